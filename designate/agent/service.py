@@ -50,6 +50,7 @@ class Service(service.Service):
             cfg.CONF['service:agent'].listen,
             cfg.CONF['service:agent'].tcp_backlog,
             cfg.CONF['service:agent'].tcp_recv_timeout,
+            cfg.CONF['service:agent'].dns_pool_size,
         )
 
         backend_driver = cfg.CONF['service:agent'].backend_driver
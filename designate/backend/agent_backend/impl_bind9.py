@@ -22,6 +22,7 @@ from oslo_concurrency import lockutils
 from oslo_config import cfg
 from oslo_log import log as logging
 
+from designate.backend import rndc
 from designate.backend.agent_backend import base
 from designate import exceptions
 from designate import utils
@@ -34,9 +35,22 @@ class Bind9Backend(base.AgentBackend):
     __plugin_name__ = 'bind9'
     __backend_status__ = 'untested'
 
+    def __init__(self, agent_service):
+        super(Bind9Backend, self).__init__(agent_service)
+
+        # Keep connections to the control channel open instead of running
+        # the rndc binary for every command.
+        self._rndc_client = None
+        if cfg.CONF[CFG_GROUP_NAME].rndc_native:
+            self._rndc_client = self._rndc_client_from_config()
+
     def start(self):
         LOG.info("Started bind9 backend")
 
+    def stop(self):
+        if self._rndc_client is not None:
+            self._rndc_client.close()
+
     def find_zone_serial(self, zone_name):
         LOG.debug("Finding %s", zone_name)
         resolver = dns.resolver.Resolver()
@@ -58,11 +72,10 @@ class Bind9Backend(base.AgentBackend):
     def delete_zone(self, zone_name):
         LOG.debug('Delete Zone: %s' % zone_name)
 
-        rndc_op = 'delzone'
         # RNDC doesn't like the trailing dot on the zone name
-        rndc_call = self._rndc_base() + [rndc_op, zone_name.rstrip('.')]
+        rndc_op = ['delzone', zone_name.rstrip('.')]
 
-        utils.execute(*rndc_call)
+        self._execute_rndc(rndc_op)
 
     def _rndc_base(self):
         rndc_call = [
@@ -81,6 +94,21 @@ class Bind9Backend(base.AgentBackend):
 
         return rndc_call
 
+    def _rndc_client_from_config(self):
+        group = cfg.CONF[CFG_GROUP_NAME]
+        try:
+            return rndc.RndcClient.from_key_file(
+                group.rndc_host, group.rndc_port,
+                config_file=group.rndc_config_file,
+                key_file=group.rndc_key_file,
+                pool_size=group.rndc_pool_size,
+                timeout=group.rndc_timeout or None,
+            )
+        except exceptions.ConfigurationError as e:
+            LOG.warning('Unable to use the RNDC control channel, falling '
+                        'back to executing rndc: %s', e)
+            return None
+
     def _sync_zone(self, zone, new_zone_flag=False):
         """Sync a single zone's zone file and reload bind config"""
 
@@ -103,24 +131,31 @@ class Bind9Backend(base.AgentBackend):
 
             zone.to_file(output_path, relativize=False)
 
-            rndc_call = self._rndc_base()
-
             if new_zone_flag:
                 rndc_op = [
                     'addzone',
                     '%s { type master; file "%s"; };' % (zone_name,
                                                          output_path),
                 ]
-                rndc_call.extend(rndc_op)
             else:
-                rndc_op = 'reload'
-                rndc_call.extend([rndc_op])
-                rndc_call.extend([zone_name])
-
-            LOG.debug('Calling RNDC with: %s' % " ".join(rndc_call))
-            self._execute_rndc(rndc_call)
-
-    def _execute_rndc(self, rndc_call):
+                rndc_op = ['reload', zone_name]
+
+            LOG.debug('Calling RNDC with: %s' % " ".join(rndc_op))
+            self._execute_rndc(rndc_op)
+
+    def _execute_rndc(self, rndc_op):
+        if self._rndc_client is not None:
+            try:
+                LOG.debug('Sending RNDC command: %s' % " ".join(rndc_op))
+                self._rndc_client.call(" ".join(rndc_op))
+                return
+            except rndc.UNSENT_ERRORS as e:
+                # Any other failure can come once named got the command,
+                # which must not be run a second time
+                LOG.warning('RNDC control channel failure, falling back to '
+                            'executing rndc: %s', e)
+
+        rndc_call = self._rndc_base() + rndc_op
         try:
             LOG.debug('Executing RNDC call: %s' % " ".join(rndc_call))
             utils.execute(*rndc_call)
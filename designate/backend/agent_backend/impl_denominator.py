@@ -13,6 +13,8 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import collections
+import hashlib
 import itertools
 
 import dns.rdata
@@ -62,7 +64,12 @@ class Denominator(object):
         return self._execute(['zone', 'delete'], kwargs)
 
     def _params(self, **kwargs):
-        params = [('--%s' % k, str(v)) for k, v in kwargs.items()]
+        # A list is passed as the same option repeated, which is how the
+        # records of a record set are given in a single call
+        params = []
+        for k, v in kwargs.items():
+            values = v if isinstance(v, list) else [v]
+            params.extend(('--%s' % k, str(value)) for value in values)
         return list(itertools.chain(*params))
 
     def _base(self):
@@ -96,6 +103,10 @@ class DenominatorBackend(base.AgentBackend):
         self.denominator = Denominator(
             cfg.CONF[CFG_GROUP_NAME])
 
+        # Fingerprints of the zones as they were last synced to the provider,
+        # to tell the updates that change nothing apart
+        self._synced_zones = {}
+
     def start(self):
         LOG.info("Started Denominator backend")
 
@@ -139,19 +150,19 @@ class DenominatorBackend(base.AgentBackend):
                 ttl=soa_record.ttl,
                 email=rname)
 
-            # Add records one by one.
-            for name, ttl, rtype, data in self._iterate_records(zone):
-                # Some providers do not support creation of SOA record.
-                rdatatype = dns.rdatatype.from_text(rtype)
-                if rdatatype == dns.rdatatype.SOA:
-                    continue
-
+            # Add the records one record set at a time. Some providers do
+            # not support creation of SOA record.
+            rrsets = self._rrsets(zone)
+            for (name, rtype), (ttl, data) in sorted(rrsets.items()):
                 self.denominator.create_record(
                     zone=zone_name,
                     name=name,
                     type=rtype,
                     ttl=ttl,
-                    data=data)
+                    data=sorted(data))
+
+            self._synced_zones[zone_name] = self._fingerprint(
+                soa_record.ttl, rname, rrsets)
 
     def update_zone(self, zone):
         LOG.debug("Updating %s", zone.origin)
@@ -162,7 +173,15 @@ class DenominatorBackend(base.AgentBackend):
         soa_record = zone.find_rrset(zone.origin, dns.rdatatype.SOA)
         rname = soa_record.items[0].rname.derelativize(origin=zone.origin)
 
+        rrsets = self._rrsets(zone)
+        fingerprint = self._fingerprint(soa_record.ttl, rname, rrsets)
+
         with self._sync_zone(zone.origin):
+            if self._synced_zones.get(zone_name) == fingerprint:
+                LOG.debug("%s is unchanged since it was last synced",
+                          zone_name)
+                return
+
             # Update zone with a new parameters
             self.denominator.update_zone(
                 id=zone_name,
@@ -171,52 +190,38 @@ class DenominatorBackend(base.AgentBackend):
 
             # Fetch records to create a differential update of a zone.
             output = self.denominator.get_records(zone_name)
-            subzones = dict()
-
-            # subzones dict will contain names of subzones without
-            # trailing dot.
-            for raw in output.splitlines():
-                data = raw.split()
-                name, rtype = data[0], data[1]
-
-                rtypes = subzones.get(name, set())
-                rtypes.add(rtype)
-                subzones[name] = rtypes
-
-            for name, ttl, rtype, data in self._iterate_records(zone):
-                record_action = self.denominator.create_record
-
-                if name in subzones and rtype in subzones[name]:
-                    # When RR set already exists, replace it with a new one.
-                    rdatatype = dns.rdatatype.from_text(rtype)
+            current = self._parse_records(output)
+
+            # Only send the record sets that changed, each in one call.
+            for key, (ttl, data) in sorted(rrsets.items()):
+                name, rtype = key
+                if key not in current:
+                    record_action = self.denominator.create_record
+                elif current[key] != (ttl, data):
+                    # Replace all the records of the set at once
                     record_action = self.denominator.update_record
-
-                    # So next call will ADD a new record to record set
-                    # instead of replacing of the existing one.
-                    subzones[name].remove(rtype)
-
-                    # NOTE: DynECT does not support deleting of the SOA
-                    #       record. Skip updating of the SOA record.
-                    if rdatatype == dns.rdatatype.SOA:
-                        continue
+                else:
+                    continue
 
                 record_action(zone=zone_name,
                               name=name,
                               type=rtype,
                               ttl=ttl,
-                              data=data)
+                              data=sorted(data))
 
             # Remaining records should be deleted
-            for name, types in subzones.items():
-                for rtype in types:
-                    self.denominator.delete_record(
-                        zone=zone_name, id=name, type=rtype)
+            for name, rtype in sorted(set(current) - set(rrsets)):
+                self.denominator.delete_record(
+                    zone=zone_name, id=name, type=rtype)
+
+            self._synced_zones[zone_name] = fingerprint
 
     def delete_zone(self, zone_name):
         LOG.debug('Delete Zone: %s' % zone_name)
 
         with self._sync_zone(zone_name):
             self.denominator.delete_zone(id=zone_name)
+            self._synced_zones.pop(zone_name.rstrip('.'), None)
 
     def _sync_zone(self, zone_name):
         LOG.debug('Synchronising zone: %s' % zone_name)
@@ -231,3 +236,50 @@ class DenominatorBackend(base.AgentBackend):
 
             data = rdata.to_text(origin=zone.origin, relativize=False)
             yield name, ttl, dns.rdatatype.to_text(rdata.rdtype), data
+
+    def _rrsets(self, zone):
+        """Group the records of a zone by name and type, leaving out the SOA
+
+        NOTE: DynECT does not support deleting of the SOA record, so it is
+              never created or replaced.
+        """
+        rrsets = collections.defaultdict(set)
+        ttls = {}
+        for name, ttl, rtype, data in self._iterate_records(zone):
+            if dns.rdatatype.from_text(rtype) == dns.rdatatype.SOA:
+                continue
+            rrsets[(name, rtype)].add(data)
+            ttls[(name, rtype)] = ttl
+        return dict((key, (ttls[key], frozenset(data)))
+                    for key, data in rrsets.items())
+
+    @staticmethod
+    def _parse_records(output):
+        """Group the output of 'record list' like _rrsets does
+
+        Every line is a record as "name type ttl data", where the name has
+        no trailing dot.
+        """
+        rrsets = collections.defaultdict(set)
+        ttls = {}
+        for raw in (output or '').splitlines():
+            data = raw.split()
+            if len(data) < 3:
+                continue
+            name, rtype = data[0], data[1]
+            if rtype == 'SOA':
+                continue
+            rrsets[(name, rtype)].add(' '.join(data[3:]))
+            try:
+                ttls[(name, rtype)] = int(data[2])
+            except ValueError:
+                ttls[(name, rtype)] = None
+        return dict((key, (ttls[key], frozenset(data)))
+                    for key, data in rrsets.items())
+
+    @staticmethod
+    def _fingerprint(ttl, email, rrsets):
+        state = repr((ttl, str(email), sorted(
+            (key, data_ttl, sorted(data))
+            for key, (data_ttl, data) in rrsets.items())))
+        return hashlib.sha256(state.encode('utf-8')).hexdigest()
@@ -42,7 +42,9 @@ import errno
 import glob
 import os
 import random
+import shutil
 import tempfile
+import threading
 
 import dns
 import dns.resolver
@@ -66,6 +68,8 @@ TINYDNS_DATA_DEFAULT_PATH = 'tinydns-data'
 
 TINYDNS_DATADIR_DEFAULT_PATH = '/var/lib/djbdns'
 SOA_QUERY_TIMEOUT = 1
+# Longest wait before trying a failed data.cdb rebuild again, in seconds
+MAX_REBUILD_RETRY_DELAY = 300
 
 
 # TODO(Federico) on zone creation and update, agent.handler unnecessarily
@@ -129,6 +133,13 @@ class DjbdnsBackend(base.AgentBackend):
 
         self._check_dirs(tinydns_root_dir, datafiles_dir)
 
+        # Zone changes coming in within rebuild_delay seconds of each other
+        # are served by a single rebuild of data.cdb
+        self._rebuild_delay = conf.rebuild_delay
+        self._rebuild_lock = threading.Lock()
+        self._rebuild_timer = None
+        self._rebuild_failures = 0
+
     @staticmethod
     def _check_dirs(*dirnames):
         """Check if directories are writable
@@ -143,6 +154,14 @@ class DjbdnsBackend(base.AgentBackend):
         """Start the backend"""
         LOG.info("Started djbdns backend")
 
+    def stop(self):
+        """Stop the backend, rebuilding data.cdb if a rebuild is pending"""
+        with self._rebuild_lock:
+            timer, self._rebuild_timer = self._rebuild_timer, None
+        if timer is not None:
+            timer.cancel()
+            self._run_scheduled_rebuild(retry=False)
+
     def find_zone_serial(self, zone_name):
         """Query the local resolver for a zone
         Times out after SOA_QUERY_TIMEOUT
@@ -156,21 +175,87 @@ class DjbdnsBackend(base.AgentBackend):
             return None
 
     @staticmethod
-    def _concatenate_zone_datafiles(data_fn, path_glob):
+    def _copy_datafile(zone_f, data_f):
+        """Append a zone datafile to 'data'
+        The kernel copies the file over with sendfile where it is available,
+        instead of it being read into memory and written out again
+        """
+        size = os.fstat(zone_f.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(data_f.fileno(), zone_f.fileno(), offset,
+                                   size - offset)
+                if not sent:
+                    break
+                offset += sent
+        except (AttributeError, OSError):
+            if offset:
+                raise
+            # No sendfile, or no sendfile between files, on this platform
+            shutil.copyfileobj(zone_f, data_f)
+            data_f.flush()
+
+    def _concatenate_zone_datafiles(self, data_fn, path_glob):
         """Concatenate all zone datafiles into 'data'
         """
-        with open(data_fn, 'w') as data_f:
+        with open(data_fn, 'wb') as data_f:
             zone_cnt = 0
             for zone_fn in glob.glob(path_glob):
                 zone_cnt += 1
-                with open(zone_fn) as zf:
-                    data_f.write(zf.read())
+                with open(zone_fn, 'rb') as zf:
+                    self._copy_datafile(zf, data_f)
 
         LOG.info("Loaded %d zone datafiles.", zone_cnt)
 
+    def _schedule_rebuild(self):
+        """Rebuild data.cdb now, or once rebuild_delay has passed
+        A change coming in while a rebuild is waiting to run is left to it
+        """
+        if not self._rebuild_delay:
+            self._rebuild_data_cdb()
+            return
+
+        self._start_rebuild_timer(self._rebuild_delay)
+
+    def _start_rebuild_timer(self, delay):
+        with self._rebuild_lock:
+            if self._rebuild_timer is not None:
+                return
+            self._rebuild_timer = threading.Timer(
+                delay, self._run_scheduled_rebuild)
+            self._rebuild_timer.daemon = True
+            self._rebuild_timer.start()
+
+    def _run_scheduled_rebuild(self, retry=True):
+        """Rebuild data.cdb for the changes scheduled so far
+        A failed rebuild is tried again, waiting twice as long after every
+        failure, so the changes it was for are not left out of data.cdb
+        """
+        # Changes from here on need a rebuild of their own, as this one might
+        # have read the datafiles before they were written
+        with self._rebuild_lock:
+            self._rebuild_timer = None
+        try:
+            self._rebuild_data_cdb()
+        except Exception as e:
+            if not retry:
+                LOG.error("Scheduled rebuild of data.cdb failed: %s", e)
+                return
+            self._rebuild_failures += 1
+            delay = min(self._rebuild_delay * 2 ** self._rebuild_failures,
+                        MAX_REBUILD_RETRY_DELAY)
+            LOG.error("Scheduled rebuild of data.cdb failed, retrying in "
+                      "%(delay)d seconds: %(error)s",
+                      {'delay': delay, 'error': e})
+            self._start_rebuild_timer(delay)
+        else:
+            self._rebuild_failures = 0
+
+    @lockutils.synchronized('djbdns-data-cdb')
     def _rebuild_data_cdb(self):
         """Rebuild data.cdb file from zone datafiles
-        Requires global lock
+        Runs under a global lock
 
         On zone creation, axfr-get creates datafiles atomically by doing
         rename. On zone deletion, os.remove deletes the file atomically
@@ -284,7 +369,7 @@ class DjbdnsBackend(base.AgentBackend):
         LOG.debug("Triggering initial AXFR from MiniDNS to Djbdns for %s",
                   zone_name)
         self._perform_axfr_from_minidns(zone_name)
-        self._rebuild_data_cdb()
+        self._schedule_rebuild()
 
     @filter_exceptions
     def update_zone(self, zone):
@@ -299,7 +384,7 @@ class DjbdnsBackend(base.AgentBackend):
             zone_name = zone_name.decode('utf-8')
         LOG.debug("Triggering AXFR from MiniDNS to Djbdns for %s", zone_name)
         self._perform_axfr_from_minidns(zone_name)
-        self._rebuild_data_cdb()
+        self._schedule_rebuild()
 
     @filter_exceptions
     def delete_zone(self, zone_name):
@@ -323,4 +408,4 @@ class DjbdnsBackend(base.AgentBackend):
 
             raise
 
-        self._rebuild_data_cdb()
+        self._schedule_rebuild()
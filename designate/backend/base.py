@@ -94,6 +94,54 @@ class Backend(DriverPlugin):
         :param zone: the DNS zone.
         """
 
+    # Batch Backend Interface
+    def create_zones(self, context, zones):
+        """
+        Create several DNS zones.
+
+        Backends able to create zones in bulk override this, by default the
+        zones are created one by one.
+
+        :param context: Security context information.
+        :param zones: the DNS zones.
+        :returns: a list telling for each zone whether it was created.
+        """
+        return self._for_each_zone(self.create_zone, context, zones)
+
+    def update_zones(self, context, zones):
+        """
+        Update several DNS zones.
+
+        :param context: Security context information.
+        :param zones: the DNS zones.
+        :returns: a list telling for each zone whether it was updated.
+        """
+        return self._for_each_zone(self.update_zone, context, zones)
+
+    def delete_zones(self, context, zones):
+        """
+        Delete several DNS zones.
+
+        :param context: Security context information.
+        :param zones: the DNS zones.
+        :returns: a list telling for each zone whether it was deleted.
+        """
+        return self._for_each_zone(self.delete_zone, context, zones)
+
+    def _for_each_zone(self, method, context, zones):
+        results = []
+        for zone in zones:
+            try:
+                method(context, zone)
+            except Exception as e:
+                LOG.info('Failed to %(method)s %(zone)s: %(error)s',
+                         {'method': method.__name__, 'zone': zone.name,
+                          'error': e})
+                results.append(False)
+            else:
+                results.append(True)
+        return results
+
     def ping(self, context):
         """Ping the Backend service"""
 
@@ -0,0 +1,90 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Pooled HTTP sessions for the backends that talk to a REST API.
+
+A backend keeps one session for its target, so that its requests go over
+kept open connections instead of setting up a new one, and a TLS handshake,
+for every one of them.
+"""
+import time
+
+import requests
+from oslo_log import log as logging
+from requests import adapters
+from urllib3.util import retry
+
+from designate.metrics import metrics
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_TIMEOUT = 30
+
+# Server side errors that are worth trying a request again for
+RETRY_STATUSES = (502, 503, 504)
+
+
+class HTTPSession(requests.Session):
+    """
+    A requests session with a bounded pool of connections.
+
+    At most pool_size requests to a host run at the same time, the others
+    wait for a connection to be free. Requests failing to connect and
+    idempotent ones getting a 502, 503 or 504 are retried with an exponential
+    backoff, while a POST is only retried when it could not connect.
+    """
+
+    def __init__(self, name, pool_size=DEFAULT_POOL_SIZE,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                 timeout=DEFAULT_TIMEOUT, headers=None):
+        super(HTTPSession, self).__init__()
+
+        self.name = name
+        self.timeout = timeout
+
+        if headers:
+            self.headers.update(headers)
+
+        max_retries = retry.Retry(
+            total=retries,
+            read=0,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=False,
+        )
+        adapter = adapters.HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            pool_block=True,
+            max_retries=max_retries,
+        )
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+
+        start_time = time.time()
+        try:
+            response = super(HTTPSession, self).request(method, url, **kwargs)
+        finally:
+            elapsed = time.time() - start_time
+            metrics.timing('backend.%s.http_request' % self.name, elapsed)
+
+        LOG.debug('%(method)s %(url)s returned %(status)d in %(elapsed).3fs',
+                  {'method': method, 'url': url,
+                   'status': response.status_code, 'elapsed': elapsed})
+        return response
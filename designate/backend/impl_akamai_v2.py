@@ -16,13 +16,13 @@
 
 import time
 
-import requests
 from akamai import edgegrid
 from oslo_log import log as logging
 import six.moves.urllib.parse as urlparse
 
 from designate import exceptions
 from designate.backend import base
+from designate.backend import httpclient
 
 
 LOG = logging.getLogger(__name__)
@@ -31,7 +31,7 @@ LOG = logging.getLogger(__name__)
 class AkamaiClient(object):
     def __init__(self, client_token=None, client_secret=None,
                  access_token=None, host=None):
-        session = requests.Session()
+        session = httpclient.HTTPSession('akamai_v2')
         self.baseurl = 'https://%s' % host
         self.client_token = client_token
         self.client_secret = client_secret
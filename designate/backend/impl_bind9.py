@@ -15,7 +15,8 @@
 # under the License.
 
 """
-Bind 9 backend. Create and delete zones by executing rndc
+Bind 9 backend. Create and delete zones by executing rndc, or by talking to
+the rndc control channel of named directly
 """
 
 import random
@@ -29,6 +30,7 @@ from oslo_utils import strutils
 from designate import exceptions
 from designate import utils
 from designate.backend import base
+from designate.backend import rndc
 from designate.utils import DEFAULT_MDNS_PORT
 
 LOG = logging.getLogger(__name__)
@@ -57,6 +59,18 @@ class Bind9Backend(base.Backend):
         if self._rndc_timeout == 0:
             self._rndc_timeout = None
 
+        # Keep connections to the control channel open instead of running
+        # the rndc binary for every command.
+        self._rndc_client = None
+        if strutils.bool_from_string(
+                self.options.get('rndc_native', 'false')):
+            self._rndc_client = self._generate_rndc_client()
+
+    def stop(self):
+        if self._rndc_client is not None:
+            self._rndc_client.close()
+        super(Bind9Backend, self).stop()
+
     def _generate_rndc_base_call(self):
         """Generate argument list to execute rndc"""
         rndc_host = self.options.get('rndc_host', '127.0.0.1')
@@ -74,28 +88,29 @@ class Bind9Backend(base.Backend):
 
         return rndc_call
 
+    def _generate_rndc_client(self):
+        """Set up a client for the rndc control channel, if it has a key"""
+        try:
+            return rndc.RndcClient.from_key_file(
+                self.options.get('rndc_host', '127.0.0.1'),
+                int(self.options.get('rndc_port', 953)),
+                config_file=self.options.get('rndc_config_file'),
+                key_file=self.options.get('rndc_key_file'),
+                pool_size=int(self.options.get('rndc_pool_size', 4)),
+                timeout=float(self._rndc_timeout or 0) or None,
+            )
+        except exceptions.ConfigurationError as e:
+            LOG.warning('Unable to use the rndc control channel, falling '
+                        'back to executing rndc: %s', e)
+            return None
+
     def create_zone(self, context, zone):
         """Create a new Zone by executin rndc, then notify mDNS
         Do not raise exceptions if the zone already exists.
         """
         LOG.debug('Create Zone')
-        masters = []
-        for master in self.masters:
-            host = master['host']
-            port = master['port']
-            masters.append('%s port %s' % (host, port))
-
-        # Ensure different MiniDNS instances are targeted for AXFRs
-        random.shuffle(masters)
 
-        view = 'in %s' % self._view if self._view else ''
-
-        rndc_op = [
-            'addzone',
-            '%s %s { type slave; masters { %s;}; file "slave.%s%s"; };' %
-            (zone['name'].rstrip('.'), view, '; '.join(masters), zone['name'],
-             zone['id']),
-        ]
+        rndc_op = self._zone_config_op('addzone', zone)
 
         try:
             self._execute_rndc(rndc_op)
@@ -115,14 +130,7 @@ class Bind9Backend(base.Backend):
         """
         LOG.debug('Delete Zone')
 
-        view = 'in %s' % self._view if self._view else ''
-
-        rndc_op = [
-            'delzone',
-            '%s %s' % (zone['name'].rstrip('.'), view),
-        ]
-        if self._clean_zonefile:
-            rndc_op.insert(1, '-clean')
+        rndc_op = self._delzone_op(zone)
 
         try:
             self._execute_rndc(rndc_op)
@@ -144,6 +152,56 @@ class Bind9Backend(base.Backend):
         """
         LOG.debug('Update Zone')
 
+        rndc_op = self._zone_config_op('modzone', zone)
+
+        try:
+            self._execute_rndc(rndc_op)
+        except exceptions.Backend as e:
+            LOG.warning("Error updating zone: %s", e)
+            pass
+        super().update_zone(context, zone)
+
+    def create_zones(self, context, zones):
+        """Create Zones by pipelining rndc addzones over the control channel,
+        then notify mDNS
+        """
+        results = self._execute_rndc_batch(
+            [self._zone_config_op('addzone', zone) for zone in zones],
+            'already exists')
+        if results is None:
+            return super(Bind9Backend, self).create_zones(context, zones)
+
+        for zone, created in six.moves.zip(zones, results):
+            if created:
+                self.mdns_api.notify_zone_changed(
+                    context, zone, self._host, self._port, self.timeout,
+                    self.retry_interval, self.max_retries, self.delay)
+        return results
+
+    def update_zones(self, context, zones):
+        """Update Zones by pipelining rndc modzones over the control channel,
+        then notify mDNS
+        """
+        results = self._execute_rndc_batch(
+            [self._zone_config_op('modzone', zone) for zone in zones])
+        if results is None:
+            return super(Bind9Backend, self).update_zones(context, zones)
+
+        # As with a single zone, failing to modify it is not an error
+        for zone in zones:
+            super(Bind9Backend, self).update_zone(context, zone)
+        return [True] * len(zones)
+
+    def delete_zones(self, context, zones):
+        """Delete Zones by pipelining rndc delzones over the control channel
+        """
+        results = self._execute_rndc_batch(
+            [self._delzone_op(zone) for zone in zones], 'not found')
+        if results is None:
+            return super(Bind9Backend, self).delete_zones(context, zones)
+        return results
+
+    def _zone_config_op(self, command, zone):
         masters = []
         for master in self.masters:
             host = master['host']
@@ -155,19 +213,55 @@ class Bind9Backend(base.Backend):
 
         view = 'in %s' % self._view if self._view else ''
 
-        rndc_op = [
-            'modzone',
+        return [
+            command,
             '%s %s { type slave; masters { %s;}; file "slave.%s%s"; };' %
             (zone['name'].rstrip('.'), view, '; '.join(masters), zone['name'],
              zone['id']),
         ]
 
+    def _delzone_op(self, zone):
+        view = 'in %s' % self._view if self._view else ''
+
+        rndc_op = [
+            'delzone',
+            '%s %s' % (zone['name'].rstrip('.'), view),
+        ]
+        if self._clean_zonefile:
+            rndc_op.insert(1, '-clean')
+
+        return rndc_op
+
+    def _execute_rndc_batch(self, rndc_ops, ignore_error=None):
+        """Pipeline rndc commands over the control channel
+
+        :param rndc_ops: list of rndc arguments
+        :param ignore_error: error of a command that still counts as success
+        :returns: a list telling for each command whether it succeeded, or
+                  None if they have to be executed one by one instead
+        """
+        if self._rndc_client is None:
+            return None
+
         try:
-            self._execute_rndc(rndc_op)
-        except exceptions.Backend as e:
-            LOG.warning("Error updating zone: %s", e)
-            pass
-        super().update_zone(context, zone)
+            LOG.debug('Sending %d RNDC commands', len(rndc_ops))
+            results = self._rndc_client.pipeline(
+                [' '.join(rndc_op) for rndc_op in rndc_ops])
+        except rndc.UNSENT_ERRORS as e:
+            # Any other failure can come once named got the commands, which
+            # must not be run a second time
+            LOG.warning('RNDC control channel failure, falling back to '
+                        'executing rndc: %s', e)
+            return None
+
+        succeeded = []
+        for result in results:
+            if result.ok or (ignore_error and ignore_error in result.err):
+                succeeded.append(True)
+            else:
+                LOG.warning('RNDC call failure: %s', result.err)
+                succeeded.append(False)
+        return succeeded
 
     def _execute_rndc(self, rndc_op):
         """Execute rndc
@@ -177,6 +271,17 @@ class Bind9Backend(base.Backend):
         :returns: None
         :raises: exceptions.Backend
         """
+        if self._rndc_client is not None:
+            try:
+                LOG.debug('Sending RNDC command: %r', rndc_op)
+                self._rndc_client.call(' '.join(rndc_op))
+                return
+            except rndc.UNSENT_ERRORS as e:
+                # Any other failure can come once named got the command,
+                # which must not be run a second time
+                LOG.warning('RNDC control channel failure, falling back to '
+                            'executing rndc: %s', e)
+
         try:
             rndc_call = self._rndc_call_base + rndc_op
             LOG.debug('Executing RNDC call: %r with timeout %s',
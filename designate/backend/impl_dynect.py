@@ -13,18 +13,18 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import threading
 import time
 
 from eventlet import Timeout
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
-import requests
-from requests.adapters import HTTPAdapter
 
 from designate import exceptions
 from designate import utils
 from designate.backend import base
+from designate.backend import httpclient
 
 LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
@@ -94,13 +94,16 @@ class DynClient(object):
     """
     DynECT service client.
 
+    The client logs in on its first request and keeps the session token, and
+    the connections to the API, for the requests after it. It logs in again
+    when the token has expired.
+
     https://help.dynect.net/rest/
     """
     def __init__(self, customer_name, user_name, password,
                  endpoint="https://api.dynect.net:443",
                  api_version='3.5.6', headers=None, verify=True, retries=1,
-                 timeout=10, timings=False, pool_maxsize=10,
-                 pool_connections=10):
+                 timeout=10, timings=False, pool_maxsize=10):
         self.customer_name = customer_name
         self.user_name = user_name
         self.password = password
@@ -111,26 +114,22 @@ class DynClient(object):
         self.timings = timings
         self.timeout = timeout
 
-        self.authing = False
         self.token = None
+        self._login_lock = threading.Lock()
 
-        session = requests.Session()
-        session.verify = verify
-
-        session.headers = {
+        session_headers = {
             'Content-Type': 'application/json',
             'Accept': 'application/json',
             'API-Version': api_version,
             'User-Agent': 'DynECTClient'}
 
         if headers is not None:
-            session.headers.update(headers)
+            session_headers.update(headers)
 
-        adapter = HTTPAdapter(max_retries=int(retries),
-                              pool_maxsize=int(pool_maxsize),
-                              pool_connections=int(pool_connections),
-                              pool_block=True)
-        session.mount(endpoint, adapter)
+        session = httpclient.HTTPSession(
+            'dynect', pool_size=int(pool_maxsize), retries=int(retries),
+            timeout=timeout, headers=session_headers)
+        session.verify = verify
         self.http = session
 
     def _http_log_req(self, method, url, kwargs):
@@ -240,14 +239,17 @@ class DynClient(object):
         return polled_response
 
     def request(self, method, url, retries=2, **kwargs):
-        if self.token is None and not self.authing:
-            self.login()
+        token = self.login()
 
         try:
             response = self._request(method, url, **kwargs)
         except DynClientAuthError:
             if retries > 0:
-                self.token = None
+                # The token expired, log in again unless a concurrent
+                # request already has
+                with self._login_lock:
+                    if self.token == token:
+                        self.token = None
                 retries = retries - 1
                 return self.request(method, url, retries, **kwargs)
             else:
@@ -259,15 +261,20 @@ class DynClient(object):
         return response.json()
 
     def login(self):
-        self.authing = True
-        data = {
-            'customer_name': self.customer_name,
-            'user_name': self.user_name,
-            'password': self.password
-        }
-        response = self.post('/Session', data=data)
-        self.token = response['data']['token']
-        self.authing = False
+        """
+        Log in, unless the client already holds a session token
+        :return: The session token
+        """
+        with self._login_lock:
+            if self.token is None:
+                data = {
+                    'customer_name': self.customer_name,
+                    'user_name': self.user_name,
+                    'password': self.password
+                }
+                response = self._request('POST', '/Session', data=data)
+                self.token = response.json()['data']['token']
+            return self.token
 
     def logout(self):
         self.delete('/Session')
@@ -316,14 +323,18 @@ class DynECTBackend(base.Backend):
                 raise exceptions.ConfigurationError(
                     "DynECT only supports mDNS instances on port 53")
 
-    def get_client(self):
-        return DynClient(
+        # Keep the session, and the connections to the API, open between
+        # zone changes
+        self.client = DynClient(
             customer_name=self.customer_name,
             user_name=self.username,
             password=self.password,
             timeout=CONF[CFG_GROUP_NAME].timeout,
             timings=CONF[CFG_GROUP_NAME].timings)
 
+    def get_client(self):
+        return self.client
+
     def create_zone(self, context, zone):
         LOG.info('Creating zone %(d_id)s / %(d_name)s',
                  {'d_id': zone['id'], 'd_name': zone['name']})
@@ -354,7 +365,6 @@ class DynECTBackend(base.Backend):
                 raise
 
         client.put(url, data={'activate': True})
-        client.logout()
 
     def delete_zone(self, context, zone):
         LOG.info('Deleting zone %(d_id)s / %(d_name)s',
@@ -371,4 +381,3 @@ class DynECTBackend(base.Backend):
                 pass
             else:
                 raise
-        client.logout()
@@ -51,13 +51,18 @@ class NSD4Backend(base.Backend):
                                         '/etc/nsd/nsd_control.key')
         self.pattern = self.options.get('pattern', 'slave')
 
-    def _command(self, command):
+    def _command(self, command, lines=None):
         sock = eventlet.wrap_ssl(
             eventlet.connect((self.host, self.port)),
             keyfile=self.keyfile,
             certfile=self.certfile)
         stream = sock.makefile()
         stream.write('%s %s\n' % (self.NSDCT_VERSION, command))
+        if lines is not None:
+            # Commands reading stdin take a line each, ended by an EOT
+            for line in lines:
+                stream.write('%s\n' % line)
+            stream.write('\x04\n')
         stream.flush()
         result = stream.read()
         stream.close()
@@ -75,6 +80,55 @@ class NSD4Backend(base.Backend):
         if result.rstrip("\n") != 'ok':
             raise exceptions.Backend(result)
 
+    def _execute_nsd4_batch(self, command, zones, lines):
+        """Run a command taking a line per zone
+
+        :returns: a list telling for each zone whether the command
+                  succeeded on it
+        :raises: exceptions.Backend if the command failed as a whole
+        """
+        try:
+            LOG.debug('Executing NSD4 control call: %s for %d zones on %s',
+                      command, len(zones), self.host)
+            result = self._command(command, lines)
+        except (ssl.SSLError, socket.error) as e:
+            LOG.debug('NSD4 control call failure: %s' % e)
+            raise exceptions.Backend(e)
+
+        failed = set()
+        names = set(zone['name'] for zone in zones)
+        for line in result.splitlines():
+            if not line.startswith('error'):
+                continue
+            # An error not naming a zone, such as an NSD too old to know
+            # the command, fails the whole batch
+            named = names.intersection(line.split())
+            if not named:
+                raise exceptions.Backend(line)
+            LOG.warning('NSD4 control call failure: %s', line)
+            failed.update(named)
+
+        return [zone['name'] not in failed for zone in zones]
+
+    def create_zones(self, context, zones):
+        LOG.debug('Create Zones')
+        try:
+            return self._execute_nsd4_batch(
+                'addzones', zones,
+                ['%s %s' % (zone['name'], self.pattern) for zone in zones])
+        except exceptions.Backend as e:
+            LOG.warning('Could not add zones at once: %s', e)
+            return super(NSD4Backend, self).create_zones(context, zones)
+
+    def delete_zones(self, context, zones):
+        LOG.debug('Delete Zones')
+        try:
+            return self._execute_nsd4_batch(
+                'delzones', zones, [zone['name'] for zone in zones])
+        except exceptions.Backend as e:
+            LOG.warning('Could not delete zones at once: %s', e)
+            return super(NSD4Backend, self).delete_zones(context, zones)
+
     def create_zone(self, context, zone):
         LOG.debug('Create Zone')
         masters = []
@@ -19,6 +19,7 @@ from six.moves import urllib
 
 from designate import exceptions
 from designate.backend import base
+from designate.backend import httpclient
 
 LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
@@ -40,21 +41,47 @@ class PDNS4Backend(base.Backend):
             "X-API-Key": self.api_token
         }
 
+        # Keep the connections to the API open between zone changes
+        self.http = httpclient.HTTPSession(
+            self.__plugin_name__,
+            pool_size=int(self.options.get(
+                'api_pool_size', httpclient.DEFAULT_POOL_SIZE)),
+            headers=self.headers,
+        )
+
     def _build_url(self, zone=''):
         r_url = urllib.parse.urlparse(self.api_endpoint)
         return "%s://%s/api/v1/servers/localhost/zones%s%s" % (
             r_url.scheme, r_url.netloc, '/' if zone else '', zone)
 
     def _check_zone_exists(self, zone):
-        zone = requests.get(
-            self._build_url(zone=zone.name),
-            headers=self.headers,
-        )
+        zone = self.http.get(self._build_url(zone=zone.name))
         return zone.status_code == 200
 
+    def _list_zones(self):
+        """Get the names of all the zones on the server in one request"""
+        response = self.http.get(self._build_url())
+        response.raise_for_status()
+        return set(zone['name'] for zone in response.json())
+
     def create_zone(self, context, zone):
         """Create a DNS zone"""
+        self._create_zone(context, zone, self._check_zone_exists(zone))
+
+    def create_zones(self, context, zones):
+        """Create DNS zones, checking which exist with a single request"""
+        try:
+            existing = self._list_zones()
+        except (requests.RequestException, ValueError) as e:
+            LOG.warning('Could not list the zones on the server: %s', e)
+            return super(PDNS4Backend, self).create_zones(context, zones)
+
+        def create_zone(context, zone):
+            self._create_zone(context, zone, zone.name in existing)
 
+        return self._for_each_zone(create_zone, context, zones)
+
+    def _create_zone(self, context, zone, exists):
         masters = []
         for master in self.masters:
             host = master.host
@@ -71,23 +98,19 @@ class PDNS4Backend(base.Backend):
         if self.tsigkey_name:
             data['slave_tsig_key_ids'] = [self.tsigkey_name]
 
-        if self._check_zone_exists(zone):
+        if exists:
             LOG.info(
                 '%s exists on the server. Deleting zone before creation', zone
             )
 
             try:
-                self.delete_zone(context, zone)
+                self._delete_zone(context, zone, exists)
             except exceptions.Backend:
                 LOG.error('Could not delete pre-existing zone %s', zone)
                 raise
 
         try:
-            requests.post(
-                self._build_url(),
-                json=data,
-                headers=self.headers
-            ).raise_for_status()
+            self.http.post(self._build_url(), json=data).raise_for_status()
         except requests.HTTPError as e:
             # check if the zone was actually created - even with errors pdns
             # will create the zone sometimes
@@ -105,15 +128,27 @@ class PDNS4Backend(base.Backend):
 
     def delete_zone(self, context, zone):
         """Delete a DNS zone"""
+        self._delete_zone(context, zone, self._check_zone_exists(zone))
+
+    def delete_zones(self, context, zones):
+        """Delete DNS zones, checking which exist with a single request"""
+        try:
+            existing = self._list_zones()
+        except (requests.RequestException, ValueError) as e:
+            LOG.warning('Could not list the zones on the server: %s', e)
+            return super(PDNS4Backend, self).delete_zones(context, zones)
+
+        def delete_zone(context, zone):
+            self._delete_zone(context, zone, zone.name in existing)
+
+        return self._for_each_zone(delete_zone, context, zones)
 
+    def _delete_zone(self, context, zone, exists):
         # First verify that the zone exists -- If it's not present
         #  in the backend then we can just declare victory.
-        if self._check_zone_exists(zone):
+        if exists:
             try:
-                requests.delete(
-                    self._build_url(zone.name),
-                    headers=self.headers
-                ).raise_for_status()
+                self.http.delete(self._build_url(zone.name)).raise_for_status()
             except requests.HTTPError as e:
                 raise exceptions.Backend(e)
         else:
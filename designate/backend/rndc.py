@@ -0,0 +1,466 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Client for the BIND 9 control channel.
+
+Speaks the protocol rndc uses to talk to named, so that commands can be sent
+over kept open, authenticated connections instead of running the rndc binary
+for every one of them.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import random
+import re
+import select
+import socket
+import struct
+import threading
+import time
+
+import six
+from oslo_log import log as logging
+
+from designate import exceptions
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_KEY_FILE = '/etc/rndc.key'
+
+# Digests and the algorithm numbers named expects in front of them
+ALGORITHMS = {
+    'hmac-md5': (hashlib.md5, None),
+    'hmac-sha1': (hashlib.sha1, 161),
+    'hmac-sha224': (hashlib.sha224, 162),
+    'hmac-sha256': (hashlib.sha256, 163),
+    'hmac-sha384': (hashlib.sha384, 164),
+    'hmac-sha512': (hashlib.sha512, 165),
+}
+
+MESSAGE_VERSION = 1
+MESSAGE_EXPIRY = 60
+
+TYPE_BINARY = 1
+TYPE_TABLE = 2
+TYPE_LIST = 3
+
+_COMMENTS_RE = re.compile(r'/\*.*?\*/|//[^\n]*|#[^\n]*', re.S)
+_KEY_RE = re.compile(r'\bkey\s+"?([^\s"{]+)"?\s*\{(.*?)\}\s*;', re.S)
+_ALGORITHM_RE = re.compile(r'\balgorithm\s+"?([\w-]+)"?\s*;')
+_SECRET_RE = re.compile(r'\bsecret\s+"([^"]+)"\s*;')
+_DEFAULT_KEY_RE = re.compile(r'\bdefault-key\s+"?([^\s";]+)"?\s*;')
+
+
+class RndcConnectionError(exceptions.Backend):
+    pass
+
+
+class RndcConnectionClosed(RndcConnectionError):
+    """The connection was closed before the first command was sent"""
+    pass
+
+
+class RndcConnectFailed(RndcConnectionError):
+    """The connection could not be set up, so no command was sent"""
+    pass
+
+
+# The failures after which the commands are known not to have run, the others
+# can happen once named got a command and may have applied it, even without a
+# reply to it
+UNSENT_ERRORS = (RndcConnectFailed, RndcConnectionClosed)
+
+
+def load_key(config_file=None, key_file=None):
+    """
+    Find the algorithm and secret of the rndc key, as rndc would.
+
+    A key file takes precedence over the config file, where the default-key
+    is used if set and the first key otherwise.
+    """
+    path = key_file or config_file or DEFAULT_KEY_FILE
+    try:
+        with open(path) as f:
+            config = _COMMENTS_RE.sub('', f.read())
+    except (IOError, OSError) as e:
+        raise exceptions.ConfigurationError(
+            'Unable to read rndc key from %s: %s' % (path, e))
+
+    keys = _KEY_RE.findall(config)
+    if not keys:
+        raise exceptions.ConfigurationError('No rndc key in %s' % path)
+
+    key = keys[0][1]
+    default_key = _DEFAULT_KEY_RE.search(config)
+    if not key_file and default_key:
+        key = dict(keys).get(default_key.group(1))
+        if key is None:
+            raise exceptions.ConfigurationError(
+                'rndc key %s not found in %s' % (default_key.group(1), path))
+
+    algorithm = _ALGORITHM_RE.search(key)
+    secret = _SECRET_RE.search(key)
+    if algorithm is None or secret is None:
+        raise exceptions.ConfigurationError(
+            'Incomplete rndc key in %s' % path)
+
+    return algorithm.group(1).lower(), secret.group(1)
+
+
+def _decode_key(algorithm, secret):
+    try:
+        digestmod, algorithm_id = ALGORITHMS[algorithm]
+    except KeyError:
+        raise exceptions.ConfigurationError(
+            'Unsupported rndc key algorithm %s' % algorithm)
+    try:
+        secret = base64.b64decode(secret)
+    except (binascii.Error, ValueError):
+        raise exceptions.ConfigurationError('Invalid rndc key secret')
+    return digestmod, algorithm_id, secret
+
+
+def _serialize(table):
+    data = b''
+    for key, value in table.items():
+        key = key.encode('ascii')
+        if isinstance(value, dict):
+            value_type, value = TYPE_TABLE, _serialize(value)
+        else:
+            if isinstance(value, six.text_type):
+                value = value.encode('utf-8')
+            value_type = TYPE_BINARY
+        data += struct.pack('B', len(key)) + key
+        data += struct.pack('>BI', value_type, len(value)) + value
+    return data
+
+
+def _parse_value(value_type, value):
+    if value_type == TYPE_TABLE:
+        return _parse(value)[0]
+    elif value_type == TYPE_LIST:
+        items = []
+        while value:
+            item_type, length = struct.unpack('>BI', value[:5])
+            items.append(_parse_value(item_type, value[5:5 + length]))
+            value = value[5 + length:]
+        return items
+    return value
+
+
+def _parse(data):
+    """
+    Parse a table, returning it along with where its first element ends.
+    """
+    table = {}
+    first_end = None
+    pos = 0
+    while pos < len(data):
+        key_length = data[pos]
+        key = data[pos + 1:pos + 1 + key_length].decode('ascii')
+        pos += 1 + key_length
+        value_type, length = struct.unpack('>BI', data[pos:pos + 5])
+        pos += 5
+        if pos + length > len(data):
+            raise ValueError('Truncated element %s' % key)
+        table[key] = _parse_value(value_type, data[pos:pos + length])
+        pos += length
+        if first_end is None:
+            first_end = pos
+    return table, first_end
+
+
+def _text(table, key):
+    value = table.get(key, b'')
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', 'replace')
+    return value
+
+
+class RndcResult(object):
+    def __init__(self, command, data):
+        self.command = command
+        self.result = _text(data, 'result') or '0'
+        self.err = _text(data, 'err')
+        self.text = _text(data, 'text')
+
+    @property
+    def ok(self):
+        return self.result == '0'
+
+    def check(self):
+        """Raise the failure of a command the way rndc reports it"""
+        if not self.ok:
+            message = "'%s' failed: %s" % (
+                self.command.split(' ', 1)[0], self.err or self.result)
+            if self.text:
+                message += '\n%s' % self.text
+            raise exceptions.Backend(message)
+        return self.text
+
+
+class RndcConnection(object):
+    """An authenticated connection to the control channel of named"""
+
+    def __init__(self, host, port, algorithm, secret, timeout=None):
+        self._digestmod, self._algorithm_id, self._secret = _decode_key(
+            algorithm, secret)
+        self._serial = random.randint(0, 1 << 24)
+        self._nonce = None
+
+        try:
+            self._sock = socket.create_connection((host, port), timeout)
+        except (socket.error, socket.timeout) as e:
+            raise RndcConnectFailed(
+                'Unable to connect to rndc on %s:%d: %s' % (host, port, e))
+
+        try:
+            # named hands out the nonce that authenticates the commands
+            # following on this connection in reply to a null command
+            self._send('null')
+            self._nonce = self._receive()['_ctrl'].get('_nonce')
+            if self._nonce is None:
+                raise RndcConnectionError('rndc did not hand out a nonce')
+        except RndcConnectionError as e:
+            self.close()
+            raise RndcConnectFailed(
+                'Unable to log in to rndc on %s:%d: %s' % (host, port, e))
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        try:
+            self._sock.close()
+        except socket.error:
+            pass
+
+    def closed_by_peer(self):
+        """
+        Whether named closed the connection while it sat idle, as nothing
+        else is sent to the client between commands
+        """
+        try:
+            readable, _, _ = select.select([self._sock], [], [], 0)
+        except (socket.error, ValueError):
+            return True
+        return bool(readable)
+
+    def pipeline(self, commands):
+        """
+        Send the commands in a row, then read their replies in order.
+
+        Only a connection closed while sending the first command is raised
+        as RndcConnectionClosed. Once a command has been sent named may run
+        it, whether or not a reply comes back.
+
+        :returns: a list of RndcResult
+        """
+        serials = []
+        for command in commands:
+            try:
+                serials.append(self._send(command))
+            except RndcConnectionClosed:
+                if serials:
+                    raise RndcConnectionError(
+                        'Connection closed after sending %d of %d rndc '
+                        'commands' % (len(serials), len(commands)))
+                raise
+
+        results = []
+        for command, serial in six.moves.zip(commands, serials):
+            message = self._receive()
+            if message['_ctrl'].get('_ser') != serial:
+                raise RndcConnectionError('Unexpected rndc reply')
+            results.append(RndcResult(command, message.get('_data', {})))
+
+        return results
+
+    def _send(self, command):
+        self._serial += 1
+        now = int(time.time())
+        serial = str(self._serial).encode('ascii')
+
+        ctrl = {
+            '_ser': serial,
+            '_tim': str(now),
+            '_exp': str(now + MESSAGE_EXPIRY),
+        }
+        if self._nonce is not None:
+            ctrl['_nonce'] = self._nonce
+
+        # The signature covers everything following the _auth table, which
+        # needs to come first
+        signed = _serialize({'_ctrl': ctrl, '_data': {'type': command}})
+        digest = self._digest(signed)
+        if self._algorithm_id is None:
+            auth = {'hmd5': digest.rstrip(b'=')}
+        else:
+            auth = {'hsha': struct.pack('B88s', self._algorithm_id, digest)}
+
+        message = _serialize({'_auth': auth}) + signed
+        try:
+            self._sock.sendall(
+                struct.pack('>II', len(message) + 4, MESSAGE_VERSION) +
+                message)
+        except (socket.error, socket.timeout) as e:
+            raise self._error(e)
+
+        return serial
+
+    def _receive(self):
+        length, version = struct.unpack('>II', self._read(8))
+        if version != MESSAGE_VERSION:
+            raise RndcConnectionError(
+                'Unsupported rndc message version %d' % version)
+
+        data = self._read(length - 4)
+        try:
+            message, auth_end = _parse(data)
+            nonce = message['_ctrl'].get('_nonce')
+            auth = message['_auth']
+            if self._algorithm_id is None:
+                digest = auth['hmd5']
+            else:
+                digest = auth['hsha'][1:].rstrip(b'\0')
+            digest = digest.rstrip(b'=')
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError,
+                struct.error):
+            raise RndcConnectionError('Malformed rndc reply')
+
+        expected = self._digest(data[auth_end:]).rstrip(b'=')
+        if not hmac.compare_digest(digest, expected):
+            raise RndcConnectionError('rndc reply failed authentication')
+
+        if self._nonce is not None and nonce != self._nonce:
+            raise RndcConnectionError('rndc reply has a bad nonce')
+
+        return message
+
+    def _read(self, length):
+        data = b''
+        while len(data) < length:
+            try:
+                chunk = self._sock.recv(length - len(data))
+            except (socket.error, socket.timeout) as e:
+                raise RndcConnectionError('rndc connection failed: %s' % e)
+            if not chunk:
+                raise RndcConnectionError(
+                    'rndc connection closed before replying')
+            data += chunk
+        return data
+
+    def _digest(self, data):
+        return base64.b64encode(
+            hmac.new(self._secret, data, self._digestmod).digest())
+
+    @staticmethod
+    def _error(e):
+        if isinstance(e, (ConnectionResetError, BrokenPipeError)):
+            return RndcConnectionClosed('rndc connection closed: %s' % e)
+        return RndcConnectionError('rndc connection failed: %s' % e)
+
+
+class RndcClient(object):
+    """
+    A pool of connections to the control channel of one named.
+
+    Up to pool_size commands, or pipelines of commands, run at the same time
+    and the connections are kept open between them.
+    """
+
+    def __init__(self, host, port, algorithm, secret, pool_size=4,
+                 timeout=None):
+        # Fail on a broken key here rather than on every connection
+        _decode_key(algorithm, secret)
+
+        self.host = host
+        self.port = port
+        self._algorithm = algorithm
+        self._secret = secret
+        self._timeout = timeout
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._idle = []
+
+    @classmethod
+    def from_key_file(cls, host, port, config_file=None, key_file=None,
+                      **kwargs):
+        algorithm, secret = load_key(config_file, key_file)
+        return cls(host, port, algorithm, secret, **kwargs)
+
+    def call(self, command):
+        """
+        Run a command, raising a Backend exception if it fails.
+
+        :returns: the text named replied with
+        """
+        return self.pipeline([command])[0].check()
+
+    def pipeline(self, commands):
+        """
+        Run several commands over one connection without waiting on each.
+
+        :returns: a list of RndcResult, one for every command
+        """
+        with self._slots:
+            connection, reused = self._checkout()
+            try:
+                results = connection.pipeline(commands)
+            except RndcConnectionClosed:
+                connection.close()
+                if not reused:
+                    raise
+
+                # named closed a connection that sat idle before any of the
+                # commands got to run, so they can go over a new one
+                LOG.debug('rndc connection to %s:%d was closed, reconnecting',
+                          self.host, self.port)
+                connection = self._connect()
+                try:
+                    results = connection.pipeline(commands)
+                except Exception:
+                    connection.close()
+                    raise
+            except Exception:
+                connection.close()
+                raise
+
+            with self._lock:
+                self._idle.append(connection)
+
+            return results
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection = self._idle.pop()
+            # Replies to a command on a connection named closed meanwhile
+            # never come, and the command can't safely be sent again
+            if not connection.closed_by_peer():
+                return connection, True
+            connection.close()
+        return self._connect(), False
+
+    def _connect(self):
+        return RndcConnection(self.host, self.port, self._algorithm,
+                              self._secret, self._timeout)
@@ -0,0 +1,298 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import re
+import signal
+
+from oslo_log import log as logging
+
+from designate import exceptions
+
+LOG = logging.getLogger(__name__)
+
+# Time all the blacklist regexes together may take to evaluate against a
+# zone name, however many there are
+MATCH_TIMEOUT = 0.1
+
+# Unbounded quantifiers a pattern may have, each one more multiplies the
+# backtracking a failing search can do
+MAX_UNBOUNDED_QUANTIFIERS = 3
+
+REGEX_METACHARACTERS = frozenset('.^$*+?{}[]|()')
+# Quantified groups may backtrack catastrophically, and backreferences are
+# renumbered when patterns are combined
+RISKY_PATTERN = re.compile(r'\)[*+?{]|\\[1-9]|\(\?P=')
+# Repeated groups and backreferences may take exponential time
+UNSAFE_PATTERN = re.compile(r'(?<!\\)\)[*+{]|\\[1-9]|\(\?P=')
+
+
+class Timeout(Exception):
+    pass
+
+
+def _handle_timeout(signum, frame):
+    raise Timeout()
+
+
+class Alarm(object):
+    """
+    Interrupt a regex which runs for too long with SIGALRM.
+
+    The handler is installed once around all of the patterns evaluated for
+    a zone name. Signals can only be used from the main thread, elsewhere
+    the patterns are evaluated without a time limit instead of failing. This
+    is why the patterns which could take exponential time are refused when
+    a blacklist is created, see check_pattern.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.previous_handler = None
+
+    def __enter__(self):
+        try:
+            self.previous_handler = signal.signal(
+                signal.SIGALRM, _handle_timeout)
+            self.enabled = True
+        except ValueError:
+            LOG.debug('Evaluating the blacklists without a time limit, '
+                      'not running in the main thread')
+        return self
+
+    def __exit__(self, *args):
+        if self.enabled:
+            self.disarm()
+            signal.signal(signal.SIGALRM, self.previous_handler)
+            self.enabled = False
+
+    def arm(self, seconds):
+        if self.enabled:
+            signal.setitimer(signal.ITIMER_REAL, seconds)
+
+    def disarm(self):
+        if self.enabled:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _count_unbounded_quantifiers(pattern):
+    count = 0
+    quantified = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            quantified = False
+            continue
+        elif char == '[':
+            # Skip the character class, a ] first in it is a literal
+            i += 1
+            if pattern[i:i + 1] == '^':
+                i += 1
+            if pattern[i:i + 1] == ']':
+                i += 1
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            quantified = False
+        elif char in '*+?':
+            # The lazy .*? is no more quantifiers than .*
+            if char != '?' and not quantified:
+                count += 1
+            quantified = True
+        elif char == '{':
+            bounds = re.match(r'\{\d*(,\d*)?\}', pattern[i:])
+            if bounds is not None:
+                if bounds.group(0).endswith(',}') and not quantified:
+                    count += 1
+                i += len(bounds.group(0))
+                quantified = True
+                continue
+            quantified = False
+        else:
+            quantified = False
+        i += 1
+    return count
+
+
+def check_pattern(pattern):
+    """
+    Refuse the patterns which could take too long to evaluate.
+
+    Repeated groups, like (a+)+, and backreferences can take exponential
+    time and too many unbounded quantifiers polynomial time of a high
+    degree. They cannot be interrupted outside of the main thread, so they
+    are refused when a blacklist is created instead.
+
+    :raises: exceptions.InvalidBlacklistPattern
+    """
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise exceptions.InvalidBlacklistPattern(
+            'Invalid blacklist pattern %s: %s' % (pattern, e))
+
+    if UNSAFE_PATTERN.search(pattern):
+        raise exceptions.InvalidBlacklistPattern(
+            'Blacklist pattern %s repeats a group or has a backreference, '
+            'which can take too long to evaluate' % pattern)
+
+    if _count_unbounded_quantifiers(pattern) > MAX_UNBOUNDED_QUANTIFIERS:
+        raise exceptions.InvalidBlacklistPattern(
+            'Blacklist pattern %s has more than %d unbounded quantifiers, '
+            'which can take too long to evaluate' %
+            (pattern, MAX_UNBOUNDED_QUANTIFIERS))
+
+
+def parse_literal(pattern):
+    """
+    Return the text a regex matches literally, or None if it is not a
+    literal
+    """
+    literal = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            # \d, \w, \b and friends are not literals
+            if char.isalnum():
+                return None
+            literal.append(char)
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char in REGEX_METACHARACTERS:
+            return None
+        else:
+            literal.append(char)
+    if escaped or not literal:
+        return None
+    return ''.join(literal)
+
+
+def parse_literal_pattern(pattern):
+    """
+    Split a pattern like ^.*\\.example\\.com\\.$ into how its literal is
+    anchored, one of exact, prefix, suffix or contains, and the literal.
+    Returns None for the patterns which need a regex.
+    """
+    start_anchored = pattern.startswith('^')
+    if start_anchored:
+        pattern = pattern[1:]
+    if pattern.startswith('.*'):
+        start_anchored = False
+        pattern = pattern[2:]
+
+    end_anchored = pattern.endswith('$') and not pattern.endswith('\\$')
+    if end_anchored:
+        pattern = pattern[:-1]
+
+    literal = parse_literal(pattern)
+    if literal is None:
+        return None
+
+    if start_anchored and end_anchored:
+        return 'exact', literal
+    elif start_anchored:
+        return 'prefix', literal
+    elif end_anchored:
+        return 'suffix', literal
+    return 'contains', literal
+
+
+class BlacklistMatcher(object):
+    """
+    Match zone names against all the blacklist patterns.
+
+    Literal patterns, the common ^.*\\.example\\.com\\.$ ones, are looked up
+    in sets without a regex. The other patterns are compiled once, and those
+    which cannot backtrack catastrophically are combined in a single
+    alternation. The remaining ones are evaluated one at a time, all of them
+    within MATCH_TIMEOUT.
+    """
+    def __init__(self, patterns):
+        self.exact = set()
+        self.prefixes = set()
+        self.suffixes = set()
+        self.contains = []
+        self.combined = None
+        self.regexes = []
+
+        safe = []
+        for pattern in patterns:
+            literal_pattern = parse_literal_pattern(pattern)
+            if literal_pattern is not None:
+                kind, literal = literal_pattern
+                if kind == 'exact':
+                    self.exact.add(literal)
+                elif kind == 'prefix':
+                    self.prefixes.add(literal)
+                elif kind == 'suffix':
+                    self.suffixes.add(literal)
+                else:
+                    self.contains.append(literal)
+                continue
+
+            regex = re.compile(pattern)
+            # Inline flags apply to the whole alternation, so patterns with
+            # flags are not combined either
+            if RISKY_PATTERN.search(pattern) or regex.flags != re.UNICODE:
+                self.regexes.append(regex)
+            else:
+                safe.append(regex)
+
+        if len(safe) > 1:
+            try:
+                self.combined = re.compile('|'.join(
+                    '(?:%s)' % regex.pattern for regex in safe))
+            except re.error:
+                # e.g. the same named group in several patterns
+                self.regexes.extend(safe)
+        else:
+            self.regexes.extend(safe)
+
+    def _match_literals(self, zone_name):
+        if zone_name in self.exact:
+            return True
+        if self.suffixes and any(zone_name[i:] in self.suffixes
+                                 for i in range(len(zone_name))):
+            return True
+        if self.prefixes and any(zone_name[:i] in self.prefixes
+                                 for i in range(1, len(zone_name) + 1)):
+            return True
+        return any(literal in zone_name for literal in self.contains)
+
+    def match(self, zone_name):
+        if self._match_literals(zone_name):
+            return True
+
+        regexes = self.regexes
+        if self.combined is not None:
+            regexes = [self.combined] + regexes
+        if not regexes:
+            return False
+
+        regex = None
+        with Alarm() as alarm:
+            try:
+                alarm.arm(MATCH_TIMEOUT)
+                for regex in regexes:
+                    if regex.search(zone_name) is not None:
+                        return True
+            except Timeout:
+                LOG.critical(
+                    'Blacklist regex (%(pattern)s) took too long to evaluate '
+                    'against zone name (%(zone_name)s',
+                    {
+                        'pattern': regex.pattern,
+                        'zone_name': zone_name
+                    })
+                return True
+            finally:
+                alarm.disarm()
+        return False
@@ -62,8 +62,12 @@ class CentralAPI(object):
         6.0 - Renamed domains to zones
         6.1 - Add ServiceStatus methods
         6.2 - Changed 'find_recordsets' method args
+        6.3 - Add invalidate_floatingip_cache
+        6.4 - Add invalidate_blacklists
+        6.5 - Add invalidate_tlds
+        6.6 - Add invalidate_quotas and reconcile_zone_usages
     """
-    RPC_API_VERSION = '6.2'
+    RPC_API_VERSION = '6.6'
 
     # This allows us to mark some methods as not logged.
     # This can be for a few reasons - some methods my not actually call over
@@ -76,7 +80,7 @@ class CentralAPI(object):
 
         target = messaging.Target(topic=self.topic,
                                   version=self.RPC_API_VERSION)
-        self.client = rpc.get_client(target, version_cap='6.2')
+        self.client = rpc.get_client(target, version_cap='6.6')
 
     @classmethod
     def get_instance(cls):
@@ -111,6 +115,11 @@ class CentralAPI(object):
     def reset_quotas(self, context, tenant_id):
         return self.client.call(context, 'reset_quotas', tenant_id=tenant_id)
 
+    def invalidate_quotas(self, context, tenant_id=None):
+        # Every central instance caches the quotas, so this is a fanout cast.
+        cctxt = self.client.prepare(fanout=True)
+        return cctxt.cast(context, 'invalidate_quotas', tenant_id=tenant_id)
+
     # TSIG Key Methods
     def create_tsigkey(self, context, tsigkey):
         return self.client.call(context, 'create_tsigkey', tsigkey=tsigkey)
@@ -175,6 +184,10 @@ class CentralAPI(object):
     def count_zones(self, context, criterion=None):
         return self.client.call(context, 'count_zones', criterion=criterion)
 
+    def reconcile_zone_usages(self, context, criterion=None):
+        return self.client.call(context, 'reconcile_zone_usages',
+                                criterion=criterion)
+
     def touch_zone(self, context, zone_id):
         return self.client.call(context, 'touch_zone', zone_id=zone_id)
 
@@ -197,6 +210,11 @@ class CentralAPI(object):
     def delete_tld(self, context, tld_id):
         return self.client.call(context, 'delete_tld', tld_id=tld_id)
 
+    def invalidate_tlds(self, context):
+        # Every central instance caches the TLDs, so this is a fanout cast.
+        cctxt = self.client.prepare(fanout=True)
+        return cctxt.cast(context, 'invalidate_tlds')
+
     # RecordSet Methods
     def create_recordset(self, context, zone_id, recordset):
         return self.client.call(context, 'create_recordset',
@@ -303,6 +321,13 @@ class CentralAPI(object):
         return self.client.call(context, 'update_floatingip', region=region,
                                 floatingip_id=floatingip_id, values=values)
 
+    def invalidate_floatingip_cache(self, context, project_id=None):
+        # Every central instance caches the floating ips, so this is a
+        # fanout cast.
+        cctxt = self.client.prepare(fanout=True)
+        return cctxt.cast(context, 'invalidate_floatingip_cache',
+                          project_id=project_id)
+
     # Blacklisted Zone Methods
     def create_blacklist(self, context, blacklist):
         return self.client.call(context, 'create_blacklist',
@@ -329,6 +354,12 @@ class CentralAPI(object):
         return self.client.call(context, 'delete_blacklist',
                                 blacklist_id=blacklist_id)
 
+    def invalidate_blacklists(self, context):
+        # Every central instance caches the blacklists, so this is a
+        # fanout cast.
+        cctxt = self.client.prepare(fanout=True)
+        return cctxt.cast(context, 'invalidate_blacklists')
+
     # Pool Server Methods
     def create_pool(self, context, pool):
         return self.client.call(context, 'create_pool', pool=pool)
@@ -14,14 +14,12 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
-import re
 import collections
 import copy
 import functools
 import threading
 import itertools
 import string
-import signal
 import random
 from random import SystemRandom
 import time
@@ -48,6 +46,9 @@ from designate import service
 from designate import scheduler
 from designate import storage
 from designate import utils
+from designate.central import blacklist as blacklist_matcher
+from designate.central import rpcapi as central_rpcapi
+from designate.central import tld as tld_index
 from designate.mdns import rpcapi as mdns_rpcapi
 from designate.storage import transaction
 from designate.storage import transaction_shallow_copy
@@ -185,7 +186,7 @@ def notification(notification_type):
 
 
 class Service(service.RPCService):
-    RPC_API_VERSION = '6.2'
+    RPC_API_VERSION = '6.6'
 
     target = messaging.Target(version=RPC_API_VERSION)
 
@@ -193,6 +194,12 @@ class Service(service.RPCService):
         self._scheduler = None
         self._storage = None
         self._quota = None
+        self._blacklist_matcher = None
+        self._blacklist_matcher_expires = 0
+        self._blacklist_generation = 0
+        self._tld_index = None
+        self._tld_index_expires = 0
+        self._tld_generation = 0
 
         super(Service, self).__init__(
             self.service_name, cfg.CONF['service:central'].topic,
@@ -244,6 +251,10 @@ class Service(service.RPCService):
         self.coordination.stop()
         super(Service, self).stop(graceful)
 
+    @property
+    def central_api(self):
+        return central_rpcapi.CentralAPI.get_instance()
+
     @property
     def mdns_api(self):
         return mdns_rpcapi.MdnsAPI.get_instance()
@@ -272,30 +283,17 @@ class Service(service.RPCService):
             raise exceptions.InvalidZoneName('More than one label is '
                                              'required')
 
-        tlds = self.storage.find_tlds(context)
-        if tlds:
+        tlds = self._get_tld_index(context)
+        if tlds.root:
             LOG.debug("Checking if %s has a valid TLD", zone_name)
-            allowed = False
-            for i in range(-len(zone_labels), 0):
-                last_i_labels = zone_labels[i:]
-                LOG.debug("Checking %s against the TLD list", last_i_labels)
-                if ".".join(last_i_labels) in tlds:
-                    allowed = True
-                    break
-            if not allowed:
+            if not tlds.has_tld(zone_labels):
                 raise exceptions.InvalidZoneName('Invalid TLD')
 
             # Now check that the zone name is not the same as a TLD
-            try:
-                stripped_zone_name = zone_name.rstrip('.').lower()
-                self.storage.find_tld(
-                    context,
-                    {'name': stripped_zone_name})
-            except exceptions.TldNotFound:
-                LOG.debug("%s has a valid TLD", zone_name)
-            else:
+            if tlds.is_tld(zone_name.rstrip('.').lower().split('.')):
                 raise exceptions.InvalidZoneName(
                     'Zone name cannot be the same as a TLD')
+            LOG.debug("%s has a valid TLD", zone_name)
 
         # Check zone name blacklist
         if self._is_blacklisted_zone_name(context, zone_name):
@@ -306,6 +304,29 @@ class Service(service.RPCService):
 
         return True
 
+    def _get_tld_index(self, context):
+        ttl = cfg.CONF['service:central'].tld_cache_ttl
+        if (self._tld_index is not None and
+                time.time() < self._tld_index_expires):
+            return self._tld_index
+
+        generation = self._tld_generation
+        tlds = tld_index.TldIndex(
+            [tld.name for tld in self.storage.find_tlds(context)])
+
+        # Do not cache the TLDs if they changed while being loaded
+        if ttl > 0 and generation == self._tld_generation:
+            self._tld_index = tlds
+            self._tld_index_expires = time.time() + ttl
+
+        return tlds
+
+    def _invalidate_tld_index(self, context):
+        if cfg.CONF['service:central'].tld_cache_ttl > 0:
+            self.invalidate_tlds(context)
+            # Every central instance caches the TLDs
+            self.central_api.invalidate_tlds(context)
+
     def _is_valid_recordset_name(self, context, zone, recordset_name):
         if recordset_name is None:
             raise exceptions.InvalidObject
@@ -351,7 +372,8 @@ class Service(service.RPCService):
 
     def _is_valid_recordset_placement_subzone(self, context, zone,
                                               recordset_name,
-                                              criterion=None):
+                                              criterion=None,
+                                              child_zones=None):
         """
         Check that the placement of the requested rrset belongs to any of the
         zones subzones..
@@ -366,18 +388,29 @@ class Service(service.RPCService):
         if zone.name == recordset_name:
             return
 
-        child_zones = self.storage.find_zones(
-            context, {"parent_zone_id": zone.id})
-        for child_zone in child_zones:
-            try:
-                self._is_valid_recordset_name(
-                    context, child_zone, recordset_name)
-            except Exception:
-                continue
-            else:
-                msg = 'RecordSet belongs in a child zone: %s' % \
-                    child_zone['name']
-                raise exceptions.InvalidRecordSetLocation(msg)
+        # A child zone the recordset belongs in is named after the recordset,
+        # or one of the names between the recordset and the zone
+        labels = recordset_name.split('.')
+        names = [
+            name for name in (
+                '.'.join(labels[i:]) for i in range(len(labels))
+            ) if name.endswith('.' + zone.name)
+        ]
+        if not names:
+            return
+
+        if child_zones is None:
+            child_zones = self.storage.find_zones(
+                context, {"parent_zone_id": zone.id, "name": names})
+        else:
+            # The child zones were loaded up front, keyed by name
+            child_zones = [child_zones[name] for name in names
+                           if name in child_zones]
+
+        if child_zones:
+            msg = 'RecordSet belongs in a child zone: %s' % \
+                child_zones[0]['name']
+            raise exceptions.InvalidRecordSetLocation(msg)
 
     def _is_valid_recordset_records(self, recordset):
         """
@@ -398,38 +431,31 @@ class Service(service.RPCService):
         """
         Ensures the provided zone_name is not blacklisted.
         """
-        blacklists = self.storage.find_blacklists(context)
-
-        class Timeout(Exception):
-            pass
-
-        def _handle_timeout(signum, frame):
-            raise Timeout()
+        return self._get_blacklist_matcher(context).match(zone_name)
 
-        signal.signal(signal.SIGALRM, _handle_timeout)
+    def _get_blacklist_matcher(self, context):
+        ttl = cfg.CONF['service:central'].blacklist_cache_ttl
+        if (self._blacklist_matcher is not None and
+                time.time() < self._blacklist_matcher_expires):
+            return self._blacklist_matcher
 
-        try:
-            for blacklist in blacklists:
-                signal.setitimer(signal.ITIMER_REAL, 0.02)
-
-                try:
-                    if bool(re.search(blacklist.pattern, zone_name)):
-                        return True
-                finally:
-                    signal.setitimer(signal.ITIMER_REAL, 0)
+        generation = self._blacklist_generation
+        blacklists = self.storage.find_blacklists(context)
+        matcher = blacklist_matcher.BlacklistMatcher(
+            [blacklist.pattern for blacklist in blacklists])
 
-        except Timeout:
-            LOG.critical(
-                'Blacklist regex (%(pattern)s) took too long to evaluate '
-                'against zone name (%(zone_name)s',
-                {
-                    'pattern': blacklist.pattern,
-                    'zone_name': zone_name
-                })
+        # Do not cache the blacklists if they changed while being loaded
+        if ttl > 0 and generation == self._blacklist_generation:
+            self._blacklist_matcher = matcher
+            self._blacklist_matcher_expires = time.time() + ttl
 
-            return True
+        return matcher
 
-        return False
+    def _invalidate_blacklist_matcher(self, context):
+        if cfg.CONF['service:central'].blacklist_cache_ttl > 0:
+            self.invalidate_blacklists(context)
+            # Every central instance caches the blacklists
+            self.central_api.invalidate_blacklists(context)
 
     def _is_subzone(self, context, zone_name, pool_id):
         """
@@ -441,22 +467,20 @@ class Service(service.RPCService):
         # Break the name up into it's component labels
         labels = zone_name.split(".")
 
-        criterion = {"pool_id": pool_id}
-
-        i = 1
+        # Starting with label #2, search for all the parent zones at once
+        names = ['.'.join(labels[i:]) for i in range(1, len(labels) - 1)]
+        if not names:
+            return False
 
-        # Starting with label #2, search for matching zone's in the database
-        while (i < len(labels)):
-            name = '.'.join(labels[i:])
-            criterion["name"] = name
-            try:
-                zone = self.storage.find_zone(context, criterion)
-            except exceptions.ZoneNotFound:
-                i += 1
-            else:
-                return zone
+        # The reversed names of the parents are prefixes of each other, so
+        # the closest parent sorts last
+        zones = self.storage.find_zones(
+            context, {"name": names, "pool_id": pool_id}, limit=1,
+            sort_key='reverse_name', sort_dir='desc')
+        if not zones:
+            return False
 
-        return False
+        return zones[0]
 
     def _is_superzone(self, context, zone_name, pool_id):
         """
@@ -489,6 +513,10 @@ class Service(service.RPCService):
         Optionally set delayed_notify to have PM issue delayed notify
         """
 
+        old_serial = zone.serial
+        journal = (self._is_zone_journal_enabled(zone) and
+                   'ttl' not in zone.obj_get_changes())
+
         # Increment the serial number
         zone.serial = utils.increment_serial(zone.serial)
         if set_delayed_notify:
@@ -496,11 +524,74 @@ class Service(service.RPCService):
 
         zone = self.storage.update_zone(context, zone)
 
+        # Drop the answers mdns cached for the previous serial
+        self.mdns_api.invalidate_zone(context, zone.id, zone.serial)
+
+        # Record the serial change in the zone journal, the RRs changed are
+        # added by the callers once they are written. A zone TTL change
+        # affects every RR using the default TTL, leave a gap in the journal
+        # so IXFR falls back to a full transfer.
+        if journal:
+            self.storage.create_zone_journal_entries(
+                context, zone.id, old_serial, zone.serial,
+                [('SOA', None, None, None, None)])
+            self.storage.purge_zone_journal(
+                context, zone.id,
+                keep=cfg.CONF['service:central'].zone_journal_size)
+
         # Update SOA record
         self._update_soa(context, zone)
 
         return zone
 
+    # Zone Journal Methods
+    @staticmethod
+    def _is_zone_journal_enabled(zone):
+        return (cfg.CONF['service:central'].zone_journal_size > 0 and
+                zone.type == 'PRIMARY')
+
+    @staticmethod
+    def _recordset_rrs(zone, recordset, records=None):
+        """Return the (name, ttl, type, data) RRs served for a recordset"""
+        if recordset.type == 'SOA':
+            # The SOA is not part of the journal, it frames the changes.
+            return set()
+
+        if records is None:
+            if not recordset.obj_attr_is_set('records'):
+                return set()
+            records = [record.data for record in recordset.records
+                       if record.action != 'DELETE']
+
+        ttl = recordset.ttl if recordset.ttl is not None else zone.ttl
+
+        return set((recordset.name, ttl, recordset.type, data)
+                   for data in records)
+
+    def _journal_zone_changes(self, context, zone, deleted, added,
+                              increment_serial=True):
+        """Record the RRs removed and added by a zone change"""
+        deleted, added = deleted - added, added - deleted
+        if not deleted and not added:
+            return
+
+        if not increment_serial:
+            # The zone content changed without a serial change. Unless the
+            # zone is still being created, add a marker without an old serial
+            # so IXFR from this serial or older falls back to a full
+            # transfer.
+            if zone.action != 'CREATE':
+                self.storage.create_zone_journal_entries(
+                    context, zone.id, None, zone.serial,
+                    [('SOA', None, None, None, None)])
+            return
+
+        entries = [('DEL',) + rr for rr in sorted(deleted)]
+        entries.extend(('ADD',) + rr for rr in sorted(added))
+
+        self.storage.create_zone_journal_entries(
+            context, zone.id, None, zone.serial, entries)
+
     # SOA Recordset Methods
     def _build_soa_record(self, zone, ns_records):
         return "%s %s. %d %d %d %d %d" % (ns_records[0]['hostname'],
@@ -611,8 +702,12 @@ class Service(service.RPCService):
 
     def _enforce_recordset_quota(self, context, zone):
         # Ensure the recordsets per zone quota is OK
-        criterion = {'zone_id': zone.id}
-        count = self.storage.count_recordsets(context, criterion)
+        if cfg.CONF.quota_usage_counters:
+            count = self.storage.get_zone_usage(
+                context, zone.id)['recordsets']
+        else:
+            criterion = {'zone_id': zone.id}
+            count = self.storage.count_recordsets(context, criterion)
 
         self.quota.limit_check(
             context, zone.tenant_id, zone_recordsets=count)
@@ -623,13 +718,20 @@ class Service(service.RPCService):
             return
 
         # Ensure the records per zone quota is OK
-        zone_criterion = {
-            'zone_id': zone.id,
-            'managed': False,  # only include non-managed records
-        }
+        if cfg.CONF.quota_usage_counters:
+            zone_records = self.storage.get_zone_usage(
+                context, zone.id)['records']
+        else:
+            zone_criterion = {
+                'zone_id': zone.id,
+                'managed': False,  # only include non-managed records
+            }
 
-        zone_records = self.storage.count_records(context, zone_criterion)
+            zone_records = self.storage.count_records(
+                context, zone_criterion)
 
+        # NOTE: Counting the records of a single recordset is bounded by the
+        #       records per recordset quota
         recordset_criterion = {
             'recordset_id': recordset.id,
             'managed': False,  # only include non-managed records
@@ -675,7 +777,6 @@ class Service(service.RPCService):
         return self.quota.get_quota(context, tenant_id, resource)
 
     @rpc.expected_exceptions()
-    @transaction
     def set_quota(self, context, tenant_id, resource, hard_limit):
         target = {
             'tenant_id': tenant_id,
@@ -687,27 +788,63 @@ class Service(service.RPCService):
         if tenant_id != context.project_id and not context.all_tenants:
             raise exceptions.Forbidden()
 
-        return self.quota.set_quota(context, tenant_id, resource, hard_limit)
+        quota = self._set_quota_in_storage(
+            context, tenant_id, resource, hard_limit)
+
+        self._invalidate_quotas(context, tenant_id)
+
+        return quota
 
     @transaction
+    def _set_quota_in_storage(self, context, tenant_id, resource, hard_limit):
+        return self.quota.set_quota(context, tenant_id, resource, hard_limit)
+
     def reset_quotas(self, context, tenant_id):
         target = {'tenant_id': tenant_id}
         policy.check('reset_quotas', context, target)
 
+        self._reset_quotas_in_storage(context, tenant_id)
+
+        self._invalidate_quotas(context, tenant_id)
+
+    @transaction
+    def _reset_quotas_in_storage(self, context, tenant_id):
         self.quota.reset_quotas(context, tenant_id)
 
+    def _invalidate_quotas(self, context, tenant_id):
+        # The quotas are invalidated once the change is committed, so they
+        # can not be cached again with the old limits
+        if cfg.CONF.quota_cache_ttl > 0:
+            self.invalidate_quotas(context, tenant_id)
+            # Every central instance caches the quotas
+            self.central_api.invalidate_quotas(context, tenant_id)
+
+    def invalidate_quotas(self, context, tenant_id=None):
+        """
+        Drop the cached quotas of a tenant, or of all the tenants when no
+        tenant_id is given
+        """
+        self.quota.invalidate_quotas(tenant_id)
+
     # TLD Methods
     @rpc.expected_exceptions()
     @notification('dns.tld.create')
-    @transaction
     def create_tld(self, context, tld):
         policy.check('create_tld', context)
 
         # The TLD is only created on central's storage and not on the backend.
-        created_tld = self.storage.create_tld(context, tld)
+        created_tld = self._create_tld_in_storage(context, tld)
+
+        # Only drop the cached TLDs once the change is committed, they could
+        # be reloaded from the previous TLDs otherwise
+        self._invalidate_tld_index(context)
 
         return created_tld
 
+    @transaction
+    def _create_tld_in_storage(self, context, tld):
+        return self.storage.create_tld(context, tld)
+
     @rpc.expected_exceptions()
     def find_tlds(self, context, criterion=None, marker=None, limit=None,
                   sort_key=None, sort_dir=None):
@@ -724,40 +861,62 @@ class Service(service.RPCService):
 
     @rpc.expected_exceptions()
     @notification('dns.tld.update')
-    @transaction
     def update_tld(self, context, tld):
         target = {
             'tld_id': tld.obj_get_original_value('id'),
         }
         policy.check('update_tld', context, target)
 
-        tld = self.storage.update_tld(context, tld)
+        tld = self._update_tld_in_storage(context, tld)
+
+        self._invalidate_tld_index(context)
 
         return tld
 
+    @transaction
+    def _update_tld_in_storage(self, context, tld):
+        return self.storage.update_tld(context, tld)
+
     @rpc.expected_exceptions()
     @notification('dns.tld.delete')
-    @transaction
     def delete_tld(self, context, tld_id):
         policy.check('delete_tld', context, {'tld_id': tld_id})
 
-        tld = self.storage.delete_tld(context, tld_id)
+        tld = self._delete_tld_in_storage(context, tld_id)
+
+        self._invalidate_tld_index(context)
 
         return tld
 
+    @transaction
+    def _delete_tld_in_storage(self, context, tld_id):
+        return self.storage.delete_tld(context, tld_id)
+
+    def invalidate_tlds(self, context):
+        """
+        Drop the cached TLD index, it is rebuilt from storage for the next
+        zone name checked
+        """
+        self._tld_generation += 1
+        self._tld_index = None
+
     # TSIG Key Methods
     @rpc.expected_exceptions()
     @notification('dns.tsigkey.create')
-    @transaction
     def create_tsigkey(self, context, tsigkey):
         policy.check('create_tsigkey', context)
 
-        created_tsigkey = self.storage.create_tsigkey(context, tsigkey)
+        created_tsigkey = self._create_tsigkey_in_storage(context, tsigkey)
 
-        # TODO(Ron): this method needs to do more than update storage.
+        # Let mdns know once the change is committed, it caches the keys.
+        self.mdns_api.invalidate_tsigkeys(context)
 
         return created_tsigkey
 
+    @transaction
+    def _create_tsigkey_in_storage(self, context, tsigkey):
+        return self.storage.create_tsigkey(context, tsigkey)
+
     @rpc.expected_exceptions()
     def find_tsigkeys(self, context, criterion=None, marker=None, limit=None,
                       sort_key=None, sort_dir=None):
@@ -774,31 +933,37 @@ class Service(service.RPCService):
 
     @rpc.expected_exceptions()
     @notification('dns.tsigkey.update')
-    @transaction
     def update_tsigkey(self, context, tsigkey):
         target = {
             'tsigkey_id': tsigkey.obj_get_original_value('id'),
         }
         policy.check('update_tsigkey', context, target)
 
-        tsigkey = self.storage.update_tsigkey(context, tsigkey)
+        tsigkey = self._update_tsigkey_in_storage(context, tsigkey)
 
-        # TODO(Ron): this method needs to do more than update storage.
+        self.mdns_api.invalidate_tsigkeys(context)
 
         return tsigkey
 
+    @transaction
+    def _update_tsigkey_in_storage(self, context, tsigkey):
+        return self.storage.update_tsigkey(context, tsigkey)
+
     @rpc.expected_exceptions()
     @notification('dns.tsigkey.delete')
-    @transaction
     def delete_tsigkey(self, context, tsigkey_id):
         policy.check('delete_tsigkey', context, {'tsigkey_id': tsigkey_id})
 
-        tsigkey = self.storage.delete_tsigkey(context, tsigkey_id)
+        tsigkey = self._delete_tsigkey_in_storage(context, tsigkey_id)
 
-        # TODO(Ron): this method needs to do more than update storage.
+        self.mdns_api.invalidate_tsigkeys(context)
 
         return tsigkey
 
+    @transaction
+    def _delete_tsigkey_in_storage(self, context, tsigkey_id):
+        return self.storage.delete_tsigkey(context, tsigkey_id)
+
     # Tenant Methods
     @rpc.expected_exceptions()
     def find_tenants(self, context):
@@ -955,12 +1120,8 @@ class Service(service.RPCService):
         self._create_ns(context, zone, [n.hostname for n in pool_ns_records])
 
         if zone.obj_attr_is_set('recordsets'):
-            for rrset in zone.recordsets:
-                # This allows eventlet to yield, as this looping operation
-                # can be very long-lived.
-                time.sleep(0)
-                self._create_recordset_in_storage(
-                    context, zone, rrset, increment_serial=False)
+            self._create_recordsets_in_storage(
+                context, zone, zone.recordsets)
 
         return zone
 
@@ -1064,6 +1225,11 @@ class Service(service.RPCService):
         zone = self._update_zone_in_storage(
             context, zone, increment_serial=increment_serial)
 
+        if not increment_serial:
+            # Secondary zones are synced without a serial increment, drop
+            # the answers mdns cached now the new records are committed
+            self.mdns_api.invalidate_zone(context, zone.id, zone.serial)
+
         # Fire off a XFR
         if 'masters' in changes:
             self.mdns_api.perform_zone_xfr(context, zone)
@@ -1124,6 +1290,7 @@ class Service(service.RPCService):
         if hasattr(context, 'abandon') and context.abandon:
             LOG.info("Abandoning zone '%(zone)s'", {'zone': zone.name})
             zone = self.storage.delete_zone(context, zone.id)
+            self.mdns_api.invalidate_zone(context, zone.id)
         else:
             zone = self._delete_zone_in_storage(context, zone)
             self.zone_api.delete_zone(context, zone)
@@ -1156,6 +1323,16 @@ class Service(service.RPCService):
 
         return self.storage.purge_zones(context, criterion, limit)
 
+    @rpc.expected_exceptions()
+    @transaction
+    def reconcile_zone_usages(self, context, criterion=None):
+        """Recount the recordsets and records of zones.
+        :returns: number of zones whose usage counts were corrected
+        """
+        policy.check('reconcile_zone_usages', context, criterion)
+
+        return self.storage.reconcile_zone_usages(context, criterion)
+
     @rpc.expected_exceptions()
     def xfr_zone(self, context, zone_id):
         zone = self.storage.get_zone(context, zone_id)
@@ -1343,9 +1520,106 @@ class Service(service.RPCService):
         recordset = self.storage.create_recordset(context, zone.id,
                                                   recordset)
 
+        if self._is_zone_journal_enabled(zone):
+            self._journal_zone_changes(
+                context, zone, set(), self._recordset_rrs(zone, recordset),
+                increment_serial)
+
         # Return the zone too in case it was updated
         return (recordset, zone)
 
+    @transaction_shallow_copy
+    def _create_recordsets_in_storage(self, context, zone, recordsets):
+        """Create many recordsets in a zone without incrementing its serial,
+        with bulk inserts. Used when importing a zone.
+
+        The checks are those of _create_recordset_in_storage. CNAME placement
+        is checked against the other new recordsets as well as the existing
+        ones.
+        """
+        recordsets = list(recordsets)
+        if not recordsets:
+            return []
+
+        # Ensure the tenant has enough quota, the last recordset is checked
+        # against all the others as if they were created one at a time
+        if cfg.CONF.quota_usage_counters:
+            usage = self.storage.get_zone_usage(context, zone.id)
+            count = usage['recordsets']
+        else:
+            usage = None
+            count = self.storage.count_recordsets(
+                context, {'zone_id': zone.id})
+        self.quota.limit_check(context, zone.tenant_id,
+                               zone_recordsets=count + len(recordsets) - 1)
+
+        new_records = sum(
+            len(recordset.records) for recordset in recordsets
+            if recordset.obj_attr_is_set('records') and not recordset.managed)
+        if new_records:
+            if usage is not None:
+                zone_records = usage['records']
+            else:
+                zone_records = self.storage.count_records(
+                    context, {'zone_id': zone.id, 'managed': False})
+            self.quota.limit_check(context, zone.tenant_id,
+                                   zone_records=zone_records + new_records)
+
+        types = collections.defaultdict(set)
+        for recordset in self.storage.find_recordsets(
+                context, {'zone_id': zone.id}):
+            types[recordset.name].add(recordset.type)
+
+        child_zones = {
+            child_zone.name: child_zone
+            for child_zone in self.storage.find_zones(
+                context.elevated(all_tenants=True),
+                {"parent_zone_id": zone.id})
+        }
+
+        for recordset in recordsets:
+            # This allows eventlet to yield, as this looping operation
+            # can be very long-lived.
+            time.sleep(0)
+
+            self._is_valid_ttl(context, getattr(recordset, 'ttl', None))
+            self._is_valid_recordset_name(context, zone, recordset.name)
+
+            # CNAME's must not be created at the zone apex.
+            if recordset.type == 'CNAME' and recordset.name == zone.name:
+                raise exceptions.InvalidRecordSetLocation(
+                    'CNAME recordsets may not be created at the zone apex')
+            types[recordset.name].add(recordset.type)
+
+            self._is_valid_recordset_placement_subzone(
+                context, zone, recordset.name, child_zones=child_zones)
+            self._is_valid_recordset_records(recordset)
+
+            if recordset.obj_attr_is_set('records'):
+                for record in recordset.records:
+                    record.action = 'CREATE'
+                    record.status = 'PENDING'
+                    record.serial = zone.serial
+
+        # CNAME's must not share a name with other recordsets
+        for rrtypes in types.values():
+            if 'CNAME' in rrtypes and len(rrtypes) > 1:
+                raise exceptions.InvalidRecordSetLocation(
+                    'CNAME recordsets may not share a name with any other '
+                    'records')
+
+        recordsets = self.storage.create_recordsets(
+            context, zone.id, recordsets)
+
+        if self._is_zone_journal_enabled(zone):
+            rrs = set()
+            for recordset in recordsets:
+                rrs |= self._recordset_rrs(zone, recordset)
+            self._journal_zone_changes(
+                context, zone, set(), rrs, increment_serial=False)
+
+        return recordsets
+
     @rpc.expected_exceptions()
     def get_recordset(self, context, zone_id, recordset_id):
         recordset = self.storage.get_recordset(context, recordset_id)
@@ -1457,6 +1731,12 @@ class Service(service.RPCService):
 
         self._validate_recordset(context, zone, recordset)
 
+        # Fetch the RRs currently served for the zone journal
+        original_rrs = None
+        if self._is_zone_journal_enabled(zone) and recordset.type != 'SOA':
+            original_rrs = self._recordset_rrs(
+                zone, self.storage.get_recordset(context, recordset.id))
+
         if increment_serial:
             # update the zone's status and increment the serial
             zone = self._update_zone_in_storage(
@@ -1477,6 +1757,11 @@ class Service(service.RPCService):
         # Update the recordset
         recordset = self.storage.update_recordset(context, recordset)
 
+        if original_rrs is not None:
+            self._journal_zone_changes(
+                context, zone, original_rrs,
+                self._recordset_rrs(zone, recordset), increment_serial)
+
         return (recordset, zone)
 
     @rpc.expected_exceptions()
@@ -1522,6 +1807,10 @@ class Service(service.RPCService):
     def _delete_recordset_in_storage(self, context, zone, recordset,
                                      increment_serial=True):
 
+        original_rrs = None
+        if self._is_zone_journal_enabled(zone):
+            original_rrs = self._recordset_rrs(zone, recordset)
+
         if increment_serial:
             # update the zone's status and increment the serial
             zone = self._update_zone_in_storage(
@@ -1537,6 +1826,10 @@ class Service(service.RPCService):
         self.storage.update_recordset(context, recordset)
         recordset = self.storage.delete_recordset(context, recordset.id)
 
+        if original_rrs is not None:
+            self._journal_zone_changes(
+                context, zone, original_rrs, set(), increment_serial)
+
         return (recordset, zone)
 
     @rpc.expected_exceptions()
@@ -1604,6 +1897,12 @@ class Service(service.RPCService):
         record = self.storage.create_record(context, zone.id, recordset.id,
                                             record)
 
+        if self._is_zone_journal_enabled(zone):
+            self._journal_zone_changes(
+                context, zone, set(),
+                self._recordset_rrs(zone, recordset, [record.data]),
+                increment_serial)
+
         return (record, zone)
 
     @rpc.expected_exceptions()
@@ -1704,6 +2003,12 @@ class Service(service.RPCService):
     def _update_record_in_storage(self, context, zone, record,
                                   increment_serial=True):
 
+        recordset = None
+        if self._is_zone_journal_enabled(zone):
+            recordset = self.storage.get_recordset(
+                context, record.recordset_id)
+            original_data = record.obj_get_original_value('data')
+
         if increment_serial:
             # update the zone's status and increment the serial
             zone = self._update_zone_in_storage(
@@ -1716,6 +2021,13 @@ class Service(service.RPCService):
         # Update the record
         record = self.storage.update_record(context, record)
 
+        if recordset is not None:
+            self._journal_zone_changes(
+                context, zone,
+                self._recordset_rrs(zone, recordset, [original_data]),
+                self._recordset_rrs(zone, recordset, [record.data]),
+                increment_serial)
+
         return (record, zone)
 
     @rpc.expected_exceptions()
@@ -1766,6 +2078,8 @@ class Service(service.RPCService):
     def _delete_record_in_storage(self, context, zone, record,
                                   increment_serial=True):
 
+        original_action = record.action
+
         if increment_serial:
             # update the zone's status and increment the serial
             zone = self._update_zone_in_storage(
@@ -1777,6 +2091,15 @@ class Service(service.RPCService):
 
         record = self.storage.update_record(context, record)
 
+        if (self._is_zone_journal_enabled(zone) and
+                original_action != 'DELETE'):
+            recordset = self.storage.get_recordset(
+                context, record.recordset_id)
+            self._journal_zone_changes(
+                context, zone,
+                self._recordset_rrs(zone, recordset, [record.data]), set(),
+                increment_serial)
+
         return (record, zone)
 
     @rpc.expected_exceptions()
@@ -1876,19 +2199,22 @@ class Service(service.RPCService):
         floatingips either with a associated record or not. Deletes invalid
         records also.
 
-        Returns a list of tuples with FloatingIPs and it's Record.
+        Returns a dict of FloatingIPs and their Record keyed by region and
+        id, the invalid records and the TTL of each record by record id.
         """
         tenant_id = tenant_id or context.project_id
 
         elevated_context = context.elevated(all_tenants=True,
                                             edit_managed_records=True)
-        criterion = {
-            'managed': True,
-            'managed_resource_type': 'ptr:floatingip',
-        }
 
-        records = self.find_records(elevated_context, criterion)
-        records = dict([(r['managed_extra'], r) for r in records])
+        # Only look up the records of the FIPs we were given
+        addresses = [fip['address'] for fip in fips.values()]
+        records = {}
+        ttls = {}
+        for record, ttl in self.storage.find_floatingip_records(
+                elevated_context, addresses):
+            records[record['managed_extra']] = record
+            ttls[record['id']] = ttl
 
         invalid = []
         data = {}
@@ -1913,7 +2239,7 @@ class Service(service.RPCService):
                     record = None
             data[fip_key] = (fip_values, record)
 
-        return data, invalid
+        return data, invalid, ttls
 
     def _invalidate_floatingips(self, context, records):
         """
@@ -1928,10 +2254,13 @@ class Service(service.RPCService):
                 self.delete_record(elevated_context, r['zone_id'],
                                    r['recordset_id'], r['id'])
 
-    def _format_floatingips(self, context, data, recordsets=None):
+    def _format_floatingips(self, context, data, recordsets=None, ttls=None):
         """
         Given a list of FloatingIP and Record tuples we look through creating
         a new dict of FloatingIPs
+
+        The TTL of each record is taken from ttls, keyed by record id, when
+        it is there.
         """
         elevated_context = context.elevated(all_tenants=True)
 
@@ -1956,20 +2285,23 @@ class Service(service.RPCService):
                 fip_ptr['action'] = record.action
                 fip_ptr['status'] = record.status
 
-                # We can have a recordset dict passed in
-                if (recordsets is not None and
-                        record['recordset_id'] in recordsets):
-                    recordset = recordsets[record['recordset_id']]
+                if ttls is not None and record['id'] in ttls:
+                    fip_ptr['ttl'] = ttls[record['id']]
                 else:
-                    recordset = self.storage.get_recordset(
-                        elevated_context, record['recordset_id'])
-
-                if recordset['ttl'] is not None:
-                    fip_ptr['ttl'] = recordset['ttl']
-                else:
-                    zone = self.get_zone(
-                        elevated_context, record['zone_id'])
-                    fip_ptr['ttl'] = zone['ttl']
+                    # We can have a recordset dict passed in
+                    if (recordsets is not None and
+                            record['recordset_id'] in recordsets):
+                        recordset = recordsets[record['recordset_id']]
+                    else:
+                        recordset = self.storage.get_recordset(
+                            elevated_context, record['recordset_id'])
+
+                    if recordset['ttl'] is not None:
+                        fip_ptr['ttl'] = recordset['ttl']
+                    else:
+                        zone = self.get_zone(
+                            elevated_context, record['zone_id'])
+                        fip_ptr['ttl'] = zone['ttl']
 
                 fip_ptr['ptrdname'] = record['data']
                 fip_ptr['description'] = record['description']
@@ -2015,12 +2347,12 @@ class Service(service.RPCService):
 
         tenant_fips = self._list_floatingips(context)
 
-        valid, invalid = self._determine_floatingips(
+        valid, invalid, ttls = self._determine_floatingips(
             elevated_context, tenant_fips)
 
         self._invalidate_floatingips(context, invalid)
 
-        return self._format_floatingips(context, valid)
+        return self._format_floatingips(context, valid, ttls=ttls)
 
     @rpc.expected_exceptions()
     def get_floatingip(self, context, region, floatingip_id):
@@ -2035,12 +2367,12 @@ class Service(service.RPCService):
 
         result = self._list_to_dict([fip], keys=['region', 'id'])
 
-        valid, invalid = self._determine_floatingips(
+        valid, invalid, ttls = self._determine_floatingips(
             elevated_context, result)
 
         self._invalidate_floatingips(context, invalid)
 
-        return self._format_floatingips(context, valid)[0]
+        return self._format_floatingips(context, valid, ttls=ttls)[0]
 
     def _set_floatingip_reverse(self, context, region, floatingip_id, values):
         """
@@ -2184,17 +2516,34 @@ class Service(service.RPCService):
             return self._set_floatingip_reverse(
                 context, region, floatingip_id, values)
 
+    def invalidate_floatingip_cache(self, context, project_id=None):
+        """
+        Drop the cached Neutron floating ips of a project, or of every
+        project when project_id is None
+        """
+        self.network_api.invalidate_floatingip_cache(project_id)
+
     # Blacklisted zones
     @rpc.expected_exceptions()
     @notification('dns.blacklist.create')
-    @transaction
     def create_blacklist(self, context, blacklist):
         policy.check('create_blacklist', context)
 
-        created_blacklist = self.storage.create_blacklist(context, blacklist)
+        blacklist_matcher.check_pattern(blacklist.pattern)
+
+        created_blacklist = self._create_blacklist_in_storage(
+            context, blacklist)
+
+        # Only drop the cached matchers once the change is committed, they
+        # could be rebuilt from the previous blacklists otherwise
+        self._invalidate_blacklist_matcher(context)
 
         return created_blacklist
 
+    @transaction
+    def _create_blacklist_in_storage(self, context, blacklist):
+        return self.storage.create_blacklist(context, blacklist)
+
     @rpc.expected_exceptions()
     def get_blacklist(self, context, blacklist_id):
         policy.check('get_blacklist', context)
@@ -2224,27 +2573,48 @@ class Service(service.RPCService):
 
     @rpc.expected_exceptions()
     @notification('dns.blacklist.update')
-    @transaction
     def update_blacklist(self, context, blacklist):
         target = {
             'blacklist_id': blacklist.id,
         }
         policy.check('update_blacklist', context, target)
 
-        blacklist = self.storage.update_blacklist(context, blacklist)
+        if 'pattern' in blacklist.obj_what_changed():
+            blacklist_matcher.check_pattern(blacklist.pattern)
+
+        blacklist = self._update_blacklist_in_storage(context, blacklist)
+
+        self._invalidate_blacklist_matcher(context)
 
         return blacklist
 
+    @transaction
+    def _update_blacklist_in_storage(self, context, blacklist):
+        return self.storage.update_blacklist(context, blacklist)
+
     @rpc.expected_exceptions()
     @notification('dns.blacklist.delete')
-    @transaction
     def delete_blacklist(self, context, blacklist_id):
         policy.check('delete_blacklist', context)
 
-        blacklist = self.storage.delete_blacklist(context, blacklist_id)
+        blacklist = self._delete_blacklist_in_storage(context, blacklist_id)
+
+        self._invalidate_blacklist_matcher(context)
 
         return blacklist
 
+    @transaction
+    def _delete_blacklist_in_storage(self, context, blacklist_id):
+        return self.storage.delete_blacklist(context, blacklist_id)
+
+    def invalidate_blacklists(self, context):
+        """
+        Drop the cached blacklist matcher, it is rebuilt from storage for
+        the next zone name checked
+        """
+        self._blacklist_generation += 1
+        self._blacklist_matcher = None
+
     # Server Pools
     @rpc.expected_exceptions()
     @notification('dns.pool.create')
@@ -2400,12 +2770,15 @@ class Service(service.RPCService):
         if deleted:
             LOG.debug('update_status: deleting %s', zone.name)
             self.storage.delete_zone(context, zone.id)
+            self.mdns_api.invalidate_zone(context, zone.id)
 
         return zone
 
     def _update_record_status(self, context, zone_id, status, serial):
         """Update status on every record in a zone based on `serial`
-        :returns: updated records
+
+        The transitions are those of `_update_zone_or_record_status`, applied
+        to all the matching records at once.
         """
         criterion = {
             'zone_id': zone_id
@@ -2428,34 +2801,34 @@ class Service(service.RPCService):
                 'serial': '<=%d' % serial,
             })
 
-        records = self.storage.find_records(context, criterion=criterion)
-
-        for record in records:
-            record, deleted = self._update_zone_or_record_status(
-                record, status, serial)
-
-            if record.obj_what_changed():
-                LOG.debug('Setting record %s, serial %s: action %s, '
-                          'status %s', record.id, record.serial,
-                          record.action, record.status)
-                self.storage.update_record(context, record)
+        updated = 0
+        deleted = 0
 
-            # TODO(Ron): Including this to retain the current logic.
-            # We should NOT be deleting records.  The record status should
-            # be used to indicate the record has been deleted.
-            if deleted:
-                LOG.debug('Deleting record %s, serial %s: action %s, '
-                          'status %s', record.id, record.serial,
-                          record.action, record.status)
-
-                self.storage.delete_record(context, record.id)
+        if status == 'SUCCESS':
+            updated = self.storage.update_records_status(
+                context, dict(criterion, action=['CREATE', 'UPDATE']),
+                'ACTIVE', action='NONE')
 
-                recordset = self.storage.get_recordset(
-                    context, record.recordset_id)
-                if len(recordset.records) == 0:
-                    self.storage.delete_recordset(context, recordset.id)
+        elif status == 'ERROR':
+            updated = self.storage.update_records_status(
+                context, criterion, 'ERROR')
 
-        return records
+        elif status == 'NO_ZONE':
+            updated = self.storage.update_records_status(
+                context, dict(criterion, action=['CREATE', 'UPDATE']),
+                'ERROR', action='CREATE')
+
+        # TODO(Ron): Including this to retain the current logic.
+        # We should NOT be deleting records.  The record status should
+        # be used to indicate the record has been deleted.
+        if status in ('SUCCESS', 'NO_ZONE'):
+            deleted = self.storage.delete_records(
+                context, dict(criterion, action='DELETE'))
+
+        LOG.debug('Updated the status of %(updated)d records and deleted '
+                  '%(deleted)d records of zone %(zone)s for serial %(serial)s',
+                  {'updated': updated, 'deleted': deleted, 'zone': zone_id,
+                   'serial': serial})
 
     @staticmethod
     def _update_zone_or_record_status(zone_or_record, status, serial):
@@ -0,0 +1,50 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+
+class TldIndex(object):
+    """
+    Trie of the TLD names keyed by their labels from right to left, so
+    a zone name is checked against all the TLDs in O(labels).
+    """
+    def __init__(self, names):
+        self.root = {}
+        for name in names:
+            node = self.root
+            for label in reversed(name.strip('.').split('.')):
+                node = node.setdefault(label, {})
+            # None can not be a label, it marks the end of a TLD
+            node[None] = True
+
+    def has_tld(self, labels):
+        """
+        Return True if the labels end with a TLD
+        """
+        node = self.root
+        for label in reversed(labels):
+            node = node.get(label)
+            if node is None:
+                return False
+            if None in node:
+                return True
+        return False
+
+    def is_tld(self, labels):
+        """
+        Return True if the labels are a TLD
+        """
+        node = self.root
+        for label in reversed(labels):
+            node = node.get(label)
+            if node is None:
+                return False
+        return None in node
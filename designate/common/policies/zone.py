@@ -228,6 +228,11 @@ rules = [
         deprecated_reason=DEPRECATED_REASON,
         deprecated_since=versionutils.deprecated.WALLABY
     ),
+    policy.RuleDefault(
+        name="reconcile_zone_usages",
+        check_str=base.RULE_ADMIN,
+        description='Recount the recordsets and records of zones.'
+    ),
     policy.RuleDefault(
         name="touch_zone",
         check_str=base.SYSTEM_ADMIN_OR_PROJECT_MEMBER,
@@ -34,6 +34,12 @@ AGENT_OPTS = [
                help='The Agent TCP Backlog'),
     cfg.FloatOpt('tcp_recv_timeout', default=0.5,
                  help='Agent TCP Receive Timeout'),
+    cfg.IntOpt('dns_pool_size', default=0,
+               help='Number of green threads handling DNS queries. When set, '
+                    'queries are handled by a dedicated pool of this size, '
+                    'read into preallocated buffers, and queries pipelined '
+                    'on a TCP connection are handled concurrently. The '
+                    'default of 0 spawns a thread per query'),
     cfg.ListOpt('allow_notify', default=[],
                 help='List of IP addresses allowed to NOTIFY The Agent'),
     cfg.ListOpt('masters', default=[],
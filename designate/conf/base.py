@@ -90,6 +90,14 @@ DESIGNATE_OPTS = [
                help='Number of records allowed per recordset'),
     cfg.IntOpt('quota_api_export_size', default=1000,
                help='Number of recordsets allowed in a zone export'),
+    cfg.BoolOpt('quota_usage_counters', default=False,
+                help='Check the recordsets and records per zone quotas '
+                     'against the usage counted as they are written, '
+                     'rather than counting the recordsets and records of '
+                     'the zone on every change'),
+    cfg.IntOpt('quota_cache_ttl', default=0,
+               help='Seconds the quotas of a tenant are cached for, '
+                    '0 disables the cache'),
 ]
 
 
@@ -27,6 +27,12 @@ BINS9_OPTS = [
                help='RNDC Config File'),
     cfg.StrOpt('rndc_key_file', help='RNDC Key File'),
     cfg.IntOpt('rndc_timeout', default=0, min=0, help='RNDC command timeout'),
+    cfg.BoolOpt('rndc_native', default=False,
+                help='Send commands over the RNDC control channel instead '
+                     'of executing rndc for each of them'),
+    cfg.IntOpt('rndc_pool_size', default=4, min=1,
+               help='Number of connections to the RNDC control channel to '
+                    'keep open'),
     cfg.StrOpt('zone_file_path', default='$state_path/zones',
                help='Path where zone files are stored'),
     cfg.StrOpt('query_destination', default='127.0.0.1',
@@ -50,6 +50,19 @@ CENTRAL_OPTS = [
         'scheduler_filters',
         default=['default_pool'],
         help='Enabled Pool Scheduling filters'),
+    cfg.IntOpt('zone_journal_size', default=0,
+               help='Number of serial changes kept in the journal of each '
+                    'zone, used by mdns to answer IXFR requests. Set to 0 '
+                    'to disable the journal'),
+    cfg.IntOpt('blacklist_cache_ttl', default=0,
+               help='Seconds the compiled zone name blacklists are cached '
+                    'for. Every central instance drops its cache when a '
+                    'blacklist is changed. Set to 0 to load the blacklists '
+                    'for every zone created'),
+    cfg.IntOpt('tld_cache_ttl', default=0,
+               help='Seconds the TLDs are cached for. Every central '
+                    'instance drops its cache when a TLD is changed. Set to '
+                    '0 to load the TLDs for every zone created'),
 ]
 
 
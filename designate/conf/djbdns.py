@@ -43,6 +43,11 @@ DJDNS_OPTS = [
     ),
     cfg.StrOpt('query_destination', default='127.0.0.1',
                help='Host to query when finding zones'),
+    cfg.FloatOpt('rebuild_delay', default=0.0, min=0.0,
+                 help='Seconds to wait after a zone change before '
+                      'rebuilding data.cdb, so that the changes coming in '
+                      'meanwhile are applied by the same rebuild. By '
+                      'default data.cdb is rebuilt for every change'),
 ]
 
 
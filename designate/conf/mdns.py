@@ -33,6 +33,27 @@ MDNS_OPTS = [
                help='mDNS TCP Backlog'),
     cfg.FloatOpt('tcp_recv_timeout', default=0.5,
                  help='mDNS TCP Receive Timeout'),
+    cfg.IntOpt('dns_pool_size', default=0,
+               help='Number of green threads handling DNS queries. When set, '
+                    'queries are handled by a dedicated pool of this size, '
+                    'read into preallocated buffers, and queries pipelined '
+                    'on a TCP connection are handled concurrently. The '
+                    'default of 0 spawns a thread per query'),
+    cfg.IntOpt('dns_queue_size', default=0,
+               help='Number of queries allowed to wait for a free thread of '
+                    'the query pool, further queries get a SERVFAIL '
+                    'response. The default of 0 stops reading '
+                    'queries until a thread is free instead'),
+    cfg.IntOpt('xfr_pool_size', default=0,
+               help='Number of green threads reserved for zone transfers '
+                    '(AXFR and IXFR), so they can not hold every thread of '
+                    'the query pool. Requires dns_pool_size, the default of '
+                    '0 handles transfers in the query pool'),
+    cfg.IntOpt('xfr_queue_size', default=0,
+               help='Number of zone transfers allowed to wait for a free '
+                    'thread of the transfer pool, further transfers get a '
+                    'SERVFAIL response. The default of 0 stops reading '
+                    'queries until a thread is free instead'),
     cfg.BoolOpt('all_tcp', default=False,
                 help='Send all traffic over TCP'),
     cfg.BoolOpt('query_enforce_tsig', default=False,
@@ -46,6 +67,21 @@ MDNS_OPTS = [
                help='RPC topic name for mdns'),
     cfg.IntOpt('xfr_timeout', help="Timeout in seconds for XFR's.",
                default=10),
+    cfg.IntOpt('axfr_cache_size', default=64 * 1024 * 1024,
+               help='Maximum size in bytes of the rendered AXFR responses '
+                    'kept in memory, set to 0 to disable the cache'),
+    cfg.IntOpt('tsigkey_cache_ttl', default=300,
+               help='Time in seconds TSIG keys are cached for, set to 0 to '
+                    'look them up in the database for every request'),
+    cfg.IntOpt('record_cache_ttl', default=0,
+               help='Time in seconds the answers to record queries (e.g. '
+                    'SOA) are cached for. Central drops the answers of a '
+                    'zone from every mdns when its serial changes, so this '
+                    'only bounds how long an answer can be stale if that '
+                    'message is lost. Set to 0 to disable the cache'),
+    cfg.IntOpt('record_cache_size', default=100000,
+               help='Maximum number of answers to record queries kept in '
+                    'the cache'),
 ]
 
 
@@ -43,6 +43,12 @@ NETWORK_API_NEUTRON_OPTS = [
     cfg.StrOpt('ca_certificates_file',
                help='Location of ca certificates file to use for '
                     'neutron client requests.'),
+    cfg.IntOpt('floatingip_cache_ttl',
+               default=0,
+               help='Seconds the floating ips of a project are cached for '
+                    'by designate-central, 0 disables the cache. Entries '
+                    'are dropped early when the neutron notification '
+                    'handler sees a floating ip change.'),
 ]
 
 
@@ -39,9 +39,24 @@ WORKER_OPTS = [
     cfg.IntOpt('poll_max_retries', default=10,
                help='The maximum number of times to retry sending a request '
                     'and wait for a response from a server'),
+    cfg.IntOpt('poll_sockets_per_nameserver', default=0,
+               help='Number of UDP sockets per nameserver shared by all the '
+                    'SOA polls of a worker process. Many polls are '
+                    'outstanding on each socket at once, and waiting for a '
+                    'response is bounded by poll_timeout. The default of 0 '
+                    'opens a new socket for every poll'),
     cfg.IntOpt('poll_delay', default=5,
                help='The time to wait before sending the first request '
                     'to a server'),
+    cfg.BoolOpt('coalesce_zone_actions', default=False,
+                help='Run the actions for a zone one at a time, collapsing '
+                     'the updates waiting for a zone into one push and poll '
+                     'for the newest serial, and stopping the polls for '
+                     'serials that have been superseded'),
+    cfg.IntOpt('zone_action_batch_size', default=0, min=0,
+               help='Number of zones of a pool, waiting for the same action, '
+                    'that shard recovery hands to the backends at once. The '
+                    'default of 0 recovers the zones one by one'),
     cfg.BoolOpt('notify', default=True,
                 deprecated_for_removal=True,
                 deprecated_reason='This option is being removed to reduce '
@@ -140,9 +140,10 @@ class SerializationMiddleware(DNSMiddleware):
 class TsigInfoMiddleware(DNSMiddleware):
     """Middleware which looks up the information available for a TsigKey"""
 
-    def __init__(self, application, storage):
+    def __init__(self, application, storage, tsigkey_cache=None):
         super(TsigInfoMiddleware, self).__init__(application)
         self.storage = storage
+        self.tsigkey_cache = tsigkey_cache
 
     def process_request(self, request):
         if not request.had_tsig:
@@ -152,9 +153,12 @@ class TsigInfoMiddleware(DNSMiddleware):
             name = request.keyname.to_text(True)
             if six.PY3 and isinstance(name, bytes):
                 name = name.decode('utf-8')
-            criterion = {'name': name}
-            tsigkey = self.storage.find_tsigkey(
-                    context.get_current(), criterion)
+            if self.tsigkey_cache is not None:
+                tsigkey = self.tsigkey_cache.get(name)
+            else:
+                criterion = {'name': name}
+                tsigkey = self.storage.find_tsigkey(
+                        context.get_current(), criterion)
 
             request.environ['tsigkey'] = tsigkey
             request.environ['context'].tsigkey_id = tsigkey.id
@@ -170,8 +174,9 @@ class TsigInfoMiddleware(DNSMiddleware):
 class TsigKeyring(object):
     """Implements the DNSPython KeyRing API, backed by the Designate DB"""
 
-    def __init__(self, storage):
+    def __init__(self, storage, tsigkey_cache=None):
         self.storage = storage
+        self.tsigkey_cache = tsigkey_cache
 
     def __getitem__(self, key):
         return self.get(key)
@@ -181,9 +186,12 @@ class TsigKeyring(object):
             name = key.to_text(True)
             if six.PY3 and isinstance(name, bytes):
                 name = name.decode('utf-8')
-            criterion = {'name': name}
-            tsigkey = self.storage.find_tsigkey(
-                context.get_current(), criterion)
+            if self.tsigkey_cache is not None:
+                tsigkey = self.tsigkey_cache.get(name)
+            else:
+                criterion = {'name': name}
+                tsigkey = self.storage.find_tsigkey(
+                    context.get_current(), criterion)
 
             return base64.decode_as_bytes(tsigkey.secret)
 
@@ -191,6 +199,58 @@ class TsigKeyring(object):
             return default
 
 
+class TsigKeyCache(object):
+    """
+    Caches the TSIG keys looked up by TsigKeyring and TsigInfoMiddleware, so
+    signed requests do not each need database lookups.
+
+    Keys are kept for ``ttl`` seconds, or until the cache is invalidated
+    after a TSIG key is changed. Names which are not found are not cached.
+    """
+
+    def __init__(self, storage, ttl):
+        self.storage = storage
+        self.ttl = ttl
+        self.lock = Lock()
+        self.data = {}
+
+    def load(self):
+        """Fill the cache with every existing TSIG key"""
+        tsigkeys = self.storage.find_tsigkeys(
+            context.DesignateContext.get_admin_context())
+
+        expires_at = time.time() + self.ttl
+        with self.lock:
+            self.data = dict(
+                (tsigkey.name, (tsigkey, expires_at)) for tsigkey in tsigkeys
+            )
+
+    def get(self, name):
+        """
+        Return the TSIG key with the given name.
+
+        :raises: TsigKeyNotFound if there is no such key.
+        """
+        now = time.time()
+
+        with self.lock:
+            entry = self.data.get(name)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        tsigkey = self.storage.find_tsigkey(
+            context.get_current(), {'name': name})
+
+        with self.lock:
+            self.data[name] = (tsigkey, now + self.ttl)
+        return tsigkey
+
+    def invalidate(self):
+        """Drop every cached key, they are looked up again when used"""
+        with self.lock:
+            self.data = {}
+
+
 class ZoneLock(object):
     """A Lock across all zones that enforces a rate limit on NOTIFYs"""
 
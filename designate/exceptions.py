@@ -229,6 +229,10 @@ class InvaildZoneTransfer(DesignateException):
     error_type = 'invalid_zone_transfer_request'
 
 
+class InvalidBlacklistPattern(BadRequest):
+    error_type = 'invalid_blacklist_pattern'
+
+
 class InvalidTTL(DesignateException):
     error_code = 400
     error_type = 'invalid_ttl'
@@ -0,0 +1,212 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import collections
+import threading
+import time
+
+from oslo_log import log as logging
+
+LOG = logging.getLogger(__name__)
+
+
+class XFRCache(object):
+    """
+    LRU cache of rendered zone transfers, bounded by size in bytes.
+
+    Entries are keyed by zone id and serial, plus a variant key describing
+    the parameters the messages were rendered with (e.g. the max message
+    size). Storing an entry for a new serial drops every entry cached for an
+    older serial of the same zone.
+
+    The cached messages are the rendered wire format of each message without
+    any TSIG RR, so they can be signed per request.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._zones = {}
+
+    def get(self, zone_id, serial, variant):
+        """
+        Return the list of cached (wire, counts) messages or None.
+        """
+        key = (zone_id, serial, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            # Mark the entry as recently used
+            self._entries.pop(key)
+            self._entries[key] = entry
+            return entry[0]
+
+    def set(self, zone_id, serial, variant, messages):
+        """
+        Cache the rendered messages of a zone transfer.
+
+        Transfers larger than the whole cache are not stored.
+        """
+        size = sum(len(wire) for wire, _ in messages)
+        if size > self.max_size:
+            LOG.debug('Not caching AXFR of %(zone_id)s, %(size)d bytes '
+                      'exceeds the cache size', {'zone_id': zone_id,
+                                                 'size': size})
+            return
+
+        key = (zone_id, serial, variant)
+        with self._lock:
+            if self._zones.get(zone_id, {}).get('serial') != serial:
+                self._invalidate(zone_id)
+            self._pop(key)
+
+            self._entries[key] = (messages, size)
+            self._zones.setdefault(
+                zone_id, {'serial': serial, 'keys': set()})['keys'].add(key)
+            self.size += size
+
+            # Evict the least recently used entries
+            while self.size > self.max_size:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate(self, zone_id):
+        """Drop every cached transfer of a zone."""
+        with self._lock:
+            self._invalidate(zone_id)
+
+    def _invalidate(self, zone_id):
+        zone = self._zones.pop(zone_id, None)
+        if zone is None:
+            return
+        for key in zone['keys']:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= entry[1]
+
+        zone = self._zones.get(key[0])
+        if zone is not None:
+            zone['keys'].discard(key)
+            if not zone['keys']:
+                self._zones.pop(key[0])
+
+
+class RecordCache(object):
+    """
+    LRU cache of the RRSets answered to record queries, by name and type.
+
+    Every answer is stored with the id and pool of its zone and the zone
+    serial it was read at. Central announces every change of a zone to all
+    the mdns instances (see invalidate), which drops the answers of the zone
+    and, until the change is visible, stops answers read at an older serial
+    from being stored. Answers are also dropped after ``ttl`` seconds, in
+    case an announcement was lost.
+    """
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.generation = 0
+
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._zones = {}
+        # The serial and generation of the last invalidation of each zone,
+        # kept for ttl seconds in the order they expire in
+        self._invalidations = collections.OrderedDict()
+
+    def get(self, name, rdtype):
+        """
+        Return the cached (zone_id, pool_id, rrset) answer or None.
+        """
+        key = (name, rdtype)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[3] <= time.time():
+                self._pop(key)
+                return None
+            # Mark the entry as recently used
+            self._entries.pop(key)
+            self._entries[key] = entry
+            return entry[:3]
+
+    def set(self, name, rdtype, zone, rrset, generation):
+        """
+        Cache the answer to a query, unless the zone was invalidated since
+        the lookup started.
+
+        :param zone: The zone the answer was read from.
+        :param generation: The cache generation read before the lookup.
+        """
+        key = (name, rdtype)
+        now = time.time()
+        with self._lock:
+            self._expire_invalidations(now)
+            invalidation = self._invalidations.get(zone.id)
+            if invalidation is not None:
+                serial, invalidated_generation, _ = invalidation
+                if (invalidated_generation > generation or
+                        serial is None or zone.serial < serial):
+                    return
+
+            self._pop(key)
+            self._entries[key] = (zone.id, zone.pool_id, rrset,
+                                  now + self.ttl)
+            self._zones.setdefault(zone.id, set()).add(key)
+
+            # Evict the least recently used entries
+            while len(self._entries) > self.max_entries:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate(self, zone_id, serial=None):
+        """
+        Drop the answers of a zone.
+
+        :param serial: The new serial of the zone, or None if the zone was
+                       deleted.
+        """
+        now = time.time()
+        with self._lock:
+            for key in self._zones.pop(zone_id, ()):
+                self._entries.pop(key, None)
+
+            self.generation += 1
+            self._expire_invalidations(now)
+            self._invalidations.pop(zone_id, None)
+            self._invalidations[zone_id] = (serial, self.generation,
+                                            now + self.ttl)
+
+    def _expire_invalidations(self, now):
+        while self._invalidations:
+            zone_id, invalidation = next(iter(self._invalidations.items()))
+            if invalidation[2] > now:
+                break
+            del self._invalidations[zone_id]
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        keys = self._zones.get(entry[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self._zones.pop(entry[0])
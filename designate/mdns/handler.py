@@ -13,19 +13,28 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import collections
+import itertools
+
 import dns
+import dns.exception
 import dns.flags
 import dns.message
 import dns.opcode
 import dns.rcode
+import dns.rdata
 import dns.rdataclass
 import dns.rdatatype
+import dns.renderer
+import dns.resolver
+import dns.rrset
 from oslo_config import cfg
 from oslo_log import log as logging
 import six
 
 from designate import exceptions
 from designate.central import rpcapi as central_api
+from designate.mdns import cache
 from designate.mdns import xfr
 
 LOG = logging.getLogger(__name__)
@@ -40,11 +49,17 @@ TSIG_RRSIZE = 10 + 64 + 160 + 1
 
 
 class RequestHandler(xfr.XFRMixin):
-    def __init__(self, storage, tg):
+    def __init__(self, storage, tg, record_cache=None):
         self._central_api = None
 
         self.storage = storage
         self.tg = tg
+        self.record_cache = record_cache
+
+        self.axfr_cache = None
+        if CONF['service:mdns'].axfr_cache_size > 0:
+            self.axfr_cache = cache.XFRCache(
+                CONF['service:mdns'].axfr_cache_size)
 
     @property
     def central_api(self):
@@ -67,14 +82,16 @@ class RequestHandler(xfr.XFRMixin):
                 return
 
             q_rrset = request.question[0]
-            # Handle AXFR and IXFR requests with an AXFR responses for now.
-            # It is permissible for a server to send an AXFR response when
-            # receiving an IXFR request.
-            if q_rrset.rdtype in (dns.rdatatype.AXFR, dns.rdatatype.IXFR):
+            if q_rrset.rdtype == dns.rdatatype.AXFR:
                 for response in self._handle_axfr(request):
                     yield response
                 return
 
+            elif q_rrset.rdtype == dns.rdatatype.IXFR:
+                for response in self._handle_ixfr(request):
+                    yield response
+                return
+
             else:
                 for response in self._handle_record_query(request):
                     yield response
@@ -200,20 +217,179 @@ class RequestHandler(xfr.XFRMixin):
                                           'not implemented')
         return criterion
 
-    def _handle_axfr(self, request):
+    def _find_xfr_zone(self, request):
+        """Find the zone named in a zone transfer request"""
         context = request.environ['context']
         q_rrset = request.question[0]
 
-        # First check if there is an existing zone
         # TODO(vinod) once validation is separated from the api,
         # validate the parameters
+        name = q_rrset.name.to_text()
+        if six.PY3 and isinstance(name, bytes):
+            name = name.decode('utf-8')
+        criterion = self._zone_criterion_from_request(
+            request, {'name': name})
+        return self.storage.find_zone(context, criterion)
+
+    def _handle_ixfr(self, request):
+        """
+        Respond to an IXFR request with the changes made to the zone since
+        the serial the client holds, as recorded in the zone journal.
+
+        Falls back to a full zone transfer when the journal does not cover
+        every change since that serial.
+        """
+        context = request.environ['context']
+        q_rrset = request.question[0]
+
         try:
-            name = q_rrset.name.to_text()
-            if six.PY3 and isinstance(name, bytes):
-                name = name.decode('utf-8')
-            criterion = self._zone_criterion_from_request(
-                request, {'name': name})
-            zone = self.storage.find_zone(context, criterion)
+            zone = self._find_xfr_zone(request)
+        except exceptions.ZoneNotFound:
+            LOG.warning('ZoneNotFound while handling ixfr request. '
+                        'Question was %(qr)s', {'qr': q_rrset})
+
+            yield self._handle_query_error(request, dns.rcode.REFUSED)
+            return
+        except exceptions.Forbidden:
+            LOG.warning('Forbidden while handling ixfr request. '
+                        'Question was %(qr)s', {'qr': q_rrset})
+
+            yield self._handle_query_error(request, dns.rcode.REFUSED)
+            return
+
+        # The serial held by the client is sent as a SOA in the authority
+        # section, without it we can only send the whole zone.
+        client_serial = None
+        for rrset in request.authority:
+            if rrset.rdtype == dns.rdatatype.SOA and len(rrset):
+                client_serial = rrset[0].serial
+                break
+
+        criterion = {'zone_id': zone.id, 'type': 'SOA'}
+        soa_rrsets = list(self._iter_axfr_rrsets(
+            zone, self.storage.find_recordsets_axfr(context, criterion)))
+
+        if client_serial is None or not soa_rrsets:
+            for response in self._handle_axfr(request, zone):
+                yield response
+            return
+
+        soa_rrset = soa_rrsets[0]
+        serial = soa_rrset[0].serial
+
+        if client_serial >= serial:
+            # The client is up to date, a single SOA tells it so.
+            for response in self._render_xfr(request, zone, [soa_rrset]):
+                yield response
+            return
+
+        transitions = self._get_journal_transitions(
+            self.storage.find_zone_journal(context, zone.id, client_serial),
+            client_serial, serial)
+
+        if transitions is None:
+            LOG.debug('Zone journal of %(zone)s does not cover serial '
+                      '%(old)d to %(new)d, sending a full transfer',
+                      {'zone': zone.name, 'old': client_serial,
+                       'new': serial})
+            for response in self._handle_axfr(request, zone):
+                yield response
+            return
+
+        for response in self._render_xfr(
+                request, zone,
+                self._iter_ixfr_rrsets(zone, soa_rrset, transitions)):
+            yield response
+
+    @staticmethod
+    def _get_journal_transitions(rows, client_serial, serial):
+        """
+        Build the chain of serial changes leading from the client serial to
+        the current serial out of the zone journal.
+
+        :param rows: Raw journal rows, ordered by serial.
+        :return: A list of (old_serial, serial, deleted, added) tuples, or
+                 None if the journal has a gap.
+        """
+        transitions = []
+        expected = client_serial
+
+        for new_serial, group in itertools.groupby(rows, key=lambda r: r[1]):
+            deleted = []
+            added = []
+            old_serials = []
+            for row in group:
+                if row[2] == 'SOA':
+                    old_serials.append(row[0])
+                elif row[2] == 'DEL':
+                    deleted.append(row[3:])
+                else:
+                    added.append(row[3:])
+
+            if new_serial == client_serial:
+                # These changes led to the serial the client already has,
+                # unless the zone was changed without a serial change.
+                if None in old_serials:
+                    return None
+                continue
+
+            if old_serials != [expected]:
+                return None
+
+            transitions.append((expected, new_serial, deleted, added))
+            expected = new_serial
+
+        if expected != serial:
+            return None
+
+        return transitions
+
+    @staticmethod
+    def _iter_ixfr_rrsets(zone, soa_rrset, transitions):
+        """
+        Yield the RRSets of an incremental zone transfer (RFC 1995).
+
+        Each change is sent as the old SOA followed by the deleted RRs, then
+        the new SOA followed by the added RRs, framed by the current SOA.
+        """
+        soa = soa_rrset[0]
+
+        def make_soa(serial):
+            fields = soa.to_text().split()
+            fields[2] = str(serial)
+            return dns.rrset.from_rdata(
+                soa_rrset.name, soa_rrset.ttl,
+                dns.rdata.from_text(soa.rdclass, soa.rdtype,
+                                    ' '.join(fields)))
+
+        def make_rrsets(rows):
+            rows = sorted(rows, key=lambda r: (r[0], r[2]))
+            for key, group in itertools.groupby(
+                    rows, key=lambda r: (r[0], r[1], r[2])):
+                name, ttl, rrtype = key
+                yield dns.rrset.from_text_list(
+                    str(name), ttl if ttl is not None else zone.ttl,
+                    dns.rdataclass.IN, str(rrtype),
+                    [str(row[3]) for row in group])
+
+        yield soa_rrset
+        for old_serial, new_serial, deleted, added in transitions:
+            yield make_soa(old_serial)
+            for rrset in make_rrsets(deleted):
+                yield rrset
+            yield make_soa(new_serial)
+            for rrset in make_rrsets(added):
+                yield rrset
+        yield soa_rrset
+
+    def _handle_axfr(self, request, zone=None):
+        context = request.environ['context']
+        q_rrset = request.question[0]
+
+        # First check if there is an existing zone
+        try:
+            if zone is None:
+                zone = self._find_xfr_zone(request)
         except exceptions.ZoneNotFound:
             LOG.warning('ZoneNotFound while handling axfr request. '
                         'Question was %(qr)s', {'qr': q_rrset})
@@ -227,17 +403,65 @@ class RequestHandler(xfr.XFRMixin):
             yield self._handle_query_error(request, dns.rcode.REFUSED)
             return
 
+        # Serve the transfer from the pre-rendered messages if the zone has
+        # not changed since it was last rendered.
+        # NOTE: The cached messages include the question section, so they can
+        #       only be replayed for the same question, down to its case.
+        cached_messages = None
+        cache_variant = (CONF['service:mdns'].max_message_size,
+                         request.had_tsig, q_rrset.name.to_text(),
+                         q_rrset.rdtype)
+        if self.axfr_cache is not None:
+            messages = self.axfr_cache.get(zone.id, zone.serial,
+                                           cache_variant)
+            if messages is not None:
+                for response in self._replay_axfr(request, messages):
+                    yield response
+                return
+
+            cached_messages = []
+
         # The AXFR response needs to have a SOA at the beginning and end.
         criterion = {'zone_id': zone.id, 'type': 'SOA'}
-        soa_records = self.storage.find_recordsets_axfr(context, criterion)
+        soa_rrsets = list(self._iter_axfr_rrsets(
+            zone, self.storage.find_recordsets_axfr(context, criterion)))
 
-        # Get all the records other than SOA
+        # Stream all the records other than SOA, grouped into RRSets
         criterion = {'zone_id': zone.id, 'type': '!SOA'}
         records = self.storage.find_recordsets_axfr(context, criterion)
 
-        # Place the SOA RRSet at the front and end of the RRSet list
-        records.insert(0, soa_records[0])
-        records.append(soa_records[0])
+        # Place the SOA RRSet at the front and end of the RRSet stream
+        rrsets = itertools.chain(
+            soa_rrsets[:1], self._iter_axfr_rrsets(zone, records),
+            soa_rrsets[:1])
+
+        for response in self._render_xfr(request, zone, rrsets,
+                                         cached_messages):
+            yield response
+
+        if cached_messages and soa_rrsets:
+            # NOTE: Use the serial of the SOA we actually sent, the zone may
+            #       have been updated since it was looked up.
+            self.axfr_cache.set(zone.id, soa_rrsets[0][0].serial,
+                                cache_variant, cached_messages)
+        return
+
+    def _render_xfr(self, request, zone, rrsets, snapshots=None):
+        """
+        Render the RRSets of a zone transfer, yielding a message each time
+        one is full.
+
+        :param rrsets: Iterable of the RRSets to send, in order.
+        :param snapshots: Optional list the wire format of each message is
+                          appended to, see _snapshot_packet. It is left
+                          empty if the transfer is aborted or grows larger
+                          than the AXFR cache.
+        """
+        rrsets = iter(rrsets)
+        snapshots_size = 0
+
+        # RRSets which had to be split into individual RRs to fit in a message
+        pending = collections.deque()
 
         # Handle multi message response with tsig
         multi_messages = False
@@ -245,17 +469,13 @@ class RequestHandler(xfr.XFRMixin):
 
         # Render the results, yielding a packet after each TooBig exception.
         renderer = None
-        while records:
-            record = records.pop(0)
-
-            rrname = str(record[3])
-            ttl = int(record[2]) if record[2] is not None else zone.ttl
-            rrtype = str(record[1])
-            rdata = [str(record[4])]
-
-            rrset = dns.rrset.from_text_list(
-                rrname, ttl, dns.rdataclass.IN, rrtype, rdata,
-            )
+        while True:
+            if pending:
+                rrset = pending.popleft()
+            else:
+                rrset = next(rrsets, None)
+                if rrset is None:
+                    break
 
             while True:
                 try:
@@ -268,25 +488,50 @@ class RequestHandler(xfr.XFRMixin):
                     # message is not enough
                     multi_messages = True
                     if renderer.counts[dns.renderer.ANSWER] == 0:
+                        if len(rrset) > 1:
+                            # The whole RRSet does not fit in a single
+                            # message, fall back to sending it one RR at a
+                            # time.
+                            split = [
+                                dns.rrset.from_rdata(rrset.name, rrset.ttl,
+                                                     rdata)
+                                for rdata in rrset
+                            ]
+                            rrset = split.pop(0)
+                            pending.extendleft(reversed(split))
+                            continue
+
                         # We've received a TooBig from the first attempted
-                        # RRSet in this packet. Log a warning and abort the
-                        # AXFR.
+                        # RR in this packet. Log a warning and abort the
+                        # transfer.
                         LOG.warning(
-                            'Aborted AXFR of %(zone)s, a single RR '
+                            'Aborted transfer of %(zone)s, a single RR '
                             '(%(rrset_type)s %(rrset_name)s) '
                             'exceeded the max message size.',
                             {
                                 'zone': zone.name,
-                                'rrset_type': rrtype,
-                                'rrset_name': rrname,
+                                'rrset_type': dns.rdatatype.to_text(
+                                    rrset.rdtype),
+                                'rrset_name': rrset.name.to_text(),
                             }
                         )
 
+                        if snapshots is not None:
+                            del snapshots[:]
+
                         yield self._handle_query_error(
                             request, dns.rcode.SERVFAIL
                         )
                         return
 
+                    if snapshots is not None:
+                        snapshots.append(self._snapshot_packet(renderer))
+                        snapshots_size += len(snapshots[-1][0])
+                        if snapshots_size > self.axfr_cache.max_size:
+                            # Too large to be cached, stop collecting.
+                            del snapshots[:]
+                            snapshots = None
+
                     renderer, multi_messages_context = self._finalize_packet(
                         renderer, request, multi_messages,
                         multi_messages_context)
@@ -294,18 +539,76 @@ class RequestHandler(xfr.XFRMixin):
                     renderer = None
 
         if renderer:
+            if snapshots is not None:
+                snapshots.append(self._snapshot_packet(renderer))
+
             renderer, multi_messages_context = self._finalize_packet(
                 renderer, request, multi_messages, multi_messages_context)
             yield renderer
-        return
+
+    def _replay_axfr(self, request, messages):
+        """
+        Yield a zone transfer from previously rendered messages, only the
+        header and TSIG RR are rendered for this request.
+        """
+        multi_messages = len(messages) > 1
+        multi_messages_context = None
+
+        for wire, counts in messages:
+            renderer = self._create_axfr_renderer(request)
+            renderer.output.seek(0)
+            renderer.output.truncate()
+            renderer.output.write(wire)
+            renderer.counts = list(counts)
+            renderer.section = dns.renderer.ANSWER
+
+            renderer, multi_messages_context = self._finalize_packet(
+                renderer, request, multi_messages, multi_messages_context)
+            yield renderer
+
+    @staticmethod
+    def _snapshot_packet(renderer):
+        """Return the wire format and section counts without any TSIG"""
+        renderer.write_header()
+        return renderer.get_wire(), tuple(renderer.counts)
+
+    @staticmethod
+    def _iter_axfr_rrsets(zone, records):
+        """
+        Group raw AXFR rows into RRSets as they are read.
+
+        :param zone: The zone being transferred, used for the default TTL.
+        :param records: Iterable of raw rows, ordered by recordset id.
+        :return: A generator of dnspython RRSets.
+        """
+        for _, rows in itertools.groupby(records, key=lambda r: r[0]):
+            rows = list(rows)
+            record = rows[0]
+
+            rrname = str(record[3])
+            ttl = int(record[2]) if record[2] is not None else zone.ttl
+            rrtype = str(record[1])
+            rdata = [str(row[4]) for row in rows]
+
+            yield dns.rrset.from_text_list(
+                rrname, ttl, dns.rdataclass.IN, rrtype, rdata,
+            )
 
     def _handle_record_query(self, request):
         """Handle a DNS QUERY request for a record"""
         context = request.environ['context']
-        response = dns.message.make_response(request)
+        q_rrset = request.question[0]
+
+        generation = None
+        if self.record_cache is not None:
+            answer = self.record_cache.get(q_rrset.name, q_rrset.rdtype)
+            if answer is not None and self._is_cached_answer_allowed(
+                    request, *answer[:2]):
+                yield self._make_record_response(request, answer[2])
+                return
+            generation = self.record_cache.generation
 
         try:
-            q_rrset = request.question[0]
             name = q_rrset.name.to_text()
             if six.PY3 and isinstance(name, bytes):
                 name = name.decode('utf-8')
@@ -364,11 +667,31 @@ class RequestHandler(xfr.XFRMixin):
             return
 
         r_rrset = self._convert_to_rrset(zone, recordset)
-        response.answer = [r_rrset] if r_rrset else []
+        if self.record_cache is not None:
+            self.record_cache.set(q_rrset.name, q_rrset.rdtype, zone,
+                                  r_rrset, generation)
+        yield self._make_record_response(request, r_rrset)
+
+    def _is_cached_answer_allowed(self, request, zone_id, pool_id):
+        """
+        Check the zone of a cached answer matches the criterion the zone
+        would be looked up with, otherwise the query is handled uncached.
+        """
+        try:
+            criterion = self._zone_criterion_from_request(request)
+        except (exceptions.Forbidden, NotImplementedError):
+            return False
+        return (criterion.get('pool_id', pool_id) == pool_id and
+                criterion.get('id', zone_id) == zone_id)
+
+    @staticmethod
+    def _make_record_response(request, rrset):
+        response = dns.message.make_response(request)
+        response.answer = [rrset] if rrset else []
         response.set_rcode(dns.rcode.NOERROR)
         # For all the data stored in designate mdns is Authoritative
         response.flags |= dns.flags.AA
-        yield response
+        return response
 
     def _create_axfr_renderer(self, request):
         # Build up a dummy response, we're stealing it's logic for building
@@ -0,0 +1,41 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from oslo_log import log as logging
+
+from designate.mdns import base
+
+LOG = logging.getLogger(__name__)
+
+
+class RecordCacheEndpoint(base.BaseEndpoint):
+    RPC_API_VERSION = '1.0'
+    RPC_API_NAMESPACE = 'record_cache'
+
+    def __init__(self, tg, record_cache):
+        super(RecordCacheEndpoint, self).__init__(tg)
+        self.record_cache = record_cache
+
+    def invalidate_zone(self, context, zone_id, serial=None):
+        """
+        Drop the cached answers of a zone after its serial was incremented
+        or it was deleted.
+
+        :param context: The user context.
+        :param zone_id: The id of the zone.
+        :param serial: The new serial of the zone, None if it was deleted.
+        """
+        if self.record_cache is None:
+            return
+
+        LOG.debug('Invalidating the cached records of zone %(zone_id)s, '
+                  'serial %(serial)s', {'zone_id': zone_id, 'serial': serial})
+        self.record_cache.invalidate(zone_id, serial)
@@ -44,9 +44,17 @@ class MdnsAPI(object):
 
     XFR API version history:
         1.0 - Added perform_zone_xfr.
+
+    TSIG Key API version history:
+        1.0 - Added invalidate_tsigkeys.
+
+    Record Cache API version history:
+        1.0 - Added invalidate_zone.
     """
     RPC_NOTIFY_API_VERSION = '2.0'
     RPC_XFR_API_VERSION = '1.0'
+    RPC_TSIGKEY_API_VERSION = '1.0'
+    RPC_RECORD_CACHE_API_VERSION = '1.0'
 
     def __init__(self, topic=None):
         self.topic = topic if topic else cfg.CONF['service:mdns'].topic
@@ -61,6 +69,18 @@ class MdnsAPI(object):
                                       version=self.RPC_XFR_API_VERSION)
         self.xfr_client = rpc.get_client(xfr_target, version_cap='1.0')
 
+        tsigkey_target = messaging.Target(
+            topic=self.topic, namespace='tsigkey',
+            version=self.RPC_TSIGKEY_API_VERSION)
+        self.tsigkey_client = rpc.get_client(tsigkey_target,
+                                             version_cap='1.0')
+
+        record_cache_target = messaging.Target(
+            topic=self.topic, namespace='record_cache',
+            version=self.RPC_RECORD_CACHE_API_VERSION)
+        self.record_cache_client = rpc.get_client(record_cache_target,
+                                                  version_cap='1.0')
+
     @classmethod
     def get_instance(cls):
         """
@@ -140,3 +160,18 @@ class MdnsAPI(object):
         LOG.info("perform_zone_xfr: Calling mdns for zone %(zone)s",
                  {"zone": zone.name})
         return self.xfr_client.cast(context, 'perform_zone_xfr', zone=zone)
+
+    def invalidate_tsigkeys(self, context):
+        LOG.info("invalidate_tsigkeys: Calling all mdns instances")
+        # Every mdns instance caches the TSIG keys, so this is a fanout cast.
+        cctxt = self.tsigkey_client.prepare(fanout=True)
+        return cctxt.cast(context, 'invalidate_tsigkeys')
+
+    def invalidate_zone(self, context, zone_id, serial=None):
+        LOG.debug("invalidate_zone: Calling all mdns instances for zone "
+                  "%(zone_id)s", {'zone_id': zone_id})
+        # Every mdns instance caches record query answers, so this is a
+        # fanout cast.
+        cctxt = self.record_cache_client.prepare(fanout=True)
+        return cctxt.cast(context, 'invalidate_zone', zone_id=zone_id,
+                          serial=serial)
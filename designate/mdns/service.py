@@ -20,8 +20,11 @@ from designate import dnsutils
 from designate import service
 from designate import storage
 from designate import utils
+from designate.mdns import cache
 from designate.mdns import handler
 from designate.mdns import notify
+from designate.mdns import recordcache
+from designate.mdns import tsigkey
 from designate.mdns import xfr
 from designate.utils import DEFAULT_MDNS_PORT
 
@@ -34,24 +37,35 @@ class Service(service.RPCService):
 
     def __init__(self):
         self._storage = None
+        self._tsigkey_cache = None
+        self._record_cache = None
 
         super(Service, self).__init__(
             self.service_name, cfg.CONF['service:mdns'].topic,
             threads=cfg.CONF['service:mdns'].threads,
         )
-        self.override_endpoints(
-            [notify.NotifyEndpoint(self.tg), xfr.XfrEndpoint(self.tg)]
-        )
+        self.override_endpoints([
+            notify.NotifyEndpoint(self.tg),
+            xfr.XfrEndpoint(self.tg),
+            tsigkey.TsigKeyEndpoint(self.tg, self.tsigkey_cache),
+            recordcache.RecordCacheEndpoint(self.tg, self.record_cache),
+        ])
 
         self.dns_service = service.DNSService(
             self.dns_application, self.tg,
             cfg.CONF['service:mdns'].listen,
             cfg.CONF['service:mdns'].tcp_backlog,
             cfg.CONF['service:mdns'].tcp_recv_timeout,
+            cfg.CONF['service:mdns'].dns_pool_size,
+            cfg.CONF['service:mdns'].dns_queue_size,
+            cfg.CONF['service:mdns'].xfr_pool_size,
+            cfg.CONF['service:mdns'].xfr_queue_size,
         )
 
     def start(self):
         super(Service, self).start()
+        if self.tsigkey_cache is not None:
+            self.tsigkey_cache.load()
         self.dns_service.start()
 
     def stop(self, graceful=True):
@@ -66,6 +80,25 @@ class Service(service.RPCService):
             )
         return self._storage
 
+    @property
+    def tsigkey_cache(self):
+        if (not self._tsigkey_cache and
+                CONF['service:mdns'].tsigkey_cache_ttl > 0):
+            self._tsigkey_cache = dnsutils.TsigKeyCache(
+                self.storage, CONF['service:mdns'].tsigkey_cache_ttl
+            )
+        return self._tsigkey_cache
+
+    @property
+    def record_cache(self):
+        if (not self._record_cache and
+                CONF['service:mdns'].record_cache_ttl > 0):
+            self._record_cache = cache.RecordCache(
+                CONF['service:mdns'].record_cache_ttl,
+                CONF['service:mdns'].record_cache_size,
+            )
+        return self._record_cache
+
     @property
     def service_name(self):
         return 'mdns'
@@ -75,10 +108,13 @@ class Service(service.RPCService):
     def dns_application(self):
         # Create an instance of the RequestHandler class and wrap with
         # necessary middleware.
-        application = handler.RequestHandler(self.storage, self.tg)
-        application = dnsutils.TsigInfoMiddleware(application, self.storage)
+        application = handler.RequestHandler(
+            self.storage, self.tg, record_cache=self.record_cache)
+        application = dnsutils.TsigInfoMiddleware(
+            application, self.storage, self.tsigkey_cache
+        )
         application = dnsutils.SerializationMiddleware(
-            application, dnsutils.TsigKeyring(self.storage)
+            application, dnsutils.TsigKeyring(self.storage, self.tsigkey_cache)
         )
 
         return application
@@ -128,6 +128,12 @@ class NetworkAPI(DriverPlugin):
         """
         raise NotImplementedError
 
+    def invalidate_floatingip_cache(self, project_id=None):
+        """
+        Drop the cached Floating IPs of a project, or of every project when
+        project_id is None.
+        """
+
     @staticmethod
     def address_zone(address):
         """
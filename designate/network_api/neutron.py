@@ -15,7 +15,14 @@
 #
 # Copied partially from nova
 import concurrent.futures
+import threading
+import time
+
 import futurist
+from keystoneauth1 import identity
+from keystoneauth1 import noauth
+from keystoneauth1 import session as ks_session
+from keystoneauth1 import token_endpoint
 from neutronclient.common import exceptions as neutron_exceptions
 from neutronclient.v2_0 import client as clientv20
 from oslo_config import cfg
@@ -28,24 +35,113 @@ CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
-def get_client(context, endpoint):
-    params = {
-        'endpoint_url': endpoint,
-        'timeout': CONF['network_api:neutron'].timeout,
-        'insecure': CONF['network_api:neutron'].insecure,
-        'ca_cert': CONF['network_api:neutron'].ca_certificates_file,
-    }
+_SESSION = None
+_ADMIN_AUTH = None
+_LOCK = threading.Lock()
+
 
+def get_session():
+    """
+    Return the keystoneauth session shared by every Neutron client, so the
+    HTTP connections to each Neutron endpoint are kept alive and reused
+    """
+    global _SESSION
+    with _LOCK:
+        if _SESSION is None:
+            verify = (CONF['network_api:neutron'].ca_certificates_file or
+                      True)
+            if CONF['network_api:neutron'].insecure:
+                verify = False
+            _SESSION = ks_session.Session(
+                verify=verify,
+                timeout=CONF['network_api:neutron'].timeout,
+            )
+        return _SESSION
+
+
+def get_admin_auth():
+    """
+    Return the auth plugin for the admin credentials. The plugin is shared
+    so its token is reused until it expires instead of requesting a new one
+    from Keystone for every client
+    """
+    global _ADMIN_AUTH
+    with _LOCK:
+        if _ADMIN_AUTH is None:
+            _ADMIN_AUTH = identity.Password(
+                auth_url=CONF['network_api:neutron'].auth_url,
+                username=CONF['network_api:neutron'].admin_username,
+                password=CONF['network_api:neutron'].admin_password,
+                project_name=CONF['network_api:neutron'].admin_tenant_name,
+                default_domain_id='default',
+            )
+        return _ADMIN_AUTH
+
+
+def reset_client_pool():
+    global _SESSION, _ADMIN_AUTH
+    with _LOCK:
+        _SESSION = None
+        _ADMIN_AUTH = None
+
+
+def get_client(context, endpoint):
+    auth = None
     if context.auth_token:
-        params['token'] = context.auth_token
-        params['auth_strategy'] = None
+        auth = token_endpoint.Token(endpoint, context.auth_token)
     elif CONF['network_api:neutron'].admin_username is not None:
-        params['username'] = CONF['network_api:neutron'].admin_username
-        params['project_name'] = CONF['network_api:neutron'].admin_tenant_name
-        params['password'] = CONF['network_api:neutron'].admin_password
-        params['auth_url'] = CONF['network_api:neutron'].auth_url
-        params['auth_strategy'] = CONF['network_api:neutron'].auth_strategy
-    return clientv20.Client(**params)
+        if CONF['network_api:neutron'].auth_strategy == 'noauth':
+            auth = noauth.NoAuth(endpoint=endpoint)
+        else:
+            auth = get_admin_auth()
+
+    return clientv20.Client(
+        session=get_session(),
+        auth=auth,
+        endpoint_override=endpoint,
+    )
+
+
+class FloatingIPCache(object):
+    """
+    Short lived cache of the floating ips of each project and region, so
+    that listing PTR records does not query every Neutron endpoint each time
+    """
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.data = {}
+        self.next_purge = 0
+
+    def get(self, project_id, region):
+        with self.lock:
+            entry = self.data.get((project_id, region))
+        if entry is None or entry[0] <= time.time():
+            return None
+        return list(entry[1])
+
+    def set(self, project_id, region, floating_ips):
+        now = time.time()
+        with self.lock:
+            if now >= self.next_purge:
+                # Drop the projects which stopped listing their floating
+                # ips, the expired entries would otherwise accumulate
+                self.data = {
+                    key: entry for key, entry in self.data.items()
+                    if entry[0] > now
+                }
+                self.next_purge = now + self.ttl
+            self.data[(project_id, region)] = (
+                now + self.ttl, list(floating_ips)
+            )
+
+    def invalidate(self, project_id=None):
+        with self.lock:
+            if project_id is None:
+                self.data = {}
+                return
+            for key in [key for key in self.data if key[0] == project_id]:
+                del self.data[key]
 
 
 class NeutronNetworkAPI(base.NetworkAPI):
@@ -54,10 +150,25 @@ class NeutronNetworkAPI(base.NetworkAPI):
     """
     __plugin_name__ = 'neutron'
 
+    def __init__(self, *args, **kwargs):
+        super(NeutronNetworkAPI, self).__init__(*args, **kwargs)
+        self.floatingip_cache = None
+        if CONF['network_api:neutron'].floatingip_cache_ttl > 0:
+            self.floatingip_cache = FloatingIPCache(
+                CONF['network_api:neutron'].floatingip_cache_ttl
+            )
+
     def list_floatingips(self, context, region=None):
         """
         Get floating ips based on the current context from Neutron
         """
+        if self.floatingip_cache is not None:
+            floating_ips = self.floatingip_cache.get(
+                context.project_id, region
+            )
+            if floating_ips is not None:
+                return floating_ips
+
         endpoints = self._endpoints(
             service_catalog=context.service_catalog,
             service_type='network',
@@ -67,6 +178,7 @@ class NeutronNetworkAPI(base.NetworkAPI):
         )
 
         floating_ips = []
+        complete = True
         with futurist.GreenThreadPoolExecutor(max_workers=5) as executor:
             executors = [
                 executor.submit(
@@ -79,12 +191,25 @@ class NeutronNetworkAPI(base.NetworkAPI):
             ]
             for future in concurrent.futures.as_completed(executors):
                 try:
-                    floating_ips.extend(future.result())
+                    result = future.result()
                 except Exception as e:
                     raise exceptions.NeutronCommunicationFailure(e)
+                if result is None:
+                    complete = False
+                    continue
+                floating_ips.extend(result)
+
+        # Do not cache the floating ips when an endpoint refused the
+        # request, they would be missing until the entry expires
+        if self.floatingip_cache is not None and complete:
+            self.floatingip_cache.set(context.project_id, region, floating_ips)
 
         return floating_ips
 
+    def invalidate_floatingip_cache(self, project_id=None):
+        if self.floatingip_cache is not None:
+            self.floatingip_cache.invalidate(project_id)
+
     @staticmethod
     def _get_floating_ips(context, endpoint, region, project_id):
         LOG.debug('Fetching floating ips from %(region)s @ %(endpoint)s',
@@ -92,22 +217,23 @@ class NeutronNetworkAPI(base.NetworkAPI):
         client = get_client(context, endpoint=endpoint)
         try:
             fips = client.list_floatingips(project_id=project_id)
-            for fip in fips['floatingips']:
-                yield {
-                    'id': fip['id'],
-                    'address': fip['floating_ip_address'],
-                    'region': region
-                }
         except neutron_exceptions.Unauthorized:
             LOG.warning(
                 'Failed fetching floating ips from %(region)s @ %(endpoint)s'
                 'due to an Unauthorized error',
                 {'region': region, 'endpoint': endpoint}
             )
+            return None
         except Exception:
             LOG.error(
                 'Failed fetching floating ips from %(region)s @ %(endpoint)s',
                 {'region': region, 'endpoint': endpoint}
             )
             raise
-        return
+        return [
+            {
+                'id': fip['id'],
+                'address': fip['floating_ip_address'],
+                'region': region
+            } for fip in fips['floatingips']
+        ]
@@ -16,6 +16,7 @@
 from oslo_config import cfg
 from oslo_log import log as logging
 
+from designate.context import DesignateContext
 from designate.notification_handler import base
 
 
@@ -34,15 +35,25 @@ class NeutronFloatingHandler(base.BaseAddressHandler):
         return (exchange, topics)
 
     def get_event_types(self):
-        return [
+        event_types = [
             'floatingip.update.end',
             'floatingip.delete.start'
         ]
+        if self._floatingip_cache_enabled():
+            # A new floating ip only changes the cached floating ips
+            event_types.append('floatingip.create.end')
+        return event_types
+
+    @staticmethod
+    def _floatingip_cache_enabled():
+        return cfg.CONF['network_api:neutron'].floatingip_cache_ttl > 0
 
     def process_notification(self, context, event_type, payload):
         LOG.debug('%s received notification - %s',
                   self.get_canonical_name(), event_type)
 
+        self._invalidate_floatingip_cache(event_type, payload)
+
         zone_id = cfg.CONF[self.name].zone_id
         if event_type.startswith('floatingip.delete'):
             self._delete(zone_id=zone_id,
@@ -65,3 +76,17 @@ class NeutronFloatingHandler(base.BaseAddressHandler):
                 self._delete(zone_id=zone_id,
                              resource_id=payload['floatingip']['id'],
                              resource_type='floatingip')
+
+    def _invalidate_floatingip_cache(self, event_type, payload):
+        if not self._floatingip_cache_enabled():
+            return
+
+        # The delete notification only carries the floating ip id, so the
+        # cached floating ips of every project are dropped
+        project_id = None
+        if 'floatingip' in payload:
+            project_id = (payload['floatingip'].get('project_id') or
+                          payload['floatingip'].get('tenant_id'))
+
+        context = DesignateContext.get_admin_context(all_tenants=True)
+        self.central_api.invalidate_floatingip_cache(context, project_id)
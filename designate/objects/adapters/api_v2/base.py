@@ -17,6 +17,7 @@ from oslo_config import cfg
 from designate.objects.adapters import base
 from designate.objects import base as ovoobj_base
 from designate import exceptions
+from designate import utils
 
 
 cfg.CONF.import_opt('api_base_uri', 'designate.api', group='service:api')
@@ -150,9 +151,19 @@ class APIv2Adapter(base.DesignateAdapter):
 
     @classmethod
     def _get_next_href(cls, request, items):
+        item = items[-1]
+        sort_key = request.GET.get('sort_key') or 'created_at'
+
+        # Hand out a keyset marker carrying the sort key value of the last
+        # item, so storage does not need to look the item up again
+        if sort_key in item.fields and item.obj_attr_is_set(sort_key):
+            marker = utils.encode_marker(sort_key, item[sort_key], item.id)
+        else:
+            marker = item['id']
+
         # Prepare the extra params
         extra_params = {
-            'marker': items[-1]['id']
+            'marker': marker
         }
 
         return cls._get_collection_href(request, extra_params)
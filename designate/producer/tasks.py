@@ -18,6 +18,7 @@ import datetime
 from designate import context
 from designate import plugin
 from designate import rpc
+from designate import utils
 from designate.central import rpcapi
 from designate.worker import rpcapi as worker_rpcapi
 
@@ -75,7 +76,9 @@ class PeriodicTask(plugin.ExtensionPlugin):
             if len(items) == 0:
                 return
             else:
-                kwargs["marker"] = items[-1].id
+                # Page on from the last item without it being looked up again
+                kwargs["marker"] = utils.encode_marker(
+                    'created_at', items[-1].created_at, items[-1].id)
 
             for i in items:
                 yield i
@@ -83,6 +86,11 @@ class PeriodicTask(plugin.ExtensionPlugin):
     def _iter_zones(self, ctxt, criterion=None):
         criterion = criterion or {}
         criterion.update(self._filter_between('shard'))
+
+        # The zones are iterated page by page, counting them is not needed
+        ctxt = ctxt.deepcopy()
+        ctxt.hide_counts = True
+
         return self._iter(self.central_api.find_zones, ctxt, criterion)
 
 
@@ -280,3 +288,40 @@ class WorkerPeriodicRecovery(PeriodicTask):
         ctxt.all_tenants = True
 
         self.worker_api.recover_shard(ctxt, pstart, pend)
+
+
+class ZoneUsageReconcileTask(PeriodicTask):
+    """Recount the recordsets and records of zones, correcting any drift of
+    the usage counts the quotas are checked against.
+    """
+    __plugin_name__ = 'zone_usage_reconcile'
+
+    def __call__(self):
+        if not CONF.quota_usage_counters:
+            return
+
+        pstart, pend = self._my_range()
+        LOG.info(
+            "Reconciling zone usages for shards %(start)s to %(end)s",
+            {
+                "start": pstart,
+                "end": pend
+            })
+
+        ctxt = context.DesignateContext.get_admin_context()
+        ctxt.all_tenants = True
+
+        criterion = self._filter_between('shard')
+        criterion['deleted'] = '0'
+
+        count = self.central_api.reconcile_zone_usages(ctxt, criterion)
+
+        if count:
+            LOG.warning(
+                "Corrected the usage of %(count)d zones for shards "
+                "%(start)s to %(end)s",
+                {
+                    "count": count,
+                    "start": pstart,
+                    "end": pend
+                })
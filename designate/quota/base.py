@@ -14,6 +14,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 import abc
+import time
 
 import six
 from oslo_config import cfg
@@ -28,6 +29,12 @@ class Quota(DriverPlugin):
     __plugin_ns__ = 'designate.quota'
     __plugin_type__ = 'quota'
 
+    def __init__(self):
+        super(Quota, self).__init__()
+        self._cache = {}
+        self._cache_generation = 0
+        self._cache_purged = time.time()
+
     def limit_check(self, context, tenant_id, **values):
         quotas = self.get_quotas(context, tenant_id)
 
@@ -44,10 +51,44 @@ class Quota(DriverPlugin):
     def get_quotas(self, context, tenant_id):
         quotas = self.get_default_quotas(context)
 
-        quotas.update(self._get_quotas(context, tenant_id))
+        quotas.update(self._get_cached_quotas(context, tenant_id))
 
         return quotas
 
+    def _get_cached_quotas(self, context, tenant_id):
+        ttl = cfg.CONF.quota_cache_ttl
+        if ttl <= 0:
+            return self._get_quotas(context, tenant_id)
+
+        now = time.time()
+        cached = self._cache.get(tenant_id)
+        if cached is not None and now < cached[0]:
+            return cached[1]
+
+        generation = self._cache_generation
+        quotas = self._get_quotas(context, tenant_id)
+
+        # Do not cache the quotas if they changed while being loaded
+        if generation == self._cache_generation:
+            if now - self._cache_purged > ttl:
+                self._cache = dict(
+                    (key, value) for key, value in self._cache.items()
+                    if now < value[0])
+                self._cache_purged = now
+            self._cache[tenant_id] = (now + ttl, quotas)
+
+        return quotas
+
+    def invalidate_quotas(self, tenant_id=None):
+        """
+        Drop the cached quotas of a tenant, or of all the tenants
+        """
+        self._cache_generation += 1
+        if tenant_id is None:
+            self._cache = {}
+        else:
+            self._cache.pop(tenant_id, None)
+
     @abc.abstractmethod
     def _get_quotas(self, context, tenant_id):
         pass
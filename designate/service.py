@@ -18,17 +18,26 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 import errno
+import itertools
 import socket
 import struct
 import threading
+import time
 
+import dns.exception
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import eventlet
 import eventlet.debug
+import eventlet.semaphore
 from oslo_log import log as logging
 import oslo_messaging as messaging
 from oslo_service import service
 from oslo_service import sslutils
 from oslo_service import wsgi
 from oslo_utils import netutils
+import six
 
 from designate import policy
 from designate import rpc
@@ -136,10 +145,53 @@ class WSGIService(Service):
         super(WSGIService, self).wait()
 
 
+class DNSQueryPool(object):
+    """
+    A pool of green threads handling one class of DNS queries, with a limit
+    on the number of queries waiting for a free thread.
+    """
+
+    def __init__(self, name, size, queue_size=0):
+        self.name = name
+        self.size = size
+        self.queue_size = queue_size
+        self.pool = eventlet.GreenPool(size)
+
+    def spawn(self, func, *args):
+        """
+        Run func in the pool. With a queue size the caller is not blocked,
+        without one it waits for a free thread, so that no more queries are
+        read in the meantime.
+
+        :return: A GreenThread which completes along with func, or None if
+                 the queue is full and the query is rejected.
+        """
+        if self.pool.free() > 0 or not self.queue_size:
+            return self.pool.spawn(func, *args)
+
+        if self.pool.waiting() >= self.queue_size:
+            metrics.counter('dns.%s.rejected' % self.name).increment()
+            return None
+
+        metrics.counter('dns.%s.queued' % self.name).increment()
+        return eventlet.spawn(self._wait_and_run, func, args)
+
+    def _wait_and_run(self, func, args):
+        # Blocks until a thread of the pool is free
+        queued_at = time.time()
+        thread = self.pool.spawn(func, *args)
+        metrics.timing('dns.%s.queue_time' % self.name,
+                       time.time() - queued_at)
+        return thread.wait()
+
+
 class DNSService(object):
     _TCP_RECV_MAX_SIZE = 65535
+    _UDP_RECV_MAX_SIZE = 65535
 
-    def __init__(self, app, tg, listen, tcp_backlog, tcp_recv_timeout):
+    def __init__(self, app, tg, listen, tcp_backlog, tcp_recv_timeout,
+                 pool_size=0, queue_size=0, xfr_pool_size=0,
+                 xfr_queue_size=0):
         self._running = threading.Event()
         self.app = app
         self.tg = tg
@@ -148,6 +200,19 @@ class DNSService(object):
         self.listen = listen
         metrics.init()
 
+        # When a pool size is set queries are handled by a dedicated pool of
+        # green threads instead of a new thread group thread per query. Zone
+        # transfers can be given their own pool, so they can not hold every
+        # thread while cheap queries are waiting.
+        self.pool = None
+        self.xfr_pool = None
+        if pool_size:
+            self.pool = DNSQueryPool('query', pool_size, queue_size)
+            self.xfr_pool = self.pool
+            if xfr_pool_size:
+                self.xfr_pool = DNSQueryPool(
+                    'xfr', xfr_pool_size, xfr_queue_size)
+
         # Eventet will complain loudly about our use of multiple greentheads
         # reading/writing to the UDP socket at once. Disable this warning.
         eventlet.debug.hub_prevent_multiple_readers(False)
@@ -177,7 +242,10 @@ class DNSService(object):
         self._dns_socks_udp.append(sock_udp)
 
         self.tg.add_thread(self._dns_handle_tcp, sock_tcp)
-        self.tg.add_thread(self._dns_handle_udp, sock_udp)
+        if self.pool is not None:
+            self.tg.add_thread(self._dns_handle_udp_pooled, sock_udp)
+        else:
+            self.tg.add_thread(self._dns_handle_udp, sock_udp)
 
     def stop(self):
         self._running.clear()
@@ -207,7 +275,12 @@ class DNSService(object):
                               {'host': addr[2], 'port': addr[3]})
 
                 # Dispatch a thread to handle the connection
-                self.tg.add_thread(self._dns_handle_tcp_conn, addr, client)
+                if self.pool is not None:
+                    self.tg.add_thread(self._dns_handle_tcp_conn_pooled,
+                                       addr, client)
+                else:
+                    self.tg.add_thread(self._dns_handle_tcp_conn, addr,
+                                       client)
 
             # NOTE: Any uncaught exceptions will result in the main loop
             # ending unexpectedly. Ensure proper ordering of blocks, and
@@ -299,6 +372,200 @@ class DNSService(object):
             if client:
                 client.close()
 
+    def _dns_handle_tcp_conn_pooled(self, addr, client):
+        """
+        Handle DNS Queries over TCP using the query pool. Pipelined queries
+        are read into a preallocated buffer and handled concurrently, the
+        responses are sent in the order they are ready.
+        See https://tools.ietf.org/html/rfc7766#section-6.2.1.1
+        Raises no exception: it's to be run in an eventlet green thread
+
+        :param addr: Tuple of the client's (IPv4 addr, Port) or
+                     (IPv6 addr, Port, Flow info, Scope ID)
+        :type addr: tuple
+        :param client: Client socket
+        :type client: socket
+        :raises: None
+        """
+        host, port = addr[:2]
+        buf = memoryview(bytearray(self._TCP_RECV_MAX_SIZE))
+        send_lock = eventlet.semaphore.Semaphore()
+        pending = set()
+        try:
+            # Every write is a complete message, there is nothing to gain
+            # from delaying them while earlier responses are unacknowledged.
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            while True:
+                # Decode the first 2 bytes containing the query length
+                if self._dns_recv_into(client, buf, 2) < 2:
+                    break
+                (expected_length,) = struct.unpack('!H', buf[:2])
+
+                received = self._dns_recv_into(client, buf, expected_length)
+
+                # The buffer is reused for the next query, hand a copy of
+                # the payload to the query thread.
+                payload = buf[:received].tobytes()
+                thread = self._dns_get_pool(payload).spawn(
+                    self._dns_handle_tcp_query, addr, client, send_lock,
+                    payload)
+                if thread is not None:
+                    pending.add(thread)
+                    thread.link(pending.discard)
+                else:
+                    response = self._dns_busy_response(payload)
+                    if response is not None:
+                        with send_lock:
+                            client.sendall(
+                                struct.pack('!H', len(response)) + response)
+
+                if received < expected_length:
+                    break
+
+        except socket.timeout:
+            LOG.info('TCP Timeout from: %(host)s:%(port)d',
+                     {'host': host, 'port': port})
+        except socket.error as e:
+            errname = errno.errorcode[e.args[0]]
+            LOG.warning('Socket error %(err)s from: %(host)s:%(port)d',
+                        {'host': host, 'port': port, 'err': errname})
+
+        except Exception:
+            LOG.exception('Unknown exception handling TCP request from: '
+                          "%(host)s:%(port)d", {'host': host, 'port': port})
+        finally:
+            # Let the queries already read complete before closing
+            for thread in list(pending):
+                thread.wait()
+            if client:
+                client.close()
+
+    @staticmethod
+    def _dns_recv_into(client, buf, length):
+        """
+        Receive up to length bytes into the start of buf, stopping early
+        only if the connection is closed.
+
+        :return: The number of bytes received
+        """
+        received = 0
+        while received < length:
+            nbytes = client.recv_into(buf[received:length])
+            if not nbytes:
+                break
+            received += nbytes
+        return received
+
+    def _dns_handle_tcp_query(self, addr, client, send_lock, payload):
+        """
+        Handle a DNS Query received over a TCP connection, sending back all
+        the response messages at once.
+
+        :raises: None
+        """
+        host, port = addr[:2]
+        try:
+            responses = iter(self.app({'payload': payload, 'addr': addr}))
+
+            # Handle the query before waiting for the connection, a zone
+            # transfer only holds it while rendering its later messages.
+            first = list(itertools.islice(responses, 1))
+
+            with send_lock:
+                for response in itertools.chain(first, responses):
+                    # Send back a response only if present
+                    if response is None:
+                        continue
+
+                    client.sendall(
+                        struct.pack('!H', len(response)) + response)
+
+        except socket.error as e:
+            errname = errno.errorcode[e.args[0]]
+            LOG.warning('Socket error %(err)s from: %(host)s:%(port)d',
+                        {'host': host, 'port': port, 'err': errname})
+        except Exception:
+            LOG.exception('Unhandled exception while processing request from '
+                          "%(host)s:%(port)d", {'host': host, 'port': port})
+
+    def _dns_handle_udp_pooled(self, sock_udp):
+        """Handle DNS Queries over UDP using the query pool
+
+        :param sock_udp: UDP socket
+        :type sock_udp: socket
+        :raises: None
+        """
+        LOG.info('_handle_udp thread started')
+
+        buf = memoryview(bytearray(self._UDP_RECV_MAX_SIZE))
+        addr = ('unknown', 0)
+        while self._running.is_set():
+            try:
+                nbytes, addr = sock_udp.recvfrom_into(buf)
+
+                LOG.debug('Handling UDP Request from: %(host)s:%(port)d',
+                          {'host': addr[0], 'port': addr[1]})
+
+                payload = buf[:nbytes].tobytes()
+                thread = self._dns_get_pool(payload).spawn(
+                    self._dns_handle_udp_query, sock_udp, addr, payload)
+                if thread is None:
+                    response = self._dns_busy_response(payload)
+                    if response is not None:
+                        sock_udp.sendto(response, addr)
+            except socket.timeout:
+                pass
+            except socket.error as e:
+                errname = errno.errorcode[e.args[0]]
+                LOG.warning('Socket error %(err)s from: %(host)s:%(port)d',
+                            {'host': addr[0], 'port': addr[1], 'err': errname})
+            except Exception:
+                LOG.exception('Unknown exception handling UDP request from: '
+                              '%(host)s:%(port)d',
+                              {'host': addr[0], 'port': addr[1]})
+
+    def _dns_get_pool(self, payload):
+        """Return the pool which handles the query, based on its type"""
+        if self.xfr_pool is not self.pool:
+            if self._dns_get_qtype(payload) in (dns.rdatatype.AXFR,
+                                                dns.rdatatype.IXFR):
+                return self.xfr_pool
+        return self.pool
+
+    @staticmethod
+    def _dns_get_qtype(payload):
+        """
+        Return the type of the first question of a query, without decoding
+        the whole message.
+        """
+        try:
+            # Skip the header and the question name
+            offset = 12
+            length = six.indexbytes(payload, offset)
+            while length:
+                if length >= 0xc0:
+                    # Compression pointer
+                    offset += 1
+                    break
+                offset += length + 1
+                length = six.indexbytes(payload, offset)
+            (qtype,) = struct.unpack_from('!H', payload, offset + 1)
+            return qtype
+        except (IndexError, struct.error):
+            return None
+
+    @staticmethod
+    def _dns_busy_response(payload):
+        """Build a SERVFAIL response for a query which was rejected"""
+        try:
+            request = dns.message.from_wire(payload)
+        except dns.exception.DNSException:
+            return None
+        response = dns.message.make_response(request)
+        response.set_rcode(dns.rcode.SERVFAIL)
+        return response.to_wire()
+
     def _dns_handle_udp(self, sock_udp):
         """Handle a DNS Query over UDP in a dedicated thread
 
@@ -28,10 +28,14 @@ from designate import exceptions
 from designate import objects
 from designate.sqlalchemy import session
 from designate.sqlalchemy import utils
+from designate import utils as designate_utils
 
 
 LOG = logging.getLogger(__name__)
 
+# Number of rows per INSERT when creating objects in bulk
+BULK_INSERT_CHUNK_SIZE = 1000
+
 
 def _set_object_from_model(obj, model, **extra):
     """Update a DesignateObject with the values from a SQLA Model"""
@@ -48,6 +52,15 @@ def _set_object_from_model(obj, model, **extra):
     return obj
 
 
+def _get_column_default(column):
+    """Return the value a column gets when an INSERT does not set it"""
+    if column.default is not None and column.default.is_scalar:
+        return column.default.arg
+    if column.server_default is not None:
+        return column.server_default.arg
+    return None
+
+
 def _set_listobject_from_models(obj, models, map_=None):
     for model in models:
         extra = {}
@@ -220,6 +233,67 @@ class SQLAlchemy(object):
 
         return _set_object_from_model(obj, resultproxy.fetchone())
 
+    def _create_many(self, table, objs, exc_dup, skip_values=None,
+                     extra_values=None):
+        """
+        Insert many objects with multi-row INSERTs.
+
+        Unlike _create the rows are not fetched back. The ids and the column
+        defaults are filled in on the objects instead.
+
+        :param extra_values: A list with a dict of extra values per object.
+        """
+        if not objs:
+            return objs
+
+        now = timeutils.utcnow()
+        rows = []
+        for i, obj in enumerate(objs):
+            if not obj.obj_attr_is_set('id') or obj.id is None:
+                obj.id = designate_utils.generate_uuid()
+            if 'created_at' in table.c:
+                obj.created_at = now
+
+            values = obj.obj_get_changes()
+
+            if skip_values is not None:
+                for skip_value in skip_values:
+                    values.pop(skip_value, None)
+
+            if extra_values is not None:
+                values.update(extra_values[i])
+
+            rows.append(values)
+
+        # An executemany INSERT needs every row to have the same columns, use
+        # the defaults for the columns some rows do not have.
+        columns = set()
+        for values in rows:
+            columns.update(values)
+        for column in table.c:
+            if (column.name not in columns and column.default is not None and
+                    column.default.is_scalar):
+                columns.add(column.name)
+
+        for obj, values in zip(objs, rows):
+            for name in columns - set(values):
+                values[name] = _get_column_default(table.c[name])
+
+            for name, value in values.items():
+                if name in obj.FIELDS and name not in (skip_values or []):
+                    obj[name] = value
+            obj.obj_reset_changes()
+
+        try:
+            for i in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                self.session.execute(
+                    table.insert(), rows[i:i + BULK_INSERT_CHUNK_SIZE])
+        except oslo_db_exception.DBDuplicateEntry:
+            msg = "Duplicate %s" % objs[0].obj_name()
+            raise exc_dup(msg)
+
+        return objs
+
     def _find(self, context, table, cls, list_cls, exc_notfound, criterion,
               one=False, marker=None, limit=None, sort_key=None,
               sort_dir=None, query=None, apply_tenant_criteria=True):
@@ -251,10 +325,11 @@ class SQLAlchemy(object):
             else:
                 return _set_object_from_model(cls(), results[0])
         else:
-            if marker is not None:
-                marker = utils.check_marker(table, marker, self.session)
-
             try:
+                if marker is not None:
+                    marker = utils.get_marker(
+                        table, marker, sort_key, self.session)
+
                 query = utils.paginate_query(
                     query, table, limit,
                     [sort_key, 'id'], marker=marker,
@@ -311,11 +386,11 @@ class SQLAlchemy(object):
             inner_q = inner_q.with_hint(recordsets_table, index_hint,
                                         dialect_name='mysql')
 
-        if marker is not None:
-            marker = utils.check_marker(recordsets_table, marker,
-                                        self.session)
-
         try:
+            if marker is not None:
+                marker = utils.get_marker(
+                    recordsets_table, marker, sort_key, self.session)
+
             inner_q = utils.paginate_query(
                 inner_q, recordsets_table, limit,
                 [sort_key, 'id'], marker=marker,
@@ -622,3 +697,40 @@ class SQLAlchemy(object):
         # show up as ValueError
         except ValueError as value_error:
             raise exceptions.ValueError(six.text_type(value_error))
+
+    def _select_raw_iter(self, context, table, criterion, query=None,
+                         chunk_size=1000):
+        """
+        Iterate over the raw rows of a query without loading them all.
+
+        The query is executed with a server side cursor (where the DB-API
+        driver supports one) and rows are fetched in chunks of chunk_size,
+        keeping memory usage bounded regardless of the size of the result.
+        """
+        # Build the query
+        if query is None:
+            query = select([table])
+
+        query = self._apply_criterion(table, query, criterion)
+        query = self._apply_deleted_criteria(context, table, query)
+        query = query.execution_options(stream_results=True)
+
+        try:
+            resultproxy = self.session.execute(query)
+        # Any ValueErrors are propagated back to the user as is.
+        # If however central or storage is called directly, invalid values
+        # show up as ValueError
+        except ValueError as value_error:
+            raise exceptions.ValueError(six.text_type(value_error))
+
+        try:
+            while True:
+                rows = resultproxy.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            # NOTE: Release the cursor (and the connection it holds) even if
+            #       the consumer stops iterating early.
+            resultproxy.close()
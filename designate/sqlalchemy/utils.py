@@ -24,9 +24,12 @@ from oslo_db.sqlalchemy import utils
 from oslo_db import exception as oslo_db_exception
 from oslo_db.sqlalchemy.migration_cli import manager
 from oslo_log import log
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
 
 from designate.i18n import _
 from designate import exceptions
+from designate import utils as designate_utils
 
 
 LOG = log.getLogger(__name__)
@@ -151,6 +154,39 @@ def check_marker(table, marker, session):
     return marker
 
 
+def get_marker(table, marker, sort_key, session):
+    """
+    Get the sort key and id values a page starts after.
+
+    Keyset markers carry the values, the row of a marker id is looked up.
+    """
+    if uuidutils.is_uuid_like(marker):
+        return check_marker(table, marker, session)
+
+    marker_sort_key, value, marker_id = designate_utils.decode_marker(marker)
+
+    if marker_sort_key != sort_key:
+        # The marker was made for another sort order
+        return check_marker(table, marker_id, session)
+
+    column = getattr(table.c, sort_key, None)
+    if column is None:
+        raise utils.InvalidSortKey()
+
+    # Only a scalar can be compared with a column
+    if not isinstance(value, six.string_types + six.integer_types +
+                      (float, type(None))):
+        raise exceptions.InvalidMarker()
+
+    if value is not None and isinstance(column.type, sqlalchemy.DateTime):
+        try:
+            value = timeutils.normalize_time(timeutils.parse_isotime(value))
+        except ValueError:
+            raise exceptions.InvalidMarker()
+
+    return {sort_key: value, 'id': marker_id}
+
+
 def get_rrset_index(sort_key):
     rrset_index_hint = None
     index = RRSET_FILTERING_INDEX.get(sort_key)
@@ -305,6 +305,66 @@ class Storage(DriverPlugin):
         :param criterion: Criteria to filter by.
         """
 
+    @abc.abstractmethod
+    def create_zone_journal_entries(self, context, zone_id, old_serial,
+                                    serial, entries):
+        """
+        Record changes made to a zone by a serial change in the zone journal.
+
+        :param context: RPC Context.
+        :param zone_id: Zone ID the changes belong to.
+        :param old_serial: Serial of the zone before the change.
+        :param serial: Serial of the zone after the change.
+        :param entries: List of (operation, name, ttl, type, data) tuples.
+                        The operation is one of 'SOA' (a serial change
+                        marker), 'DEL' or 'ADD'.
+        """
+
+    @abc.abstractmethod
+    def find_zone_journal(self, context, zone_id, serial):
+        """
+        Find the zone journal entries of a zone from a serial onwards.
+
+        Returns raw (old_serial, serial, operation, name, ttl, type, data)
+        rows ordered by serial.
+
+        :param context: RPC Context.
+        :param zone_id: Zone ID to find the journal of.
+        :param serial: Oldest serial to include.
+        """
+
+    @abc.abstractmethod
+    def purge_zone_journal(self, context, zone_id, keep=0):
+        """
+        Purge old entries from the zone journal.
+
+        :param context: RPC Context.
+        :param zone_id: Zone ID to purge the journal of.
+        :param keep: Number of most recent serial changes to keep.
+        """
+
+    @abc.abstractmethod
+    def get_zone_usage(self, context, zone_id):
+        """
+        Get the number of recordsets and non-managed records of a zone.
+
+        Returns a dict with the 'recordsets' and 'records' counts, which are
+        kept up to date by the recordset and record writes.
+
+        :param context: RPC Context.
+        :param zone_id: Zone ID to get the usage of.
+        """
+
+    @abc.abstractmethod
+    def reconcile_zone_usages(self, context, criterion=None):
+        """
+        Recount the recordsets and records of zones, correcting any drift of
+        their usage counts.
+
+        :param context: RPC Context.
+        :param criterion: Criteria to filter the zones by.
+        """
+
     @abc.abstractmethod
     def create_recordset(self, context, zone_id, recordset):
         """
@@ -315,6 +375,17 @@ class Storage(DriverPlugin):
         :param recordset: RecordSet object with the values to be created.
         """
 
+    @abc.abstractmethod
+    def create_recordsets(self, context, zone_id, recordsets):
+        """
+        Create many recordsets, and their records, on a given Zone ID with
+        bulk inserts.
+
+        :param context: RPC Context.
+        :param zone_id: Zone ID to create the recordsets in.
+        :param recordsets: RecordSet objects with the values to be created.
+        """
+
     @abc.abstractmethod
     def get_recordset(self, context, recordset_id):
         """
@@ -343,7 +414,12 @@ class Storage(DriverPlugin):
     @abc.abstractmethod
     def find_recordsets_axfr(self, context, criterion=None):
         """
-        Find RecordSets.
+        Find RecordSets for a zone transfer.
+
+        Returns an iterable of raw (recordset id, type, ttl, name, data,
+        action) rows ordered by recordset id, so the records of a RecordSet
+        are always adjacent. The rows may be streamed from the database, the
+        iterable should be consumed (or closed) promptly.
 
         :param context: RPC Context.
         :param criterion: Criteria to filter by.
@@ -430,6 +506,18 @@ class Storage(DriverPlugin):
         :param criterion: Criteria to filter by.
         """
 
+    @abc.abstractmethod
+    def find_floatingip_records(self, context, addresses):
+        """
+        Find the PTR records of floating IPs by address, with the TTL they
+        are served with.
+
+        :param context: RPC Context.
+        :param addresses: The floating IP addresses to look up.
+        :return: A list of (Record, ttl) tuples, ttl is the TTL of the
+                 record's RecordSet or, if it has none, of its Zone.
+        """
+
     @abc.abstractmethod
     def update_record(self, context, record):
         """
@@ -448,6 +536,30 @@ class Storage(DriverPlugin):
         :param record_id: Record ID to delete
         """
 
+    @abc.abstractmethod
+    def update_records_status(self, context, criterion, status, action=None):
+        """
+        Set the status, and optionally the action, of every record matching
+        the criterion in a single statement.
+
+        :param context: RPC Context.
+        :param criterion: Criteria to filter by.
+        :param status: Status to set.
+        :param action: Action to set, None leaves it unchanged.
+        :return: Number of records updated.
+        """
+
+    @abc.abstractmethod
+    def delete_records(self, context, criterion):
+        """
+        Delete every record matching the criterion, along with the
+        recordsets left without any records.
+
+        :param context: RPC Context.
+        :param criterion: Criteria to filter by.
+        :return: Number of records deleted.
+        """
+
     @abc.abstractmethod
     def count_records(self, context, criterion=None):
         """
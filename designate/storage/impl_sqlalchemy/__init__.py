@@ -13,11 +13,13 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import collections
 import time
 import hashlib
 
 from oslo_log import log as logging
-from sqlalchemy import select, distinct, func
+import six
+from sqlalchemy import bindparam, select, distinct, exists, false, func
 from sqlalchemy.sql.expression import or_
 
 from designate import exceptions
@@ -31,6 +33,15 @@ LOG = logging.getLogger(__name__)
 
 MAXIMUM_SUBZONE_DEPTH = 128
 
+# Number of IDs per DELETE when deleting records or recordsets in bulk
+BULK_DELETE_CHUNK_SIZE = 500
+
+# Number of addresses per query when looking up floating IP PTR records
+FLOATINGIP_LOOKUP_CHUNK_SIZE = 500
+
+# Number of zones per query when loading the attributes and masters of zones
+ZONE_RELATIONS_CHUNK_SIZE = 500
+
 
 class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
     """SQLAlchemy connection"""
@@ -224,34 +235,57 @@ class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
             exceptions.ZoneNotFound, criterion, one, marker, limit,
             sort_key, sort_dir)
 
-        def _load_relations(zone):
-            if zone.type == 'SECONDARY':
-                zone.masters = self._find_zone_masters(
-                    context, {'zone_id': zone.id})
-            else:
-                # This avoids an extra DB call per primary zone. This will
-                # always have 0 results for a PRIMARY zone.
-                zone.masters = objects.ZoneMasterList()
-
-            zone.attributes = self._find_zone_attributes(
-                context, {'zone_id': zone.id, "key": "!master"})
-
-            zone.obj_reset_changes(['masters', 'attributes'])
+        if one:
+            self._load_zone_relations(context, [zones])
+            LOG.debug("Fetched zone %s", zones)
+            return zones
 
-        # TODO(Federico) refactor part of _find_zones into _find_zone, move
-        # _load_relations out
+        self._load_zone_relations(context, zones)
 
-        if one:
-            _load_relations(zones)
+        if context.hide_counts:
+            zones.total_count = None
+        elif marker is None and (limit is None or len(zones) < int(limit)):
+            # The page holds every zone matching the criterion
+            zones.total_count = len(zones)
         else:
             zones.total_count = self.count_zones(context, criterion)
-            for d in zones:
-                _load_relations(d)
 
-        if one:
-            LOG.debug("Fetched zone %s", zones)
         return zones
 
+    def _load_zone_relations(self, context, zones):
+        """
+        Load the masters and attributes of zones, with a query per relation
+        for all the zones rather than per zone
+        """
+        zone_ids = [zone.id for zone in zones]
+        # Only SECONDARY zones have masters
+        secondary_zone_ids = [
+            zone.id for zone in zones if zone.type == 'SECONDARY']
+
+        attributes = collections.defaultdict(list)
+        for i in range(0, len(zone_ids), ZONE_RELATIONS_CHUNK_SIZE):
+            for attribute in self._find_zone_attributes(context, {
+                    'zone_id': zone_ids[i:i + ZONE_RELATIONS_CHUNK_SIZE],
+                    'key': '!master'}):
+                attributes[attribute.zone_id].append(attribute)
+
+        masters = collections.defaultdict(list)
+        for i in range(0, len(secondary_zone_ids), ZONE_RELATIONS_CHUNK_SIZE):
+            for master in self._find_zone_masters(context, {
+                    'zone_id': secondary_zone_ids[
+                        i:i + ZONE_RELATIONS_CHUNK_SIZE]}):
+                masters[master.zone_id].append(master)
+
+        for zone in zones:
+            zone.attributes = objects.ZoneAttributeList(
+                objects=attributes.get(zone.id, []))
+            zone.masters = objects.ZoneMasterList(
+                objects=masters.get(zone.id, []))
+
+            zone.attributes.obj_reset_changes()
+            zone.masters.obj_reset_changes()
+            zone.obj_reset_changes(['masters', 'attributes'])
+
     def create_zone(self, context, zone):
         # Patch in the reverse_name column
         extra_values = {"reverse_name": zone.name[::-1]}
@@ -274,6 +308,13 @@ class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
             zone.masters = objects.ZoneMasterList()
         zone.obj_reset_changes(['masters', 'attributes'])
 
+        # The recordsets of the zone are counted as they are created
+        self.session.execute(tables.zone_usages.insert(), [{
+            'zone_id': zone.id,
+            'recordsets': 0,
+            'records': 0,
+        }])
+
         return zone
 
     def get_zone(self, context, zone_id):
@@ -384,29 +425,7 @@ class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
                 self.create_zone_master(context, zone.id, attr)
 
         if zone.obj_attr_is_set('recordsets'):
-            existing = self.find_recordsets(context, {'zone_id': zone.id})
-
-            data = {}
-            for rrset in existing:
-                data[rrset.name, rrset.type] = rrset
-
-            keep = set()
-            for rrset in zone.recordsets:
-                current = data.get((rrset.name, rrset.type))
-
-                if current:
-                    current.update(rrset)
-                    current.records = rrset.records
-                    self.update_recordset(context, current)
-                    keep.add(current.id)
-                else:
-                    self.create_recordset(context, zone.id, rrset)
-                    keep.add(rrset.id)
-
-            if zone.type == 'SECONDARY':
-                # Purge anything that shouldn't be there :P
-                for i in set([i.id for i in data.values()]) - keep:
-                    self.delete_recordset(context, i)
+            self._update_zone_recordsets(context, zone)
 
         if tenant_id_changed:
             recordsets_query = tables.recordsets.update().\
@@ -503,6 +522,161 @@ class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
 
         return result[0]
 
+    # Zone journal methods
+    def create_zone_journal_entries(self, context, zone_id, old_serial,
+                                    serial, entries):
+        if not entries:
+            return
+
+        values = [{
+            'zone_id': zone_id,
+            'old_serial': old_serial,
+            'serial': serial,
+            'operation': operation,
+            'name': name,
+            'ttl': ttl,
+            'type': type_,
+            'data': data,
+        } for operation, name, ttl, type_, data in entries]
+
+        self.session.execute(tables.zone_journal.insert(), values)
+
+    def find_zone_journal(self, context, zone_id, serial):
+        table = tables.zone_journal
+
+        query = select([table.c.old_serial, table.c.serial,
+                        table.c.operation, table.c.name, table.c.ttl,
+                        table.c.type, table.c.data]).\
+            where(table.c.zone_id == zone_id).\
+            where(table.c.serial >= serial).\
+            order_by(table.c.serial)
+
+        resultproxy = self.session.execute(query)
+        return resultproxy.fetchall()
+
+    def purge_zone_journal(self, context, zone_id, keep=0):
+        table = tables.zone_journal
+
+        query = table.delete().where(table.c.zone_id == zone_id)
+
+        if keep > 0:
+            # Find the oldest serial change marker we want to keep
+            oldest = select([table.c.serial]).\
+                where(table.c.zone_id == zone_id).\
+                where(table.c.operation == 'SOA').\
+                order_by(table.c.serial.desc()).\
+                offset(keep - 1).limit(1)
+
+            result = self.session.execute(oldest).fetchone()
+            if result is None:
+                return
+
+            query = query.where(table.c.serial < result[0])
+
+        self.session.execute(query)
+
+    # Zone usage methods
+    @staticmethod
+    def _is_counted_record(record):
+        # Managed records are not subject to the quotas, records stored
+        # without the managed field take the column default of False
+        if not record.obj_attr_is_set('managed'):
+            return True
+        return record.managed is False
+
+    @staticmethod
+    def _zone_usage_counts(zone_id):
+        rs_table = tables.recordsets
+        r_table = tables.records
+
+        recordsets = select([func.count(rs_table.c.id)]).\
+            where(rs_table.c.zone_id == zone_id).\
+            as_scalar()
+        records = select([func.count(r_table.c.id)]).\
+            where(r_table.c.zone_id == zone_id).\
+            where(r_table.c.managed == false()).\
+            as_scalar()
+
+        return recordsets, records
+
+    def _update_zone_usage(self, zone_id, recordsets=0, records=0):
+        """
+        Adjust the usage counts of a zone, in the same transaction as the
+        write they account for
+        """
+        if not recordsets and not records:
+            return
+
+        table = tables.zone_usages
+
+        query = table.update().\
+            where(table.c.zone_id == zone_id).\
+            values(recordsets=table.c.recordsets + recordsets,
+                   records=table.c.records + records)
+
+        self.session.execute(query)
+
+    def _recount_zone_usages(self, zone_ids):
+        """
+        Recount the usage of zones, for the bulk writes which do not track
+        what they changed
+        :returns: number of zones whose usage counts were wrong
+        """
+        table = tables.zone_usages
+
+        recordsets, records = self._zone_usage_counts(table.c.zone_id)
+
+        query = table.update().\
+            where(table.c.zone_id.in_(zone_ids)).\
+            where(or_(table.c.recordsets != recordsets,
+                      table.c.records != records)).\
+            values(recordsets=recordsets, records=records)
+
+        return self.session.execute(query).rowcount
+
+    def get_zone_usage(self, context, zone_id):
+        table = tables.zone_usages
+
+        query = select([table.c.recordsets, table.c.records]).\
+            where(table.c.zone_id == zone_id)
+        result = self.session.execute(query).fetchone()
+
+        if result is None:
+            # Not counted yet, until the zone usages are reconciled
+            return {
+                'recordsets': self.count_recordsets(
+                    context, {'zone_id': zone_id}),
+                'records': self.count_records(
+                    context, {'zone_id': zone_id, 'managed': False}),
+            }
+
+        return {
+            'recordsets': result['recordsets'],
+            'records': result['records'],
+        }
+
+    def reconcile_zone_usages(self, context, criterion=None):
+        """
+        Recount the usage of zones.
+        :returns: number of zones whose usage counts were missing or wrong
+        """
+        table = tables.zone_usages
+        zones = tables.zones
+
+        zone_ids = select([zones.c.id])
+        zone_ids = self._apply_criterion(zones, zone_ids, criterion)
+
+        # Count the zones which have no usage yet
+        recordsets, records = self._zone_usage_counts(zones.c.id)
+        query = table.insert().from_select(
+            ['zone_id', 'recordsets', 'records'],
+            select([zones.c.id, recordsets, records]).
+            where(zones.c.id.in_(zone_ids)).
+            where(~exists().where(table.c.zone_id == zones.c.id)))
+        created = self.session.execute(query).rowcount
+
+        return created + self._recount_zone_usages(zone_ids)
+
     # Zone attribute methods
     def _find_zone_attributes(self, context, criterion, one=False,
                               marker=None, limit=None, sort_key=None,
@@ -649,11 +823,11 @@ class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
 
         query = query.order_by(tables.recordsets.c.id)
 
-        raw_rows = self._select_raw(
+        # NOTE: Zones can be very large, stream the rows rather than loading
+        #       the whole zone into memory at once.
+        return self._select_raw_iter(
             context, tables.recordsets, criterion, query)
 
-        return raw_rows
-
     def create_recordset(self, context, zone_id, recordset):
         # Fetch the zone as we need the tenant_id
         zone = self._find_zones(context, {'id': zone_id}, one=True)
@@ -668,6 +842,8 @@ class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
             tables.recordsets, recordset, exceptions.DuplicateRecordSet,
             ['records'], extra_values=extra_values)
 
+        self._update_zone_usage(zone_id, recordsets=1)
+
         if recordset.obj_attr_is_set('records'):
             for record in recordset.records:
                 # NOTE: Since we're dealing with a mutable object, the return
@@ -681,6 +857,144 @@ class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
 
         return recordset
 
+    def create_recordsets(self, context, zone_id, recordsets):
+        # Fetch the zone as we need the tenant_id
+        zone = self._find_zones(context, {'id': zone_id}, one=True)
+
+        extra_values = []
+        for recordset in recordsets:
+            recordset.tenant_id = zone.tenant_id
+            recordset.zone_id = zone_id
+
+            # Patch in the reverse_name column
+            extra_values.append({"reverse_name": recordset.name[::-1]})
+
+        self._create_many(
+            tables.recordsets, recordsets, exceptions.DuplicateRecordSet,
+            ['records'], extra_values=extra_values)
+
+        records = []
+        for recordset in recordsets:
+            if recordset.obj_attr_is_set('records'):
+                for record in recordset.records:
+                    record.tenant_id = zone.tenant_id
+                    record.zone_id = zone_id
+                    record.recordset_id = recordset.id
+                    record.hash = self._recalculate_record_hash(record)
+                    records.append(record)
+            else:
+                recordset.records = objects.RecordList()
+
+        self._create_many(tables.records, records, exceptions.DuplicateRecord)
+
+        self._update_zone_usage(
+            zone_id, recordsets=len(recordsets),
+            records=len([r for r in records if self._is_counted_record(r)]))
+
+        for recordset in recordsets:
+            recordset.obj_reset_changes(['records'])
+
+        return recordsets
+
+    def _update_zone_recordsets(self, context, zone):
+        """
+        Make the recordsets of a zone match zone.recordsets, writing only the
+        recordsets and records which differ
+        """
+        existing = self.find_recordsets(context, {'zone_id': zone.id})
+
+        data = {}
+        for rrset in existing:
+            data[rrset.name, rrset.type] = rrset
+
+        keep = set()
+        create_recordsets = []
+        update_recordsets = []
+        create_records = []
+        delete_record_ids = []
+
+        for rrset in zone.recordsets:
+            current = data.get((rrset.name, rrset.type))
+
+            if not current:
+                create_recordsets.append(rrset)
+                continue
+
+            keep.add(current.id)
+
+            changed = False
+            for field in ('ttl', 'description'):
+                if (rrset.obj_attr_is_set(field) and
+                        getattr(rrset, field) != getattr(current, field)):
+                    setattr(current, field, getattr(rrset, field))
+                    changed = True
+            if changed:
+                update_recordsets.append({
+                    '_id': current.id,
+                    'ttl': current.ttl,
+                    'description': current.description,
+                })
+
+            have = dict((r.data, r) for r in current.records)
+            want = set()
+            for record in rrset.records:
+                want.add(record.data)
+                if record.data not in have:
+                    record.tenant_id = current.tenant_id
+                    record.zone_id = zone.id
+                    record.recordset_id = current.id
+                    record.hash = self._recalculate_record_hash(record)
+                    create_records.append(record)
+
+            delete_record_ids.extend(
+                r.id for d, r in have.items() if d not in want)
+
+        delete_recordset_ids = []
+        if zone.type == 'SECONDARY':
+            # Purge anything that shouldn't be there :P
+            delete_recordset_ids = [
+                i.id for i in data.values() if i.id not in keep]
+
+        rs_table = tables.recordsets
+        r_table = tables.records
+
+        if update_recordsets:
+            query = rs_table.update().\
+                where(rs_table.c.id == bindparam('_id')).\
+                values(ttl=bindparam('ttl'),
+                       description=bindparam('description'))
+            query = self._apply_version_increment(context, rs_table, query)
+            self.session.execute(query, update_recordsets)
+
+        # Delete before creating, a record may move between recordsets
+        for ids, table, column in (
+                (delete_record_ids, r_table, r_table.c.id),
+                (delete_recordset_ids, r_table, r_table.c.recordset_id),
+                (delete_recordset_ids, rs_table, rs_table.c.id)):
+            for i in range(0, len(ids), BULK_DELETE_CHUNK_SIZE):
+                query = table.delete().where(
+                    column.in_(ids[i:i + BULK_DELETE_CHUNK_SIZE]))
+                query = self._apply_tenant_criteria(context, table, query)
+                self.session.execute(query)
+
+        self._create_many(r_table, create_records, exceptions.DuplicateRecord)
+
+        if create_recordsets:
+            self.create_recordsets(context, zone.id, create_recordsets)
+
+        if delete_record_ids or delete_recordset_ids or create_records:
+            self._recount_zone_usages([zone.id])
+
+        LOG.debug('Updated the recordsets of zone %(zone)s: %(created)d '
+                  'created, %(updated)d updated and %(deleted)d deleted, '
+                  '%(records_created)d records created and '
+                  '%(records_deleted)d deleted',
+                  {'zone': zone.id, 'created': len(create_recordsets),
+                   'updated': len(update_recordsets),
+                   'deleted': len(delete_recordset_ids),
+                   'records_created': len(create_records),
+                   'records_deleted': len(delete_record_ids)})
+
     def find_recordsets_export(self, context, criterion=None):
         query = None
 
@@ -762,8 +1076,18 @@ class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
         recordset = self._find_recordsets(
             context, {'id': recordset_id}, one=True)
 
-        return self._delete(context, tables.recordsets, recordset,
-                            exceptions.RecordSetNotFound)
+        # The records of the recordset are deleted along with it
+        records = len(
+            [r for r in recordset.records if self._is_counted_record(r)])
+
+        deleted_recordset = self._delete(
+            context, tables.recordsets, recordset,
+            exceptions.RecordSetNotFound)
+
+        self._update_zone_usage(
+            deleted_recordset.zone_id, recordsets=-1, records=-records)
+
+        return deleted_recordset
 
     def count_recordsets(self, context, criterion=None):
         # Ensure that we return only active recordsets
@@ -814,9 +1138,14 @@ class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
         record.recordset_id = recordset_id
         record.hash = self._recalculate_record_hash(record)
 
-        return self._create(
+        record = self._create(
             tables.records, record, exceptions.DuplicateRecord)
 
+        if self._is_counted_record(record):
+            self._update_zone_usage(zone_id, records=1)
+
+        return record
+
     def get_record(self, context, record_id):
         return self._find_records(context, {'id': record_id}, one=True)
 
@@ -830,18 +1159,112 @@ class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
         return self._find_records(context, criterion, one=True)
 
     def update_record(self, context, record):
-        if record.obj_what_changed():
+        changes = record.obj_what_changed()
+        if changes:
             record.hash = self._recalculate_record_hash(record)
 
-        return self._update(
+        updated_record = self._update(
             context, tables.records, record, exceptions.DuplicateRecord,
             exceptions.RecordNotFound)
 
+        if 'managed' in changes:
+            self._recount_zone_usages([updated_record.zone_id])
+
+        return updated_record
+
     def delete_record(self, context, record_id):
         # Fetch the existing record, we'll need to return it.
         record = self._find_records(context, {'id': record_id}, one=True)
-        return self._delete(context, tables.records, record,
-                            exceptions.RecordNotFound)
+        deleted_record = self._delete(context, tables.records, record,
+                                      exceptions.RecordNotFound)
+
+        if self._is_counted_record(record):
+            self._update_zone_usage(record.zone_id, records=-1)
+
+        return deleted_record
+
+    def find_floatingip_records(self, context, addresses):
+        r_table = tables.records
+        rs_table = tables.recordsets
+        z_table = tables.zones
+
+        rjoin = r_table.join(
+            rs_table, r_table.c.recordset_id == rs_table.c.id).join(
+            z_table, r_table.c.zone_id == z_table.c.id)
+
+        # Resolve the TTL the PTR is served with in the same query
+        ttl = func.coalesce(rs_table.c.ttl, z_table.c.ttl).label('ptr_ttl')
+
+        criterion = {
+            'managed': True,
+            'managed_resource_type': 'ptr:floatingip',
+        }
+
+        addresses = sorted(set(addresses))
+        results = []
+        for i in range(0, len(addresses), FLOATINGIP_LOOKUP_CHUNK_SIZE):
+            query = select([r_table, ttl]).select_from(rjoin).\
+                where(r_table.c.managed_extra.in_(
+                    addresses[i:i + FLOATINGIP_LOOKUP_CHUNK_SIZE]))
+            query = self._apply_criterion(r_table, query, criterion)
+            query = self._apply_tenant_criteria(context, r_table, query)
+
+            for row in self.session.execute(query).fetchall():
+                record = sqlalchemy_base._set_object_from_model(
+                    objects.Record(), row)
+                results.append((record, row['ptr_ttl']))
+
+        return results
+
+    def update_records_status(self, context, criterion, status, action=None):
+        table = tables.records
+
+        values = {'status': status}
+        if action is not None:
+            values['action'] = action
+
+        query = table.update().values(**values)
+        query = self._apply_criterion(table, query, criterion)
+        query = self._apply_tenant_criteria(context, table, query)
+        query = self._apply_version_increment(context, table, query)
+
+        return self.session.execute(query).rowcount
+
+    def delete_records(self, context, criterion):
+        table = tables.records
+
+        # Find the recordsets the records belong to first, so those left
+        # empty can be deleted afterwards
+        query = select([table.c.recordset_id, table.c.zone_id]).distinct()
+        query = self._apply_criterion(table, query, criterion)
+        query = self._apply_tenant_criteria(context, table, query)
+        rows = self.session.execute(query).fetchall()
+        recordset_ids = [row[0] for row in rows]
+        zone_ids = sorted(set(row[1] for row in rows))
+
+        if not recordset_ids:
+            return 0
+
+        query = table.delete()
+        query = self._apply_criterion(table, query, criterion)
+        query = self._apply_tenant_criteria(context, table, query)
+        count = self.session.execute(query).rowcount
+
+        rs_table = tables.recordsets
+        for i in range(0, len(recordset_ids), BULK_DELETE_CHUNK_SIZE):
+            query = rs_table.delete().\
+                where(rs_table.c.id.in_(
+                    recordset_ids[i:i + BULK_DELETE_CHUNK_SIZE])).\
+                where(~exists().where(
+                    table.c.recordset_id == rs_table.c.id))
+            query = self._apply_tenant_criteria(context, rs_table, query)
+            self.session.execute(query)
+
+        for i in range(0, len(zone_ids), BULK_DELETE_CHUNK_SIZE):
+            self._recount_zone_usages(
+                zone_ids[i:i + BULK_DELETE_CHUNK_SIZE])
+
+        return count
 
     def count_records(self, context, criterion=None):
         # Ensure that we return only active records
@@ -1797,6 +2220,12 @@ class SQLAlchemyStorage(sqlalchemy_base.SQLAlchemy, storage_base.Storage):
     # Reverse Name utils
     def _rname_check(self, criterion):
         # If the criterion has 'name' in it, switch it out for reverse_name
-        if criterion is not None and criterion.get('name', "").startswith('*'):
+        name = criterion.get('name') if criterion is not None else None
+        if not isinstance(name, six.string_types):
+            return criterion
+        # A leading wildcard can not use the index on name, e.g.
+        # '%.example.org.' is matched as a '.gro.elpmaxe.%' prefix instead
+        if name.startswith('*') or (name.startswith('%') and
+                                    not name.endswith('%')):
             criterion['reverse_name'] = criterion.pop('name')[::-1]
         return criterion
@@ -0,0 +1,57 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""Add the zone_journal table used to answer IXFR requests"""
+
+from sqlalchemy import Integer, String, DateTime, Enum, Text
+from sqlalchemy.schema import (Table, Column, MetaData, Index,
+                               ForeignKeyConstraint)
+
+from designate import utils
+from designate.sqlalchemy.types import UUID
+
+meta = MetaData()
+
+ZONE_JOURNAL_OPERATIONS = ['SOA', 'DEL', 'ADD']
+
+
+def upgrade(migrate_engine):
+    meta.bind = migrate_engine
+
+    # Load the zones table so the foreign key can be resolved
+    Table('zones', meta, autoload=True)
+
+    operations_enum = Enum(name='zone_journal_operations', metadata=meta,
+                           *ZONE_JOURNAL_OPERATIONS)
+    operations_enum.create(checkfirst=True)
+
+    zone_journal_table = Table('zone_journal', meta,
+        Column('id', UUID(), default=utils.generate_uuid, primary_key=True),
+        Column('created_at', DateTime),
+
+        Column('zone_id', UUID(), nullable=False),
+        Column('old_serial', Integer, nullable=True),
+        Column('serial', Integer, nullable=False),
+        Column('operation', operations_enum, nullable=False),
+        Column('name', String(255), nullable=True),
+        Column('type', String(10), nullable=True),
+        Column('ttl', Integer, nullable=True),
+        Column('data', Text, nullable=True),
+
+        ForeignKeyConstraint(['zone_id'], ['zones.id'], ondelete='CASCADE'),
+
+        mysql_engine='InnoDB',
+        mysql_charset='utf8',
+    )
+    zone_journal_table.create(checkfirst=True)
+
+    Index('zone_journal_zone_serial', zone_journal_table.c.zone_id,
+          zone_journal_table.c.serial).create(migrate_engine)
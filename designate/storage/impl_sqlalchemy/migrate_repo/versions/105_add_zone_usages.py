@@ -0,0 +1,54 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""Add the zone_usages table holding the recordset and record counts the
+quotas are checked against"""
+
+from sqlalchemy import Integer, false, func, select
+from sqlalchemy.schema import (Table, Column, MetaData,
+                               ForeignKeyConstraint)
+
+from designate.sqlalchemy.types import UUID
+
+meta = MetaData()
+
+
+def upgrade(migrate_engine):
+    meta.bind = migrate_engine
+
+    zones_table = Table('zones', meta, autoload=True)
+    recordsets_table = Table('recordsets', meta, autoload=True)
+    records_table = Table('records', meta, autoload=True)
+
+    zone_usages_table = Table('zone_usages', meta,
+        Column('zone_id', UUID(), primary_key=True),
+        Column('recordsets', Integer, nullable=False, default=0),
+        Column('records', Integer, nullable=False, default=0),
+
+        ForeignKeyConstraint(['zone_id'], ['zones.id'], ondelete='CASCADE'),
+
+        mysql_engine='InnoDB',
+        mysql_charset='utf8',
+    )
+    zone_usages_table.create(checkfirst=True)
+
+    # Count the usage of the existing zones
+    recordsets = select([func.count(recordsets_table.c.id)]).\
+        where(recordsets_table.c.zone_id == zones_table.c.id).\
+        as_scalar()
+    records = select([func.count(records_table.c.id)]).\
+        where(records_table.c.zone_id == zones_table.c.id).\
+        where(records_table.c.managed == false()).\
+        as_scalar()
+
+    migrate_engine.execute(zone_usages_table.insert().from_select(
+        ['zone_id', 'recordsets', 'records'],
+        select([zones_table.c.id, recordsets, records])))
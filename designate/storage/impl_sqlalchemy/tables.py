@@ -40,6 +40,7 @@ ACTIONS = ['CREATE', 'DELETE', 'UPDATE', 'NONE']
 
 ZONE_TYPES = ('PRIMARY', 'SECONDARY',)
 ZONE_TASK_TYPES = ['IMPORT', 'EXPORT']
+ZONE_JOURNAL_OPERATIONS = ['SOA', 'DEL', 'ADD']
 
 SERVICE_STATES = [
     "UP", "DOWN", "WARNING"
@@ -477,3 +478,32 @@ zone_tasks = Table('zone_tasks', metadata,
 
     mysql_engine='InnoDB',
     mysql_charset='utf8')
+
+zone_journal = Table('zone_journal', metadata,
+    Column('id', UUID, default=utils.generate_uuid, primary_key=True),
+    Column('created_at', DateTime, default=lambda: timeutils.utcnow()),
+
+    Column('zone_id', UUID, nullable=False),
+    Column('old_serial', Integer, nullable=True),
+    Column('serial', Integer, nullable=False),
+    Column('operation', Enum(name='zone_journal_operations',
+                             *ZONE_JOURNAL_OPERATIONS), nullable=False),
+    Column('name', String(255), nullable=True),
+    Column('type', String(10), nullable=True),
+    Column('ttl', Integer, nullable=True),
+    Column('data', Text, nullable=True),
+
+    ForeignKeyConstraint(['zone_id'], ['zones.id'], ondelete='CASCADE'),
+
+    mysql_engine='InnoDB',
+    mysql_charset='utf8')
+
+zone_usages = Table('zone_usages', metadata,
+    Column('zone_id', UUID, primary_key=True),
+    Column('recordsets', Integer, nullable=False, default=0),
+    Column('records', Integer, nullable=False, default=0),
+
+    ForeignKeyConstraint(['zone_id'], ['zones.id'], ondelete='CASCADE'),
+
+    mysql_engine='InnoDB',
+    mysql_charset='utf8')
@@ -273,6 +273,19 @@ class ApiV2ZonesTest(ApiV2TestCase):
 
         self._assert_invalid_paging(data, '/zones', key='zones')
 
+    def test_get_zones_next_link(self):
+        data = [self.create_zone(name='x-%s.com.' % i)
+                for i in 'abcde']
+
+        url = '/zones?limit=2&sort_key=name'
+        zones = []
+        while url:
+            response = self.client.get(url)
+            zones.extend(response.json['zones'])
+            url = response.json['links'].get('next')
+
+        self.assertEqual([z.id for z in data], [z['id'] for z in zones])
+
     @patch.object(central_service.Service, 'find_zones',
                   side_effect=messaging.MessagingTimeout())
     def test_get_zones_timeout(self, _):
@@ -32,6 +32,7 @@ from oslo_messaging.rpc import dispatcher as rpc_dispatcher
 
 from designate import exceptions
 from designate import objects
+from designate.central import rpcapi as central_rpcapi
 from designate.mdns import rpcapi as mdns_api
 from designate.tests import fixtures
 from designate.tests.test_central import CentralTestCase
@@ -85,6 +86,66 @@ class CentralServiceTest(CentralTestCase):
             with testtools.ExpectedException(exceptions.InvalidZoneName):
                 self.central_service._is_valid_zone_name(context, 'biz.')
 
+    def test_is_valid_zone_name_tlds_cached(self):
+        self.config(tld_cache_ttl=60, group='service:central')
+        context = self.get_context()
+
+        patcher = mock.patch.object(central_rpcapi.CentralAPI, 'get_instance')
+        get_instance = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.create_tld(name='org')
+
+        with mock.patch.object(self.central_service.storage, 'find_tlds',
+                               wraps=self.central_service.storage.
+                               find_tlds) as find_tlds:
+            self.central_service._is_valid_zone_name(context, 'example.org.')
+
+            with testtools.ExpectedException(exceptions.InvalidZoneName):
+                self.central_service._is_valid_zone_name(
+                    context, 'example.net.')
+            self.assertEqual(1, find_tlds.call_count)
+
+            # Changing the TLDs drops the cached index
+            get_instance.reset_mock()
+            tld = self.create_tld(name='net')
+            get_instance.return_value.invalidate_tlds.\
+                assert_called_once_with(mock.ANY)
+
+            self.central_service._is_valid_zone_name(context, 'example.net.')
+            self.assertEqual(2, find_tlds.call_count)
+
+            with testtools.ExpectedException(exceptions.InvalidZoneName):
+                self.central_service._is_valid_zone_name(context, 'net.')
+
+            self.central_service.delete_tld(self.admin_context, tld.id)
+
+            with testtools.ExpectedException(exceptions.InvalidZoneName):
+                self.central_service._is_valid_zone_name(
+                    context, 'example.net.')
+            self.assertEqual(3, find_tlds.call_count)
+
+    def test_invalidate_tlds(self):
+        self.config(tld_cache_ttl=60, group='service:central')
+        context = self.get_context()
+
+        patcher = mock.patch.object(central_rpcapi.CentralAPI, 'get_instance')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.create_tld(name='org')
+        self.central_service._is_valid_zone_name(context, 'example.org.')
+
+        # e.g. a TLD created through another central instance
+        self.storage.create_tld(self.admin_context, objects.Tld(name='net'))
+
+        with testtools.ExpectedException(exceptions.InvalidZoneName):
+            self.central_service._is_valid_zone_name(context, 'example.net.')
+
+        self.central_service.invalidate_tlds(self.admin_context)
+
+        self.central_service._is_valid_zone_name(context, 'example.net.')
+
     def test_is_valid_recordset_name(self):
         self.config(max_recordset_name_len=18,
                     group='service:central')
@@ -171,6 +232,127 @@ class CentralServiceTest(CentralTestCase):
                 context, evil_zone_name)
             self.assertTrue(result)
 
+    def test_create_blacklist_unsafe_pattern(self):
+        exc = self.assertRaises(rpc_dispatcher.ExpectedException,
+                                self.create_blacklist,
+                                pattern='(([a-z])+.)+[A-Z]([a-z])+$')
+
+        self.assertEqual(exceptions.InvalidBlacklistPattern, exc.exc_info[0])
+
+    def test_update_blacklist_unsafe_pattern(self):
+        blacklist = self.create_blacklist()
+        blacklist.pattern = '^(a+)+\\.example\\.$'
+
+        exc = self.assertRaises(rpc_dispatcher.ExpectedException,
+                                self.central_service.update_blacklist,
+                                self.admin_context, blacklist)
+
+        self.assertEqual(exceptions.InvalidBlacklistPattern, exc.exc_info[0])
+
+    def test_is_blacklisted_zone_name_cached(self):
+        self.config(blacklist_cache_ttl=60, group='service:central')
+        context = self.get_context()
+
+        patcher = mock.patch.object(central_rpcapi.CentralAPI, 'get_instance')
+        get_instance = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.create_blacklist(pattern='^.*\\.example\\.org\\.$')
+
+        with mock.patch.object(self.central_service.storage,
+                               'find_blacklists',
+                               wraps=self.central_service.storage.
+                               find_blacklists) as find_blacklists:
+            self.assertTrue(self.central_service._is_blacklisted_zone_name(
+                context, 'www.example.org.'))
+            self.assertFalse(self.central_service._is_blacklisted_zone_name(
+                context, 'www.example.net.'))
+            self.assertEqual(1, find_blacklists.call_count)
+
+            # Changing the blacklists drops the cached matcher
+            get_instance.reset_mock()
+            blacklist = self.create_blacklist(
+                pattern='^.*\\.example\\.net\\.$')
+            get_instance.return_value.invalidate_blacklists.\
+                assert_called_once_with(mock.ANY)
+
+            self.assertTrue(self.central_service._is_blacklisted_zone_name(
+                context, 'www.example.net.'))
+            self.assertEqual(2, find_blacklists.call_count)
+
+            self.central_service.delete_blacklist(
+                self.admin_context, blacklist.id)
+
+            self.assertFalse(self.central_service._is_blacklisted_zone_name(
+                context, 'www.example.net.'))
+            self.assertEqual(3, find_blacklists.call_count)
+
+    def test_blacklist_changes_invalidate_after_commit(self):
+        self.config(blacklist_cache_ttl=60, group='service:central')
+        storage = self.central_service.storage
+
+        calls = mock.Mock()
+        calls.attach_mock(mock.Mock(wraps=storage.commit), 'commit')
+        calls.attach_mock(mock.Mock(), 'invalidate')
+
+        with mock.patch.object(storage, 'commit', calls.commit), \
+                mock.patch.object(self.central_service,
+                                  '_invalidate_blacklist_matcher',
+                                  calls.invalidate):
+            blacklist = self.create_blacklist()
+            blacklist.description = 'updated'
+            self.central_service.update_blacklist(
+                self.admin_context, blacklist)
+            self.central_service.delete_blacklist(
+                self.admin_context, blacklist.id)
+
+        self.assertEqual(
+            ['commit', 'invalidate'] * 3,
+            [name for name, _, _ in calls.mock_calls]
+        )
+
+    def test_tld_changes_invalidate_after_commit(self):
+        self.config(tld_cache_ttl=60, group='service:central')
+        storage = self.central_service.storage
+
+        calls = mock.Mock()
+        calls.attach_mock(mock.Mock(wraps=storage.commit), 'commit')
+        calls.attach_mock(mock.Mock(), 'invalidate')
+
+        with mock.patch.object(storage, 'commit', calls.commit), \
+                mock.patch.object(self.central_service,
+                                  '_invalidate_tld_index',
+                                  calls.invalidate):
+            tld = self.create_tld(fixture=0)
+            tld.description = 'updated'
+            self.central_service.update_tld(self.admin_context, tld)
+            self.central_service.delete_tld(self.admin_context, tld.id)
+
+        self.assertEqual(
+            ['commit', 'invalidate'] * 3,
+            [name for name, _, _ in calls.mock_calls]
+        )
+
+    def test_invalidate_blacklists(self):
+        self.config(blacklist_cache_ttl=60, group='service:central')
+        context = self.get_context()
+
+        self.assertFalse(self.central_service._is_blacklisted_zone_name(
+            context, 'www.example.org.'))
+
+        # e.g. a blacklist created through another central instance
+        self.storage.create_blacklist(
+            self.admin_context,
+            objects.Blacklist(pattern='^.*\\.example\\.org\\.$'))
+
+        self.assertFalse(self.central_service._is_blacklisted_zone_name(
+            context, 'www.example.org.'))
+
+        self.central_service.invalidate_blacklists(self.admin_context)
+
+        self.assertTrue(self.central_service._is_blacklisted_zone_name(
+            context, 'www.example.org.'))
+
     def test_is_subzone(self):
         context = self.get_context()
 
@@ -193,6 +375,20 @@ class CentralServiceTest(CentralTestCase):
             context, 'www.example.org.', zone.pool_id)
         self.assertTrue(result)
 
+    def test_is_subzone_closest_parent(self):
+        context = self.get_context()
+
+        zone = self.create_zone(name='example.org.')
+        sub_zone = self.create_zone(name='sub.example.org.')
+
+        result = self.central_service._is_subzone(
+            context, 'www.sub.example.org.', zone.pool_id)
+        self.assertEqual(sub_zone.id, result.id)
+
+        result = self.central_service._is_subzone(
+            context, 'a.b.www.example.org.', zone.pool_id)
+        self.assertEqual(zone.id, result.id)
+
     def test_is_superzone(self):
         context = self.get_context()
 
@@ -412,6 +608,22 @@ class CentralServiceTest(CentralTestCase):
 
         self.assertEqual(exceptions.TsigKeyNotFound, exc.exc_info[0])
 
+    def test_tsigkey_changes_invalidate_mdns_cache(self):
+        mdns = mock.Mock()
+        with mock.patch.object(mdns_api.MdnsAPI, 'get_instance') as get_mdns:
+            get_mdns.return_value = mdns
+
+            tsigkey = self.create_tsigkey(name='test-key')
+            self.assertEqual(1, mdns.invalidate_tsigkeys.call_count)
+
+            tsigkey.name = 'test-key-updated'
+            self.central_service.update_tsigkey(self.admin_context, tsigkey)
+            self.assertEqual(2, mdns.invalidate_tsigkeys.call_count)
+
+            self.central_service.delete_tsigkey(
+                self.admin_context, tsigkey.id)
+            self.assertEqual(3, mdns.invalidate_tsigkeys.call_count)
+
     # Tenant Tests
     def test_count_tenants(self):
         admin_context = self.get_admin_context()
@@ -523,6 +735,52 @@ class CentralServiceTest(CentralTestCase):
 
         self.assertEqual(exceptions.OverQuota, exc.exc_info[0])
 
+    def test_get_quotas_cached(self):
+        self.config(quota_zones=10, quota_cache_ttl=60)
+        context = self.get_admin_context()
+        context.all_tenants = True
+
+        patcher = mock.patch.object(central_rpcapi.CentralAPI, 'get_instance')
+        get_instance = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        quotas = self.central_service.get_quotas(context, 'tenant_id')
+        self.assertEqual(10, quotas['zones'])
+
+        # e.g. a quota set through another central instance
+        self.storage.create_quota(context, objects.Quota(
+            tenant_id='tenant_id', resource='zones', hard_limit=5))
+
+        quotas = self.central_service.get_quotas(context, 'tenant_id')
+        self.assertEqual(10, quotas['zones'])
+
+        self.central_service.set_quota(context, 'tenant_id', 'zones', 1)
+
+        quotas = self.central_service.get_quotas(context, 'tenant_id')
+        self.assertEqual(1, quotas['zones'])
+        get_instance.return_value.invalidate_quotas.assert_called_once_with(
+            context, 'tenant_id')
+
+        self.central_service.reset_quotas(context, 'tenant_id')
+
+        quotas = self.central_service.get_quotas(context, 'tenant_id')
+        self.assertEqual(10, quotas['zones'])
+
+    def test_invalidate_quotas(self):
+        self.config(quota_zones=10, quota_cache_ttl=60)
+        context = self.get_admin_context()
+        context.all_tenants = True
+
+        self.central_service.get_quotas(context, 'tenant_id')
+
+        self.storage.create_quota(context, objects.Quota(
+            tenant_id='tenant_id', resource='zones', hard_limit=5))
+
+        self.central_service.invalidate_quotas(context)
+
+        quotas = self.central_service.get_quotas(context, 'tenant_id')
+        self.assertEqual(5, quotas['zones'])
+
     def test_create_subzone(self):
         # Create the Parent Zone using fixture 0
         parent_zone = self.create_zone(fixture=0)
@@ -1458,6 +1716,23 @@ class CentralServiceTest(CentralTestCase):
 
         self.assertEqual(exceptions.OverQuota, exc.exc_info[0])
 
+    def test_create_recordset_over_quota_usage_counters(self):
+        self.config(quota_zone_recordsets=3, quota_usage_counters=True)
+
+        zone = self.create_zone()
+
+        with mock.patch.object(self.central_service.storage,
+                               'count_recordsets') as count_recordsets:
+            self.create_recordset(zone)
+
+            exc = self.assertRaises(rpc_dispatcher.ExpectedException,
+                                    self.create_recordset,
+                                    zone)
+
+            self.assertFalse(count_recordsets.called)
+
+        self.assertEqual(exceptions.OverQuota, exc.exc_info[0])
+
     def test_create_invalid_recordset_location_cname_at_apex(self):
         zone = self.create_zone()
 
@@ -1686,6 +1961,37 @@ class CentralServiceTest(CentralTestCase):
         self.assertEqual(1800, recordset.ttl)
         self.assertThat(new_serial, GreaterThan(original_serial))
 
+    def test_update_recordset_zone_journal(self):
+        self.config(zone_journal_size=10, group='service:central')
+
+        zone = self.create_zone()
+        original_serial = zone.serial
+
+        recordset = self.create_recordset(
+            zone, records=[{'data': '192.0.2.1'}])
+
+        recordset.records[0].data = '192.0.2.2'
+        self.central_service.update_recordset(self.admin_context, recordset)
+
+        zone = self.central_service.get_zone(self.admin_context, zone.id)
+
+        journal = self.storage.find_zone_journal(
+            self.admin_context, zone.id, original_serial)
+
+        markers = [(row[0], row[1]) for row in journal if row[2] == 'SOA']
+        self.assertEqual(2, len(markers))
+        self.assertEqual(original_serial, markers[0][0])
+        self.assertEqual(markers[0][1], markers[1][0])
+        self.assertEqual(zone.serial, markers[1][1])
+
+        changes = [(row[1], row[2], row[6]) for row in journal
+                   if row[2] != 'SOA']
+        self.assertEqual([
+            (markers[0][1], 'ADD', '192.0.2.1'),
+            (zone.serial, 'DEL', '192.0.2.1'),
+            (zone.serial, 'ADD', '192.0.2.2'),
+        ], changes)
+
     def test_update_recordset_deadlock_retry(self):
         # Create a zone
         zone = self.create_zone()
@@ -2022,6 +2328,27 @@ class CentralServiceTest(CentralTestCase):
 
         self.assertEqual(exceptions.OverQuota, exc.exc_info[0])
 
+    def test_create_record_over_zone_quota_usage_counters(self):
+        self.config(quota_zone_records=1, quota_usage_counters=True)
+
+        zone = self.create_zone()
+        recordset = self.create_recordset(zone)
+
+        self.create_record(zone, recordset)
+
+        # The records of the deleted recordset no longer count
+        self.central_service.delete_recordset(
+            self.admin_context, zone.id, recordset.id)
+        recordset = self.create_recordset(zone)
+
+        self.create_record(zone, recordset)
+
+        exc = self.assertRaises(rpc_dispatcher.ExpectedException,
+                                self.create_record,
+                                zone, recordset, fixture=1)
+
+        self.assertEqual(exceptions.OverQuota, exc.exc_info[0])
+
     def test_create_record_over_recordset_quota(self):
         self.config(quota_recordset_records=1)
 
@@ -2727,6 +3054,14 @@ class CentralServiceTest(CentralTestCase):
         self.central_service.get_floatingip(
             context, fip['region'], fip['id'])
 
+    def test_invalidate_floatingip_cache(self):
+        with mock.patch.object(self.central_service.network_api,
+                               'invalidate_floatingip_cache') as invalidate:
+            self.central_service.invalidate_floatingip_cache(
+                self.admin_context, 'a')
+
+        invalidate.assert_called_once_with('a')
+
     # Blacklist Tests
     def test_create_blacklist(self):
         values = self.get_blacklist_fixture(fixture=0)
@@ -3134,6 +3469,38 @@ class CentralServiceTest(CentralTestCase):
 
         self.assertEqual(exceptions.ZoneNotFound, exc.exc_info[0])
 
+    def test_zone_changes_invalidate_mdns_record_cache(self):
+        zone = self.create_zone()
+
+        mdns = mock.Mock()
+        with mock.patch.object(mdns_api.MdnsAPI, 'get_instance') as get_mdns:
+            get_mdns.return_value = mdns
+
+            zone.email = 'info@example.net'
+            zone = self.central_service.update_zone(self.admin_context, zone)
+            mdns.invalidate_zone.assert_called_once_with(
+                mock.ANY, zone.id, zone.serial)
+
+            self.central_service.delete_zone(self.admin_context, zone.id)
+            zone = self.central_service.get_zone(self.admin_context, zone.id)
+            self.central_service.update_status(
+                self.admin_context, zone.id, 'SUCCESS', zone.serial)
+            mdns.invalidate_zone.assert_called_with(mock.ANY, zone.id)
+
+    def test_zone_sync_invalidates_mdns_record_cache(self):
+        zone = self.create_zone()
+
+        mdns = mock.Mock()
+        with mock.patch.object(mdns_api.MdnsAPI, 'get_instance') as get_mdns:
+            get_mdns.return_value = mdns
+
+            zone.email = 'info@example.net'
+            zone = self.central_service.update_zone(
+                self.admin_context, zone, increment_serial=False)
+
+            mdns.invalidate_zone.assert_called_once_with(
+                mock.ANY, zone.id, zone.serial)
+
     def test_update_status_delete_last_record(self):
         zone = self.create_zone()
         recordset = self.create_recordset(zone)
@@ -3547,6 +3914,93 @@ class CentralServiceTest(CentralTestCase):
 
         self.wait_for_import(zone_import.id)
 
+    def test_create_zone_with_recordsets(self):
+        values = self.get_zone_fixture(values={
+            'tenant_id': self.admin_context.project_id})
+        zone = objects.Zone.from_dict(values)
+        zone.recordsets = objects.RecordSetList(objects=[
+            objects.RecordSet(
+                name='www.%s' % zone.name, type='A',
+                records=objects.RecordList(objects=[
+                    objects.Record(data='192.0.2.1'),
+                    objects.Record(data='192.0.2.2'),
+                ])),
+            objects.RecordSet(
+                name='ftp.%s' % zone.name, type='CNAME',
+                records=objects.RecordList(objects=[
+                    objects.Record(data='www.%s' % zone.name),
+                ])),
+        ])
+
+        zone = self.central_service.create_zone(self.admin_context, zone)
+
+        recordset = self.central_service.find_recordset(
+            self.admin_context,
+            {'zone_id': zone.id, 'name': 'www.%s' % zone.name})
+        self.assertEqual(['192.0.2.1', '192.0.2.2'],
+                         sorted(r.data for r in recordset.records))
+        for record in recordset.records:
+            self.assertEqual('PENDING', record.status)
+            self.assertEqual('CREATE', record.action)
+            self.assertEqual(zone.serial, record.serial)
+
+        # SOA, NS and the two new recordsets
+        self.assertEqual(4, self.central_service.count_recordsets(
+            self.admin_context, {'zone_id': zone.id}))
+
+    def test_create_zone_with_recordsets_over_quota_usage_counters(self):
+        # SOA, NS and the two new recordsets
+        self.config(quota_zone_recordsets=3, quota_usage_counters=True)
+
+        values = self.get_zone_fixture(values={
+            'tenant_id': self.admin_context.project_id})
+        zone = objects.Zone.from_dict(values)
+        zone.recordsets = objects.RecordSetList(objects=[
+            objects.RecordSet(
+                name='www.%s' % zone.name, type='A',
+                records=objects.RecordList(objects=[
+                    objects.Record(data='192.0.2.1'),
+                ])),
+            objects.RecordSet(
+                name='ftp.%s' % zone.name, type='A',
+                records=objects.RecordList(objects=[
+                    objects.Record(data='192.0.2.2'),
+                ])),
+        ])
+
+        with mock.patch.object(self.central_service.storage,
+                               'count_recordsets') as count_recordsets:
+            exc = self.assertRaises(
+                rpc_dispatcher.ExpectedException,
+                self.central_service.create_zone, self.admin_context, zone)
+
+            self.assertFalse(count_recordsets.called)
+
+        self.assertEqual(exceptions.OverQuota, exc.exc_info[0])
+
+    def test_create_zone_with_recordsets_cname_conflict(self):
+        values = self.get_zone_fixture(values={
+            'tenant_id': self.admin_context.project_id})
+        zone = objects.Zone.from_dict(values)
+        zone.recordsets = objects.RecordSetList(objects=[
+            objects.RecordSet(
+                name='www.%s' % zone.name, type='A',
+                records=objects.RecordList(objects=[
+                    objects.Record(data='192.0.2.1'),
+                ])),
+            objects.RecordSet(
+                name='www.%s' % zone.name, type='CNAME',
+                records=objects.RecordList(objects=[
+                    objects.Record(data='ftp.%s' % zone.name),
+                ])),
+        ])
+
+        exc = self.assertRaises(
+            rpc_dispatcher.ExpectedException,
+            self.central_service.create_zone, self.admin_context, zone)
+
+        self.assertEqual(exceptions.InvalidRecordSetLocation, exc.exc_info[0])
+
     def test_find_zone_imports(self):
         context = self.get_context()
 
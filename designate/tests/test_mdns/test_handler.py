@@ -27,6 +27,7 @@ from oslo_config import cfg
 from designate import context
 from designate import objects
 from designate.tests.test_mdns import MdnsTestCase
+from designate.mdns import cache
 from designate.mdns import handler
 
 CONF = cfg.CONF
@@ -1056,3 +1057,61 @@ class MdnsRequestHandlerTest(MdnsTestCase):
 
         response = next(self.handler(request)).to_wire()
         self.assertEqual(expected_response, binascii.b2a_hex(response))
+
+    def test_dispatch_opcode_query_from_record_cache(self):
+        record_cache = cache.RecordCache(60, 100)
+        self.handler = handler.RequestHandler(
+            self.storage, self.mock_tg, record_cache=record_cache)
+
+        zone = self.create_zone(name='example.com.')
+        recordset = self.create_recordset(
+            zone, name='example.com.', type='A')
+        self.create_record(zone, recordset, data='192.0.2.5')
+
+        # DNS packet with QUERY opcode for A example.com.
+        payload = ("c28901200001000000000001076578616d706c6503636f6d0000010001"
+                   "0000291000000000000000")
+        expected_response = (b"c28985000001000100000001076578616d706c6503636f"
+                             b"6d0000010001c00c0001000100000e100004c000020500"
+                             b"00292000000000000000")
+
+        request = dns.message.from_wire(binascii.a2b_hex(payload))
+        request.environ = {'addr': self.addr, 'context': self.context}
+        response = next(self.handler(request)).to_wire()
+        self.assertEqual(expected_response, binascii.b2a_hex(response))
+
+        # The second query is answered without any storage lookup
+        with mock.patch.object(self.storage, 'find_recordset') as find:
+            response = next(self.handler(request)).to_wire()
+        self.assertFalse(find.called)
+        self.assertEqual(expected_response, binascii.b2a_hex(response))
+
+        # The cached answer is not given to another pool's TSIG key
+        request.environ['tsigkey'] = self.tsigkey_pool_unknown
+        response = next(self.handler(request))
+        self.assertEqual(dns.rcode.REFUSED, response.rcode())
+
+    def test_dispatch_opcode_query_record_cache_invalidated(self):
+        record_cache = cache.RecordCache(60, 100)
+        self.handler = handler.RequestHandler(
+            self.storage, self.mock_tg, record_cache=record_cache)
+
+        zone = self.create_zone(name='example.com.')
+        recordset = self.create_recordset(
+            zone, name='example.com.', type='A')
+        self.create_record(zone, recordset, data='192.0.2.5')
+
+        request = dns.message.make_query('example.com.', dns.rdatatype.A)
+        request.environ = {'addr': self.addr, 'context': self.context}
+        response = next(self.handler(request))
+        self.assertEqual('192.0.2.5', response.answer[0][0].to_text())
+
+        recordset = self.central_service.get_recordset(
+            self.admin_context, zone.id, recordset.id)
+        recordset.records[0].data = '192.0.2.6'
+        self.central_service.update_recordset(self.admin_context, recordset)
+        zone = self.central_service.get_zone(self.admin_context, zone.id)
+        record_cache.invalidate(zone.id, zone.serial)
+
+        response = next(self.handler(request))
+        self.assertEqual('192.0.2.6', response.answer[0][0].to_text())
@@ -22,8 +22,11 @@ from unittest import mock
 
 import dns
 import dns.message
+import eventlet
+import eventlet.event
 from oslo_log import log as logging
 
+from designate import service
 from designate.tests.test_mdns import MdnsTestCase
 
 LOG = logging.getLogger(__name__)
@@ -176,3 +179,179 @@ class MdnsServiceTest(MdnsTestCase):
         self.assertEqual(11, mock_socket.recv.call_count)
         self.assertEqual(4, mock_socket.sendall.call_count)
         self.assertEqual(1, mock_socket.close.call_count)
+
+
+class MdnsServicePooledTest(MdnsServiceTest):
+    def setUp(self):
+        self.config(dns_pool_size=10, group='service:mdns')
+        super(MdnsServicePooledTest, self).setUp()
+
+    @staticmethod
+    def _recv_into(*chunks):
+        """Mimic socket.recv_into, returning the given chunks in turn"""
+        chunks = list(chunks)
+
+        def recv_into(buf, nbytes=0):
+            chunk = chunks.pop(0)
+            if not isinstance(chunk, bytes):
+                raise chunk
+            buf[:len(chunk)] = chunk
+            return len(chunk)
+        return recv_into
+
+    def test_pool(self):
+        self.assertIsNotNone(self.dns_service.pool)
+        self.assertEqual(10, self.dns_service.pool.size)
+
+    def test__dns_handle_tcp_conn_pooled_one_query(self):
+        payload = self.query_payload
+        mock_socket = mock.Mock()
+        pay_len = struct.pack("!H", len(payload))
+        mock_socket.recv_into.side_effect = self._recv_into(
+            pay_len, payload, socket.timeout)
+
+        self.dns_service._dns_handle_tcp_conn_pooled(('1.2.3.4', 42),
+                                                     mock_socket)
+
+        self.assertEqual(3, mock_socket.recv_into.call_count)
+        self.assertEqual(1, mock_socket.sendall.call_count)
+        self.assertEqual(1, mock_socket.close.call_count)
+        wire = mock_socket.sendall.call_args[0][0]
+        (expected_length,) = struct.unpack('!H', wire[:2])
+        self.assertEqual(len(wire), expected_length + 2)
+        self.assertEqual(self.expected_response, wire[2:])
+
+    def test__dns_handle_tcp_conn_pooled_multiple_queries(self):
+        payload = self.query_payload
+        mock_socket = mock.Mock()
+        pay_len = struct.pack("!H", len(payload))
+        # Pipeline 5 queries, one of them split over two reads, then close
+        # the connection
+        mock_socket.recv_into.side_effect = self._recv_into(
+            pay_len, payload,
+            pay_len, payload,
+            pay_len, payload[:5], payload[5:],
+            pay_len, payload,
+            pay_len, payload,
+            b'',
+        )
+
+        self.dns_service._dns_handle_tcp_conn_pooled(('1.2.3.4', 42),
+                                                     mock_socket)
+
+        self.assertEqual(12, mock_socket.recv_into.call_count)
+        self.assertEqual(5, mock_socket.sendall.call_count)
+        self.assertEqual(1, mock_socket.close.call_count)
+        for call in mock_socket.sendall.call_args_list:
+            self.assertEqual(self.expected_response, call[0][0][2:])
+
+    def test__dns_handle_tcp_conn_pooled_socket_error(self):
+        payload = self.query_payload
+        mock_socket = mock.Mock()
+        pay_len = struct.pack("!H", len(payload))
+        mock_socket.recv_into.side_effect = self._recv_into(
+            pay_len, payload,
+            pay_len, payload,
+            socket.error(errno.EAGAIN),
+        )
+
+        self.dns_service._dns_handle_tcp_conn_pooled(('1.2.3.4', 42),
+                                                     mock_socket)
+
+        # The queries read before the error are still answered
+        self.assertEqual(2, mock_socket.sendall.call_count)
+        self.assertEqual(1, mock_socket.close.call_count)
+
+    def test__dns_handle_tcp_query_multiple_messages(self):
+        mock_socket = mock.Mock()
+        self.dns_service.app = mock.Mock(
+            return_value=iter([b'first', None, b'second']))
+
+        self.dns_service._dns_handle_tcp_query(
+            ('1.2.3.4', 42), mock_socket, mock.MagicMock(), b'query')
+
+        self.assertEqual(
+            [mock.call(b'\x00\x05first'), mock.call(b'\x00\x06second')],
+            mock_socket.sendall.call_args_list)
+
+    def test_dns_get_qtype(self):
+        axfr = dns.message.make_query('example.com.', dns.rdatatype.AXFR)
+        query = dns.message.make_query('example.com.', dns.rdatatype.SOA)
+
+        self.assertEqual(dns.rdatatype.AXFR,
+                         self.dns_service._dns_get_qtype(axfr.to_wire()))
+        self.assertEqual(dns.rdatatype.SOA,
+                         self.dns_service._dns_get_qtype(query.to_wire()))
+        self.assertIsNone(self.dns_service._dns_get_qtype(b'\x00' * 13))
+
+    def test_dns_get_pool_shared(self):
+        axfr = dns.message.make_query('example.com.', dns.rdatatype.AXFR)
+
+        self.assertIs(self.dns_service.pool,
+                      self.dns_service._dns_get_pool(axfr.to_wire()))
+
+    def test_dns_get_pool_xfr(self):
+        self.config(xfr_pool_size=2, group='service:mdns')
+        dns_service = self.start_service('mdns').dns_service
+
+        axfr = dns.message.make_query('example.com.', dns.rdatatype.AXFR)
+        ixfr = dns.message.make_query('example.com.', dns.rdatatype.IXFR)
+        query = dns.message.make_query('example.com.', dns.rdatatype.SOA)
+
+        self.assertEqual(2, dns_service.xfr_pool.size)
+        self.assertIs(dns_service.xfr_pool,
+                      dns_service._dns_get_pool(axfr.to_wire()))
+        self.assertIs(dns_service.xfr_pool,
+                      dns_service._dns_get_pool(ixfr.to_wire()))
+        self.assertIs(dns_service.pool,
+                      dns_service._dns_get_pool(query.to_wire()))
+
+    def test_dns_query_pool_queue_limit(self):
+        pool = service.DNSQueryPool('query', 1, queue_size=1)
+        done = eventlet.event.Event()
+
+        running = pool.spawn(done.wait)
+        queued = pool.spawn(lambda: 'queued')
+        # Let the queued thread start waiting for the pool
+        eventlet.sleep(0)
+
+        self.assertIsNone(pool.spawn(lambda: 'rejected'))
+
+        done.send()
+        running.wait()
+        self.assertEqual('queued', queued.wait())
+
+    def test_dns_query_pool_without_queue_blocks(self):
+        pool = service.DNSQueryPool('query', 1)
+        done = eventlet.event.Event()
+
+        running = pool.spawn(done.wait)
+        spawner = eventlet.spawn(pool.spawn, lambda: 'waited')
+        eventlet.sleep(0)
+
+        # The caller waits for the pool instead of a thread being spawned
+        self.assertFalse(spawner.dead)
+        self.assertEqual(1, pool.pool.running())
+
+        done.send()
+        running.wait()
+        self.assertEqual('waited', spawner.wait().wait())
+
+    def test__dns_handle_udp_pooled_rejected(self):
+        self.dns_service.pool = mock.Mock()
+        self.dns_service.pool.spawn.return_value = None
+        self.dns_service._running.set()
+
+        mock_socket = mock.Mock()
+
+        def recvfrom_into(buf):
+            self.dns_service._running.clear()
+            buf[:len(self.query_payload)] = self.query_payload
+            return len(self.query_payload), self.addr
+
+        mock_socket.recvfrom_into.side_effect = recvfrom_into
+
+        self.dns_service._dns_handle_udp_pooled(mock_socket)
+
+        response = dns.message.from_wire(mock_socket.sendto.call_args[0][0])
+        self.assertEqual(dns.rcode.SERVFAIL, response.rcode())
@@ -13,6 +13,8 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+from unittest import mock
+
 from oslo_log import log as logging
 
 from designate.tests import TestCase
@@ -132,3 +134,48 @@ class NeutronFloatingHandlerTest(TestCase, NotificationHandlerMixin):
                                                     criterion)
 
         self.assertEqual(2, len(records))
+
+    def test_floatingip_update_invalidates_floatingip_cache(self):
+        self.config(floatingip_cache_ttl=60, group='network_api:neutron')
+        event_type = 'floatingip.update.end'
+        fixture = self.get_notification_fixture(
+            'neutron', event_type + '_associate')
+
+        with mock.patch.object(self.plugin.central_api,
+                               'invalidate_floatingip_cache') as invalidate:
+            self.plugin.process_notification(
+                self.admin_context.to_dict(), event_type, fixture['payload'])
+
+        invalidate.assert_called_once_with(
+            mock.ANY, 'c97027dd880d4c129ae7a4ba7edade05')
+
+    def test_floatingip_delete_invalidates_floatingip_cache(self):
+        self.config(floatingip_cache_ttl=60, group='network_api:neutron')
+        event_type = 'floatingip.delete.start'
+        fixture = self.get_notification_fixture('neutron', event_type)
+
+        with mock.patch.object(self.plugin.central_api,
+                               'invalidate_floatingip_cache') as invalidate:
+            self.plugin.process_notification(
+                self.admin_context.to_dict(), event_type, fixture['payload'])
+
+        invalidate.assert_called_once_with(mock.ANY, None)
+
+    def test_floatingip_cache_disabled(self):
+        event_type = 'floatingip.delete.start'
+        fixture = self.get_notification_fixture('neutron', event_type)
+
+        self.assertNotIn('floatingip.create.end',
+                         self.plugin.get_event_types())
+
+        with mock.patch.object(self.plugin.central_api,
+                               'invalidate_floatingip_cache') as invalidate:
+            self.plugin.process_notification(
+                self.admin_context.to_dict(), event_type, fixture['payload'])
+
+        invalidate.assert_not_called()
+
+    def test_floatingip_cache_enabled_event_types(self):
+        self.config(floatingip_cache_ttl=60, group='network_api:neutron')
+
+        self.assertIn('floatingip.create.end', self.plugin.get_event_types())
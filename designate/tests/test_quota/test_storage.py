@@ -13,6 +13,8 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+from unittest import mock
+
 from oslo_log import log as logging
 
 from designate import quota
@@ -92,3 +94,35 @@ class StorageQuotaTest(tests.TestCase):
 
         quotas = self.quota.storage.find_quotas(context, criterion)
         self.assertEqual(0, len(quotas))
+
+    def test_get_quotas_cached(self):
+        self.config(quota_zones=10, quota_cache_ttl=60)
+        context = self.get_admin_context()
+        context.all_tenants = True
+
+        with mock.patch.object(self.quota.storage, 'find_quotas',
+                               return_value=[]) as find_quotas:
+            self.quota.limit_check(context, 'tenant_id', zones=0)
+            quotas = self.quota.get_quotas(context, 'tenant_id')
+
+            self.assertEqual(10, quotas['zones'])
+            self.assertEqual(1, find_quotas.call_count)
+
+            self.quota.invalidate_quotas('other_tenant_id')
+            self.quota.get_quotas(context, 'tenant_id')
+            self.assertEqual(1, find_quotas.call_count)
+
+            self.quota.invalidate_quotas('tenant_id')
+            self.quota.get_quotas(context, 'tenant_id')
+            self.assertEqual(2, find_quotas.call_count)
+
+    def test_get_quotas_not_cached(self):
+        context = self.get_admin_context()
+        context.all_tenants = True
+
+        self.quota.get_quotas(context, 'tenant_id')
+
+        self.quota.set_quota(context, 'tenant_id', 'zones', 1500)
+
+        quotas = self.quota.get_quotas(context, 'tenant_id')
+        self.assertEqual(1500, quotas['zones'])
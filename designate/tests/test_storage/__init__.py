@@ -23,6 +23,7 @@ from oslo_messaging.rpc import dispatcher as rpc_dispatcher
 
 from designate import exceptions
 from designate import objects
+from designate import utils
 from designate.utils import generate_uuid
 from designate.storage.base import Storage as StorageBase
 from designate.utils import DEFAULT_MDNS_PORT
@@ -162,6 +163,59 @@ class StorageTestCase(object):
             self.storage.find_pool_attributes(
                 self.admin_context, marker='4')
 
+    def test_paging_keyset_marker(self):
+        created = [self.create_zone(name='example-%d.org.' % i)
+                   for i in range(4)]
+
+        # The marker carries the values to page on, the item it was made
+        # from does not need to exist any more
+        marker = utils.encode_marker(
+            'name', created[1].name, 'ffffffff-ffff-ffff-ffff-ffffffffffff')
+
+        results = self.storage.find_zones(
+            self.admin_context, marker=marker, limit=5, sort_key='name')
+
+        self.assertEqual([z.id for z in created[2:]], [z.id for z in results])
+
+    def test_paging_keyset_marker_created_at(self):
+        created = [self.create_zone(name='example-%d.org.' % i)
+                   for i in range(4)]
+
+        marker = utils.encode_marker(
+            'created_at', created[1].created_at, created[1].id)
+
+        results = self.storage.find_zones(
+            self.admin_context, marker=marker, limit=5)
+
+        self.assertEqual([z.id for z in created[2:]], [z.id for z in results])
+
+    def test_paging_keyset_marker_invalid_value(self):
+        marker = utils.encode_marker(
+            'name', {'name': 'example.org.'},
+            'ffffffff-ffff-ffff-ffff-ffffffffffff')
+
+        with testtools.ExpectedException(exceptions.InvalidMarker):
+            self.storage.find_zones(
+                self.admin_context, marker=marker, limit=5, sort_key='name')
+
+    def test_paging_keyset_marker_sort_key_mismatch(self):
+        created = [self.create_zone(name='example-%d.org.' % i)
+                   for i in range(4)]
+
+        # A marker made for another sort key falls back to its item
+        marker = utils.encode_marker('created_at', None, created[1].id)
+
+        results = self.storage.find_zones(
+            self.admin_context, marker=marker, limit=5, sort_key='name')
+
+        self.assertEqual([z.id for z in created[2:]], [z.id for z in results])
+
+        marker = utils.encode_marker('created_at', None, generate_uuid())
+
+        with testtools.ExpectedException(exceptions.MarkerNotFound):
+            self.storage.find_zones(
+                self.admin_context, marker=marker, sort_key='name')
+
     def test_paging_limit_invalid(self):
         with testtools.ExpectedException(exceptions.ValueError):
             self.storage.find_pool_attributes(
@@ -659,6 +713,81 @@ class StorageTestCase(object):
         self.assertEqual(zone_two['email'], results[0]['email'])
         self.assertIn('status', zone_two)
 
+    def test_find_zones_leading_wildcard(self):
+        zone = self.create_zone(name='example.org.')
+        sub_zone = self.create_zone(name='sub.example.org.')
+        self.create_zone(name='subexample.org.')
+
+        results = self.storage.find_zones(
+            self.admin_context, {'name': '%.example.org.'})
+
+        self.assertEqual([sub_zone.id], [result.id for result in results])
+
+        results = self.storage.find_zones(
+            self.admin_context, {'name': '%example.org.'})
+
+        self.assertEqual(3, len(results))
+
+        results = self.storage.find_zones(
+            self.admin_context, {'name': [zone.name, sub_zone.name]})
+
+        self.assertEqual(2, len(results))
+
+    def test_find_zones_relations(self):
+        fixture = self.get_zone_fixture('SECONDARY', 0)
+        fixture['email'] = cfg.CONF['service:central'].managed_resource_email
+        fixture['masters'] = [{'host': '192.0.2.10', 'port': 53}]
+        secondary = self.create_zone(**fixture)
+
+        zone = self.create_zone(fixture=1)
+        self.storage.create_zone_attribute(
+            self.admin_context, zone.id,
+            objects.ZoneAttribute(key='service_tier', value='gold'))
+
+        with mock.patch.object(
+                self.storage, '_find_zone_attributes',
+                wraps=self.storage._find_zone_attributes) as find_attributes:
+            with mock.patch.object(
+                    self.storage, '_find_zone_masters',
+                    wraps=self.storage._find_zone_masters) as find_masters:
+                results = self.storage.find_zones(
+                    self.admin_context, sort_key='name', sort_dir='asc')
+
+        # One query per relation for all the zones
+        self.assertEqual(1, find_attributes.call_count)
+        self.assertEqual(1, find_masters.call_count)
+
+        self.assertEqual([secondary.id, zone.id], [r.id for r in results])
+        self.assertEqual([('192.0.2.10', 53)],
+                         [(m.host, m.port) for m in results[0].masters])
+        self.assertEqual(0, len(results[1].masters))
+        self.assertEqual([('service_tier', 'gold')],
+                         [(a.key, a.value) for a in results[1].attributes])
+        for result in results:
+            self.assertFalse(result.obj_what_changed())
+
+    def test_find_zones_total_count(self):
+        self.create_zone(fixture=0)
+        self.create_zone(fixture=1)
+
+        with mock.patch.object(self.storage, 'count_zones',
+                               wraps=self.storage.count_zones) as count:
+            # Every zone fits in the page, counting them is not needed
+            results = self.storage.find_zones(self.admin_context, limit=5)
+            self.assertEqual(2, results.total_count)
+            self.assertFalse(count.called)
+
+            results = self.storage.find_zones(self.admin_context, limit=1)
+            self.assertEqual(2, results.total_count)
+            self.assertTrue(count.called)
+
+            count.reset_mock()
+            context = self.get_admin_context()
+            context.hide_counts = True
+            results = self.storage.find_zones(context, limit=1)
+            self.assertIsNone(results.total_count)
+            self.assertFalse(count.called)
+
     def test_find_zones_all_tenants(self):
         # Create two contexts with different tenant_id's
         one_context = self.get_admin_context()
@@ -919,6 +1048,122 @@ class StorageTestCase(object):
         self.assertIsNotNone(recordset.records[0].id)
         self.assertIsNotNone(recordset.records[1].id)
 
+    def test_create_recordsets(self):
+        zone = self.create_zone()
+
+        recordsets = [
+            objects.RecordSet(
+                name='www.%s' % zone['name'],
+                type='A',
+                ttl=300,
+                records=objects.RecordList(objects=[
+                    objects.Record(data='192.0.2.1'),
+                    objects.Record(data='192.0.2.2'),
+                ])
+            ),
+            objects.RecordSet(
+                name='mail.%s' % zone['name'],
+                type='MX',
+                records=objects.RecordList(objects=[
+                    objects.Record(data='10 mail.%s' % zone['name'],
+                                   serial=zone['serial']),
+                ])
+            ),
+        ]
+
+        recordsets = self.storage.create_recordsets(
+            self.admin_context, zone['id'], recordsets)
+
+        # The generated values are set without fetching the rows back
+        for recordset in recordsets:
+            self.assertIsNotNone(recordset.id)
+            self.assertEqual(1, recordset.version)
+            self.assertEqual(zone['id'], recordset.zone_id)
+
+            for record in recordset.records:
+                self.assertEqual(recordset.id, record.recordset_id)
+                self.assertEqual('PENDING', record.status)
+                self.assertEqual('CREATE', record.action)
+                self.assertFalse(record.obj_what_changed())
+
+        for recordset in recordsets:
+            actual = self.storage.get_recordset(
+                self.admin_context, recordset.id)
+            self.assertEqual(recordset.name, actual.name)
+            self.assertEqual(recordset.ttl, actual.ttl)
+            self.assertEqual(recordset.created_at, actual.created_at)
+            self.assertEqual(
+                sorted(r.data for r in recordset.records),
+                sorted(r.data for r in actual.records))
+            self.assertEqual(
+                sorted(r.id for r in recordset.records),
+                sorted(r.id for r in actual.records))
+
+    def test_create_recordsets_duplicate(self):
+        zone = self.create_zone()
+
+        recordsets = [
+            objects.RecordSet(name='www.%s' % zone['name'], type='A'),
+            objects.RecordSet(name='www.%s' % zone['name'], type='A'),
+        ]
+
+        with testtools.ExpectedException(exceptions.DuplicateRecordSet):
+            self.storage.create_recordsets(
+                self.admin_context, zone['id'], recordsets)
+
+    def test_update_zone_recordsets(self):
+        zone = self.create_zone()
+        www = self.create_recordset(zone, type='A', name='www.%s' % zone.name)
+        kept = self.storage.create_record(
+            self.admin_context, zone.id, www.id,
+            objects.Record(data='192.0.2.1', status='ACTIVE', action='NONE'))
+        self.storage.create_record(
+            self.admin_context, zone.id, www.id,
+            objects.Record(data='192.0.2.2'))
+        mail = self.create_recordset(zone, type='A',
+                                     name='mail.%s' % zone.name)
+
+        zone.recordsets = objects.RecordSetList(objects=[
+            objects.RecordSet(
+                name='www.%s' % zone.name, type='A', ttl=600,
+                records=objects.RecordList(objects=[
+                    objects.Record(data='192.0.2.1'),
+                    objects.Record(data='192.0.2.3'),
+                ])
+            ),
+            objects.RecordSet(
+                name='ftp.%s' % zone.name, type='A',
+                records=objects.RecordList(objects=[
+                    objects.Record(data='192.0.2.4'),
+                ])
+            ),
+        ])
+
+        zone.type = 'SECONDARY'
+        self.storage.update_zone(self.admin_context, zone)
+
+        recordset = self.storage.get_recordset(self.admin_context, www.id)
+        self.assertEqual(600, recordset.ttl)
+        self.assertEqual(2, recordset.version)
+        self.assertEqual(['192.0.2.1', '192.0.2.3'],
+                         sorted(r.data for r in recordset.records))
+
+        # The record which did not change is left alone
+        record = self.storage.get_record(self.admin_context, kept.id)
+        self.assertEqual('ACTIVE', record.status)
+        self.assertEqual(1, record.version)
+
+        recordset = self.storage.find_recordset(
+            self.admin_context,
+            {'zone_id': zone.id, 'name': 'ftp.%s' % zone.name})
+        self.assertEqual(['192.0.2.4'], [r.data for r in recordset.records])
+
+        # Recordsets missing from a secondary zone are purged
+        with testtools.ExpectedException(exceptions.RecordSetNotFound):
+            self.storage.get_recordset(self.admin_context, mail.id)
+        self.assertEqual(0, self.storage.count_records(
+            self.admin_context, {'recordset_id': mail.id}))
+
     def test_find_recordsets(self):
         zone = self.create_zone()
 
@@ -956,6 +1201,20 @@ class StorageTestCase(object):
         # Ensure we can page through the results.
         self._ensure_paging(created, self.storage.find_recordsets)
 
+    def test_find_recordsets_keyset_marker(self):
+        zone = self.create_zone(name='example.org.')
+
+        created = [self.create_recordset(zone, name='r-%d.example.org.' % i)
+                   for i in range(10)]
+
+        marker = utils.encode_marker('name', created[4].name, created[4].id)
+
+        results = self.storage.find_recordsets(
+            self.admin_context, criterion={'zone_id': zone.id},
+            marker=marker, limit=10, sort_key='name')
+
+        self.assertEqual([r.id for r in created[5:]], [r.id for r in results])
+
     def test_find_recordsets_criterion(self):
         zone = self.create_zone()
 
@@ -1034,6 +1293,145 @@ class StorageTestCase(object):
             self.assertNotIn(record, records)
             records.append(record)
 
+    def test_find_recordsets_axfr(self):
+        zone = self.create_zone()
+
+        records = [
+            {"data": "10.0.0.1"},
+            {"data": "10.0.0.2"},
+        ]
+
+        recordset = self.create_recordset(zone, records=records)
+
+        criterion = dict(zone_id=zone['id'], type='!SOA')
+
+        results = list(
+            self.storage.find_recordsets_axfr(self.admin_context, criterion))
+
+        # Should be 3, as the NS recordset is automatically created
+        self.assertEqual(3, len(results))
+
+        rows = [row for row in results if row[0] == recordset.id]
+        self.assertEqual(2, len(rows))
+        self.assertEqual(
+            set(['10.0.0.1', '10.0.0.2']), set(row[4] for row in rows))
+
+        # Records of the same RecordSet must be adjacent
+        ids = [row[0] for row in results]
+        self.assertEqual(sorted(ids), ids)
+
+    def test_find_zone_journal(self):
+        zone = self.create_zone()
+
+        self.storage.create_zone_journal_entries(
+            self.admin_context, zone.id, 1, 2,
+            [('SOA', None, None, None, None),
+             ('ADD', 'www.example.org.', 300, 'A', '192.0.2.1')])
+        self.storage.create_zone_journal_entries(
+            self.admin_context, zone.id, 2, 3,
+            [('SOA', None, None, None, None)])
+
+        results = self.storage.find_zone_journal(
+            self.admin_context, zone.id, 2)
+        self.assertEqual(3, len(results))
+        self.assertEqual([2, 2, 3], [row[1] for row in results])
+        self.assertIn(
+            (1, 2, 'ADD', 'www.example.org.', 300, 'A', '192.0.2.1'),
+            [tuple(row) for row in results])
+
+        results = self.storage.find_zone_journal(
+            self.admin_context, zone.id, 3)
+        self.assertEqual([(2, 3, 'SOA', None, None, None, None)],
+                         [tuple(row) for row in results])
+
+    def test_purge_zone_journal(self):
+        zone = self.create_zone()
+
+        for serial in range(2, 6):
+            self.storage.create_zone_journal_entries(
+                self.admin_context, zone.id, serial - 1, serial,
+                [('SOA', None, None, None, None),
+                 ('ADD', 'www.example.org.', 300, 'A', '192.0.2.%d' % serial)])
+
+        # Keep the last 2 serial changes
+        self.storage.purge_zone_journal(self.admin_context, zone.id, keep=2)
+
+        results = self.storage.find_zone_journal(
+            self.admin_context, zone.id, 0)
+        self.assertEqual([4, 4, 5, 5], [row[1] for row in results])
+
+        self.storage.purge_zone_journal(self.admin_context, zone.id)
+
+        results = self.storage.find_zone_journal(
+            self.admin_context, zone.id, 0)
+        self.assertEqual(0, len(results))
+
+    def _assert_zone_usage_counted(self, zone):
+        usage = self.storage.get_zone_usage(self.admin_context, zone.id)
+
+        self.assertEqual({
+            'recordsets': self.storage.count_recordsets(
+                self.admin_context, {'zone_id': zone.id}),
+            'records': self.storage.count_records(
+                self.admin_context, {'zone_id': zone.id, 'managed': False}),
+        }, usage)
+
+        return usage
+
+    def test_get_zone_usage(self):
+        zone = self.create_zone()
+
+        # The SOA and NS recordsets are managed
+        usage = self._assert_zone_usage_counted(zone)
+        self.assertEqual({'recordsets': 2, 'records': 0}, usage)
+
+        recordset = self.create_recordset(zone)
+        record_one = self.create_record(zone, recordset, fixture=0)
+        self.create_record(zone, recordset, fixture=1)
+
+        usage = self._assert_zone_usage_counted(zone)
+        self.assertEqual({'recordsets': 3, 'records': 2}, usage)
+
+        self.storage.delete_record(self.admin_context, record_one.id)
+
+        usage = self._assert_zone_usage_counted(zone)
+        self.assertEqual({'recordsets': 3, 'records': 1}, usage)
+
+        # NOTE: The records are deleted by the foreign key, which SQLite does
+        #       not enforce in the tests
+        self.storage.delete_recordset(self.admin_context, recordset.id)
+
+        usage = self.storage.get_zone_usage(self.admin_context, zone.id)
+        self.assertEqual({'recordsets': 2, 'records': 0}, usage)
+
+    def test_get_zone_usage_bulk_writes(self):
+        zone = self.create_zone()
+
+        recordsets = objects.RecordSetList(objects=[
+            objects.RecordSet(
+                name='www.%s' % zone.name, type='A',
+                records=objects.RecordList(objects=[
+                    objects.Record(data='192.0.2.1'),
+                    objects.Record(data='192.0.2.2', managed=True),
+                ])),
+            objects.RecordSet(
+                name='mail.%s' % zone.name, type='A',
+                records=objects.RecordList(objects=[
+                    objects.Record(data='192.0.2.3'),
+                ])),
+        ])
+        recordsets = self.storage.create_recordsets(
+            self.admin_context, zone.id, recordsets)
+
+        usage = self._assert_zone_usage_counted(zone)
+        self.assertEqual({'recordsets': 4, 'records': 2}, usage)
+
+        self.storage.delete_records(
+            self.admin_context, {'recordset_id': recordsets[1].id})
+
+        usage = self._assert_zone_usage_counted(zone)
+        self.assertEqual({'recordsets': 3, 'records': 1}, usage)
+
     def test_get_recordset(self):
         zone = self.create_zone()
         expected = self.create_recordset(zone)
@@ -1552,6 +1950,135 @@ class StorageTestCase(object):
             uuid = 'caf771fc-6b05-4891-bee1-c2a48621f57b'
             self.storage.delete_record(self.admin_context, uuid)
 
+    def test_find_floatingip_records(self):
+        zone = self.create_zone()
+        recordsets = [
+            self.create_recordset(zone, name='a.%s' % zone.name),
+            self.create_recordset(zone, name='b.%s' % zone.name, ttl=300),
+        ]
+        records = []
+        for i, recordset in enumerate(recordsets):
+            records.append(self.storage.create_record(
+                self.admin_context, zone.id, recordset.id,
+                objects.Record.from_dict({
+                    'data': 'fip%d.example.org.' % i,
+                    'managed': True,
+                    'managed_extra': '192.0.2.%d' % i,
+                    'managed_resource_type': 'ptr:floatingip',
+                    'managed_tenant_id': 'tenant',
+                })))
+
+        results = self.storage.find_floatingip_records(
+            self.admin_context, ['192.0.2.0', '192.0.2.1', '192.0.2.2'])
+
+        results = dict((record.id, (record, ttl)) for record, ttl in results)
+        self.assertEqual(2, len(results))
+
+        # The zone TTL is used when the recordset has none
+        record, ttl = results[records[0].id]
+        self.assertEqual('192.0.2.0', record.managed_extra)
+        self.assertEqual('tenant', record.managed_tenant_id)
+        self.assertEqual(zone.ttl, ttl)
+
+        record, ttl = results[records[1].id]
+        self.assertEqual('fip1.example.org.', record.data)
+        self.assertEqual(300, ttl)
+
+        # Only the addresses asked for are returned
+        results = self.storage.find_floatingip_records(
+            self.admin_context, ['192.0.2.1'])
+        self.assertEqual([records[1].id], [r.id for r, _ in results])
+
+    @mock.patch('designate.storage.impl_sqlalchemy.'
+                'FLOATINGIP_LOOKUP_CHUNK_SIZE', 2)
+    def test_find_floatingip_records_chunked(self):
+        zone = self.create_zone()
+        for i in range(5):
+            recordset = self.create_recordset(
+                zone, name='%d.%s' % (i, zone.name))
+            self.storage.create_record(
+                self.admin_context, zone.id, recordset.id,
+                objects.Record.from_dict({
+                    'data': 'fip%d.example.org.' % i,
+                    'managed': True,
+                    'managed_extra': '192.0.2.%d' % i,
+                    'managed_resource_type': 'ptr:floatingip',
+                }))
+
+        results = self.storage.find_floatingip_records(
+            self.admin_context, ['192.0.2.%d' % i for i in range(6)])
+
+        self.assertEqual(
+            ['192.0.2.%d' % i for i in range(5)],
+            sorted(record.managed_extra for record, _ in results))
+
+    def test_update_records_status(self):
+        zone = self.create_zone()
+        recordset = self.create_recordset(zone, type='A')
+        record_one = self.create_record(zone, recordset, fixture=0)
+        record_two = self.create_record(zone, recordset, fixture=1)
+
+        other_zone = self.create_zone(fixture=1)
+        other_recordset = self.create_recordset(other_zone, type='A')
+        other_record = self.create_record(other_zone, other_recordset)
+
+        count = self.storage.update_records_status(
+            self.admin_context, {'recordset_id': recordset.id}, 'ACTIVE',
+            action='NONE')
+
+        self.assertEqual(2, count)
+        for record_id in (record_one.id, record_two.id):
+            record = self.storage.get_record(self.admin_context, record_id)
+            self.assertEqual('ACTIVE', record.status)
+            self.assertEqual('NONE', record.action)
+            self.assertEqual(2, record.version)
+
+        # Other records are left alone
+        record = self.storage.get_record(self.admin_context, other_record.id)
+        self.assertEqual('PENDING', record.status)
+        self.assertEqual('CREATE', record.action)
+
+    def test_update_records_status_keeps_action(self):
+        zone = self.create_zone()
+        recordset = self.create_recordset(zone, type='A')
+        record = self.create_record(zone, recordset)
+
+        self.storage.update_records_status(
+            self.admin_context, {'recordset_id': recordset.id}, 'ERROR')
+
+        record = self.storage.get_record(self.admin_context, record.id)
+        self.assertEqual('ERROR', record.status)
+        self.assertEqual('CREATE', record.action)
+
+    def test_delete_records(self):
+        zone = self.create_zone()
+        recordset_one = self.create_recordset(zone, type='A', fixture=0)
+        record_one = self.create_record(zone, recordset_one, fixture=0)
+        record_two = self.create_record(zone, recordset_one, fixture=1)
+        recordset_two = self.create_recordset(zone, type='A', fixture=1)
+        record_three = self.create_record(zone, recordset_two, fixture=0)
+
+        count = self.storage.delete_records(
+            self.admin_context, {'id': [record_one.id, record_three.id]})
+
+        self.assertEqual(2, count)
+        for record_id in (record_one.id, record_three.id):
+            with testtools.ExpectedException(exceptions.RecordNotFound):
+                self.storage.get_record(self.admin_context, record_id)
+
+        # The recordset still holding a record is kept, the emptied one is
+        # deleted
+        recordset = self.storage.get_recordset(
+            self.admin_context, recordset_one.id)
+        self.assertEqual([record_two.id], [r.id for r in recordset.records])
+
+        with testtools.ExpectedException(exceptions.RecordSetNotFound):
+            self.storage.get_recordset(self.admin_context, recordset_two.id)
+
+    def test_delete_records_none_matching(self):
+        self.assertEqual(0, self.storage.delete_records(
+            self.admin_context, {'action': 'DELETE'}))
+
     def test_count_records(self):
         # in the beginning, there should be nothing
         records = self.storage.count_records(self.admin_context)
@@ -18,6 +18,7 @@ from unittest import mock
 from oslo_log import log as logging
 
 from designate import storage
+from designate.storage.impl_sqlalchemy import tables
 from designate.tests import TestCase
 from designate.tests.test_storage import StorageTestCase
 
@@ -57,10 +58,12 @@ class SqlalchemyStorageTest(StorageTestCase, TestCase):
             u'tlds',
             u'tsigkeys',
             u'zone_attributes',
+            u'zone_journal',
             u'zone_masters',
             u'zone_tasks',
             u'zone_transfer_accepts',
             u'zone_transfer_requests',
+            u'zone_usages',
             u'zones'
         ]
         self.assertEqual(table_names, self.storage.engine.table_names())
@@ -79,6 +82,7 @@ class SqlalchemyStorageTest(StorageTestCase, TestCase):
         expected = {
             "records": {
                 "record_created_at": "CREATE INDEX record_created_at ON records (created_at)",  # noqa
+                "record_managed_extra": "CREATE INDEX record_managed_extra ON records (managed_extra, managed_resource_type)",  # noqa
                 "records_tenant": "CREATE INDEX records_tenant ON records (tenant_id)",  # noqa
                 "update_status_index": "CREATE INDEX update_status_index ON records (status, zone_id, tenant_id, created_at, serial)",  # noqa
             },
@@ -93,6 +97,9 @@ class SqlalchemyStorageTest(StorageTestCase, TestCase):
                 "rrset_ttl": "CREATE INDEX rrset_ttl ON recordsets (ttl)",  # noqa
                 "rrset_tenant_id": "CREATE INDEX rrset_tenant_id ON recordsets (tenant_id)",  # noqa
             },
+            "zone_journal": {
+                "zone_journal_zone_serial": "CREATE INDEX zone_journal_zone_serial ON zone_journal (zone_id, serial)",  # noqa
+            },
             "zones": {
                 "delayed_notify": "CREATE INDEX delayed_notify ON zones (delayed_notify)",  # noqa
                 "reverse_name_deleted": "CREATE INDEX reverse_name_deleted ON zones (reverse_name, deleted)",  # noqa
@@ -102,3 +109,32 @@ class SqlalchemyStorageTest(StorageTestCase, TestCase):
             }
         }
         self.assertDictEqual(expected, indexes)
+
+    def test_reconcile_zone_usages(self):
+        zone = self.create_zone()
+        recordset = self.create_recordset(zone)
+        self.create_record(zone, recordset)
+
+        table = tables.zone_usages
+
+        # Nothing to correct
+        self.assertEqual(0, self.storage.reconcile_zone_usages(
+            self.admin_context, {'id': zone.id}))
+
+        self.storage.session.execute(
+            table.update().where(table.c.zone_id == zone.id).
+            values(recordsets=10, records=10))
+
+        self.assertEqual(1, self.storage.reconcile_zone_usages(
+            self.admin_context, {'id': zone.id}))
+        self._assert_zone_usage_counted(zone)
+
+        # Zones without a usage are counted on the fly until reconciled
+        self.storage.session.execute(
+            table.delete().where(table.c.zone_id == zone.id))
+        self._assert_zone_usage_counted(zone)
+
+        self.assertEqual(1, self.storage.reconcile_zone_usages(
+            self.admin_context))
+        usage = self._assert_zone_usage_counted(zone)
+        self.assertEqual({'recordsets': 3, 'records': 1}, usage)
@@ -20,6 +20,7 @@ import dns.resolver
 import designate.tests
 from designate import exceptions
 from designate import utils
+from designate.backend import rndc
 from designate.backend.agent_backend import impl_bind9
 from designate.tests.unit.agent import backends
 
@@ -76,20 +77,65 @@ class Bind9AgentBackendTestCase(designate.tests.TestCase):
             'rndc_key_file', 'key_file', 'backend:agent:bind9'
         )
 
-        self.backend._execute_rndc(self.backend._rndc_base())
+        self.backend._execute_rndc(['reload'])
 
         mock_execute.assert_called_once_with(
             'rndc', '-s', '127.0.0.1', '-p', '953',
-            '-c', 'config_file', '-k', 'key_file'
+            '-c', 'config_file', '-k', 'key_file', 'reload'
         )
 
+    @mock.patch.object(rndc.RndcClient, 'from_key_file')
+    @mock.patch('designate.utils.execute')
+    def test_execute_rndc_native(self, mock_execute, mock_from_key_file):
+        self.CONF.set_override('rndc_native', True, 'backend:agent:bind9')
+        backend = impl_bind9.Bind9Backend('foo')
+
+        backend._execute_rndc(['reload', 'example.org'])
+
+        mock_from_key_file.return_value.call.assert_called_once_with(
+            'reload example.org'
+        )
+        self.assertFalse(mock_execute.called)
+
+    @mock.patch.object(rndc.RndcClient, 'from_key_file')
+    @mock.patch('designate.utils.execute')
+    def test_execute_rndc_native_falls_back(self, mock_execute,
+                                            mock_from_key_file):
+        self.CONF.set_override('rndc_native', True, 'backend:agent:bind9')
+        backend = impl_bind9.Bind9Backend('foo')
+        mock_from_key_file.return_value.call.side_effect = (
+            rndc.RndcConnectFailed()
+        )
+
+        backend._execute_rndc(['reload', 'example.org'])
+
+        mock_execute.assert_called_once_with(
+            'rndc', '-s', '127.0.0.1', '-p', '953', 'reload', 'example.org'
+        )
+
+    @mock.patch.object(rndc.RndcClient, 'from_key_file')
+    @mock.patch('designate.utils.execute')
+    def test_execute_rndc_native_not_resent(self, mock_execute,
+                                            mock_from_key_file):
+        self.CONF.set_override('rndc_native', True, 'backend:agent:bind9')
+        backend = impl_bind9.Bind9Backend('foo')
+        mock_from_key_file.return_value.call.side_effect = (
+            rndc.RndcConnectionError('rndc connection failed: timed out')
+        )
+
+        self.assertRaises(
+            exceptions.Backend,
+            backend._execute_rndc, ['addzone', 'example.org']
+        )
+        self.assertFalse(mock_execute.called)
+
     @mock.patch('designate.utils.execute')
     def test_execute_rndc_raises(self, mock_execute):
         mock_execute.side_effect = utils.processutils.ProcessExecutionError()
 
         self.assertRaises(
             exceptions.Backend,
-            self.backend._execute_rndc, self.backend._rndc_base()
+            self.backend._execute_rndc, ['reload']
         )
 
     @mock.patch('designate.utils.execute')
@@ -15,6 +15,7 @@
 # under the License.
 from unittest import mock
 
+import dns.zone
 from oslo_config import cfg
 
 import designate.tests
@@ -94,6 +95,12 @@ class DenominatorAgentBackendTestCase(designate.tests.TestCase):
 
         self.assertEqual(4, mock_execute.call_count)
 
+        # Nothing changed since the last sync, so nothing is sent
+        self.backend.update_zone(zone)
+        self.assertEqual(4, mock_execute.call_count)
+
+        self.backend._synced_zones.clear()
+
         methods = ['update_zone',
                    'get_records',
                    'create_record', 'update_record', 'delete_record']
@@ -108,6 +115,42 @@ class DenominatorAgentBackendTestCase(designate.tests.TestCase):
         self.assertEqual(1, self.backend.denominator.update_record.call_count)
         self.assertEqual(1, self.backend.denominator.delete_record.call_count)
 
+    @mock.patch('designate.utils.execute')
+    def test_update_zone_only_changed_rrsets(self, mock_execute):
+        records = ('example.org SOA 86400 ns1.designate.com. '
+                   'hostmaster@example.org. 475 3600 600 604800 1800\n'
+                   'example.org NS 3600 ns1.designate.com.\n'
+                   'www.example.org A 3600 192.0.2.2\n'
+                   'www.example.org A 3600 192.0.2.1\n'
+                   'mail.example.org A 3600 192.0.2.3\n'
+                   'old.example.org A 3600 192.0.2.4\n')
+        mock_execute.return_value = (records, None)
+
+        zone = dns.zone.from_text(
+            '$ORIGIN example.org.\n'
+            '@ 3600 IN SOA ns1.designate.com. email.email.com. '
+            '1421777854 3600 600 86400 3600\n'
+            '@ 3600 IN NS ns1.designate.com.\n'
+            'www 3600 IN A 192.0.2.1\n'
+            'www 3600 IN A 192.0.2.2\n'
+            'mail 600 IN A 192.0.2.3\n'
+            'new 3600 IN A 192.0.2.5\n'
+            'new 3600 IN A 192.0.2.6\n',
+            check_origin=False
+        )
+
+        self.backend.update_zone(zone)
+
+        calls = [call[0][call[0].index('record') + 3:]
+                 for call in mock_execute.call_args_list[2:]]
+        self.assertEqual([
+            ('replace', '--name', 'mail.example.org', '--type', 'A',
+             '--ttl', '600', '--data', '192.0.2.3'),
+            ('add', '--name', 'new.example.org', '--type', 'A',
+             '--ttl', '3600', '--data', '192.0.2.5', '--data', '192.0.2.6'),
+            ('delete', '--id', 'old.example.org', '--type', 'A'),
+        ], calls)
+
     @mock.patch('designate.utils.execute', return_value=(None, None))
     def test_delete_zone(self, mock_execute):
         self.backend.delete_zone('example.org.')
@@ -13,8 +13,11 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import os
 from unittest import mock
 
+import fixtures
+
 import designate.tests
 from designate import exceptions
 from designate.backend.agent_backend import impl_djbdns
@@ -123,3 +126,105 @@ class DjbdnsAgentBackendTestCase(designate.tests.TestCase):
             exceptions.Backend,
             self.backend.delete_zone, 'foo'
         )
+
+    @mock.patch.object(impl_djbdns.threading, 'Timer')
+    def test_schedule_rebuild_coalesces_changes(self, mock_timer):
+        self.backend._rebuild_delay = 5.0
+        self.backend._perform_axfr_from_minidns = mock.Mock()
+        self.backend._rebuild_data_cdb = mock.Mock()
+
+        self.backend.update_zone(backends.create_dnspy_zone('example.org'))
+        self.backend.update_zone(backends.create_dnspy_zone('example.com'))
+
+        mock_timer.assert_called_once_with(
+            5.0, self.backend._run_scheduled_rebuild
+        )
+        mock_timer.return_value.start.assert_called_once_with()
+        self.backend._rebuild_data_cdb.assert_not_called()
+
+        self.backend._run_scheduled_rebuild()
+
+        self.backend._rebuild_data_cdb.assert_called_once_with()
+        self.assertIsNone(self.backend._rebuild_timer)
+
+    @mock.patch.object(impl_djbdns.threading, 'Timer')
+    def test_run_scheduled_rebuild_failure(self, mock_timer):
+        self.backend._rebuild_delay = 5.0
+        self.backend._rebuild_data_cdb = mock.Mock(
+            side_effect=exceptions.Backend('Failed to generate data.cdb')
+        )
+
+        self.backend._run_scheduled_rebuild()
+
+        self.backend._rebuild_data_cdb.assert_called_once_with()
+        # The rebuild is tried again later, backing off on every failure
+        mock_timer.assert_called_once_with(
+            10.0, self.backend._run_scheduled_rebuild
+        )
+        mock_timer.return_value.start.assert_called_once_with()
+
+        self.backend._run_scheduled_rebuild()
+
+        mock_timer.assert_called_with(
+            20.0, self.backend._run_scheduled_rebuild
+        )
+
+        self.backend._rebuild_data_cdb.side_effect = None
+        self.backend._run_scheduled_rebuild()
+
+        self.assertEqual(0, self.backend._rebuild_failures)
+        self.assertEqual(2, mock_timer.call_count)
+
+    def test_stop_backend_rebuild_failure(self):
+        timer = mock.Mock()
+        self.backend._rebuild_timer = timer
+        self.backend._rebuild_data_cdb = mock.Mock(
+            side_effect=exceptions.Backend('Failed to generate data.cdb')
+        )
+
+        self.backend.stop()
+
+        self.backend._rebuild_data_cdb.assert_called_once_with()
+        self.assertIsNone(self.backend._rebuild_timer)
+
+    def test_stop_backend_runs_pending_rebuild(self):
+        timer = mock.Mock()
+        self.backend._rebuild_timer = timer
+        self.backend._rebuild_data_cdb = mock.Mock()
+
+        self.backend.stop()
+
+        timer.cancel.assert_called_once_with()
+        self.backend._rebuild_data_cdb.assert_called_once_with()
+
+    def _write_datafiles(self):
+        tmpdir = self.useFixture(fixtures.TempDir()).path
+        for name, data in (('example.org', '+example.org:192.0.2.1:3600\n'),
+                           ('example.com', '+example.com:192.0.2.2:3600\n')):
+            with open(os.path.join(tmpdir, '%s.zonedata' % name), 'w') as f:
+                f.write(data)
+        return tmpdir
+
+    def _assert_concatenated(self, tmpdir):
+        data_fn = os.path.join(tmpdir, 'data')
+
+        self.backend._concatenate_zone_datafiles(
+            data_fn, os.path.join(tmpdir, '*.zonedata')
+        )
+
+        with open(data_fn) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(
+            ['+example.com:192.0.2.2:3600', '+example.org:192.0.2.1:3600'],
+            sorted(lines)
+        )
+
+    def test_concatenate_zone_datafiles(self):
+        self._assert_concatenated(self._write_datafiles())
+
+    @mock.patch.object(impl_djbdns.os, 'sendfile',
+                       side_effect=OSError('Invalid argument'))
+    def test_concatenate_zone_datafiles_without_sendfile(self, mock_sendfile):
+        self._assert_concatenated(self._write_datafiles())
+
+        self.assertEqual(2, mock_sendfile.call_count)
@@ -62,7 +62,7 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         return response
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'post')
     def test_create_zone_missed_contract_id(self, mock_post, mock_auth):
         self.target['options'].remove(
             {'key': 'akamai_contract_id', 'value': 'G-XYW'})
@@ -84,7 +84,7 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         mock_post.assert_not_called()
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'post')
     def test_create_zone(self, mock_post, mock_auth):
         backend = akamai.AkamaiBackend(
             objects.PoolTarget.from_dict(self.target)
@@ -113,7 +113,7 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         )
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'post')
     def test_create_zone_duplicate_zone(self, mock_post, mock_auth):
         backend = akamai.AkamaiBackend(
             objects.PoolTarget.from_dict(self.target)
@@ -144,7 +144,7 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         )
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'post')
     def test_create_zone_with_tsig_key(self, mock_post, mock_auth):
         self.target['options'].extend([
             {'key': 'tsig_key_name', 'value': 'test_key'},
@@ -184,7 +184,7 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         )
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'post')
     def test_create_zone_raise_error(self, mock_post, mock_auth):
         backend = akamai.AkamaiBackend(
             objects.PoolTarget.from_dict(self.target)
@@ -224,7 +224,7 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         )
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'post')
     def test_force_delete_zone(self, mock_post, mock_auth):
         backend = akamai.AkamaiBackend(
             objects.PoolTarget.from_dict(self.target)
@@ -252,7 +252,7 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         )
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'post')
     def test_force_delete_zone_raise_error(self, mock_post, mock_auth):
         backend = akamai.AkamaiBackend(
             objects.PoolTarget.from_dict(self.target)
@@ -284,7 +284,7 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         )
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'post')
     def test_force_delete_zone_raise_error_404(self, mock_post, mock_auth):
         backend = akamai.AkamaiBackend(
             objects.PoolTarget.from_dict(self.target)
@@ -313,8 +313,8 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         )
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
-    @mock.patch.object(akamai.requests.Session, 'get')
+    @mock.patch.object(requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'get')
     def test_soft_delete_zone(self, mock_get, mock_post, mock_auth):
         backend = akamai.AkamaiBackend(
             objects.PoolTarget.from_dict(self.target)
@@ -364,8 +364,8 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         ])
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
-    @mock.patch.object(akamai.requests.Session, 'get')
+    @mock.patch.object(requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'get')
     def test_soft_delete_zone_failed_after_10_attempts(
             self, mock_get, mock_post, mock_auth):
         backend = akamai.AkamaiBackend(
@@ -417,7 +417,7 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         ])
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'post')
     def test_soft_delete_zone_raise_error(self, mock_post, mock_auth):
         backend = akamai.AkamaiBackend(
             objects.PoolTarget.from_dict(self.target)
@@ -456,7 +456,7 @@ class AkamaiBackendTestCase(designate.tests.TestCase):
         ])
 
     @mock.patch.object(akamai, 'edgegrid')
-    @mock.patch.object(akamai.requests.Session, 'post')
+    @mock.patch.object(requests.Session, 'post')
     def test_soft_delete_zone_missed_request_id(self, mock_post, mock_auth):
         backend = akamai.AkamaiBackend(
             objects.PoolTarget.from_dict(self.target)
@@ -18,6 +18,7 @@ from designate import exceptions
 from designate import objects
 from designate import utils
 from designate.backend import impl_bind9
+from designate.backend import rndc
 from designate.tests import fixtures
 
 import subprocess
@@ -257,6 +258,161 @@ class Bind9BackendTestCase(designate.tests.TestCase):
             self.backend._execute_rndc, rndc_op
         )
 
+    @mock.patch.object(rndc.RndcClient, 'from_key_file')
+    @mock.patch('designate.utils.execute')
+    def test_execute_rndc_native(self, mock_execute, mock_from_key_file):
+        self.target['options'].append({'key': 'rndc_native', 'value': 'true'})
+        backend = impl_bind9.Bind9Backend(
+            objects.PoolTarget.from_dict(self.target)
+        )
+
+        backend._execute_rndc(['delzone', 'example.com '])
+
+        mock_from_key_file.assert_called_once_with(
+            '192.168.2.4', 953, config_file='/etc/rndc.conf',
+            key_file='/etc/rndc.key', pool_size=4, timeout=None
+        )
+        mock_from_key_file.return_value.call.assert_called_once_with(
+            'delzone example.com '
+        )
+        self.assertFalse(mock_execute.called)
+
+    @mock.patch.object(rndc.RndcClient, 'from_key_file')
+    @mock.patch('designate.utils.execute')
+    def test_execute_rndc_native_falls_back(self, mock_execute,
+                                            mock_from_key_file):
+        self.target['options'].append({'key': 'rndc_native', 'value': 'true'})
+        backend = impl_bind9.Bind9Backend(
+            objects.PoolTarget.from_dict(self.target)
+        )
+        mock_from_key_file.return_value.call.side_effect = (
+            rndc.RndcConnectionClosed()
+        )
+
+        backend._execute_rndc(['delzone', 'example.com '])
+
+        mock_execute.assert_called_with(
+            '/usr/sbin/rndc', '-s', '192.168.2.4', '-p', '953',
+            '-c', '/etc/rndc.conf', '-k', '/etc/rndc.key',
+            'delzone', 'example.com ', timeout=None
+        )
+
+    @mock.patch.object(rndc.RndcClient, 'from_key_file')
+    @mock.patch('designate.utils.execute')
+    def test_execute_rndc_native_not_resent(self, mock_execute,
+                                            mock_from_key_file):
+        self.target['options'].append({'key': 'rndc_native', 'value': 'true'})
+        backend = impl_bind9.Bind9Backend(
+            objects.PoolTarget.from_dict(self.target)
+        )
+        mock_from_key_file.return_value.call.side_effect = (
+            rndc.RndcConnectionError('rndc connection failed: timed out')
+        )
+
+        self.assertRaises(
+            exceptions.Backend,
+            backend._execute_rndc, ['delzone', 'example.com ']
+        )
+        self.assertFalse(mock_execute.called)
+
+    @mock.patch.object(rndc.RndcClient, 'from_key_file')
+    def test_execute_rndc_native_command_failure(self, mock_from_key_file):
+        self.target['options'].append({'key': 'rndc_native', 'value': 'true'})
+        backend = impl_bind9.Bind9Backend(
+            objects.PoolTarget.from_dict(self.target)
+        )
+        mock_from_key_file.return_value.call.side_effect = (
+            exceptions.Backend("'delzone' failed: not found")
+        )
+
+        self.assertRaisesRegex(
+            exceptions.Backend, 'not found',
+            backend._execute_rndc, ['delzone', 'example.com ']
+        )
+
+    @mock.patch.object(rndc.RndcClient, 'from_key_file')
+    @mock.patch.object(impl_bind9.Bind9Backend, 'mdns_api')
+    def test_create_zones_native(self, mock_mdns_api, mock_from_key_file):
+        self.target['options'].append({'key': 'rndc_native', 'value': 'true'})
+        backend = impl_bind9.Bind9Backend(
+            objects.PoolTarget.from_dict(self.target)
+        )
+        zones = [self.zone, objects.Zone(
+            id='0ccf0a3e-7b3a-4b1f-9d0f-4d5c4ec1c4bd', name='example.org.',
+            email='example@example.org'
+        )]
+        mock_pipeline = mock_from_key_file.return_value.pipeline
+        mock_pipeline.return_value = [
+            rndc.RndcResult('addzone', {'result': b'1',
+                                        'err': b'already exists'}),
+            rndc.RndcResult('addzone', {'result': b'0'}),
+        ]
+
+        self.assertEqual(
+            [True, True], backend.create_zones(self.admin_context, zones)
+        )
+
+        commands = mock_pipeline.call_args[0][0]
+        self.assertEqual(2, len(commands))
+        self.assertTrue(commands[0].startswith('addzone example.com  {'))
+        self.assertTrue(commands[1].startswith('addzone example.org  {'))
+        self.assertEqual(
+            2, mock_mdns_api.notify_zone_changed.call_count
+        )
+
+    @mock.patch.object(rndc.RndcClient, 'from_key_file')
+    def test_delete_zones_native(self, mock_from_key_file):
+        self.target['options'].append({'key': 'rndc_native', 'value': 'true'})
+        backend = impl_bind9.Bind9Backend(
+            objects.PoolTarget.from_dict(self.target)
+        )
+        mock_pipeline = mock_from_key_file.return_value.pipeline
+        mock_pipeline.return_value = [
+            rndc.RndcResult('delzone', {'result': b'1', 'err': b'failure'}),
+        ]
+
+        self.assertEqual(
+            [False], backend.delete_zones(self.admin_context, [self.zone])
+        )
+        mock_pipeline.assert_called_once_with(
+            ['delzone -clean example.com ']
+        )
+
+    @mock.patch.object(rndc.RndcClient, 'from_key_file')
+    @mock.patch.object(impl_bind9.Bind9Backend, '_execute_rndc')
+    def test_delete_zones_native_falls_back(self, mock_execute,
+                                            mock_from_key_file):
+        self.target['options'].append({'key': 'rndc_native', 'value': 'true'})
+        backend = impl_bind9.Bind9Backend(
+            objects.PoolTarget.from_dict(self.target)
+        )
+        mock_from_key_file.return_value.pipeline.side_effect = (
+            rndc.RndcConnectFailed()
+        )
+
+        self.assertEqual(
+            [True], backend.delete_zones(self.admin_context, [self.zone])
+        )
+        mock_execute.assert_called_once_with(
+            ['delzone', '-clean', 'example.com ']
+        )
+
+    @mock.patch.object(impl_bind9.Bind9Backend, '_execute_rndc')
+    def test_delete_zones(self, mock_execute):
+        mock_execute.side_effect = [None, exceptions.Backend('failure')]
+
+        self.assertEqual(
+            [True, False],
+            self.backend.delete_zones(self.admin_context,
+                                      [self.zone, self.zone])
+        )
+
+    @mock.patch.object(rndc.RndcClient, 'from_key_file')
+    def test_generate_rndc_client_without_key(self, mock_from_key_file):
+        mock_from_key_file.side_effect = exceptions.ConfigurationError()
+
+        self.assertIsNone(self.backend._generate_rndc_client())
+
     @mock.patch('designate.utils.execute')
     def test_execute_rndc_raises_on_exception(self, mock_execute):
         mock_execute.side_effect = utils.processutils.ProcessExecutionError()
@@ -50,6 +50,20 @@ LOGOUT_SUCCESS = {
     ]
 }
 
+TOKEN_EXPIRED = {
+    "status": "failure",
+    "data": {},
+    "job_id": 1345964648,
+    "msgs": [
+        {
+            "INFO": "login: Bad or expired credentials",
+            "SOURCE": "BLL",
+            "ERR_CD": "INVALID_DATA",
+            "LVL": "ERROR"
+        }
+    ]
+}
+
 INVALID_MASTER_DATA = {
     "status": "failure",
     "data": {}, "job_id": 1326038394,
@@ -181,3 +195,56 @@ class DynECTTestsCase(designate.tests.TestCase):
         )
 
         self.backend.create_zone(self.context, self.zone)
+
+    @requests_mock.mock()
+    def test_zone_changes_share_session(self, req_mock):
+        login = req_mock.post(
+            '%s/Session' % self.base_address,
+            json=LOGIN_SUCCESS,
+        )
+        logout = req_mock.delete(
+            '%s/Session' % self.base_address,
+            json=LOGOUT_SUCCESS,
+        )
+        req_mock.post(
+            '%s/Secondary/example.com' % self.base_address,
+            json=ACTIVATE_SUCCESS,
+        )
+        req_mock.put(
+            '%s/Secondary/example.com' % self.base_address,
+            json=ACTIVATE_SUCCESS,
+        )
+        req_mock.delete(
+            '%s/Zone/example.com' % self.base_address,
+            json=ACTIVATE_SUCCESS,
+        )
+
+        self.backend.create_zone(self.context, self.zone)
+        self.backend.create_zone(self.context, self.zone)
+        self.backend.delete_zone(self.context, self.zone)
+
+        self.assertIs(self.backend.get_client(), self.backend.get_client())
+        self.assertEqual(1, login.call_count)
+        self.assertFalse(logout.called)
+        self.assertEqual(
+            'foo', req_mock.last_request.headers['Auth-Token'])
+
+    @requests_mock.mock()
+    def test_expired_token_logs_in_again(self, req_mock):
+        login = req_mock.post(
+            '%s/Session' % self.base_address,
+            json=LOGIN_SUCCESS,
+        )
+        delete = req_mock.delete(
+            '%s/Zone/example.com' % self.base_address,
+            [{'json': TOKEN_EXPIRED, 'status_code': 400},
+             {'json': ACTIVATE_SUCCESS}],
+        )
+
+        self.backend.client.token = 'expired'
+
+        self.backend.delete_zone(self.context, self.zone)
+
+        self.assertEqual(1, login.call_count)
+        self.assertEqual(2, delete.call_count)
+        self.assertEqual('foo', self.backend.client.token)
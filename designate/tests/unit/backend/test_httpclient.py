@@ -0,0 +1,59 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from unittest import mock
+
+import oslotest.base
+import requests_mock
+
+from designate.backend import httpclient
+
+
+class HTTPSessionTestCase(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(HTTPSessionTestCase, self).setUp()
+        self.session = httpclient.HTTPSession(
+            'fake', pool_size=4, headers={'X-API-Key': 'api_key'}
+        )
+
+    def test_adapter(self):
+        adapter = self.session.get_adapter('https://192.0.2.1/')
+
+        self.assertIs(adapter, self.session.get_adapter('http://192.0.2.1/'))
+        self.assertEqual(4, adapter._pool_maxsize)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(httpclient.DEFAULT_RETRIES, adapter.max_retries.total)
+        self.assertTrue(adapter.max_retries.is_retry('GET', 503))
+        self.assertFalse(adapter.max_retries.is_retry('POST', 503))
+        self.assertFalse(adapter.max_retries.is_retry('GET', 500))
+
+    @requests_mock.mock()
+    @mock.patch.object(httpclient, 'metrics')
+    def test_request(self, req_mock, mock_metrics):
+        req_mock.get('http://192.0.2.1/zones', status_code=200)
+
+        self.session.get('http://192.0.2.1/zones')
+
+        self.assertEqual(httpclient.DEFAULT_TIMEOUT,
+                         req_mock.last_request.timeout)
+        self.assertEqual('api_key',
+                         req_mock.last_request.headers['X-API-Key'])
+        mock_metrics.timing.assert_called_once_with(
+            'backend.fake.http_request', mock.ANY
+        )
+
+    @requests_mock.mock()
+    def test_request_timeout(self, req_mock):
+        req_mock.get('http://192.0.2.1/zones', status_code=200)
+
+        self.session.get('http://192.0.2.1/zones', timeout=5)
+
+        self.assertEqual(5, req_mock.last_request.timeout)
@@ -115,3 +115,54 @@ class NSD4BackendTestCase(designate.tests.TestCase):
         self.assertRaises(exceptions.Backend,
                           self.backend.create_zone,
                           self.context, self.zone)
+
+    @mock.patch.object(eventlet, 'connect')
+    @mock.patch.object(eventlet, 'wrap_ssl')
+    def test_create_zones(self, mock_ssl, mock_connect):
+        zone = objects.Zone(
+            id='0ccf0a3e-7b3a-4b1f-9d0f-4d5c4ec1c4bd',
+            name='example.org.',
+            email='example@example.org',
+        )
+        stream = mock_ssl.return_value.makefile.return_value
+        stream.read.return_value = (
+            'zone example.com. already exists\n'
+            'error pattern test-pattern does not exist for example.org.\n'
+        )
+
+        self.assertEqual(
+            [True, False],
+            self.backend.create_zones(self.context, [self.zone, zone])
+        )
+
+        stream.write.assert_has_calls([
+            mock.call('NSDCT1 addzones\n'),
+            mock.call('example.com. test-pattern\n'),
+            mock.call('example.org. test-pattern\n'),
+            mock.call('\x04\n'),
+        ])
+        mock_connect.assert_called_once_with(('127.0.0.1', self.port))
+
+    def test_create_zones_not_supported(self):
+        self.backend._command = mock.MagicMock(side_effect=[
+            "error unknown command 'addzones'\n", 'ok\n'
+        ])
+
+        self.assertEqual(
+            [True], self.backend.create_zones(self.context, [self.zone])
+        )
+
+        self.backend._command.assert_called_with(
+            'addzone example.com. test-pattern'
+        )
+
+    def test_delete_zones(self):
+        self.backend._command = mock.MagicMock(return_value='ok\n')
+
+        self.assertEqual(
+            [True], self.backend.delete_zones(self.context, [self.zone])
+        )
+
+        self.backend._command.assert_called_once_with(
+            'delzones', ['example.com.']
+        )
@@ -281,6 +281,89 @@ class PDNS4BackendTestCase(designate.tests.TestCase):
             self.stdlog.logger.output
         )
 
+    @requests_mock.mock()
+    @mock.patch.object(mdns_rpcapi.MdnsAPI, 'notify_zone_changed')
+    def test_create_zones(self, req_mock, mock_notify_zone_changed):
+        zone = objects.Zone(
+            id='0ccf0a3e-7b3a-4b1f-9d0f-4d5c4ec1c4bd',
+            name='example.org.',
+            email='example@example.org',
+        )
+        req_mock.get(
+            '%s/localhost/zones' % self.base_address,
+            json=[{'name': 'example.com.'}, {'name': 'example.net.'}],
+        )
+        req_mock.delete(
+            '%s/localhost/zones/example.com.' % self.base_address,
+        )
+        req_mock.post(
+            '%s/localhost/zones' % self.base_address,
+        )
+
+        self.assertEqual(
+            [True, True],
+            self.backend.create_zones(self.context, [self.zone, zone])
+        )
+
+        # The zones on the server are listed once, rather than looked up
+        # zone by zone
+        self.assertEqual(
+            ['GET', 'DELETE', 'POST', 'POST'],
+            [request.method for request in req_mock.request_history]
+        )
+        self.assertEqual(
+            ['example.com.', 'example.org.'],
+            [request.json()['name'] for request in req_mock.request_history
+             if request.method == 'POST']
+        )
+        self.assertEqual(2, mock_notify_zone_changed.call_count)
+
+    @requests_mock.mock()
+    @mock.patch.object(mdns_rpcapi.MdnsAPI, 'notify_zone_changed')
+    def test_create_zones_list_fails(self, req_mock, mock_notify_zone_changed):
+        req_mock.get(
+            '%s/localhost/zones' % self.base_address,
+            status_code=500,
+        )
+        req_mock.get(
+            '%s/localhost/zones/%s' % (self.base_address, self.zone.name),
+            status_code=404,
+        )
+        req_mock.post(
+            '%s/localhost/zones' % self.base_address,
+            status_code=500,
+        )
+
+        self.assertEqual(
+            [False], self.backend.create_zones(self.context, [self.zone])
+        )
+        self.assertFalse(mock_notify_zone_changed.called)
+
+    @requests_mock.mock()
+    def test_delete_zones(self, req_mock):
+        zone = objects.Zone(
+            id='0ccf0a3e-7b3a-4b1f-9d0f-4d5c4ec1c4bd',
+            name='example.org.',
+            email='example@example.org',
+        )
+        req_mock.get(
+            '%s/localhost/zones' % self.base_address,
+            json=[{'name': 'example.com.'}],
+        )
+        req_mock.delete(
+            '%s/localhost/zones/example.com.' % self.base_address,
+        )
+
+        self.assertEqual(
+            [True, True],
+            self.backend.delete_zones(self.context, [self.zone, zone])
+        )
+
+        self.assertEqual(
+            ['GET', 'DELETE'],
+            [request.method for request in req_mock.request_history]
+        )
+
     @requests_mock.mock()
     def test_delete_zone_success(self, req_mock):
         req_mock.delete(
@@ -0,0 +1,290 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import base64
+import hmac
+import os
+import socket
+import struct
+
+import fixtures
+import oslotest.base
+
+from designate import exceptions
+from designate.backend import rndc
+
+SECRET = base64.b64encode(b'designate-rndc-secret').decode('ascii')
+
+
+class FakeNamed(object):
+    """The control channel end of named, behind a socket"""
+
+    def __init__(self, algorithm='hmac-sha256', secret=SECRET,
+                 reply_secret=None, replies=None, hang_on=None,
+                 close_on=None):
+        self.algorithm = algorithm
+        self.secret = base64.b64decode(secret)
+        self.reply_secret = base64.b64decode(reply_secret or secret)
+        self.replies = replies or {}
+        # Commands run without named replying in time
+        self.hang_on = hang_on or ()
+        # Commands run before named drops the connection without replying
+        self.close_on = close_on or ()
+        self.nonce = b'1234567890'
+        self.commands = []
+        self.closed = False
+        self._buffer = b''
+        # Becomes readable once named closed the connection, like the socket
+        self._local, self._remote = socket.socketpair()
+
+    def sendall(self, data):
+        if self.closed:
+            return
+
+        length, version = struct.unpack('>II', data[:8])
+        assert version == 1 and length == len(data) - 4
+
+        # The signature covers everything following the _auth table
+        message, auth_end = rndc._parse(data[8:])
+        assert message['_auth'] == self._auth(data[8:][auth_end:])
+
+        command = message['_data']['type'].decode('utf-8')
+        if command != 'null':
+            assert message['_ctrl']['_nonce'] == self.nonce
+        self.commands.append(command)
+        if command in self.hang_on:
+            return
+        if command in self.close_on:
+            self.close()
+            return
+
+        reply = rndc._serialize({
+            '_ctrl': {
+                '_ser': message['_ctrl']['_ser'],
+                '_rpl': b'1',
+                '_nonce': self.nonce,
+            },
+            '_data': self.replies.get(command, {'result': b'0'}),
+        })
+        reply = rndc._serialize(
+            {'_auth': self._auth(reply, self.reply_secret)}) + reply
+        self._buffer += struct.pack('>II', len(reply) + 4, 1) + reply
+
+    def recv(self, length):
+        if self.closed:
+            return b''
+        if not self._buffer and self.hang_on:
+            raise socket.timeout('timed out')
+        data, self._buffer = self._buffer[:length], self._buffer[length:]
+        return data
+
+    def fileno(self):
+        return self._local.fileno()
+
+    def close(self):
+        self.closed = True
+        self._remote.close()
+
+    def _auth(self, data, secret=None):
+        digestmod, algorithm_id = rndc.ALGORITHMS[self.algorithm]
+        digest = base64.b64encode(
+            hmac.new(secret or self.secret, data, digestmod).digest())
+        if algorithm_id is None:
+            return {'hmd5': digest[:22]}
+        return {'hsha': struct.pack('B88s', algorithm_id, digest)}
+
+
+class RndcClientTestCase(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(RndcClientTestCase, self).setUp()
+        self.named = []
+        self.mock_connect = self.useFixture(fixtures.MockPatchObject(
+            socket, 'create_connection', side_effect=self._connect)).mock
+
+    def _connect(self, address, timeout=None):
+        named = FakeNamed(**getattr(self, 'named_kwargs', {}))
+        self.addCleanup(named._local.close)
+        self.addCleanup(named._remote.close)
+        self.named.append(named)
+        return named
+
+    def _client(self, algorithm='hmac-sha256', secret=SECRET):
+        return rndc.RndcClient('127.0.0.1', 953, algorithm, secret)
+
+    def test_call(self):
+        client = self._client()
+
+        client.call('reload example.org')
+
+        self.mock_connect.assert_called_once_with(('127.0.0.1', 953), None)
+        self.assertEqual(['null', 'reload example.org'],
+                         self.named[0].commands)
+
+    def test_call_hmac_md5(self):
+        self.named_kwargs = {'algorithm': 'hmac-md5'}
+        client = self._client(algorithm='hmac-md5')
+
+        client.call('reload example.org')
+
+        self.assertEqual(['null', 'reload example.org'],
+                         self.named[0].commands)
+
+    def test_call_failure(self):
+        self.named_kwargs = {'replies': {
+            'delzone example.org': {'result': b'1', 'err': b'not found'}
+        }}
+        client = self._client()
+
+        self.assertRaisesRegex(
+            exceptions.Backend, "'delzone' failed: not found",
+            client.call, 'delzone example.org'
+        )
+
+    def test_connection_is_kept(self):
+        client = self._client()
+
+        client.call('reload example.org')
+        client.call('reload example.com')
+
+        self.assertEqual(1, self.mock_connect.call_count)
+        self.assertEqual(
+            ['null', 'reload example.org', 'reload example.com'],
+            self.named[0].commands)
+
+    def test_pipeline(self):
+        self.named_kwargs = {'replies': {
+            'addzone example.com': {'result': b'1', 'err': b'already exists'}
+        }}
+        client = self._client()
+
+        results = client.pipeline(
+            ['addzone example.org', 'addzone example.com'])
+
+        self.assertEqual([True, False], [r.ok for r in results])
+        self.assertEqual('already exists', results[1].err)
+        self.assertEqual(1, self.mock_connect.call_count)
+
+    def test_reconnect_when_closed(self):
+        client = self._client()
+        client.call('reload example.org')
+
+        self.named[0].close()
+        client.call('reload example.com')
+
+        self.assertEqual(2, self.mock_connect.call_count)
+        self.assertEqual(['null', 'reload example.com'],
+                         self.named[1].commands)
+
+    def test_bad_signature(self):
+        self.named_kwargs = {
+            'reply_secret': base64.b64encode(b'another').decode('ascii')
+        }
+        client = self._client()
+
+        self.assertRaisesRegex(
+            rndc.RndcConnectFailed, 'failed authentication',
+            client.call, 'reload example.org'
+        )
+
+    def test_connect_failure(self):
+        self.mock_connect.side_effect = socket.error('Connection refused')
+        client = self._client()
+
+        self.assertRaises(
+            rndc.RndcConnectFailed, client.call, 'reload example.org'
+        )
+
+    def test_timeout_after_sending(self):
+        self.named_kwargs = {'hang_on': ['addzone example.org']}
+        client = self._client()
+
+        e = self.assertRaises(
+            rndc.RndcConnectionError, client.call, 'addzone example.org'
+        )
+
+        # named got the command, it must not be sent again
+        self.assertNotIsInstance(e, rndc.UNSENT_ERRORS)
+        self.assertEqual(['null', 'addzone example.org'],
+                         self.named[0].commands)
+
+    def test_closed_after_sending(self):
+        self.named_kwargs = {'close_on': ['addzone example.org']}
+        client = self._client()
+
+        e = self.assertRaises(
+            rndc.RndcConnectionError, client.pipeline,
+            ['addzone example.org', 'addzone example.com']
+        )
+
+        # named may have run the commands before dropping the connection
+        self.assertNotIsInstance(e, rndc.UNSENT_ERRORS)
+        self.assertEqual(1, self.mock_connect.call_count)
+        self.assertEqual(['null', 'addzone example.org'],
+                         self.named[0].commands)
+
+    def test_closed_while_idle_not_reused(self):
+        client = self._client()
+        client.call('reload example.org')
+
+        self.named[0].close()
+        self.assertTrue(client._idle[0].closed_by_peer())
+
+        client.call('reload example.com')
+
+        self.assertEqual(2, self.mock_connect.call_count)
+        self.assertEqual(['null', 'reload example.org'],
+                         self.named[0].commands)
+
+    def test_unsupported_algorithm(self):
+        self.assertRaises(
+            exceptions.ConfigurationError, self._client, algorithm='hmac-xyz'
+        )
+
+
+class LoadKeyTestCase(oslotest.base.BaseTestCase):
+    def _write(self, content):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'rndc')
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_load_key_file(self):
+        path = self._write(
+            'key "rndc-key" {\n'
+            '    algorithm hmac-sha256;\n'
+            '    secret "%s";\n'
+            '};\n' % SECRET
+        )
+
+        self.assertEqual(('hmac-sha256', SECRET),
+                         rndc.load_key(key_file=path))
+
+    def test_load_key_config_file_default_key(self):
+        path = self._write(
+            '# rndc.conf\n'
+            'key "other" { algorithm hmac-md5; secret "b3RoZXI="; };\n'
+            'key "rndc-key" { algorithm HMAC-SHA512; secret "%s"; };\n'
+            'options {\n'
+            '    default-key "rndc-key";\n'
+            '    default-server 127.0.0.1;\n'
+            '};\n' % SECRET
+        )
+
+        self.assertEqual(('hmac-sha512', SECRET),
+                         rndc.load_key(config_file=path))
+
+    def test_load_key_missing(self):
+        path = self._write('options { default-server 127.0.0.1; };\n')
+
+        self.assertRaises(exceptions.ConfigurationError,
+                          rndc.load_key, key_file=path)
+        self.assertRaises(exceptions.ConfigurationError,
+                          rndc.load_key, key_file=path + '.missing')
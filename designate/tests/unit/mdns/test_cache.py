@@ -0,0 +1,168 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+from unittest import mock
+
+import oslotest.base
+
+from designate.mdns import cache
+
+
+class XFRCacheTest(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(XFRCacheTest, self).setUp()
+        self.cache = cache.XFRCache(100)
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get('zone1', 1, 'v'))
+
+    def test_set_and_get(self):
+        messages = [(b'a' * 10, (1, 1, 0, 0))]
+        self.cache.set('zone1', 1, 'v', messages)
+
+        self.assertEqual(messages, self.cache.get('zone1', 1, 'v'))
+        self.assertIsNone(self.cache.get('zone1', 1, 'other'))
+        self.assertIsNone(self.cache.get('zone1', 2, 'v'))
+        self.assertEqual(10, self.cache.size)
+
+    def test_new_serial_invalidates_zone(self):
+        self.cache.set('zone1', 1, 'v1', [(b'a' * 10, ())])
+        self.cache.set('zone1', 1, 'v2', [(b'a' * 10, ())])
+        self.cache.set('zone2', 1, 'v1', [(b'a' * 10, ())])
+
+        self.cache.set('zone1', 2, 'v1', [(b'b' * 10, ())])
+
+        self.assertIsNone(self.cache.get('zone1', 1, 'v1'))
+        self.assertIsNone(self.cache.get('zone1', 1, 'v2'))
+        self.assertIsNotNone(self.cache.get('zone1', 2, 'v1'))
+        self.assertIsNotNone(self.cache.get('zone2', 1, 'v1'))
+        self.assertEqual(20, self.cache.size)
+
+    def test_invalidate(self):
+        self.cache.set('zone1', 1, 'v', [(b'a' * 10, ())])
+        self.cache.invalidate('zone1')
+
+        self.assertIsNone(self.cache.get('zone1', 1, 'v'))
+        self.assertEqual(0, self.cache.size)
+
+    def test_lru_eviction(self):
+        self.cache.set('zone1', 1, 'v', [(b'a' * 40, ())])
+        self.cache.set('zone2', 1, 'v', [(b'a' * 40, ())])
+
+        # Use zone1 so zone2 becomes the least recently used entry
+        self.cache.get('zone1', 1, 'v')
+        self.cache.set('zone3', 1, 'v', [(b'a' * 40, ())])
+
+        self.assertIsNotNone(self.cache.get('zone1', 1, 'v'))
+        self.assertIsNone(self.cache.get('zone2', 1, 'v'))
+        self.assertIsNotNone(self.cache.get('zone3', 1, 'v'))
+        self.assertEqual(80, self.cache.size)
+
+    def test_too_large(self):
+        self.cache.set('zone1', 1, 'v', [(b'a' * 101, ())])
+
+        self.assertIsNone(self.cache.get('zone1', 1, 'v'))
+        self.assertEqual(0, self.cache.size)
+
+
+class RecordCacheTest(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(RecordCacheTest, self).setUp()
+        self.cache = cache.RecordCache(60, 2)
+        self.zone = mock.Mock(id='zone1', pool_id='pool1', serial=10)
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get('example.org.', 6))
+
+    def test_set_and_get(self):
+        self.cache.set('example.org.', 6, self.zone, 'rrset',
+                       self.cache.generation)
+
+        self.assertEqual(('zone1', 'pool1', 'rrset'),
+                         self.cache.get('example.org.', 6))
+        self.assertIsNone(self.cache.get('example.org.', 1))
+
+    @mock.patch('time.time')
+    def test_expired(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.set('example.org.', 6, self.zone, 'rrset',
+                       self.cache.generation)
+
+        mock_time.return_value = 1061
+        self.assertIsNone(self.cache.get('example.org.', 6))
+
+    def test_invalidate(self):
+        self.cache.set('example.org.', 6, self.zone, 'rrset',
+                       self.cache.generation)
+        other_zone = mock.Mock(id='zone2', pool_id='pool1', serial=10)
+        self.cache.set('example.com.', 6, other_zone, 'rrset',
+                       self.cache.generation)
+
+        self.cache.invalidate('zone1', 11)
+
+        self.assertIsNone(self.cache.get('example.org.', 6))
+        self.assertIsNotNone(self.cache.get('example.com.', 6))
+
+    def test_invalidate_ignores_older_serial(self):
+        self.cache.invalidate('zone1', 11)
+
+        # Read before the change was committed
+        self.cache.set('example.org.', 6, self.zone, 'rrset',
+                       self.cache.generation)
+        self.assertIsNone(self.cache.get('example.org.', 6))
+
+        self.zone.serial = 11
+        self.cache.set('example.org.', 6, self.zone, 'rrset',
+                       self.cache.generation)
+        self.assertIsNotNone(self.cache.get('example.org.', 6))
+
+    def test_invalidate_during_lookup(self):
+        generation = self.cache.generation
+        self.cache.invalidate('zone1', 10)
+
+        self.cache.set('example.org.', 6, self.zone, 'rrset', generation)
+
+        self.assertIsNone(self.cache.get('example.org.', 6))
+
+    def test_invalidate_deleted_zone(self):
+        self.cache.invalidate('zone1')
+
+        self.zone.serial = 12
+        self.cache.set('example.org.', 6, self.zone, 'rrset',
+                       self.cache.generation)
+
+        self.assertIsNone(self.cache.get('example.org.', 6))
+
+    @mock.patch('time.time')
+    def test_invalidation_expires(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.invalidate('zone1', 11)
+
+        mock_time.return_value = 1061
+        self.cache.set('example.org.', 6, self.zone, 'rrset',
+                       self.cache.generation)
+
+        self.assertIsNotNone(self.cache.get('example.org.', 6))
+        self.assertEqual({}, self.cache._invalidations)
+
+    def test_lru_eviction(self):
+        for name in ('a.example.org.', 'b.example.org.'):
+            self.cache.set(name, 6, self.zone, 'rrset',
+                           self.cache.generation)
+
+        # Use a so b becomes the least recently used entry
+        self.cache.get('a.example.org.', 6)
+        self.cache.set('c.example.org.', 6, self.zone, 'rrset',
+                       self.cache.generation)
+
+        self.assertIsNotNone(self.cache.get('a.example.org.', 6))
+        self.assertIsNone(self.cache.get('b.example.org.', 6))
+        self.assertIsNotNone(self.cache.get('c.example.org.', 6))
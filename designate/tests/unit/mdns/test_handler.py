@@ -175,6 +175,298 @@ class MdnsHandleTest(oslotest.base.BaseTestCase):
             self.stdlog.logger.output
         )
 
+    def test_axfr_groups_records_into_rrsets(self):
+        self.storage.find_zone.return_value = objects.Zone(
+            id='e2bed4dc-9d01-11e4-89d3-123b93f75cba',
+            name='example.org.',
+            ttl=3600,
+        )
+
+        def _find_recordsets_axfr(context, criterion):
+            if criterion['type'] == 'SOA':
+                return iter([
+                    ('UUID1', 'SOA', None, 'example.org.',
+                     'ns1.example.org. example.example.org. 1 3600 600 '
+                     '86400 3600', 'NONE'),
+                ])
+            return iter([
+                ('UUID2', 'A', 300, 'www.example.org.', '192.0.2.1', 'NONE'),
+                ('UUID2', 'A', 300, 'www.example.org.', '192.0.2.2', 'NONE'),
+                ('UUID3', 'A', None, 'mail.example.org.', '192.0.2.3',
+                 'NONE'),
+            ])
+
+        self.storage.find_recordsets_axfr.side_effect = _find_recordsets_axfr
+
+        request = dns.message.make_query(
+            'example.org.', dns.rdatatype.AXFR
+        )
+        request.environ = dict(context=self.context)
+
+        response = tuple(self.handler._handle_axfr(request))
+
+        self.assertEqual(1, len(response))
+
+        # SOA, 2x www A, 1x mail A and the trailing SOA
+        self.assertEqual(5, response[0].counts[dns.renderer.ANSWER])
+
+        message = dns.message.from_wire(response[0].get_wire())
+        self.assertEqual(dns.rdatatype.SOA, message.answer[0].rdtype)
+
+        www = message.find_rrset(
+            message.answer, dns.name.from_text('www.example.org.'),
+            dns.rdataclass.IN, dns.rdatatype.A)
+        self.assertEqual(2, len(www))
+        self.assertEqual(300, www.ttl)
+
+        mail = message.find_rrset(
+            message.answer, dns.name.from_text('mail.example.org.'),
+            dns.rdataclass.IN, dns.rdatatype.A)
+        self.assertEqual(3600, mail.ttl)
+
+    def test_axfr_served_from_cache(self):
+        self.storage.find_zone.return_value = objects.Zone(
+            id='e2bed4dc-9d01-11e4-89d3-123b93f75cba',
+            name='example.org.',
+            ttl=3600,
+            serial=1,
+        )
+
+        def _find_recordsets_axfr(context, criterion):
+            if criterion['type'] == 'SOA':
+                return iter([
+                    ('UUID1', 'SOA', None, 'example.org.',
+                     'ns1.example.org. example.example.org. 1 3600 600 '
+                     '86400 3600', 'NONE'),
+                ])
+            return iter([
+                ('UUID2', 'A', 300, 'www.example.org.', '192.0.2.1', 'NONE'),
+            ])
+
+        self.storage.find_recordsets_axfr.side_effect = _find_recordsets_axfr
+
+        request = dns.message.make_query(
+            'example.org.', dns.rdatatype.AXFR
+        )
+        request.environ = dict(context=self.context)
+        first = [r.get_wire() for r in self.handler._handle_axfr(request)]
+
+        self.assertEqual(2, self.storage.find_recordsets_axfr.call_count)
+
+        request = dns.message.make_query(
+            'example.org.', dns.rdatatype.AXFR
+        )
+        request.environ = dict(context=self.context)
+        second = [r.get_wire() for r in self.handler._handle_axfr(request)]
+
+        # The second transfer must not touch the records
+        self.assertEqual(2, self.storage.find_recordsets_axfr.call_count)
+
+        self.assertEqual(1, len(second))
+        # Only the message id differs
+        self.assertEqual(request.id, dns.message.from_wire(second[0]).id)
+        self.assertEqual(first[0][2:], second[0][2:])
+
+    def test_axfr_cache_keyed_on_question(self):
+        self.storage.find_zone.return_value = objects.Zone(
+            id='e2bed4dc-9d01-11e4-89d3-123b93f75cba',
+            name='example.org.',
+            ttl=3600,
+            serial=1,
+        )
+
+        def _find_recordsets_axfr(context, criterion):
+            if criterion['type'] == 'SOA':
+                return iter([
+                    ('UUID1', 'SOA', None, 'example.org.',
+                     'ns1.example.org. example.example.org. 1 3600 600 '
+                     '86400 3600', 'NONE'),
+                ])
+            return iter([])
+
+        self.storage.find_recordsets_axfr.side_effect = _find_recordsets_axfr
+
+        request = dns.message.make_query(
+            'example.org.', dns.rdatatype.IXFR
+        )
+        request.environ = dict(context=self.context)
+        tuple(self.handler._handle_axfr(request))
+
+        request = dns.message.make_query(
+            'example.org.', dns.rdatatype.AXFR
+        )
+        request.environ = dict(context=self.context)
+        response = tuple(self.handler._handle_axfr(request))
+
+        # The transfer rendered for the IXFR question is not replayed
+        self.assertEqual(4, self.storage.find_recordsets_axfr.call_count)
+        message = dns.message.from_wire(response[0].get_wire())
+        self.assertEqual(dns.rdatatype.AXFR, message.question[0].rdtype)
+
+    def test_axfr_cache_invalidated_on_serial_change(self):
+        zone = objects.Zone(
+            id='e2bed4dc-9d01-11e4-89d3-123b93f75cba',
+            name='example.org.',
+            ttl=3600,
+            serial=1,
+        )
+        self.storage.find_zone.return_value = zone
+
+        def _find_recordsets_axfr(context, criterion):
+            if criterion['type'] == 'SOA':
+                return iter([
+                    ('UUID1', 'SOA', None, 'example.org.',
+                     'ns1.example.org. example.example.org. %d 3600 600 '
+                     '86400 3600' % zone.serial, 'NONE'),
+                ])
+            return iter([])
+
+        self.storage.find_recordsets_axfr.side_effect = _find_recordsets_axfr
+
+        request = dns.message.make_query(
+            'example.org.', dns.rdatatype.AXFR
+        )
+        request.environ = dict(context=self.context)
+        tuple(self.handler._handle_axfr(request))
+
+        zone.serial = 2
+        tuple(self.handler._handle_axfr(request))
+
+        self.assertEqual(4, self.storage.find_recordsets_axfr.call_count)
+
+    def test_axfr_cache_disabled(self):
+        CONF.set_override('axfr_cache_size', 0, 'service:mdns')
+
+        handler_ = handler.RequestHandler(self.storage, self.tg)
+
+        self.assertIsNone(handler_.axfr_cache)
+
+    def _setup_ixfr(self, serial):
+        self.storage.find_zone.return_value = objects.Zone(
+            id='e2bed4dc-9d01-11e4-89d3-123b93f75cba',
+            name='example.org.',
+            ttl=3600,
+            serial=serial,
+        )
+
+        def _find_recordsets_axfr(context, criterion):
+            if criterion['type'] == 'SOA':
+                return iter([
+                    ('UUID1', 'SOA', None, 'example.org.',
+                     'ns1.example.org. example.example.org. %d 3600 600 '
+                     '86400 3600' % serial, 'NONE'),
+                ])
+            return iter([
+                ('UUID2', 'A', 300, 'www.example.org.', '192.0.2.2', 'NONE'),
+            ])
+
+        self.storage.find_recordsets_axfr.side_effect = _find_recordsets_axfr
+
+    def _make_ixfr_request(self, serial):
+        request = dns.message.make_query(
+            'example.org.', dns.rdatatype.IXFR
+        )
+        request.authority.append(dns.rrset.from_text(
+            'example.org.', 3600, dns.rdataclass.IN, dns.rdatatype.SOA,
+            'ns1.example.org. example.example.org. %d 3600 600 86400 3600' %
+            serial))
+        request.environ = dict(context=self.context)
+        return request
+
+    def test_ixfr(self):
+        self._setup_ixfr(3)
+        self.storage.find_zone_journal.return_value = [
+            (1, 2, 'SOA', None, None, None, None),
+            (None, 2, 'ADD', 'www.example.org.', 300, 'A', '192.0.2.1'),
+            (2, 3, 'SOA', None, None, None, None),
+            (None, 3, 'DEL', 'www.example.org.', 300, 'A', '192.0.2.1'),
+            (None, 3, 'ADD', 'www.example.org.', 300, 'A', '192.0.2.2'),
+            (None, 3, 'ADD', 'www.example.org.', None, 'TXT', '"foo"'),
+        ]
+
+        response = tuple(self.handler._handle_ixfr(self._make_ixfr_request(2)))
+
+        self.assertEqual(1, len(response))
+        self.storage.find_zone_journal.assert_called_once_with(
+            self.context, 'e2bed4dc-9d01-11e4-89d3-123b93f75cba', 2)
+
+        message = dns.message.from_wire(
+            response[0].get_wire(), one_rr_per_rrset=True)
+        answer = [(dns.rdatatype.to_text(rrset.rdtype), rrset.ttl,
+                   rrset[0].to_text()) for rrset in message.answer]
+
+        soa = 'ns1.example.org. example.example.org. %d 3600 600 86400 3600'
+        self.assertEqual([
+            ('SOA', 3600, soa % 3),
+            ('SOA', 3600, soa % 2),
+            ('A', 300, '192.0.2.1'),
+            ('SOA', 3600, soa % 3),
+            ('A', 300, '192.0.2.2'),
+            ('TXT', 3600, '"foo"'),
+            ('SOA', 3600, soa % 3),
+        ], answer)
+
+    def test_ixfr_up_to_date(self):
+        self._setup_ixfr(3)
+
+        response = tuple(self.handler._handle_ixfr(self._make_ixfr_request(3)))
+
+        self.assertEqual(1, len(response))
+        self.assertEqual(1, response[0].counts[dns.renderer.ANSWER])
+        self.assertFalse(self.storage.find_zone_journal.called)
+
+    def test_ixfr_falls_back_to_axfr_on_journal_gap(self):
+        self._setup_ixfr(3)
+        self.storage.find_zone_journal.return_value = [
+            (2, 3, 'SOA', None, None, None, None),
+        ]
+
+        response = tuple(self.handler._handle_ixfr(self._make_ixfr_request(1)))
+
+        # SOA, www A and the trailing SOA
+        self.assertEqual(1, len(response))
+        self.assertEqual(3, response[0].counts[dns.renderer.ANSWER])
+        self.assertEqual(3, self.storage.find_recordsets_axfr.call_count)
+
+    def test_ixfr_without_client_soa(self):
+        self._setup_ixfr(3)
+
+        request = dns.message.make_query(
+            'example.org.', dns.rdatatype.IXFR
+        )
+        request.environ = dict(context=self.context)
+
+        response = tuple(self.handler._handle_ixfr(request))
+
+        self.assertEqual(3, response[0].counts[dns.renderer.ANSWER])
+        self.assertFalse(self.storage.find_zone_journal.called)
+
+    def test_get_journal_transitions(self):
+        rows = [
+            (1, 2, 'SOA', None, None, None, None),
+            (None, 2, 'ADD', 'www.example.org.', 300, 'A', '192.0.2.1'),
+            (2, 3, 'SOA', None, None, None, None),
+            (None, 3, 'DEL', 'www.example.org.', 300, 'A', '192.0.2.1'),
+        ]
+
+        self.assertEqual(
+            [(1, 2, [], [('www.example.org.', 300, 'A', '192.0.2.1')]),
+             (2, 3, [('www.example.org.', 300, 'A', '192.0.2.1')], [])],
+            self.handler._get_journal_transitions(rows, 1, 3))
+
+        # The changes leading to the client serial are skipped
+        self.assertEqual(
+            [(2, 3, [('www.example.org.', 300, 'A', '192.0.2.1')], [])],
+            self.handler._get_journal_transitions(rows, 2, 3))
+
+        # The journal does not reach the current serial
+        self.assertIsNone(self.handler._get_journal_transitions(rows, 1, 4))
+
+        # Changes made without a serial change break the chain
+        rows.append((None, 3, 'SOA', None, None, None, None))
+        self.assertIsNone(self.handler._get_journal_transitions(rows, 1, 3))
+        self.assertIsNone(self.handler._get_journal_transitions(rows, 3, 4))
+
     def test_get_max_message_size(self):
         CONF.set_override('max_message_size', 32768, 'service:mdns')
 
@@ -211,6 +503,7 @@ class TestRequestHandlerCall(oslotest.base.BaseTestCase):
         # Use a simple handlers that doesn't require a real request
         self.handler._handle_query_error = mock.Mock(return_value='Error')
         self.handler._handle_axfr = mock.Mock(return_value=['AXFR'])
+        self.handler._handle_ixfr = mock.Mock(return_value=['IXFR'])
         self.handler._handle_record_query = mock.Mock(
             return_value=['Record Query'])
         self.handler._handle_notify = mock.Mock(return_value=['Notify'])
@@ -271,7 +564,7 @@ class TestRequestHandlerCall(oslotest.base.BaseTestCase):
             mock.Mock(rdclass=dns.rdataclass.IN, rdtype=dns.rdatatype.IXFR)
         ]
 
-        self.assertEqual(['AXFR'], list(self.handler(request)))
+        self.assertEqual(['IXFR'], list(self.handler(request)))
 
     def test__call__record_query(self):
         request = mock.Mock()
@@ -45,10 +45,32 @@ class MdnsServiceTest(oslotest.base.BaseTestCase):
     @mock.patch.object(designate.service.DNSService, 'start')
     @mock.patch.object(designate.service.RPCService, 'start')
     def test_service_start(self, mock_rpc_start, mock_dns_start):
+        self.service.storage.find_tsigkeys.return_value = [
+            mock.Mock(name='tsigkey', secret='c2VjcmV0')
+        ]
+
         self.service.start()
 
         self.assertTrue(mock_dns_start.called)
         self.assertTrue(mock_rpc_start.called)
+        self.assertEqual(1, len(self.service.tsigkey_cache.data))
+
+    def test_tsigkey_cache_disabled(self):
+        CONF.set_override('tsigkey_cache_ttl', 0, 'service:mdns')
+
+        self.service._tsigkey_cache = None
+
+        self.assertIsNone(self.service.tsigkey_cache)
+
+    def test_record_cache_disabled_by_default(self):
+        self.assertIsNone(self.service.record_cache)
+
+    def test_record_cache(self):
+        CONF.set_override('record_cache_ttl', 30, 'service:mdns')
+        CONF.set_override('record_cache_size', 10, 'service:mdns')
+
+        self.assertEqual(30, self.service.record_cache.ttl)
+        self.assertEqual(10, self.service.record_cache.max_entries)
 
     def test_service_stop(self):
         self.service.dns_service.stop = mock.Mock()
@@ -15,6 +15,9 @@
 # under the License.
 from unittest import mock
 
+from keystoneauth1 import identity
+from keystoneauth1 import noauth
+from keystoneauth1 import token_endpoint
 from neutronclient.common import exceptions as neutron_exceptions
 from neutronclient.v2_0 import client as clientv20
 from oslo_config import cfg
@@ -39,6 +42,9 @@ class NeutronNetworkAPITest(oslotest.base.BaseTestCase):
             'network_api:neutron'
         )
 
+        neutron.reset_client_pool()
+        self.addCleanup(neutron.reset_client_pool)
+
         self.api = get_network_api('neutron')
         self.context = context.DesignateContext(
             user_id='12345', project_id='54321',
@@ -50,15 +56,10 @@ class NeutronNetworkAPITest(oslotest.base.BaseTestCase):
 
         _, kwargs = mock_client.call_args
 
-        self.assertIn('endpoint_url', kwargs)
-        self.assertIn('timeout', kwargs)
-        self.assertIn('insecure', kwargs)
-        self.assertIn('ca_cert', kwargs)
-
-        self.assertNotIn('token', kwargs)
-        self.assertNotIn('username', kwargs)
+        self.assertIn('session', kwargs)
+        self.assertIsNone(kwargs['auth'])
 
-        self.assertEqual('http://localhost:9696', kwargs['endpoint_url'])
+        self.assertEqual('http://localhost:9696', kwargs['endpoint_override'])
 
     @mock.patch.object(clientv20, 'Client')
     def test_get_client_using_token(self, mock_client):
@@ -70,15 +71,16 @@ class NeutronNetworkAPITest(oslotest.base.BaseTestCase):
 
         _, kwargs = mock_client.call_args
 
-        self.assertIn('token', kwargs)
-        self.assertIn('auth_strategy', kwargs)
-        self.assertNotIn('username', kwargs)
+        self.assertIsInstance(kwargs['auth'], token_endpoint.Token)
 
-        self.assertEqual('http://localhost:9696', kwargs['endpoint_url'])
-        self.assertEqual(self.context.auth_token, kwargs['token'])
+        self.assertEqual('http://localhost:9696', kwargs['endpoint_override'])
+        self.assertEqual(
+            self.context.auth_token, kwargs['auth'].get_token(None)
+        )
 
+    @mock.patch.object(identity, 'Password')
     @mock.patch.object(clientv20, 'Client')
-    def test_get_client_using_admin(self, mock_client):
+    def test_get_client_using_admin(self, mock_client, mock_password):
         CONF.set_override(
             'admin_username', 'test',
             'network_api:neutron'
@@ -87,19 +89,67 @@ class NeutronNetworkAPITest(oslotest.base.BaseTestCase):
         neutron.get_client(self.context, 'http://localhost:9696')
 
         _, kwargs = mock_client.call_args
+        _, auth_kwargs = mock_password.call_args
 
-        self.assertIn('auth_strategy', kwargs)
-        self.assertIn('username', kwargs)
-        self.assertIn('project_name', kwargs)
-        self.assertIn('password', kwargs)
-        self.assertIn('auth_url', kwargs)
-        self.assertNotIn('token', kwargs)
+        self.assertEqual(mock_password.return_value, kwargs['auth'])
 
-        self.assertEqual('http://localhost:9696', kwargs['endpoint_url'])
+        self.assertEqual('http://localhost:9696', kwargs['endpoint_override'])
+        self.assertIn('auth_url', auth_kwargs)
+        self.assertIn('password', auth_kwargs)
+        self.assertIn('project_name', auth_kwargs)
         self.assertEqual(
-            kwargs['username'], CONF['network_api:neutron'].admin_username
+            CONF['network_api:neutron'].admin_username,
+            auth_kwargs['username']
         )
 
+    @mock.patch.object(clientv20, 'Client')
+    def test_get_client_using_admin_noauth(self, mock_client):
+        CONF.set_override(
+            'admin_username', 'test',
+            'network_api:neutron'
+        )
+        CONF.set_override(
+            'auth_strategy', 'noauth',
+            'network_api:neutron'
+        )
+
+        neutron.get_client(self.context, 'http://localhost:9696')
+
+        _, kwargs = mock_client.call_args
+
+        self.assertIsInstance(kwargs['auth'], noauth.NoAuth)
+
+    @mock.patch.object(clientv20, 'Client')
+    def test_get_client_shares_session_and_admin_auth(self, mock_client):
+        CONF.set_override(
+            'admin_username', 'test',
+            'network_api:neutron'
+        )
+
+        neutron.get_client(self.context, 'http://localhost:9696')
+        neutron.get_client(self.context, 'http://localhost:9697')
+
+        (_, first), (_, second) = mock_client.call_args_list
+
+        self.assertIs(first['session'], second['session'])
+        self.assertIs(first['auth'], second['auth'])
+
+    def test_get_session_insecure(self):
+        CONF.set_override(
+            'insecure', True,
+            'network_api:neutron'
+        )
+
+        self.assertFalse(neutron.get_session().verify)
+
+    def test_get_session_ca_certificates_file(self):
+        CONF.set_override(
+            'ca_certificates_file', '/etc/ssl/neutron.pem',
+            'network_api:neutron'
+        )
+
+        self.assertEqual('/etc/ssl/neutron.pem', neutron.get_session().verify)
+
     @mock.patch.object(neutron, 'get_client')
     def test_list_floatingips(self, get_client):
         driver = mock.Mock()
@@ -139,3 +189,122 @@ class NeutronNetworkAPITest(oslotest.base.BaseTestCase):
             exceptions.NeutronCommunicationFailure,
             self.api.list_floatingips, self.context
         )
+
+    @mock.patch.object(neutron, 'get_client')
+    def test_list_floatingips_cached(self, get_client):
+        CONF.set_override(
+            'floatingip_cache_ttl', 60,
+            'network_api:neutron'
+        )
+        self.api = get_network_api('neutron')
+
+        driver = mock.Mock()
+        driver.list_floatingips.return_value = {'floatingips': [
+            {
+                'id': '123',
+                'floating_ip_address': '192.168.0.100',
+            },
+        ]}
+        get_client.return_value = driver
+
+        self.assertEqual(1, len(self.api.list_floatingips(self.context)))
+        self.assertEqual(1, len(self.api.list_floatingips(self.context)))
+        self.assertEqual(1, driver.list_floatingips.call_count)
+
+        # Another project and another region are looked up in Neutron
+        self.api.list_floatingips(self.context, region='RegionOne')
+        self.api.list_floatingips(context.DesignateContext(
+            user_id='12345', project_id='67890',
+        ))
+        self.assertEqual(3, driver.list_floatingips.call_count)
+
+        self.api.invalidate_floatingip_cache('54321')
+
+        self.api.list_floatingips(self.context)
+        self.api.list_floatingips(context.DesignateContext(
+            user_id='12345', project_id='67890',
+        ))
+        self.assertEqual(4, driver.list_floatingips.call_count)
+
+        self.api.invalidate_floatingip_cache()
+
+        self.api.list_floatingips(context.DesignateContext(
+            user_id='12345', project_id='67890',
+        ))
+        self.assertEqual(5, driver.list_floatingips.call_count)
+
+    @mock.patch.object(neutron, 'get_client')
+    def test_list_floatingips_unauthorized_not_cached(self, get_client):
+        CONF.set_override(
+            'floatingip_cache_ttl', 60,
+            'network_api:neutron'
+        )
+        self.api = get_network_api('neutron')
+
+        driver = mock.Mock()
+        driver.list_floatingips.side_effect = neutron_exceptions.Unauthorized
+        get_client.return_value = driver
+
+        self.assertEqual(0, len(self.api.list_floatingips(self.context)))
+        self.assertEqual(0, len(self.api.list_floatingips(self.context)))
+        self.assertEqual(2, driver.list_floatingips.call_count)
+
+
+class FloatingIPCacheTest(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(FloatingIPCacheTest, self).setUp()
+        self.cache = neutron.FloatingIPCache(60)
+        self.floating_ips = [
+            {'id': '123', 'address': '192.168.0.100', 'region': 'RegionOne'}
+        ]
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get('54321', None))
+
+    def test_set_and_get(self):
+        self.cache.set('54321', None, self.floating_ips)
+
+        self.assertEqual(self.floating_ips, self.cache.get('54321', None))
+        self.assertIsNone(self.cache.get('54321', 'RegionOne'))
+        self.assertIsNone(self.cache.get('67890', None))
+
+    @mock.patch('time.time')
+    def test_get_expired(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.set('54321', None, self.floating_ips)
+
+        mock_time.return_value = 1059
+        self.assertIsNotNone(self.cache.get('54321', None))
+
+        mock_time.return_value = 1060
+        self.assertIsNone(self.cache.get('54321', None))
+
+    @mock.patch('time.time')
+    def test_set_purges_expired(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.set('54321', None, self.floating_ips)
+
+        mock_time.return_value = 1100
+        self.cache.set('67890', None, self.floating_ips)
+
+        self.assertEqual([('67890', None)], list(self.cache.data))
+
+    def test_invalidate_project(self):
+        self.cache.set('54321', None, self.floating_ips)
+        self.cache.set('54321', 'RegionOne', self.floating_ips)
+        self.cache.set('67890', None, self.floating_ips)
+
+        self.cache.invalidate('54321')
+
+        self.assertIsNone(self.cache.get('54321', None))
+        self.assertIsNone(self.cache.get('54321', 'RegionOne'))
+        self.assertIsNotNone(self.cache.get('67890', None))
+
+    def test_invalidate_all(self):
+        self.cache.set('54321', None, self.floating_ips)
+        self.cache.set('67890', None, self.floating_ips)
+
+        self.cache.invalidate()
+
+        self.assertIsNone(self.cache.get('54321', None))
+        self.assertIsNone(self.cache.get('67890', None))
@@ -28,6 +28,7 @@ from oslo_utils import timeutils
 
 from designate import context
 from designate import rpc
+from designate import utils
 from designate.central import rpcapi as central_api
 from designate.producer import tasks
 from designate.tests.unit import RoObject
@@ -82,13 +83,18 @@ class PeriodicTest(oslotest.base.BaseTestCase):
         ctxt = mock.Mock()
         iterer = self.task._iter_zones(ctxt)
 
-        items = [RoObject(id=generate_uuid()) for i in range(0, 5)]
+        created_at = datetime.datetime(2020, 1, 1)
+        items = [RoObject(id=generate_uuid(), created_at=created_at)
+                 for i in range(0, 5)]
         central.find_zones.return_value = items
 
         # Iterate through the items causing the "paging" to be done.
         list(map(lambda i: next(iterer), items))
         central.find_zones.assert_called_once_with(
-            ctxt, {"shard": "BETWEEN 0,9"}, limit=100)
+            ctxt.deepcopy.return_value, {"shard": "BETWEEN 0,9"}, limit=100)
+
+        # The zones are not counted
+        self.assertTrue(ctxt.deepcopy.return_value.hide_counts)
 
         central.find_zones.reset_mock()
 
@@ -98,9 +104,10 @@ class PeriodicTest(oslotest.base.BaseTestCase):
         self.assertRaises(StopIteration, next, iterer)
 
         central.find_zones.assert_called_once_with(
-            ctxt,
+            ctxt.deepcopy.return_value,
             {"shard": "BETWEEN 0,9"},
-            marker=items[-1].id,
+            marker=utils.encode_marker(
+                'created_at', created_at, items[-1].id),
             limit=100
         )
 
@@ -244,3 +251,40 @@ class PeriodicSecondaryRefreshTest(oslotest.base.BaseTestCase):
             self.task()
 
         self.assertFalse(self.central.xfr_zone.called)
+
+
+class ZoneUsageReconcileTest(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(ZoneUsageReconcileTest, self).setUp()
+        self.useFixture(cfg_fixture.Config(CONF))
+
+        self.ctxt = mock.Mock()
+        self.useFixture(fixtures.MockPatchObject(
+            context.DesignateContext, 'get_admin_context',
+            return_value=self.ctxt
+        ))
+
+        self.central = mock.Mock()
+        self.useFixture(fixtures.MockPatchObject(
+            central_api.CentralAPI, 'get_instance',
+            return_value=self.central
+        ))
+
+        self.task = tasks.ZoneUsageReconcileTask()
+        self.task.my_partitions = 0, 9
+
+    def test_reconcile(self):
+        CONF.set_override('quota_usage_counters', True)
+        self.central.reconcile_zone_usages.return_value = 2
+
+        self.task()
+
+        self.central.reconcile_zone_usages.assert_called_once_with(
+            self.ctxt, {'shard': 'BETWEEN 0,9', 'deleted': '0'})
+
+    def test_reconcile_disabled(self):
+        CONF.set_override('quota_usage_counters', False)
+
+        self.task()
+
+        self.assertFalse(self.central.reconcile_zone_usages.called)
@@ -708,20 +708,21 @@ class CentralZoneTestCase(CentralBasic):
 
     def test_is_valid_recordset_placement_subzone_2(self):
         zone = RoObject(name='example.org.', id=CentralZoneTestCase.zone__id)
-        self.service._is_valid_recordset_name = mock.Mock(
-            side_effect=Exception)
-        self.service.storage.find_zones.return_value = [
-            RoObject(name='foo.example.org.')
-        ]
+        self.service.storage.find_zones.return_value = []
         self.service._is_valid_recordset_placement_subzone(
             self.context,
             zone,
             'bar.example.org.'
         )
+        _, crit = self.service.storage.find_zones.call_args[0]
+        self.assertEqual(
+            {'parent_zone_id': CentralZoneTestCase.zone__id,
+             'name': ['bar.example.org.']},
+            crit
+        )
 
     def test_is_valid_recordset_placement_subzone_failing(self):
         zone = RoObject(name='example.org.', id=CentralZoneTestCase.zone__id)
-        self.service._is_valid_recordset_name = mock.Mock()
         self.service.storage.find_zones.return_value = [
             RoObject(name='foo.example.org.')
         ]
@@ -729,8 +730,24 @@ class CentralZoneTestCase(CentralBasic):
             self.service._is_valid_recordset_placement_subzone(
                 self.context,
                 zone,
-                'bar.example.org.'
+                'bar.foo.example.org.'
             )
+        _, crit = self.service.storage.find_zones.call_args[0]
+        self.assertEqual(
+            ['bar.foo.example.org.', 'foo.example.org.'], crit['name'])
+
+    def test_is_valid_recordset_placement_subzone_loaded(self):
+        zone = RoObject(name='example.org.', id=CentralZoneTestCase.zone__id)
+        child_zones = {'foo.example.org.': RoObject(name='foo.example.org.')}
+
+        self.service._is_valid_recordset_placement_subzone(
+            self.context, zone, 'bar.example.org.', child_zones=child_zones)
+
+        with testtools.ExpectedException(exceptions.InvalidRecordSetLocation):
+            self.service._is_valid_recordset_placement_subzone(
+                self.context, zone, 'bar.foo.example.org.',
+                child_zones=child_zones)
+        self.assertFalse(self.service.storage.find_zones.called)
 
     def test_is_valid_recordset_records(self):
         recordset = RoObject(
@@ -998,8 +1015,10 @@ class CentralZoneTestCase(CentralBasic):
         ])
         self.context.abandon = True
         self.service.storage.count_zones.return_value = 0
-        self.service.delete_zone(self.context,
-                                 CentralZoneTestCase.zone__id)
+        with fx_mdns_api:
+            self.service.delete_zone(self.context,
+                                     CentralZoneTestCase.zone__id)
+            self.assertTrue(self.service.mdns_api.invalidate_zone.called)
         self.assertTrue(self.service.storage.delete_zone.called)
         self.assertFalse(self.service.zone_api.delete_zone.called)
         pcheck, _, _ = designate.central.service.policy.check.call_args[0]
@@ -1984,33 +2003,38 @@ class CentralZoneTestCase(CentralBasic):
     def test_determine_floatingips(self):
         self.context = mock.Mock()
         self.context.project_id = 'tnt'
-        self.service.find_records = mock.Mock(return_value=[
-            RoObject(managed_extra='')
-        ])
+        self.service.storage.find_floatingip_records.return_value = []
 
         fips = {}
-        data, invalid = self.service._determine_floatingips(
+        data, invalid, ttls = self.service._determine_floatingips(
             self.context, fips)
         self.assertEqual({}, data)
         self.assertEqual([], invalid)
+        self.assertEqual({}, ttls)
 
     def test_determine_floatingips_with_data(self):
         self.context = mock.Mock()
         self.context.project_id = 2
-        self.service.find_records = mock.Mock(return_value=[
-            RoObject(managed_extra=1, managed_tenant_id=1),
-            RoObject(managed_extra=2, managed_tenant_id=2),
-        ])
+        self.service.storage.find_floatingip_records.return_value = [
+            (RoObject(id='r1', managed_extra=1, managed_tenant_id=1), 300),
+            (RoObject(id='r2', managed_extra=2, managed_tenant_id=2), 3600),
+        ]
 
         fips = {
             'k': {'address': 1},
             'k2': {'address': 2},
         }
-        data, invalid = self.service._determine_floatingips(
+        data, invalid, ttls = self.service._determine_floatingips(
             self.context, fips)
         self.assertEqual(1, len(invalid))
         self.assertEqual(1, invalid[0].managed_tenant_id)
         self.assertEqual(data['k'], ({'address': 1}, None))
+        self.assertEqual({'r1': 300, 'r2': 3600}, ttls)
+
+        # Only the addresses of the FIPs given are looked up
+        _, addresses = (
+            self.service.storage.find_floatingip_records.call_args[0])
+        self.assertEqual([1, 2], sorted(addresses))
 
     def test_generate_soa_refresh_interval(self):
         central_service = self.central_service
@@ -2023,16 +2047,17 @@ class IsSubzoneTestCase(CentralBasic):
     def setUp(self):
         super(IsSubzoneTestCase, self).setUp()
 
-        def find_zone(ctx, criterion):
-            LOG.debug("Calling find_zone on %r" % criterion)
-            if criterion['name'] == 'example.com.':
-                LOG.debug("Returning %r" % criterion['name'])
-                return criterion['name']
+        def find_zones(ctx, criterion, limit=None, sort_key=None,
+                       sort_dir=None):
+            LOG.debug("Calling find_zones on %r" % criterion)
+            if 'example.com.' in criterion['name']:
+                LOG.debug("Returning example.com.")
+                return ['example.com.']
 
             LOG.debug("Not found")
-            raise exceptions.ZoneNotFound
+            return []
 
-        self.service.storage.find_zone = find_zone
+        self.service.storage.find_zones = find_zones
 
     def test_is_subzone_false(self):
         r = self.service._is_subzone(self.context, 'com',
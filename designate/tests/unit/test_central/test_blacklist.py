@@ -0,0 +1,160 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import re
+import signal
+import threading
+from unittest import mock
+
+import oslotest.base
+
+from designate import exceptions
+from designate.central import blacklist
+
+
+class ParseLiteralPatternTest(oslotest.base.BaseTestCase):
+    def test_parse_literal_pattern(self):
+        tests = (
+            ('^example\\.com\\.$', ('exact', 'example.com.')),
+            ('^.*\\.example\\.com\\.$', ('suffix', '.example.com.')),
+            ('.*\\.example\\.com\\.$', ('suffix', '.example.com.')),
+            ('example\\.com\\.$', ('suffix', 'example.com.')),
+            ('^example\\.', ('prefix', 'example.')),
+            ('^.*example', ('contains', 'example')),
+            ('example', ('contains', 'example')),
+            ('^my\\-zone\\.com\\.$', ('exact', 'my-zone.com.')),
+            ('example.com.', None),
+            ('^\\d+\\.com\\.$', None),
+            ('^(.*\\.)?example\\.com\\.$', None),
+            ('^[a-z]+\\.com\\.$', None),
+            ('^example\\.com\\$', ('prefix', 'example.com$')),
+            ('^.*$', None),
+            ('', None),
+        )
+        for pattern, expected in tests:
+            self.assertEqual(
+                expected, blacklist.parse_literal_pattern(pattern), pattern)
+
+
+class CheckPatternTest(oslotest.base.BaseTestCase):
+    def test_check_pattern(self):
+        for pattern in ('^.*\\.example\\.com\\.$',
+                        '^(.*\\.)?example\\.com\\.$',
+                        '^[a-z]+-[0-9]+\\.[a-z]*\\.$',
+                        '^(www|mail)\\.example\\.$',
+                        '^a{2,3}(b|c)?[*+(]\\)*\\.$',
+                        '^.*?\\.example\\.$'):
+            blacklist.check_pattern(pattern)
+
+    def test_check_pattern_unsafe(self):
+        for pattern in ('(a+)+$',
+                        '^([A-Za-z0-9_\\-]+\\.)*corp\\.test\\.$',
+                        '^(?:ab|a){2,}$',
+                        '^(a)\\1\\.',
+                        '^(?P<name>a)(?P=name)\\.',
+                        '.*a.*b.*c.*d',
+                        '^a+b+c+d{1,}$',
+                        '(a'):
+            self.assertRaises(exceptions.InvalidBlacklistPattern,
+                              blacklist.check_pattern, pattern)
+
+
+class BlacklistMatcherTest(oslotest.base.BaseTestCase):
+    PATTERNS = [
+        '^blacklisted\\.org\\.$',
+        '^.*\\.example\\.com\\.$',
+        '^internal\\.',
+        'example.org.',
+        'example.net.',
+        'com.$',
+        '^([A-Za-z0-9_\\-]+\\.)*corp\\.test\\.$',
+        '(?i)^SHOUT\\.',
+    ]
+
+    def test_match_same_as_search(self):
+        matcher = blacklist.BlacklistMatcher(self.PATTERNS)
+
+        for zone_name in ('blacklisted.org.', 'www.blacklisted.org.',
+                          'example.com.', 'www.example.com.', 'a.b.example.'
+                          'com.', 'internal.zone.', 'zone.internal.',
+                          'www.example.org.', 'exampleXorg.', 'example.net.',
+                          'foo.com.', 'corp.test.', 'a.corp.test.',
+                          'a!.corp.test.', 'shout.zone.', 'org.', 'zone.',
+                          'xn--bcher-kva.example.'):
+            expected = any(re.search(pattern, zone_name)
+                           for pattern in self.PATTERNS)
+            self.assertEqual(
+                expected, matcher.match(zone_name), zone_name)
+
+    def test_patterns_are_split(self):
+        matcher = blacklist.BlacklistMatcher(self.PATTERNS)
+
+        self.assertEqual({'blacklisted.org.'}, matcher.exact)
+        self.assertEqual({'.example.com.'}, matcher.suffixes)
+        self.assertEqual({'internal.'}, matcher.prefixes)
+        self.assertEqual(
+            '(?:example.org.)|(?:example.net.)|(?:com.$)',
+            matcher.combined.pattern)
+        self.assertEqual(
+            ['^([A-Za-z0-9_\\-]+\\.)*corp\\.test\\.$', '(?i)^SHOUT\\.'],
+            [regex.pattern for regex in matcher.regexes])
+
+    def test_backreferences_are_not_combined(self):
+        matcher = blacklist.BlacklistMatcher(
+            ['^(a)\\1\\.', '^(b)b\\.', 'c+$'])
+
+        self.assertEqual('(?:^(b)b\\.)|(?:c+$)', matcher.combined.pattern)
+        self.assertTrue(matcher.match('aa.'))
+        self.assertFalse(matcher.match('ab.'))
+
+    def test_named_groups_are_not_combined(self):
+        matcher = blacklist.BlacklistMatcher(
+            ['^(?P<name>a)\\.', '^(?P<name>b)\\.'])
+
+        self.assertIsNone(matcher.combined)
+        self.assertEqual(2, len(matcher.regexes))
+        self.assertTrue(matcher.match('b.'))
+
+    def test_invalid_pattern(self):
+        self.assertRaises(re.error, blacklist.BlacklistMatcher, ['(a'])
+
+    def test_no_patterns(self):
+        matcher = blacklist.BlacklistMatcher([])
+
+        self.assertFalse(matcher.match('example.com.'))
+
+    def test_timeout_is_blacklisted(self):
+        regex = mock.Mock(pattern='(a+)+$')
+        regex.search.side_effect = blacklist.Timeout()
+
+        matcher = blacklist.BlacklistMatcher([])
+        matcher.regexes = [regex]
+
+        self.assertTrue(matcher.match('example.com.'))
+
+    def test_evil_pattern(self):
+        handler = signal.getsignal(signal.SIGALRM)
+        matcher = blacklist.BlacklistMatcher(
+            ['(([a-z])+.)+[A-Z]([a-z])+$'])
+
+        self.assertTrue(matcher.match('a' * 52 + '.com.'))
+        self.assertEqual(handler, signal.getsignal(signal.SIGALRM))
+
+    def test_match_in_thread(self):
+        matcher = blacklist.BlacklistMatcher(['^(www\\.)+example\\.'])
+        results = []
+
+        thread = threading.Thread(
+            target=lambda: results.append(matcher.match('www.example.')))
+        thread.start()
+        thread.join()
+
+        self.assertEqual([True], results)
@@ -0,0 +1,53 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import oslotest.base
+
+from designate.central import tld
+
+
+class TldIndexTest(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(TldIndexTest, self).setUp()
+        self.index = tld.TldIndex(['com', 'co.uk', 'example.'])
+
+    def test_has_tld(self):
+        tests = (
+            (['example', 'com'], True),
+            (['www', 'example', 'com'], True),
+            (['com'], True),
+            (['example', 'co', 'uk'], True),
+            (['example', 'uk'], False),
+            (['example', 'org'], False),
+            (['com', 'org'], False),
+            (['foo', 'example'], True),
+        )
+        for labels, expected in tests:
+            self.assertEqual(expected, self.index.has_tld(labels), labels)
+
+    def test_is_tld(self):
+        tests = (
+            (['com'], True),
+            (['co', 'uk'], True),
+            (['uk'], False),
+            (['example'], True),
+            (['example', 'com'], False),
+            (['org'], False),
+        )
+        for labels, expected in tests:
+            self.assertEqual(expected, self.index.is_tld(labels), labels)
+
+    def test_empty(self):
+        index = tld.TldIndex([])
+
+        self.assertEqual({}, index.root)
+        self.assertFalse(index.has_tld(['example', 'com']))
+        self.assertFalse(index.is_tld(['com']))
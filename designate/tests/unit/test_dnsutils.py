@@ -211,6 +211,92 @@ class TestUtils(designate.tests.TestCase):
         self.assertEqual(middleware.process_request(notify), (response,))
 
 
+class TestTsigKeyCache(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(TestTsigKeyCache, self).setUp()
+        self.storage = mock.Mock()
+        self.tsigkey = objects.TsigKey(
+            id='e2bed4dc-9d01-11e4-89d3-123b93f75cba',
+            name='test-key', algorithm='hmac-md5', secret='c2VjcmV0',
+            scope='POOL', resource_id='794ccc2c-d751-44fe-b57f-8894c9f5c842',
+        )
+        self.cache = dnsutils.TsigKeyCache(self.storage, 300)
+
+    def test_load(self):
+        self.storage.find_tsigkeys.return_value = [self.tsigkey]
+
+        self.cache.load()
+
+        self.assertEqual(self.tsigkey, self.cache.get('test-key'))
+        self.assertFalse(self.storage.find_tsigkey.called)
+
+    def test_get(self):
+        self.storage.find_tsigkey.return_value = self.tsigkey
+
+        self.assertEqual(self.tsigkey, self.cache.get('test-key'))
+        self.assertEqual(self.tsigkey, self.cache.get('test-key'))
+
+        self.storage.find_tsigkey.assert_called_once_with(
+            mock.ANY, {'name': 'test-key'})
+
+    @mock.patch('time.time')
+    def test_get_expired(self, mock_time):
+        self.storage.find_tsigkey.return_value = self.tsigkey
+
+        mock_time.return_value = 1000
+        self.cache.get('test-key')
+
+        mock_time.return_value = 1301
+        self.cache.get('test-key')
+
+        self.assertEqual(2, self.storage.find_tsigkey.call_count)
+
+    def test_get_not_found(self):
+        self.storage.find_tsigkey.side_effect = exceptions.TsigKeyNotFound
+
+        self.assertRaises(
+            exceptions.TsigKeyNotFound, self.cache.get, 'test-key')
+        self.assertRaises(
+            exceptions.TsigKeyNotFound, self.cache.get, 'test-key')
+
+        # Missing keys are not cached
+        self.assertEqual(2, self.storage.find_tsigkey.call_count)
+
+    def test_invalidate(self):
+        self.storage.find_tsigkey.return_value = self.tsigkey
+
+        self.cache.get('test-key')
+        self.cache.invalidate()
+        self.cache.get('test-key')
+
+        self.assertEqual(2, self.storage.find_tsigkey.call_count)
+
+    def test_tsig_keyring(self):
+        self.storage.find_tsigkey.return_value = self.tsigkey
+        keyring = dnsutils.TsigKeyring(self.storage, self.cache)
+        keyname = dns.name.from_text('test-key')
+
+        self.assertEqual(b'secret', keyring.get(keyname))
+        self.assertEqual(b'secret', keyring[keyname])
+
+        self.assertEqual(1, self.storage.find_tsigkey.call_count)
+
+    def test_tsig_info_middleware(self):
+        self.storage.find_tsigkey.return_value = self.tsigkey
+        middleware = dnsutils.TsigInfoMiddleware(
+            None, self.storage, self.cache)
+
+        request = mock.Mock(had_tsig=True,
+                            keyname=dns.name.from_text('test-key'),
+                            environ={'context': mock.Mock()})
+
+        self.assertIsNone(middleware.process_request(request))
+        self.assertIsNone(middleware.process_request(request))
+
+        self.assertEqual(self.tsigkey, request.environ['tsigkey'])
+        self.assertEqual(1, self.storage.find_tsigkey.call_count)
+
+
 class TestDoAfxr(oslotest.base.BaseTestCase):
     def setUp(self):
         super(TestDoAfxr, self).setUp()
@@ -9,6 +9,7 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import datetime
 import random
 from unittest import mock
 
@@ -283,6 +284,36 @@ class TestUtils(oslotest.base.BaseTestCase):
         host, port = utils.split_host_port('abc:abc')
         self.assertEqual(('abc:abc', 53), (host, port))
 
+    def test_encode_decode_marker(self):
+        item_id = 'ce9fcd6b-d546-4397-8a49-8ceaec37cb64'
+
+        marker = utils.encode_marker('name', 'example.org.', item_id)
+
+        self.assertFalse(utils.is_uuid_like(marker))
+        self.assertEqual(
+            ('name', 'example.org.', item_id), utils.decode_marker(marker)
+        )
+
+    def test_encode_marker_datetime(self):
+        item_id = 'ce9fcd6b-d546-4397-8a49-8ceaec37cb64'
+        created_at = datetime.datetime(2020, 1, 2, 3, 4, 5, 6)
+
+        marker = utils.encode_marker('created_at', created_at, item_id)
+
+        self.assertEqual(
+            ('created_at', '2020-01-02T03:04:05.000006', item_id),
+            utils.decode_marker(marker)
+        )
+
+    def test_decode_marker_invalid(self):
+        self.assertRaises(exceptions.InvalidMarker,
+                          utils.decode_marker, 'invalid_marker')
+        self.assertRaises(exceptions.InvalidMarker,
+                          utils.decode_marker, '')
+        self.assertRaises(exceptions.InvalidMarker,
+                          utils.decode_marker,
+                          utils.encode_marker('name', 'example.org.', '678'))
+
     def test_get_paging_params(self):
         CONF.set_override('default_limit_v2', 100, 'service:api')
 
@@ -0,0 +1,208 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import errno
+import socket
+import time
+from unittest import mock
+
+import dns.exception
+import dns.message
+import dns.rrset
+import eventlet
+import oslotest.base
+
+from designate.worker import poller
+
+
+class FakeNameserver(object):
+    """
+    Answer SOA queries on a local UDP socket, holding the queries until
+    `batch` of them have been received and answering them in reverse order
+    """
+
+    def __init__(self, serials, batch=1):
+        self.serials = serials
+        self.batch = batch
+        self.queries = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.port = self.sock.getsockname()[1]
+        self.thread = eventlet.spawn(self._serve)
+
+    def _serve(self):
+        held = []
+        while True:
+            wire, addr = self.sock.recvfrom(65535)
+            query = dns.message.from_wire(wire)
+            self.queries.append(query)
+            held.append((query, addr))
+            if len(held) < self.batch:
+                continue
+            for query, addr in reversed(held):
+                self._answer(query, addr)
+            held = []
+
+    def _answer(self, query, addr):
+        name = query.question[0].name.to_text()
+        response = dns.message.make_response(query)
+        if name in self.serials:
+            response.answer.append(dns.rrset.from_text(
+                name, 3600, 'IN', 'SOA',
+                'ns1.example.org. admin.example.org. %d 3600 600 86400 3600'
+                % self.serials[name]))
+        self.sock.sendto(response.to_wire(), addr)
+
+    def stop(self):
+        self.thread.kill()
+        self.sock.close()
+
+
+class TestSerialPoller(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(TestSerialPoller, self).setUp()
+        self.poller = poller.SerialPoller(socket_count=2, timeout=2)
+
+    def start_nameserver(self, serials, batch=1):
+        nameserver = FakeNameserver(serials, batch=batch)
+        self.addCleanup(nameserver.stop)
+        return nameserver
+
+    def test_get_serial(self):
+        ns = self.start_nameserver({'example.org.': 10})
+
+        self.assertEqual(
+            10, self.poller.get_serial('example.org.', '127.0.0.1', ns.port))
+        self.assertEqual(
+            0, self.poller.get_serial('example.com.', '127.0.0.1', ns.port))
+
+    def test_get_serial_many_zones(self):
+        serials = {'zone%d.example.org.' % i: i for i in range(1, 21)}
+        ns = self.start_nameserver(serials, batch=20)
+
+        pool = eventlet.GreenPool()
+        results = pool.imap(
+            lambda name: (name, self.poller.get_serial(
+                name, '127.0.0.1', ns.port)),
+            serials)
+
+        # The answers are sent in reverse order and matched by message id
+        self.assertEqual(serials, dict(results))
+
+        # Two sockets were shared by all the queries
+        channel = self.poller._get_channel('127.0.0.1', ns.port)
+        self.assertEqual(2, len(channel.pending))
+        self.assertEqual(0, sum(len(p) for p in channel.pending.values()))
+
+    def test_get_serial_shares_query_for_zone(self):
+        ns = self.start_nameserver({'example.org.': 10}, batch=2)
+
+        threads = [
+            eventlet.spawn(self.poller.get_serial,
+                           'example.org.', '127.0.0.1', ns.port)
+            for _ in range(3)
+        ]
+        # Release the held query
+        self.poller.get_serial('example.com.', '127.0.0.1', ns.port)
+
+        self.assertEqual([10, 10, 10], [t.wait() for t in threads])
+        self.assertEqual(2, len(ns.queries))
+
+    def test_get_serial_timeout(self):
+        ns = self.start_nameserver({'example.org.': 10}, batch=2)
+        self.poller.timeout = 0.1
+
+        self.assertRaises(
+            dns.exception.Timeout,
+            self.poller.get_serial, 'example.org.', '127.0.0.1', ns.port
+        )
+
+        channel = self.poller._get_channel('127.0.0.1', ns.port)
+        self.assertEqual({}, channel.in_flight)
+        self.assertEqual(0, sum(len(p) for p in channel.pending.values()))
+
+    def test_read_error_closes_socket(self):
+        ns = self.start_nameserver({'example.org.': 10})
+        self.poller.get_serial('example.org.', '127.0.0.1', ns.port)
+        channel = self.poller._get_channel('127.0.0.1', ns.port)
+
+        sock = mock.Mock()
+        sock.recv.side_effect = socket.error(errno.ENOMEM, 'Out of memory')
+        query = poller._PendingQuery(
+            'example.com.', dns.message.make_query('example.com.', 'SOA'),
+            sock, time.time() + 2)
+        channel.pending[sock] = {query.message.id: query}
+        channel.in_flight['example.com.'] = query
+
+        # Gives up on the socket instead of reading from it again
+        channel._read(sock)
+
+        sock.recv.assert_called_once_with(mock.ANY)
+        sock.close.assert_called_once_with()
+        self.assertNotIn(sock, channel.pending)
+        self.assertEqual({}, channel.in_flight)
+        self.assertRaises(dns.exception.Timeout, query.event.wait)
+
+    def test_closed_socket_is_replaced(self):
+        ns = self.start_nameserver({'example.org.': 10})
+        self.poller.get_serial('example.org.', '127.0.0.1', ns.port)
+        channel = self.poller._get_channel('127.0.0.1', ns.port)
+
+        channel._close(next(iter(channel.pending)))
+        self.assertEqual(1, len(channel.pending))
+
+        self.assertEqual(
+            10, self.poller.get_serial('example.org.', '127.0.0.1', ns.port))
+        self.assertEqual(2, len(channel.pending))
+
+    def test_closed_socket_read_is_silent(self):
+        ns = self.start_nameserver({'example.org.': 10})
+        self.poller.get_serial('example.org.', '127.0.0.1', ns.port)
+        channel = self.poller._get_channel('127.0.0.1', ns.port)
+
+        sock = mock.Mock()
+        sock.recv.side_effect = socket.error(errno.EBADF, 'Bad descriptor')
+        channel.pending[sock] = {}
+
+        with mock.patch.object(poller.LOG, 'warning') as warning:
+            channel._read(sock)
+            # e.g. closed while the reader was waiting on it
+            channel._close(next(iter(channel.pending)))
+            eventlet.sleep(0)
+
+        warning.assert_not_called()
+        sock.close.assert_called_once_with()
+        self.assertEqual(1, len(channel.pending))
+
+    def test_get_channel_concurrently(self):
+        ns = self.start_nameserver({'example.org.': 10})
+        created = []
+        channel_cls = poller._NameserverChannel
+
+        def make_channel(*args):
+            # e.g. looking up the address yields to the other poll
+            eventlet.sleep(0)
+            created.append(channel_cls(*args))
+            return created[-1]
+
+        with mock.patch.object(poller, '_NameserverChannel',
+                               side_effect=make_channel):
+            threads = [
+                eventlet.spawn(self.poller._get_channel, '127.0.0.1', ns.port)
+                for _ in range(2)
+            ]
+            channels = [thread.wait() for thread in threads]
+
+        self.assertIs(channels[0], channels[1])
+        self.assertEqual(2, len(created))
+        # The channel that lost is closed rather than left reading
+        self.assertEqual(
+            [{}], [c.pending for c in created if c is not channels[0]])
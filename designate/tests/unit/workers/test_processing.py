@@ -79,3 +79,131 @@ class TestProcessingExecutor(TestCase):
         exe = processing.Executor()
 
         self.assertEqual('func_name', exe.task_name(mock_task))
+
+
+class TestZoneActionQueue(TestCase):
+    def setUp(self):
+        super(TestZoneActionQueue, self).setUp()
+        self.stdlog = fixtures.StandardLogging()
+        self.useFixture(self.stdlog)
+        self.queue = processing.ZoneActionQueue()
+        self.context = mock.Mock()
+        self.calls = []
+
+    def make_zone(self, action, serial, zone_id='zone-id'):
+        zone = mock.Mock(id=zone_id, action=action, serial=serial)
+        zone.name = 'example.org.'
+        return zone
+
+    def run_actions(self, first, later):
+        """
+        Run the first action, adding the later ones while it is running
+        """
+        def func(context, zone, superseded):
+            self.calls.append((zone.action, zone.serial))
+            if len(self.calls) == 1:
+                for zone in later:
+                    self.assertIsNone(
+                        self.queue.run(self.context, zone, func))
+                self.superseded = superseded.is_set()
+            return zone.serial
+
+        return self.queue.run(self.context, first, func)
+
+    def test_run(self):
+        result = self.run_actions(self.make_zone('UPDATE', 1), [])
+
+        self.assertEqual(1, result)
+        self.assertEqual([('UPDATE', 1)], self.calls)
+        self.assertEqual({}, self.queue._zones)
+
+    def test_run_coalesces_updates(self):
+        result = self.run_actions(self.make_zone('UPDATE', 1), [
+            self.make_zone('UPDATE', 2),
+            self.make_zone('UPDATE', 3),
+            self.make_zone('UPDATE', 4),
+        ])
+
+        self.assertEqual(4, result)
+        self.assertEqual([('UPDATE', 1), ('UPDATE', 4)], self.calls)
+        self.assertTrue(self.superseded)
+
+    def test_run_update_merged_into_create(self):
+        self.run_actions(self.make_zone('UPDATE', 1), [
+            self.make_zone('CREATE', 2),
+            self.make_zone('UPDATE', 3),
+        ])
+
+        self.assertEqual([('UPDATE', 1), ('CREATE', 3)], self.calls)
+
+    def test_run_keeps_actions_after_delete(self):
+        self.run_actions(self.make_zone('CREATE', 1), [
+            self.make_zone('UPDATE', 2),
+            self.make_zone('DELETE', 3),
+            self.make_zone('CREATE', 4),
+        ])
+
+        self.assertEqual(
+            [('CREATE', 1), ('DELETE', 3), ('CREATE', 4)], self.calls)
+        # A running CREATE is not superseded
+        self.assertFalse(self.superseded)
+
+    def test_run_batch(self):
+        def func(context, zone, superseded):
+            self.calls.append((zone.id, zone.action, zone.serial))
+
+        def batch_func(context, zones):
+            self.calls.append([zone.id for zone in zones])
+            # Waits for the batch instead of running alongside it
+            self.assertIsNone(self.queue.run(
+                self.context, self.make_zone('UPDATE', 3, 'zone-2'), func))
+            return len(zones)
+
+        result = self.queue.run_batch(self.context, [
+            self.make_zone('UPDATE', 1, 'zone-1'),
+            self.make_zone('UPDATE', 2, 'zone-2'),
+        ], batch_func, func)
+
+        self.assertEqual(2, result)
+        self.assertEqual(
+            [['zone-1', 'zone-2'], ('zone-2', 'UPDATE', 3)], self.calls)
+        self.assertEqual({}, self.queue._zones)
+
+    def test_run_batch_skips_running_zones(self):
+        def batch_func(context, zones):
+            self.calls.append([zone.id for zone in zones])
+
+        def func(context, zone, superseded):
+            self.calls.append((zone.id, zone.action, zone.serial))
+            if len(self.calls) == 1:
+                self.queue.run_batch(self.context, [
+                    self.make_zone('UPDATE', 2),
+                    self.make_zone('UPDATE', 1, 'zone-2'),
+                ], batch_func, func)
+
+        self.queue.run(self.context, self.make_zone('UPDATE', 1), func)
+
+        # The zone with an action running was handed to the thread
+        # running it rather than batched
+        self.assertEqual([
+            ('zone-id', 'UPDATE', 1),
+            ['zone-2'],
+            ('zone-id', 'UPDATE', 2),
+        ], self.calls)
+        self.assertEqual({}, self.queue._zones)
+
+    def test_run_continues_after_failure(self):
+        def func(context, zone, superseded):
+            self.calls.append((zone.action, zone.serial))
+            if len(self.calls) == 1:
+                self.queue.run(self.context, self.make_zone('UPDATE', 2),
+                               func)
+                raise exceptions.BadAction('Not Great')
+            return zone.serial
+
+        result = self.queue.run(self.context, self.make_zone('UPDATE', 1),
+                                func)
+
+        self.assertEqual(2, result)
+        self.assertEqual([('UPDATE', 1), ('UPDATE', 2)], self.calls)
+        self.assertIn('Not Great', self.stdlog.logger.output)
@@ -203,7 +203,8 @@ class TestService(oslotest.base.BaseTestCase):
             self.context,
             pool,
             self.zone,
-            self.zone.action
+            self.zone.action,
+            superseded=None
         )
 
         self.service._executor.run.assert_called_with([mock_zone_action()])
@@ -229,13 +230,37 @@ class TestService(oslotest.base.BaseTestCase):
             self.context,
             pool,
             self.zone,
-            self.zone.action
+            self.zone.action,
+            superseded=None
         )
 
         self.service._executor.run.assert_called_with(
             [mock_zone_action(), mock_send_notify()]
         )
 
+    def test_do_zone_action_coalesced(self):
+        CONF.set_override('coalesce_zone_actions', True, 'service:worker')
+        self.service._run_zone_action = mock.Mock()
+
+        self.service._do_zone_action(self.context, self.zone)
+
+        self.service._run_zone_action.assert_called_once_with(
+            self.context, self.zone, mock.ANY
+        )
+
+    def test_run_zone_batch_coalesced(self):
+        CONF.set_override('coalesce_zone_actions', True, 'service:worker')
+        self.service._run_zone_batch_action = mock.Mock()
+        self.service._run_zone_action = mock.Mock()
+        zones = [self.zone]
+
+        self.service._run_zone_batch(self.context, 'pool-id', zones, 'UPDATE')
+
+        self.service._run_zone_batch_action.assert_called_once_with(
+            self.context, 'pool-id', zones, 'UPDATE'
+        )
+        self.assertEqual({}, self.service.zone_action_queue._zones)
+
     def test_get_pool(self):
         pool = mock.Mock()
         self.service.load_pool = mock.Mock()
@@ -255,7 +280,8 @@ class TestService(oslotest.base.BaseTestCase):
         mock_recover_shard.assert_called_with(
             self.service.executor,
             self.context,
-            1, 10
+            1, 10,
+            run_batch=self.service._run_zone_batch
         )
 
         self.service.executor.run.assert_called_with(mock_recover_shard())
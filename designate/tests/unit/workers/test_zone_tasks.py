@@ -16,6 +16,7 @@
 from unittest import mock
 
 import dns.exception
+import eventlet
 import oslotest.base
 from oslo_config import cfg
 from oslo_config import fixture as cfg_fixture
@@ -577,6 +578,31 @@ class TestZonePollerPolling(oslotest.base.BaseTestCase):
         # retried once
         self.assertEqual(1, len(zone.time.sleep.mock_calls))
 
+    def test_do_poll_superseded(self):
+        exe = mock.Mock()
+        exe.run.return_value = [0, 0]
+        self.poller.executor = exe
+        self.poller.superseded = mock.Mock()
+        self.poller.superseded.is_set.return_value = True
+
+        self.poller._do_poll()
+
+        # Stops retrying once a newer change is polled for
+        self.assertEqual(1, exe.run.call_count)
+        self.assertFalse(self.poller.superseded.wait.called)
+
+    def test_call_superseded(self):
+        exe = mock.Mock()
+        exe.run.return_value = [0, 0]
+        self.poller.executor = exe
+        self.poller.superseded = mock.Mock()
+        self.poller.superseded.is_set.return_value = True
+        self.poller._update_status = mock.Mock()
+
+        self.assertFalse(self.poller())
+
+        self.assertFalse(self.poller._update_status.called)
+
     @mock.patch.object(zone, 'time', mock.Mock())
     def test_do_poll_with_retry_until_fail(self):
         exe = mock.Mock()
@@ -678,6 +704,21 @@ class TestPollForZone(oslotest.base.BaseTestCase):
             port=53
         )
 
+    @mock.patch.object(zone.poller, 'get_poller')
+    def test_get_serial_shared_poller(self, mock_get_poller):
+        self.useFixture(cfg_fixture.Config(CONF))
+        CONF.set_override('poll_sockets_per_nameserver', 2,
+                          'service:worker')
+        mock_get_poller.return_value.get_serial.return_value = 10
+
+        self.assertEqual(10, self.task._get_serial())
+
+        mock_get_poller.return_value.get_serial.assert_called_with(
+            'example.org.',
+            'ns.example.org',
+            port=53
+        )
+
     def test_call(self):
         self.task._get_serial = mock.Mock(return_value=10)
 
@@ -740,3 +781,205 @@ class TestExportZone(oslotest.base.BaseTestCase):
 
         self.task()
         self.assertEqual('ERROR', self.export.status)
+
+
+class TestBatchZoneActionOnTarget(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(TestBatchZoneActionOnTarget, self).setUp()
+        self.backend = mock.Mock()
+        self.target = objects.PoolTarget.from_dict({
+            'id': '4588652b-50e7-46b9-b688-a9bad40a873e',
+            'type': 'fake',
+            'options': [
+                {'key': 'host', 'value': '127.0.0.1'},
+                {'key': 'port', 'value': 53},
+            ],
+            'backend': self.backend,
+        })
+
+        self.context = mock.Mock()
+        self.executor = mock.Mock()
+        self.zones = [
+            objects.Zone(name='example.org.', action='CREATE'),
+            objects.Zone(name='example.com.', action='CREATE'),
+        ]
+
+    @mock.patch.object(wutils, 'notify')
+    @mock.patch('time.sleep', mock.Mock())
+    def test_call_create_retries_failed_zones(self, mock_notify):
+        self.backend.create_zones.side_effect = [[True, False], [True]]
+        actor = zone.BatchZoneActionOnTarget(
+            self.executor, self.context, self.zones, 'CREATE', self.target
+        )
+
+        self.assertEqual([True, True], actor())
+
+        self.backend.create_zones.assert_has_calls([
+            mock.call(self.context, self.zones),
+            mock.call(self.context, self.zones[1:]),
+        ])
+        mock_notify.assert_has_calls([
+            mock.call('example.org.', '127.0.0.1', port=53),
+            mock.call('example.com.', '127.0.0.1', port=53),
+        ])
+
+    @mock.patch.object(wutils, 'notify')
+    def test_call_delete(self, mock_notify):
+        self.backend.delete_zones.return_value = [True, True]
+        actor = zone.BatchZoneActionOnTarget(
+            self.executor, self.context, self.zones, 'DELETE', self.target
+        )
+
+        self.assertEqual([True, True], actor())
+
+        mock_notify.assert_not_called()
+
+    @mock.patch.object(wutils, 'notify')
+    @mock.patch('time.sleep', mock.Mock())
+    def test_call_exception_raised(self, mock_notify):
+        self.backend.update_zones.side_effect = exceptions.Backend()
+        actor = zone.BatchZoneActionOnTarget(
+            self.executor, self.context, self.zones, 'UPDATE', self.target
+        )
+
+        self.assertEqual([False, False], actor())
+
+        self.assertEqual(
+            actor.max_retries, self.backend.update_zones.call_count
+        )
+        mock_notify.assert_not_called()
+
+
+class TestBatchZoneActor(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(TestBatchZoneActor, self).setUp()
+        self.context = mock.Mock()
+        self.pool = mock.Mock(targets=['target 1', 'target 2'])
+        self.executor = mock.Mock()
+        self.zones = [mock.Mock(name='zone 1'), mock.Mock(name='zone 2')]
+        self.actor = zone.BatchZoneActor(
+            self.executor, self.context, self.pool, self.zones, 'CREATE'
+        )
+
+    def test_invalid_action(self):
+        self.actor.action = 'BAD'
+
+        self.assertRaises(exceptions.BadAction, self.actor)
+
+    @mock.patch.object(zone, 'UpdateStatus')
+    def test_call(self, mock_update_status):
+        self.actor._threshold = 100
+        self.executor.run.return_value = [[True, True], [True, False]]
+
+        self.assertEqual([True, False], self.actor())
+
+        self.assertEqual('ERROR', self.zones[1].status)
+        mock_update_status.assert_called_once_with(
+            self.executor, self.context, self.zones[1]
+        )
+
+
+class TestBatchZoneAction(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(TestBatchZoneAction, self).setUp()
+        self.context = mock.Mock()
+        self.pool = mock.Mock()
+        self.executor = mock.Mock()
+        self.zones = [mock.Mock(serial=1), mock.Mock(serial=1)]
+
+    @mock.patch.object(zone, '_wait', mock.Mock())
+    @mock.patch.object(zone, 'ZonePoller')
+    @mock.patch.object(zone, 'BatchZoneActor')
+    def test_call_polls_zones_acted_on(self, mock_actor, mock_poller):
+        mock_actor.return_value.return_value = [False, True]
+        self.executor.run.return_value = [True]
+        task = zone.BatchZoneAction(
+            self.executor, self.context, self.pool, self.zones, 'DELETE'
+        )
+
+        self.assertEqual([False, True], task())
+
+        mock_poller.assert_called_once_with(
+            self.executor, self.context, self.pool, self.zones[1]
+        )
+        self.assertEqual(1, self.zones[0].serial)
+        self.assertEqual(0, self.zones[1].serial)
+
+    @mock.patch.object(zone, 'ZonePoller')
+    @mock.patch.object(zone, 'BatchZoneActor')
+    def test_call_fails_on_zone_targets(self, mock_actor, mock_poller):
+        mock_actor.return_value.return_value = [False, False]
+        task = zone.BatchZoneAction(
+            self.executor, self.context, self.pool, self.zones, 'CREATE'
+        )
+
+        self.assertEqual([False, False], task())
+
+        mock_poller.assert_not_called()
+
+
+class TestRecoverShard(oslotest.base.BaseTestCase):
+    def setUp(self):
+        super(TestRecoverShard, self).setUp()
+        self.useFixture(cfg_fixture.Config(CONF))
+        self.context = mock.Mock()
+        self.executor = mock.Mock()
+        self.run_batch = mock.Mock()
+        self.zones = [
+            objects.Zone(name='a.example.org.', action='CREATE', pool_id='1'),
+            objects.Zone(name='b.example.org.', action='DELETE', pool_id='1'),
+            objects.Zone(name='c.example.org.', action='CREATE', pool_id='1'),
+            objects.Zone(name='d.example.org.', action='CREATE', pool_id='2'),
+            objects.Zone(name='e.example.org.', action='CREATE', pool_id='1'),
+        ]
+        self.task = zone.RecoverShard(
+            self.executor, self.context, 0, 4095, run_batch=self.run_batch
+        )
+        self.task._get_zones = mock.Mock(return_value=self.zones)
+        self.task._worker_api = mock.Mock()
+
+    def test_call(self):
+        self.task()
+
+        self.assertEqual(
+            4, self.task.worker_api.create_zone.call_count
+        )
+        self.task.worker_api.delete_zone.assert_called_once_with(
+            self.context, self.zones[1]
+        )
+        self.run_batch.assert_not_called()
+
+    def test_call_in_batches(self):
+        CONF.set_override('zone_action_batch_size', 2, 'service:worker')
+        self.task.executor = processing.Executor()
+
+        self.task()
+
+        self.run_batch.assert_has_calls([
+            mock.call(self.context, '1',
+                      [self.zones[0], self.zones[2]], 'CREATE'),
+            mock.call(self.context, '1', [self.zones[4]], 'CREATE'),
+            mock.call(self.context, '1', [self.zones[1]], 'DELETE'),
+            mock.call(self.context, '2', [self.zones[3]], 'CREATE'),
+        ], any_order=True)
+        self.assertEqual(4, self.run_batch.call_count)
+        self.task.worker_api.create_zone.assert_not_called()
+
+    def test_call_in_batches_concurrently(self):
+        CONF.set_override('zone_action_batch_size', 2, 'service:worker')
+        self.task.executor = processing.Executor()
+        events = []
+
+        def run_batch(context, pool_id, zones, action):
+            events.append(('start', pool_id, action))
+            # e.g. waiting for the zones to propagate
+            eventlet.sleep(0.01)
+            events.append(('end', pool_id, action))
+
+        self.task.run_batch = run_batch
+
+        self.task()
+
+        # Every batch started before the first one was done
+        self.assertEqual(['start'] * 4 + ['end'] * 4,
+                         [event for event, _, _ in events])
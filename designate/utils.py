@@ -13,7 +13,9 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import base64
 import copy
+import datetime
 import functools
 import inspect
 import os
@@ -269,6 +271,38 @@ def split_host_port(string, default_port=53):
     return (host, port)
 
 
+def encode_marker(sort_key, value, item_id):
+    """
+    Encode the sort key value and id of the last item of a page into an
+    opaque keyset pagination marker, so the next page can be selected
+    without looking up the last item again
+    """
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+
+    data = jsonutils.dump_as_bytes([sort_key, value, item_id])
+
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_marker(marker):
+    """
+    Decode a keyset pagination marker into its sort key, the sort key value
+    and the id of the item the page starts after
+    """
+    try:
+        data = base64.urlsafe_b64decode(
+            (marker + '=' * (-len(marker) % 4)).encode('ascii'))
+        sort_key, value, item_id = jsonutils.loads(data)
+    except (TypeError, ValueError):
+        raise exceptions.InvalidMarker()
+
+    if not uuidutils.is_uuid_like(item_id):
+        raise exceptions.InvalidMarker()
+
+    return sort_key, value, item_id
+
+
 def get_paging_params(context, params, sort_keys):
     """
     Extract any paging parameters
@@ -0,0 +1,229 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+import errno
+import random
+import socket
+import time
+
+import dns.exception
+import dns.message
+import eventlet
+import eventlet.event
+from oslo_config import cfg
+from oslo_log import log as logging
+
+from designate.worker import utils as wutils
+
+LOG = logging.getLogger(__name__)
+CONF = cfg.CONF
+
+_POLLER = None
+
+# Reading from a socket that has been closed, by the channel or while the
+# reader was waiting on it
+_CLOSED_ERRNOS = (errno.EBADF, errno.ENOTCONN)
+
+
+def get_poller():
+    """
+    Return the SerialPoller shared by all the tasks of this worker process
+    """
+    global _POLLER
+    if _POLLER is None:
+        _POLLER = SerialPoller(
+            CONF['service:worker'].poll_sockets_per_nameserver,
+            CONF['service:worker'].poll_timeout,
+        )
+    return _POLLER
+
+
+class _PendingQuery(object):
+    def __init__(self, zone_name, message, sock, deadline):
+        self.zone_name = zone_name
+        self.message = message
+        self.sock = sock
+        self.deadline = deadline
+        self.event = eventlet.event.Event()
+
+
+class _NameserverChannel(object):
+    """
+    A few UDP sockets connected to one nameserver, and the SOA queries
+    waiting for an answer on them.
+
+    A socket that fails to be read from is closed, along with the queries
+    waiting on it, and replaced by a new one on the next query.
+    """
+    _RECV_MAX_SIZE = 65535
+
+    def __init__(self, host, port, socket_count):
+        self.host = host
+        self.port = port
+        self.socket_count = max(socket_count, 1)
+
+        # Outstanding queries by socket and message id, and by zone name so
+        # pollers looking for the same zone share a single query
+        self.pending = {}
+        self.in_flight = {}
+
+        self._addrinfo = socket.getaddrinfo(
+            host, port, 0, socket.SOCK_DGRAM)[0]
+        for _ in range(self.socket_count):
+            self._open()
+
+    def _open(self):
+        family, socktype, proto, _, address = self._addrinfo
+        sock = socket.socket(family, socktype, proto)
+        try:
+            sock.connect(address)
+        except socket.error:
+            sock.close()
+            raise
+        self.pending[sock] = {}
+        eventlet.spawn_n(self._read, sock)
+
+    def _close(self, sock):
+        pending = self.pending.pop(sock, {})
+        sock.close()
+
+        for query in list(pending.values()):
+            self._finish(query)
+            query.event.send_exception(dns.exception.Timeout())
+
+    def close(self):
+        for sock in list(self.pending):
+            self._close(sock)
+
+    def _read(self, sock):
+        while sock in self.pending:
+            try:
+                wire = sock.recv(self._RECV_MAX_SIZE)
+            except EOFError:
+                # What eventlet raises for a socket closed under the reader
+                self._close(sock)
+                return
+            except socket.error as e:
+                if sock not in self.pending or e.errno in _CLOSED_ERRNOS:
+                    self._close(sock)
+                    return
+                # An ICMP error from an earlier query, the queries waiting
+                # on the socket will time out
+                if e.errno in (errno.ECONNREFUSED, errno.EHOSTUNREACH,
+                               errno.ENETUNREACH):
+                    continue
+                # Any other error is likely to happen again on every read,
+                # give up on the socket instead of spinning on it
+                LOG.warning('Failed to read from the socket polling '
+                            '%(host)s:%(port)d, closing it. Error: %(error)s',
+                            {'host': self.host, 'port': self.port,
+                             'error': e})
+                self._close(sock)
+                return
+
+            try:
+                response = dns.message.from_wire(wire)
+            except dns.exception.DNSException:
+                LOG.debug('Ignoring malformed response from %(host)s:'
+                          '%(port)d', {'host': self.host, 'port': self.port})
+                continue
+
+            query = self.pending.get(sock, {}).get(response.id)
+            if query is None or not query.message.is_response(response):
+                LOG.debug('Ignoring unexpected response %(id)d from '
+                          '%(host)s:%(port)d',
+                          {'id': response.id, 'host': self.host,
+                           'port': self.port})
+                continue
+
+            self._finish(query)
+            query.event.send(response)
+
+    def _finish(self, query):
+        self.pending.get(query.sock, {}).pop(query.message.id, None)
+        if self.in_flight.get(query.zone_name) is query:
+            del self.in_flight[query.zone_name]
+
+    def _send(self, zone_name, timeout):
+        # Replace the sockets that were closed after failing
+        while len(self.pending) < self.socket_count:
+            self._open()
+
+        # Spread the queries over the sockets, the message id only has to be
+        # unique amongst the queries waiting on the same socket
+        sock = min(self.pending, key=lambda s: len(self.pending[s]))
+        pending = self.pending[sock]
+
+        message = wutils.prepare_msg(zone_name)
+        while message.id in pending:
+            message.id = random.randint(0, 65535)
+
+        query = _PendingQuery(zone_name, message, sock, time.time() + timeout)
+        pending[message.id] = query
+        self.in_flight[zone_name] = query
+
+        try:
+            sock.send(message.to_wire())
+        except socket.error:
+            self._finish(query)
+            raise
+
+        return query
+
+    def query(self, zone_name, timeout):
+        query = self.in_flight.get(zone_name)
+        if query is None:
+            query = self._send(zone_name, timeout)
+
+        try:
+            with eventlet.Timeout(max(query.deadline - time.time(), 0)):
+                return query.event.wait()
+        except eventlet.Timeout:
+            self._finish(query)
+            raise dns.exception.Timeout()
+
+
+class SerialPoller(object):
+    """
+    Poll nameservers for zone serials over a small set of UDP sockets per
+    nameserver, shared by every poll running in the worker.
+
+    Many SOA queries are outstanding on a socket at once and responses are
+    matched to them by message id, instead of opening a socket per query.
+    Concurrent polls for the same zone on the same nameserver share a single
+    query and its answer.
+    """
+
+    def __init__(self, socket_count=1, timeout=10):
+        self.socket_count = socket_count
+        self.timeout = timeout
+        self._channels = {}
+
+    def _get_channel(self, host, port):
+        key = (host, port)
+        channel = self._channels.get(key)
+        if channel is None:
+            # Setting up the channel yields, so another poll may have set one
+            # up for the nameserver in the meantime
+            new_channel = _NameserverChannel(host, port, self.socket_count)
+            channel = self._channels.setdefault(key, new_channel)
+            if channel is not new_channel:
+                new_channel.close()
+        return channel
+
+    def get_serial(self, zone_name, host, port=53):
+        """
+        Possibly raises dns.exception.Timeout.
+        Possibly returns 0 if, e.g., the answer section is empty.
+        """
+        channel = self._get_channel(host, port)
+        response = channel.query(zone_name, self.timeout)
+        return wutils.parse_serial(response)
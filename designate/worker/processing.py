@@ -13,6 +13,8 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import collections
+import threading
 import time
 
 import futurist
@@ -87,3 +89,135 @@ class Executor(object):
                   {'tasks': task_names, 'time': task_time})
 
         return results
+
+
+class _ZoneActions(object):
+    def __init__(self):
+        self.running = None
+        self.superseded = None
+        self.waiting = collections.deque()
+
+
+class ZoneActionQueue(object):
+    """
+    Run the actions for each zone one at a time, collapsing the actions
+    waiting for a zone to the newest change.
+
+    Central bumps the serial of a zone on every change, and polling for a
+    serial also accepts any newer one, so an UPDATE waiting behind another
+    action only has to be pushed and polled for once, with the latest zone.
+    An UPDATE that is still polling for an older serial is told it has been
+    superseded, so it can give up instead of retrying.
+    """
+
+    def __init__(self):
+        self._zones = {}
+
+    @staticmethod
+    def _merge(waiting, zone):
+        """
+        Merge the action for zone into the last waiting action, if they can
+        be done as one
+
+        :return: The merged zone, or None if both actions have to be run
+        """
+        if waiting.action == 'UPDATE' and zone.action in ('UPDATE', 'DELETE'):
+            return zone
+        if waiting.action == 'CREATE' and zone.action == 'UPDATE':
+            # Creating the zone pushes the latest version of it
+            zone.action = 'CREATE'
+            return zone
+        return None
+
+    def _add(self, actions, context, zone):
+        if actions.waiting:
+            merged = self._merge(actions.waiting[-1][1], zone)
+            if merged is not None:
+                LOG.debug('Coalescing %(action)s of zone %(zone)s with the '
+                          'waiting action',
+                          {'action': zone.action, 'zone': zone.name})
+                actions.waiting[-1] = (context, merged)
+            else:
+                actions.waiting.append((context, zone))
+        else:
+            actions.waiting.append((context, zone))
+
+        if (actions.running.action == 'UPDATE' and
+                zone.action in ('UPDATE', 'DELETE')):
+            actions.superseded.set()
+
+    def run(self, context, zone, func):
+        """
+        Run func(context, zone, superseded) now, or after the action already
+        running for the zone has finished.
+
+        :return: The result of func, or None if the action has been handed to
+                 the thread already running actions for the zone
+        """
+        actions = self._zones.get(zone.id)
+        if actions is not None:
+            self._add(actions, context, zone)
+            return None
+
+        actions = self._zones[zone.id] = _ZoneActions()
+        actions.waiting.append((context, zone))
+
+        return self._run_waiting(zone.id, actions, func)
+
+    def run_batch(self, context, zones, batch_func, func):
+        """
+        Run batch_func(context, zones) for the zones with no action running,
+        the zones with one are handed to the thread running it instead.
+
+        The zones of the batch count as running an action until it is done,
+        the actions added for them in the meantime are then run one at a time
+        with func(context, zone, superseded), as with run().
+
+        :return: The result of batch_func, or None if every zone has been
+                 handed to the thread already running actions for it
+        """
+        batch = []
+        for zone in zones:
+            actions = self._zones.get(zone.id)
+            if actions is not None:
+                self._add(actions, context, zone)
+                continue
+
+            actions = self._zones[zone.id] = _ZoneActions()
+            actions.running = zone
+            actions.superseded = threading.Event()
+            batch.append((zone, actions))
+
+        if not batch:
+            return None
+
+        result = None
+        try:
+            result = batch_func(context, [zone for zone, _ in batch])
+        except Exception:
+            LOG.exception('Failed to %(action)s a batch of %(count)d zones',
+                          {'action': batch[0][0].action,
+                           'count': len(batch)})
+        finally:
+            for zone, actions in batch:
+                self._run_waiting(zone.id, actions, func)
+
+        return result
+
+    def _run_waiting(self, zone_id, actions, func):
+        result = None
+        try:
+            while actions.waiting:
+                context, actions.running = actions.waiting.popleft()
+                actions.superseded = threading.Event()
+                try:
+                    result = func(context, actions.running,
+                                  actions.superseded)
+                except Exception:
+                    LOG.exception('Failed to %(action)s zone %(zone)s',
+                                  {'action': actions.running.action,
+                                   'zone': actions.running.name})
+        finally:
+            del self._zones[zone_id]
+
+        return result
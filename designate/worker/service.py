@@ -52,6 +52,7 @@ class Service(service.RPCService):
 
         self._executor = None
         self._pools_map = None
+        self._zone_action_queue = None
 
         super(Service, self).__init__(
             self.service_name, cfg.CONF['service:worker'].topic,
@@ -141,22 +142,58 @@ class Service(service.RPCService):
     def stop(self, graceful=True):
         super(Service, self).stop(graceful)
 
+    @property
+    def zone_action_queue(self):
+        if not self._zone_action_queue:
+            self._zone_action_queue = processing.ZoneActionQueue()
+        return self._zone_action_queue
+
     def _do_zone_action(self, context, zone):
+        if cfg.CONF['service:worker'].coalesce_zone_actions:
+            return self.zone_action_queue.run(
+                context, zone, self._run_zone_action)
+        return self._run_zone_action(context, zone)
+
+    def _run_zone_action(self, context, zone, superseded=None):
         pool = self.get_pool(zone.pool_id)
         all_tasks = []
         all_tasks.append(zonetasks.ZoneAction(
-            self.executor, context, pool, zone, zone.action
+            self.executor, context, pool, zone, zone.action,
+            superseded=superseded
         ))
+        all_tasks.extend(self._also_notify_tasks(pool, zone))
+        return self.executor.run(all_tasks)
 
+    def _run_zone_batch(self, context, pool_id, zones, action):
+        if cfg.CONF['service:worker'].coalesce_zone_actions:
+            return self.zone_action_queue.run_batch(
+                context, zones,
+                lambda context, zones: self._run_zone_batch_action(
+                    context, pool_id, zones, action),
+                self._run_zone_action)
+        return self._run_zone_batch_action(context, pool_id, zones, action)
+
+    def _run_zone_batch_action(self, context, pool_id, zones, action):
+        pool = self.get_pool(pool_id)
+        all_tasks = []
+        all_tasks.append(zonetasks.BatchZoneAction(
+            self.executor, context, pool, zones, action
+        ))
+        for zone in zones:
+            all_tasks.extend(self._also_notify_tasks(pool, zone))
+        return self.executor.run(all_tasks)
+
+    def _also_notify_tasks(self, pool, zone):
         # Send a NOTIFY to each also-notifies
+        tasks = []
         for also_notify in pool.also_notifies:
             notify_target = AlsoNotifyTask()
             notify_target.options = {'host': also_notify.host,
                                      'port': also_notify.port}
-            all_tasks.append(zonetasks.SendNotify(self.executor,
-                                                  zone,
-                                                  notify_target))
-        return self.executor.run(all_tasks)
+            tasks.append(zonetasks.SendNotify(self.executor,
+                                              zone,
+                                              notify_target))
+        return tasks
 
     @rpc.expected_exceptions()
     def create_zone(self, context, zone):
@@ -193,7 +230,8 @@ class Service(service.RPCService):
         :return: None
         """
         return self.executor.run(zonetasks.RecoverShard(
-            self.executor, context, begin, end
+            self.executor, context, begin, end,
+            run_batch=self._run_zone_batch
         ))
 
     @rpc.expected_exceptions()
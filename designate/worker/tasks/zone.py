@@ -13,6 +13,7 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import functools
 import time
 from collections import namedtuple
 
@@ -20,6 +21,7 @@ import dns
 from oslo_config import cfg
 from oslo_log import log as logging
 
+from designate.worker import poller
 from designate.worker import utils as wutils
 from designate.worker.tasks import base
 from designate import exceptions
@@ -47,6 +49,16 @@ class ThresholdMixin(object):
         return p >= self.threshold
 
 
+def _wait(seconds, superseded=None):
+    """
+    Sleep, waking up early if the change being polled for is superseded
+    """
+    if superseded is None:
+        time.sleep(seconds)
+    else:
+        superseded.wait(seconds)
+
+
 ######################
 # CRUD Zone Operations
 ######################
@@ -206,19 +218,21 @@ class ZoneAction(base.Task):
     :return: Success/Failure of the change propagating to a satisfactory
              number of nameservers (bool)
     """
-    def __init__(self, executor, context, pool, zone, action):
+    def __init__(self, executor, context, pool, zone, action,
+                 superseded=None):
         super(ZoneAction, self).__init__(executor)
         self.context = context
         self.pool = pool
         self.zone = zone
         self.action = action
+        self.superseded = superseded
         self.task_name = 'ZoneAction-%s' % self.action.title()
 
     def _wait_for_nameservers(self):
         """
         Pause to give the nameservers a chance to update
         """
-        time.sleep(self.delay)
+        _wait(self.delay, self.superseded)
 
     def _zone_action_on_targets(self):
         actor = ZoneActor(
@@ -227,7 +241,8 @@ class ZoneAction(base.Task):
         return actor()
 
     def _poll_for_zone(self):
-        poller = ZonePoller(self.executor, self.context, self.pool, self.zone)
+        poller = ZonePoller(self.executor, self.context, self.pool, self.zone,
+                            superseded=self.superseded)
         return poller()
 
     def __call__(self):
@@ -248,6 +263,173 @@ class ZoneAction(base.Task):
         return True
 
 
+########################
+# Batched Zone Operations
+########################
+
+class BatchZoneActionOnTarget(base.Task):
+    """
+    Perform a Create/Update/Delete of several zones on a pool target in one
+    backend call, retrying the zones that failed
+
+    :return: Success/Failure of the target action for each zone (list)
+    """
+    def __init__(self, executor, context, zones, action, target):
+        super(BatchZoneActionOnTarget, self).__init__(executor)
+        self.zones = zones
+        self.action = action
+        self.target = target
+        self.context = context
+        self.task_name = 'BatchZoneActionOnTarget-%s' % self.action.title()
+
+    def _backend_method(self):
+        if self.action == 'CREATE':
+            return self.target.backend.create_zones
+        elif self.action == 'UPDATE':
+            return self.target.backend.update_zones
+        return self.target.backend.delete_zones
+
+    def _notify(self, zone):
+        if self.action == 'DELETE':
+            return True
+        try:
+            return SendNotify(self.executor, zone, self.target)()
+        except Exception:
+            return False
+
+    def __call__(self):
+        LOG.debug("Attempting %(action)s of %(count)d zones on %(target)s",
+                  {
+                      'action': self.action,
+                      'count': len(self.zones),
+                      'target': self.target
+                  })
+
+        method = self._backend_method()
+        results = [False] * len(self.zones)
+        pending = list(range(len(self.zones)))
+
+        for retry in range(0, self.max_retries):
+            zones = [self.zones[i] for i in pending]
+            try:
+                succeeded = method(self.context, zones)
+            except Exception as e:
+                LOG.info('Failed to %(action)s %(count)d zones on '
+                         'target %(target)s on attempt %(attempt)d, '
+                         'Error: %(error)s.',
+                         {
+                             'action': self.action,
+                             'count': len(zones),
+                             'target': self.target.id,
+                             'attempt': retry + 1,
+                             'error': str(e)
+                         })
+                succeeded = [False] * len(zones)
+
+            for i, success in zip(pending, succeeded):
+                results[i] = success and self._notify(self.zones[i])
+
+            pending = [i for i in pending if not results[i]]
+            if not pending:
+                break
+
+            LOG.info('Failed to %(action)s %(count)d zones on target '
+                     '%(target)s on attempt %(attempt)d',
+                     {
+                         'action': self.action,
+                         'count': len(pending),
+                         'target': self.target.id,
+                         'attempt': retry + 1
+                     })
+            time.sleep(self.retry_interval)
+
+        return results
+
+
+class BatchZoneActor(ZoneActor):
+    """
+    Orchestrate the Create/Update/Delete action of several zones on the
+    targets, updating the status of the zones it failed for
+
+    :return: Whether the action got to a satisfactory number of targets,
+             for each zone (list)
+    """
+    def __init__(self, executor, context, pool, zones, action):
+        super(BatchZoneActor, self).__init__(executor, context, pool, None)
+        self.zones = zones
+        self.action = action
+
+    def _execute(self):
+        return self.executor.run([
+            BatchZoneActionOnTarget(
+                self.executor, self.context, self.zones, self.action, target)
+            for target in self.pool.targets
+        ])
+
+    def __call__(self):
+        self._validate_action(self.action)
+        target_results = self._execute()
+
+        results = []
+        for i, zone in enumerate(self.zones):
+            successes = [bool(r and r[i]) for r in target_results]
+            met_action_threshold = self._compare_threshold(
+                successes.count(True), len(successes))
+
+            if not met_action_threshold:
+                LOG.info('Could not %(action)s %(zone)s on enough targets. '
+                         'Updating status to ERROR',
+                         {
+                             'action': self.action,
+                             'zone': zone.name
+                         })
+                zone.status = 'ERROR'
+                UpdateStatus(self.executor, self.context, zone)()
+            results.append(met_action_threshold)
+        return results
+
+
+class BatchZoneAction(base.Task):
+    """
+    Orchestrate a complete Create/Update/Delete of several zones, waiting for
+    the same action, on the pool and the polling for the changes
+
+    :return: Success/Failure of the change propagating to a satisfactory
+             number of nameservers, for each zone (list)
+    """
+    def __init__(self, executor, context, pool, zones, action):
+        super(BatchZoneAction, self).__init__(executor)
+        self.context = context
+        self.pool = pool
+        self.zones = zones
+        self.action = action
+        self.task_name = 'BatchZoneAction-%s' % self.action.title()
+
+    def __call__(self):
+        LOG.info('Attempting %(action)s on %(count)d zones',
+                 {'action': self.action, 'count': len(self.zones)})
+
+        results = BatchZoneActor(
+            self.executor, self.context, self.pool, self.zones, self.action
+        )()
+
+        zones = [zone for zone, result in zip(self.zones, results) if result]
+        if not zones:
+            return results
+
+        _wait(self.delay)
+
+        pollers = []
+        for zone in zones:
+            if self.action == 'DELETE':
+                zone.serial = 0
+            pollers.append(
+                ZonePoller(self.executor, self.context, self.pool, zone))
+        polled = iter(self.executor.run(pollers))
+
+        return [result and bool(next(polled)) for result in results]
+
+
 ##############
 # Zone Polling
 ##############
@@ -311,6 +493,13 @@ class PollForZone(base.Task):
         self.ns = ns
 
     def _get_serial(self):
+        if (self.config.poll_sockets_per_nameserver and
+                not CONF['service:mdns'].all_tcp):
+            return poller.get_poller().get_serial(
+                self.zone.name,
+                self.ns.host,
+                port=self.ns.port
+            )
         return wutils.get_serial(
             self.zone.name,
             self.ns.host,
@@ -364,11 +553,15 @@ class ZonePoller(base.Task, ThresholdMixin):
     :return: Whether the change was successfully polled for on a satisfactory
              number of nameservers in the pool
     """
-    def __init__(self, executor, context, pool, zone):
+    def __init__(self, executor, context, pool, zone, superseded=None):
         super(ZonePoller, self).__init__(executor)
         self.context = context
         self.pool = pool
         self.zone = zone
+        self.superseded = superseded
+
+    def _is_superseded(self):
+        return self.superseded is not None and self.superseded.is_set()
 
     def _update_status(self):
         task = UpdateStatus(self.executor, self.context, self.zone)
@@ -400,9 +593,12 @@ class ZonePoller(base.Task, ThresholdMixin):
                          {'zone': self.zone.name})
                 break
 
+            if self._is_superseded():
+                break
+
             LOG.debug('Unsuccessful poll for %(zone)s on attempt %(n)d',
                       {'zone': self.zone.name, 'n': retry + 1})
-            time.sleep(retry_interval)
+            _wait(retry_interval, self.superseded)
 
         return query_result
 
@@ -469,6 +665,14 @@ class ZonePoller(base.Task, ThresholdMixin):
         query_result = self._do_poll()
         result = None
         success, status = self._threshold_met(query_result)
+        if not success and self._is_superseded():
+            # The newer change polls for a newer serial and updates the
+            # status for both
+            LOG.info('Stopped polling for %(serial)s for %(zone)s, it has '
+                     'been superseded by a newer change.',
+                     {'serial': self.zone.serial, 'zone': self.zone.name})
+            return False
+
         if success:
             result = self._on_success(query_result, status)
         else:
@@ -529,11 +733,12 @@ class RecoverShard(base.Task):
 
     :return: No return value
     """
-    def __init__(self, executor, context, begin, end):
+    def __init__(self, executor, context, begin, end, run_batch=None):
         super(RecoverShard, self).__init__(executor)
         self.context = context
         self.begin_shard = begin
         self.end_shard = end
+        self.run_batch = run_batch
 
     def _get_zones(self):
         criterion = {
@@ -563,9 +768,38 @@ class RecoverShard(base.Task):
 
         return error_zones
 
+    def _recover_in_batches(self, zones):
+        """
+        Hand the zones to the backends in batches of the zones of a pool
+        waiting for the same action
+
+        The batches run alongside each other, as the zones recovered one at a
+        time do, rather than each waiting for the one before it to propagate
+        """
+        batch_size = self.config.zone_action_batch_size
+
+        groups = {}
+        for zone in zones:
+            if zone.action not in ('CREATE', 'UPDATE', 'DELETE'):
+                continue
+            groups.setdefault((zone.pool_id, zone.action), []).append(zone)
+
+        batches = []
+        for (pool_id, action), group in groups.items():
+            for i in range(0, len(group), batch_size):
+                batches.append(functools.partial(
+                    self.run_batch,
+                    self.context, pool_id, group[i:i + batch_size], action))
+
+        self.executor.run(batches)
+
     def __call__(self):
         zones = self._get_zones()
 
+        if self.run_batch is not None and self.config.zone_action_batch_size:
+            self._recover_in_batches(zones)
+            return
+
         for zone in zones:
             if zone.action == 'CREATE':
                 self.worker_api.create_zone(self.context, zone)
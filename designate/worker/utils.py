@@ -74,6 +74,14 @@ def get_serial(zone_name, host, port=53):
     Possibly returns 0 if, e.g., the answer section is empty.
     """
     resp = dig(zone_name, host, dns.rdatatype.SOA, port=port)
+    return parse_serial(resp)
+
+
+def parse_serial(resp):
+    """
+    Get the serial from the response to a SOA query.
+    Returns 0 if, e.g., the answer section is empty.
+    """
     if not resp.answer:
         return 0
     rdataset = resp.answer[0].to_rdataset()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""
+Measure the queries per second handled by designate.service.DNSService,
+spawning a thread per query (the default) or using a query pool
+(dns_pool_size).
+
+The server runs in a child process with a trivial application which flips
+the QR bit of each query, optionally sleeping to simulate a storage lookup.
+"""
+import argparse
+import multiprocessing
+import socket
+import struct
+import time
+
+import dns.message
+import dns.rdatatype
+
+
+def run_server(pool_size, delay, ready):
+    # Monkey patch the same way the designate services do
+    import designate.cmd  # noqa
+
+    import eventlet
+    from oslo_service import threadgroup
+
+    import designate.conf
+    from designate import service
+
+    designate.conf.CONF([], project='designate', default_config_files=[])
+
+    def app(request):
+        if delay:
+            eventlet.sleep(delay)
+        response = bytearray(request['payload'])
+        response[2] |= 0x80
+        yield bytes(response)
+
+    tg = threadgroup.ThreadGroup(1000)
+    dns_service = service.DNSService(
+        app, tg, ['127.0.0.1:0'], 100, 5.0, pool_size=pool_size)
+    dns_service.start()
+
+    ready.send((dns_service._dns_socks_udp[0].getsockname()[1],
+                dns_service._dns_socks_tcp[0].getsockname()[1]))
+    tg.wait()
+
+
+def bench_udp(port, queries, window):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(5)
+    query = dns.message.make_query('example.com.', dns.rdatatype.A).to_wire()
+
+    start = time.time()
+    sent = 0
+    while sent < queries:
+        batch = min(window, queries - sent)
+        for _ in range(batch):
+            sock.sendto(query, ('127.0.0.1', port))
+        for _ in range(batch):
+            sock.recv(512)
+        sent += batch
+    return queries / (time.time() - start)
+
+
+def bench_tcp(port, queries, window):
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.settimeout(5)
+    query = dns.message.make_query('example.com.', dns.rdatatype.A).to_wire()
+    framed = struct.pack('!H', len(query)) + query
+
+    start = time.time()
+    sent = 0
+    while sent < queries:
+        batch = min(window, queries - sent)
+        # Pipeline a window of queries on the connection
+        sock.sendall(framed * batch)
+        expected = len(framed) * batch
+        received = 0
+        while received < expected:
+            received += len(sock.recv(expected - received))
+        sent += batch
+    sock.close()
+    return queries / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--queries', type=int, default=10000)
+    parser.add_argument('--window', type=int, default=50,
+                        help='Queries in flight at once')
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='Seconds the application sleeps per query')
+    parser.add_argument('--pool-size', type=int, default=100,
+                        help='dns_pool_size used for the pooled run')
+    args = parser.parse_args()
+
+    for pool_size in (0, args.pool_size):
+        ready, server_ready = multiprocessing.Pipe(duplex=False)
+        server = multiprocessing.Process(
+            target=run_server, args=(pool_size, args.delay, server_ready))
+        server.start()
+        try:
+            if not ready.poll(30):
+                raise RuntimeError('The DNS server did not start')
+            udp_port, tcp_port = ready.recv()
+            udp = bench_udp(udp_port, args.queries, args.window)
+            tcp = bench_tcp(tcp_port, args.queries, args.window)
+        finally:
+            server.terminate()
+            server.join()
+
+        print('dns_pool_size=%-5d UDP %8.0f q/s  TCP pipelined %8.0f q/s' %
+              (pool_size, udp, tcp))
+
+
+if __name__ == '__main__':
+    main()
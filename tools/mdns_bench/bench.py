@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+"""
+Load test designate-mdns.
+
+designate.mdns.service runs in a child process against a database seeded
+with synthetic zones, and concurrent SOA queries, NOTIFYs and zone transfers
+are sent to it. The latency percentiles and message rate of each workload
+and the peak RSS of the server are reported.
+"""
+import argparse
+import base64
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+import dns.message
+import dns.name
+import dns.opcode
+import dns.query
+import dns.rdatatype
+
+TSIG_KEY_NAME = 'mdns-bench'
+TSIG_SECRET = base64.b64encode(b'mdns-bench-secret').decode('ascii')
+ZONE_NAME = 'zone%d.mdns-bench.example.'
+SECONDARY_ZONE_NAME = 'secondary%d.mdns-bench.example.'
+
+
+def seed(zones, records, tsig):
+    """Create the zones, their records and the TSIG key, unless present"""
+    from oslo_config import cfg
+
+    from designate.context import DesignateContext
+    from designate import objects
+    from designate import storage
+    from designate import utils
+
+    context = DesignateContext.get_admin_context(all_tenants=True)
+    store = storage.get_storage('sqlalchemy')
+    pool_id = cfg.CONF['service:central'].default_pool_id
+
+    if store.count_zones(context, {'name': ZONE_NAME % 0}):
+        print('Using the zones already in the database')
+        return
+
+    start = time.time()
+    for i in range(zones):
+        for name, zone_type in ((ZONE_NAME % i, 'PRIMARY'),
+                                (SECONDARY_ZONE_NAME % i, 'SECONDARY')):
+            zone = objects.Zone(
+                name=name, email='admin@example.org', type=zone_type,
+                serial=utils.increment_serial(), ttl=3600, refresh=3600,
+                retry=600, expire=86400, minimum=3600, pool_id=pool_id,
+                tenant_id='mdns-bench', action='NONE', status='ACTIVE')
+            if zone_type == 'SECONDARY':
+                # The benchmark client is not a master of the zone, so mdns
+                # refuses the NOTIFYs after looking the zone up
+                zone.masters = objects.ZoneMasterList(objects=[
+                    objects.ZoneMaster(host='192.0.2.1', port=53)])
+            zone = store.create_zone(context, zone)
+            if zone_type == 'SECONDARY':
+                continue
+
+            soa = '%s %s %d %d %d %d %d' % (
+                'ns1.example.org.', 'admin.example.org.', zone.serial,
+                zone.refresh, zone.retry, zone.expire, zone.minimum)
+            recordsets = [
+                _recordset(objects, name, 'SOA', [soa], zone.serial),
+                _recordset(objects, name, 'NS', ['ns1.example.org.'],
+                           zone.serial),
+            ]
+            for j in range(records):
+                recordsets.append(_recordset(
+                    objects, 'host%d.%s' % (j, name), 'A',
+                    ['10.%d.%d.%d' % (j >> 16 & 255, j >> 8 & 255, j & 255)],
+                    zone.serial))
+            store.create_recordsets(context, zone.id, recordsets)
+
+    if tsig:
+        store.create_tsigkey(context, objects.TsigKey(
+            name=TSIG_KEY_NAME, algorithm='hmac-md5', secret=TSIG_SECRET,
+            scope='POOL', resource_id=pool_id))
+
+    print('Seeded %d zones of %d records in %.1fs' %
+          (zones, records, time.time() - start))
+
+
+def _recordset(objects, name, rrtype, data, serial):
+    return objects.RecordSet(
+        name=name, type=rrtype, records=objects.RecordList(objects=[
+            objects.Record(data=d, serial=serial, action='NONE',
+                           status='ACTIVE')
+            for d in data
+        ]))
+
+
+def run_server(args, ready):
+    # Monkey patch the same way the designate services do
+    import designate.cmd  # noqa
+
+    from oslo_config import cfg
+
+    import designate.conf
+    from designate import rpc
+    from designate.manage import database
+    from designate.mdns import service
+
+    # Only report problems, the handler logs every refused NOTIFY
+    logging.disable(logging.WARNING)
+    warnings.simplefilter('ignore')
+
+    config_files = [args.config_file] if args.config_file else []
+    designate.conf.CONF([], project='designate',
+                        default_config_files=config_files)
+    cfg.CONF.set_override('connection', args.connection,
+                          'storage:sqlalchemy')
+    cfg.CONF.set_override('listen', ['127.0.0.1:0'], 'service:mdns')
+    # Parsing a transport URL registers the oslo.messaging options, mdns
+    # does not need a message bus to answer queries
+    rpc.get_transport_url()
+    cfg.CONF.set_override('transport_url', 'fake:/')
+    rpc.init(cfg.CONF)
+
+    database.get_manager().upgrade(None)
+
+    server = service.Service()
+    seed(args.zones, args.records, args.tsig)
+    server.start()
+
+    ready.send((server.dns_service._dns_socks_udp[0].getsockname()[1],
+                server.dns_service._dns_socks_tcp[0].getsockname()[1]))
+    server.wait()
+
+
+class Workload(object):
+    def __init__(self, name, port, zones, keyring=None):
+        self.name = name
+        self.port = port
+        self.zones = zones
+        self.keyring = keyring
+        self.latencies = []
+        self.messages = 0
+        self.errors = 0
+        self.first_error = None
+        self.lock = threading.Lock()
+
+    def make_query(self, zone, rdtype):
+        query = dns.message.make_query(zone, rdtype)
+        if self.keyring:
+            query.use_tsig(self.keyring, keyname=TSIG_KEY_NAME)
+        return query
+
+    def request(self, zone):
+        """Send one request, return the number of messages received"""
+        raise NotImplementedError
+
+    def run(self, count, concurrency):
+        def worker(n):
+            for i in range(n, count, concurrency):
+                zone = self.zones[i % len(self.zones)]
+                start = time.time()
+                try:
+                    messages = self.request(zone)
+                except Exception as e:
+                    with self.lock:
+                        self.errors += 1
+                        self.first_error = self.first_error or e
+                    continue
+                elapsed = time.time() - start
+                with self.lock:
+                    self.latencies.append(elapsed)
+                    self.messages += messages
+
+        threads = [threading.Thread(target=worker, args=(n,))
+                   for n in range(concurrency)]
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.duration = time.time() - start
+
+    def report(self):
+        latencies = sorted(self.latencies) or [0]
+
+        def percentile(p):
+            return latencies[min(int(len(latencies) * p),
+                                 len(latencies) - 1)] * 1000
+
+        print('%-10s %7d ok %5d errors %9.0f req/s %9.0f msg/s '
+              'p50 %8.2fms p99 %8.2fms' % (
+                  self.name, len(self.latencies), self.errors,
+                  len(self.latencies) / self.duration,
+                  self.messages / self.duration,
+                  percentile(0.5), percentile(0.99)))
+        if self.first_error:
+            print('    first error: %r' % self.first_error)
+
+
+class SOAWorkload(Workload):
+    def __init__(self, name, port, zones, keyring=None, tcp=False):
+        super(SOAWorkload, self).__init__(name, port, zones, keyring)
+        self.tcp = tcp
+
+    def request(self, zone):
+        query = self.make_query(zone, dns.rdatatype.SOA)
+        send = dns.query.tcp if self.tcp else dns.query.udp
+        response = send(query, '127.0.0.1', port=self.port, timeout=10)
+        if not response.answer:
+            raise ValueError('No SOA in the response')
+        return 1
+
+
+class NotifyWorkload(Workload):
+    def request(self, zone):
+        query = self.make_query(zone, dns.rdatatype.SOA)
+        query.set_opcode(dns.opcode.NOTIFY)
+        dns.query.udp(query, '127.0.0.1', port=self.port, timeout=10)
+        return 1
+
+
+class XFRWorkload(Workload):
+    def __init__(self, name, port, zones, keyring=None,
+                 rdtype=dns.rdatatype.AXFR):
+        super(XFRWorkload, self).__init__(name, port, zones, keyring)
+        self.rdtype = rdtype
+
+    def request(self, zone):
+        kwargs = {}
+        if self.keyring:
+            kwargs = {'keyring': self.keyring, 'keyname': TSIG_KEY_NAME}
+        if self.rdtype == dns.rdatatype.IXFR:
+            # The seeded zones have no journal, so this is answered with a
+            # full transfer of the zone
+            kwargs['serial'] = 1
+        return sum(1 for _ in dns.query.xfr(
+            '127.0.0.1', zone, rdtype=self.rdtype, port=self.port,
+            timeout=60, lifetime=600, relativize=False, **kwargs))
+
+
+def peak_rss(pid):
+    try:
+        with open('/proc/%d/status' % pid) as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) // 1024
+    except IOError:
+        pass
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--connection',
+                        help='Database URL, a new SQLite database is '
+                             'created by default')
+    parser.add_argument('--config-file',
+                        help='designate.conf with the [service:mdns] '
+                             'options to benchmark')
+    parser.add_argument('--zones', type=int, default=10)
+    parser.add_argument('--records', type=int, default=1000,
+                        help='A records per zone')
+    parser.add_argument('--queries', type=int, default=5000,
+                        help='SOA queries and NOTIFYs per workload')
+    parser.add_argument('--transfers', type=int, default=50,
+                        help='Zone transfers per workload')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--tsig', action='store_true',
+                        help='Sign every request with a TSIG key')
+    parser.add_argument('--workloads', default='soa-udp,soa-tcp,notify,axfr',
+                        help='Comma separated, from soa-udp, soa-tcp, '
+                             'notify, axfr and ixfr')
+    args = parser.parse_args()
+
+    db_file = None
+    if not args.connection:
+        _, db_file = tempfile.mkstemp(prefix='mdns-bench-', suffix='.sqlite')
+        args.connection = 'sqlite:///%s' % db_file
+
+    ready, server_ready = multiprocessing.Pipe(duplex=False)
+    server = multiprocessing.Process(target=run_server,
+                                     args=(args, server_ready))
+    server.start()
+
+    try:
+        # Seeding large zones takes a while
+        if not ready.poll(3600):
+            raise RuntimeError('mdns did not start')
+        udp_port, tcp_port = ready.recv()
+
+        keyring = None
+        if args.tsig:
+            keyring = {dns.name.from_text(TSIG_KEY_NAME):
+                       base64.b64decode(TSIG_SECRET)}
+
+        zones = [ZONE_NAME % i for i in range(args.zones)]
+        secondary_zones = [SECONDARY_ZONE_NAME % i for i in range(args.zones)]
+        workloads = {
+            'soa-udp': (SOAWorkload('soa-udp', udp_port, zones, keyring),
+                        args.queries),
+            'soa-tcp': (SOAWorkload('soa-tcp', tcp_port, zones, keyring,
+                                    tcp=True), args.queries),
+            'notify': (NotifyWorkload('notify', udp_port, secondary_zones,
+                                      keyring), args.queries),
+            'axfr': (XFRWorkload('axfr', tcp_port, zones, keyring),
+                     args.transfers),
+            'ixfr': (XFRWorkload('ixfr', tcp_port, zones, keyring,
+                                 rdtype=dns.rdatatype.IXFR), args.transfers),
+        }
+
+        print('%d zones of %d records, concurrency %d%s' % (
+            args.zones, args.records, args.concurrency,
+            ', TSIG' if args.tsig else ''))
+        for name in args.workloads.split(','):
+            workload, count = workloads[name]
+            workload.run(count, args.concurrency)
+            workload.report()
+
+        rss = peak_rss(server.pid)
+        if rss is not None:
+            print('mdns peak RSS %d MiB' % rss)
+    finally:
+        server.terminate()
+        server.join()
+        if db_file:
+            os.unlink(db_file)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())